@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Measure per-request auth CPU with and without the verified-claims cache.
+
+Signs an RS256 token with a throwaway key, serves the matching JWK from the
+auth key cache and runs ``services.shared.auth.verify_request`` the way the
+middleware does. "cold" clears the claims cache before every call (the old
+behaviour: full signature verification each hop), "warm" hits the local LRU.
+``--redis-url`` adds a run where every lookup is answered by the Redis tier,
+as seen by the second service on a request's path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import rsa  # noqa: E402
+from jose import jwt  # noqa: E402
+
+from services.shared import auth  # noqa: E402
+from services.shared.claims_cache import ClaimsCache  # noqa: E402
+
+
+def _b64(value: int) -> str:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _token_and_jwk(bits: int) -> tuple[str, dict]:
+    public, private = rsa.newkeys(bits)
+    token = jwt.encode(
+        {
+            "sub": "bench-user",
+            "iss": auth._allowed_issuers()[0],
+            "aud": "dpp-platform",
+            "exp": int(time.time()) + 3600,
+            "realm_access": {"roles": ["developer"]},
+        },
+        private.save_pkcs1().decode("ascii"),
+        algorithm="RS256",
+        headers={"kid": "bench"},
+    )
+    jwk = {
+        "kid": "bench",
+        "kty": "RSA",
+        "alg": "RS256",
+        "use": "sig",
+        "n": _b64(public.n),
+        "e": _b64(public.e),
+    }
+    return token, jwk
+
+
+def _run(label: str, token: str, number: int, *, before_each=None) -> float:
+    request = SimpleNamespace(
+        headers={"authorization": f"Bearer {token}"},
+        state=SimpleNamespace(request_id="bench"),
+    )
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for _ in range(number):
+        if before_each is not None:
+            before_each()
+        auth.verify_request(request)
+    cpu_us = (time.process_time() - cpu) / number * 1e6
+    wall_us = (time.perf_counter() - wall) / number * 1e6
+    print(f"{label:<24} cpu {cpu_us:9.1f} us/req   wall {wall_us:9.1f} us/req")
+    return cpu_us
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark verified-claims caching.")
+    parser.add_argument("--number", type=int, default=200, help="Requests per run.")
+    parser.add_argument("--bits", type=int, default=2048, help="RSA key size.")
+    parser.add_argument(
+        "--redis-url", default=None, help="Also measure hits served by Redis."
+    )
+    args = parser.parse_args()
+
+    token, jwk = _token_and_jwk(args.bits)
+    now = time.time()
+    auth._cache.update(
+        {"keys": [jwk], "fetched": now, "keycloak_ok": True, "keycloak_checked": now}
+    )
+    auth.AUTH_MODE = "keycloak"
+    auth._claims_cache = ClaimsCache()
+    os.environ.setdefault("KEYCLOAK_AUDIENCES", "dpp-platform")
+
+    cold = _run(
+        "cold (no cache)", token, args.number, before_each=auth._claims_cache.clear
+    )
+    warm = _run("warm (local LRU)", token, args.number * 50)
+    if args.redis_url:
+        from services.shared.redis_client import get_redis
+
+        auth._claims_cache = ClaimsCache(redis_client=get_redis(args.redis_url))
+        auth._claims_cache.put(auth.token_key(token), jwt.get_unverified_claims(token))
+        _run(
+            "redis tier", token, args.number * 10, before_each=auth._claims_cache.clear
+        )
+    print(
+        f"auth cpu saved per cached request: {cold - warm:.1f} us ({cold / warm:.0f}x)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Time JSON Patch application on a large DPP-shaped document.
+
+"deepcopy" is the previous approach (copy the whole document, then patch the
+copy in place). "copy-on-write" is ``services.shared.json_patch.apply_patch``,
+which copies only the containers on each modified path and shares the rest
+with the input. Both apply the same patch: a few nested replaces, an append,
+a move, a copy and a test against a document with ``--cells`` battery cells.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.shared.json_patch import apply_patch  # noqa: E402
+
+
+def _document(cells: int) -> dict:
+    return {
+        "identification": {"id": "urn:dpp:battery:bench", "version": 3},
+        "battery": {
+            "chemistry": "NMC",
+            "weight": {"value": 450.0, "unit": "kg"},
+            "cells": [
+                {
+                    "id": f"cell-{index}",
+                    "voltage": 3.7,
+                    "capacity": {"value": 50.0, "unit": "Ah"},
+                    "materials": [
+                        {"name": name, "share": share, "recycled": share / 4}
+                        for name, share in (
+                            ("lithium", 0.07),
+                            ("nickel", 0.33),
+                            ("cobalt", 0.06),
+                            ("manganese", 0.06),
+                        )
+                    ],
+                }
+                for index in range(cells)
+            ],
+        },
+        "carbonFootprint": {"total": 72.5, "phases": {"production": 60.1}},
+        "history": [{"event": "created", "at": "2026-01-01T00:00:00Z"}],
+    }
+
+
+def _patch(cells: int) -> list[dict]:
+    middle = cells // 2
+    return [
+        {"op": "test", "path": "/identification/version", "value": 3},
+        {"op": "replace", "path": "/identification/version", "value": 4},
+        {"op": "replace", "path": "/battery/weight/value", "value": 452.5},
+        {"op": "replace", "path": f"/battery/cells/{middle}/voltage", "value": 3.65},
+        {
+            "op": "replace",
+            "path": f"/battery/cells/{middle}/materials/2/recycled",
+            "value": 0.03,
+        },
+        {"op": "add", "path": "/history/-", "value": {"event": "patched"}},
+        {"op": "move", "from": "/carbonFootprint/phases", "path": "/phases"},
+        {"op": "copy", "from": "/battery/cells/0", "path": "/referenceCell"},
+    ]
+
+
+def _deepcopy_then_patch(document: dict, patch: list[dict]) -> dict:
+    return apply_patch(copy.deepcopy(document), patch, in_place=True).document
+
+
+def _copy_on_write(document: dict, patch: list[dict]) -> dict:
+    return apply_patch(document, patch).document
+
+
+def _run(label: str, apply, document: dict, patch: list[dict], number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        apply(document, patch)
+    per_patch_us = (time.perf_counter() - started) / number * 1e6
+    print(f"{label:<16} {per_patch_us:12.1f} us/patch")
+    return per_patch_us
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark JSON Patch application.")
+    parser.add_argument(
+        "--cells", type=int, default=5000, help="Cells in the document."
+    )
+    parser.add_argument("--number", type=int, default=50, help="Patches per run.")
+    args = parser.parse_args()
+
+    document = _document(args.cells)
+    patch = _patch(args.cells)
+    size_kib = len(json.dumps(document)) / 1024
+    print(f"document {size_kib:,.0f} KiB, {len(patch)} operations")
+
+    expected = _deepcopy_then_patch(document, patch)
+    result = apply_patch(document, patch)
+    assert result.document == expected, "copy-on-write result differs"
+    print(f"touched: {', '.join(result.touched)}")
+
+    baseline = _run("deepcopy", _deepcopy_then_patch, document, patch, args.number)
+    cow = _run("copy-on-write", _copy_on_write, document, patch, args.number * 100)
+    print(f"speedup: {baseline / cow:,.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
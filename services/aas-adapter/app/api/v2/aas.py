@@ -1,47 +1,22 @@
 from typing import Dict, Any
 
 import requests
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel, Field
 
 from ...auth import require_roles
-from ...config import BASYX_BASE_URL, BASYX_API_PREFIX
-from services.shared.http_client import request as pooled_request
+from ...config import BASYX_BASE_URL, BASYX_API_PREFIX, SHELL_PAGE_DEFAULT_LIMIT
+from ...core.shell_index import SHELL_INDEX, global_asset_id
+from services.shared.basyx_client import BasyxClient, get_basyx_client
+from services.shared.submodel_diff import SubmodelDiffError
 
 router = APIRouter()
 
 
-def _api_prefix() -> str:
-    return f"/{BASYX_API_PREFIX.strip('/')}" if BASYX_API_PREFIX else ""
-
-
-def _basyx_request(
-    method: str,
-    path: str,
-    *,
-    json_body: Dict[str, Any] | list | None = None,
-    timeout: int = 8,
-) -> requests.Response:
-    clean_path = path.lstrip("/")
-    primary = f"{BASYX_BASE_URL}{_api_prefix()}/{clean_path}"
-    response = pooled_request(
-        method=method,
-        url=primary,
-        json=json_body,
-        timeout=timeout,
-        session_name="aas-adapter",
+def _basyx() -> BasyxClient:
+    return get_basyx_client(
+        BASYX_BASE_URL, BASYX_API_PREFIX, session_name="aas-adapter"
     )
-    if response.status_code == 404 and _api_prefix():
-        fallback = f"{BASYX_BASE_URL}/{clean_path}"
-        response = pooled_request(
-            method=method,
-            url=fallback,
-            json=json_body,
-            timeout=timeout,
-            session_name="aas-adapter",
-        )
-    response.raise_for_status()
-    return response
 
 
 class ShellCreateRequest(BaseModel):
@@ -56,6 +31,15 @@ class SubmodelCreateRequest(BaseModel):
 
 class SubmodelPatchRequest(BaseModel):
     elements: list[Dict[str, Any]] = Field(default_factory=list)
+    # Delete current elements that are missing from ``elements``. On by
+    # default: v1 callers send the full list and expect it to replace the
+    # current one.
+    prune: bool = True
+
+
+class BatchCreateRequest(BaseModel):
+    shells: list[Dict[str, Any]] = Field(default_factory=list)
+    submodels: list[Dict[str, Any]] = Field(default_factory=list)
 
 
 class AasxUploadRequest(BaseModel):
@@ -63,17 +47,103 @@ class AasxUploadRequest(BaseModel):
     content_base64: str
 
 
+def _project(shell: dict[str, Any], fields: list[str]) -> dict[str, Any]:
+    projected: dict[str, Any] = {"id": shell.get("id")}
+    for field in fields:
+        if field == "globalAssetId":
+            projected[field] = global_asset_id(shell)
+        elif field in shell:
+            projected[field] = shell[field]
+    return projected
+
+
+def _matches(shell: dict[str, Any], id_short: str | None, asset_id: str | None) -> bool:
+    if id_short and shell.get("idShort") != id_short:
+        return False
+    return not asset_id or global_asset_id(shell) == asset_id
+
+
+def _complete_filter(
+    shells: list[dict[str, Any]],
+    cursor: str | None,
+    next_cursor: str | None,
+    id_short: str | None,
+    asset_id: str | None,
+) -> tuple[str, str] | None:
+    """The single filter ``shells`` are the whole BaSyx result of, if any."""
+    if cursor or next_cursor or bool(id_short) == bool(asset_id):
+        return None
+    if not all(_matches(shell, id_short, asset_id) for shell in shells):
+        # BaSyx ignored the filter; this is not the filter's result.
+        return None
+    if asset_id:
+        return "globalAssetId", asset_id
+    return "idShort", id_short or ""
+
+
+def _page(
+    shells: list[dict[str, Any]],
+    next_cursor: str | None,
+    fields: list[str],
+    source: str,
+) -> Dict[str, Any]:
+    items = [_project(shell, fields) for shell in shells] if fields else shells
+    return {
+        "items": items,
+        "paging_metadata": {"cursor": next_cursor} if next_cursor else {},
+        "next_cursor": next_cursor,
+        "source": source,
+    }
+
+
 @router.get("/aas/shells")
-def list_shells(request: Request):
+def list_shells(
+    request: Request,
+    limit: int = Query(default=SHELL_PAGE_DEFAULT_LIMIT, ge=1, le=1000),
+    cursor: str | None = Query(default=None),
+    id_short: str | None = Query(default=None, alias="idShort"),
+    asset_id: str | None = Query(default=None, alias="globalAssetId"),
+    fields: str | None = Query(default=None),
+):
     require_roles(
         request.state.user,
         ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"],
     )
+    wanted = [field.strip() for field in (fields or "").split(",") if field.strip()]
+
+    # A filtered first page is answered locally only when the index holds the
+    # filter's complete result; everything else goes to BaSyx with its cursor.
+    if not cursor and (asset_id or id_short):
+        if asset_id:
+            known = SHELL_INDEX.lookup("globalAssetId", asset_id)
+        else:
+            known = SHELL_INDEX.lookup("idShort", id_short or "")
+        if known is not None:
+            known = [shell for shell in known if _matches(shell, id_short, asset_id)]
+            if len(known) <= limit:
+                return _page(known, None, wanted, "index")
+
     try:
-        response = _basyx_request("GET", "shells")
-        return response.json()
+        payload = _basyx().list_shells(
+            limit=limit,
+            cursor=cursor,
+            id_short=id_short,
+            global_asset_id=asset_id,
+        )
     except requests.RequestException:
-        return {"items": []}
+        return _page([], None, wanted, "unavailable")
+    if isinstance(payload, list):
+        shells, next_cursor = payload, None
+    else:
+        payload = payload or {}
+        shells = payload.get("result", payload.get("items")) or []
+        next_cursor = (payload.get("paging_metadata") or {}).get("cursor")
+    shells = [shell for shell in shells if isinstance(shell, dict)]
+    SHELL_INDEX.add(
+        shells,
+        complete=_complete_filter(shells, cursor, next_cursor, id_short, asset_id),
+    )
+    return _page(shells, next_cursor, wanted, "basyx")
 
 
 @router.post("/aas/shells")
@@ -88,8 +158,11 @@ def create_shell(request: Request, payload: ShellCreateRequest):
         },
     }
     try:
-        response = _basyx_request("POST", "shells", json_body=shell)
-        return {"status": "created", "shell": response.json()}
+        created = _basyx().create_shell(shell)
+        SHELL_INDEX.add(
+            [created if isinstance(created, dict) and created.get("id") else shell]
+        )
+        return {"status": "created", "shell": created}
     except requests.RequestException as exc:
         return {"status": "degraded", "shell": shell, "error": str(exc)}
 
@@ -100,10 +173,9 @@ def create_submodel(request: Request, payload: SubmodelCreateRequest):
     if not payload.submodel:
         raise HTTPException(status_code=400, detail="Missing submodel")
     try:
-        response = _basyx_request("POST", "submodels", json_body=payload.submodel)
+        created = _basyx().create_submodel(payload.submodel)
     except requests.RequestException as exc:
         return {"status": "error", "error": str(exc)}
-    created = response.json() if response.content else payload.submodel
     return {"status": "created", "submodel": created}
 
 
@@ -114,10 +186,11 @@ def get_submodel_elements(request: Request, submodel_id: str):
         ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"],
     )
     try:
-        response = _basyx_request("GET", f"submodels/{submodel_id}/submodel-elements")
+        payload = _basyx().get_submodel_elements(submodel_id)
     except requests.RequestException as exc:
         return {"error": str(exc), "submodel_id": submodel_id, "items": []}
-    payload = response.json() if response.content else {"items": []}
+    if payload is None:
+        payload = {"items": []}
     if isinstance(payload, dict):
         if "submodel_id" not in payload:
             payload["submodel_id"] = submodel_id
@@ -133,22 +206,46 @@ def patch_submodel_elements(
 ):
     require_roles(request.state.user, ["manufacturer", "developer", "admin"])
     try:
-        try:
-            response = _basyx_request(
-                "PATCH",
-                f"submodels/{submodel_id}/submodel-elements",
-                json_body=payload.elements,
-            )
-        except requests.RequestException:
-            response = _basyx_request(
-                "PUT",
-                f"submodels/{submodel_id}/submodel-elements",
-                json_body=payload.elements,
-            )
+        report = _basyx().apply_submodel_elements(
+            submodel_id, payload.elements, prune=payload.prune
+        )
+    except SubmodelDiffError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
     except requests.RequestException as exc:
         return {"status": "error", "error": str(exc)}
-    updated = response.json() if response.content else payload.elements
-    return {"status": "updated", "submodel_id": submodel_id, "elements": updated}
+    updated = report.pop("elements")
+    return {
+        "status": "updated",
+        "submodel_id": submodel_id,
+        "elements": updated,
+        "diff": report,
+    }
+
+
+@router.post("/aas/batch")
+def create_batch(request: Request, payload: BatchCreateRequest):
+    require_roles(request.state.user, ["manufacturer", "developer", "admin"])
+    if not payload.shells and not payload.submodels:
+        raise HTTPException(status_code=400, detail="Nothing to create")
+    client = _basyx()
+    # Submodels first, so shells never reference a submodel not yet created.
+    submodels = client.create_submodels(payload.submodels)
+    shells = client.create_shells(payload.shells)
+    SHELL_INDEX.add(item["payload"] for item in shells if item["status"] == "created")
+    results = [*submodels, *shells]
+    failed = sum(1 for item in results if item["status"] != "created")
+    if not failed:
+        status = "created"
+    elif failed == len(results):
+        status = "error"
+    else:
+        status = "partial"
+    return {
+        "status": status,
+        "failed": failed,
+        "submodels": submodels,
+        "shells": shells,
+    }
 
 
 @router.post("/aasx/upload")
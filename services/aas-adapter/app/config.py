@@ -2,3 +2,6 @@ import os
 
 BASYX_BASE_URL = os.getenv("BASYX_BASE_URL", "http://aas-environment:8081")
 BASYX_API_PREFIX = os.getenv("BASYX_API_PREFIX", "/api/v3.0")
+SHELL_INDEX_MAX_ENTRIES = max(0, int(os.getenv("SHELL_INDEX_MAX_ENTRIES", "50000")))
+SHELL_INDEX_TTL_SECONDS = max(0.0, float(os.getenv("SHELL_INDEX_TTL_SECONDS", "300")))
+SHELL_PAGE_DEFAULT_LIMIT = max(1, int(os.getenv("SHELL_PAGE_DEFAULT_LIMIT", "100")))
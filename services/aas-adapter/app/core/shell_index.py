@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable
+
+from ..config import SHELL_INDEX_MAX_ENTRIES, SHELL_INDEX_TTL_SECONDS
+from services.shared.metrics import build_counter
+
+SHELL_INDEX_LOOKUPS = build_counter(
+    "dpp_aas_shell_index_total",
+    "Shell lookups answered by the adapter's local shell index",
+    ["filter", "result"],
+)
+
+
+def global_asset_id(shell: dict[str, Any]) -> str | None:
+    asset = shell.get("assetInformation")
+    if isinstance(asset, dict):
+        return asset.get("globalAssetId")
+    return None
+
+
+class ShellIndex:
+    """Shells seen by this adapter, by id, ``idShort`` and ``globalAssetId``.
+
+    The index is filled from shells created through the adapter and from
+    BaSyx listing pages as they pass through, so it only ever knows part of
+    the environment. ``idShort`` is not unique, so knowing some matches says
+    nothing about the others: a filter is answered locally only after BaSyx
+    returned its whole result in one page (``complete=``), and only while
+    none of those shells has expired or been evicted. Shells created through
+    the adapter later join that result. Entries expire after ``ttl`` seconds
+    so shells changed or removed elsewhere are picked up again.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = SHELL_INDEX_MAX_ENTRIES,
+        ttl: float = SHELL_INDEX_TTL_SECONDS,
+        *,
+        clock=time.monotonic,
+    ):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._shells: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._by_field: dict[str, dict[str, set[str]]] = {
+            "idShort": {},
+            "globalAssetId": {},
+        }
+        self._complete: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys(shell: dict[str, Any]) -> dict[str, str | None]:
+        return {
+            "idShort": shell.get("idShort"),
+            "globalAssetId": global_asset_id(shell),
+        }
+
+    def _unlink(self, shell_id: str, shell: dict[str, Any]) -> None:
+        for field, value in self._keys(shell).items():
+            if not value:
+                continue
+            # The filter result no longer holds every match.
+            self._complete.pop((field, value), None)
+            ids = self._by_field[field].get(value)
+            if ids is None:
+                continue
+            ids.discard(shell_id)
+            if not ids:
+                del self._by_field[field][value]
+
+    def _drop(self, shell_id: str) -> None:
+        _expires, shell = self._shells.pop(shell_id)
+        self._unlink(shell_id, shell)
+
+    def add(
+        self,
+        shells: Iterable[dict[str, Any]],
+        *,
+        complete: tuple[str, str] | None = None,
+    ) -> None:
+        """Index ``shells``; ``complete`` names the ``(field, value)`` filter
+        they are the entire BaSyx result of."""
+        if self._maxsize <= 0 or self._ttl <= 0:
+            return
+        expires_at = self._clock() + self._ttl
+        with self._lock:
+            for shell in shells:
+                shell_id = shell.get("id") if isinstance(shell, dict) else None
+                if not shell_id:
+                    continue
+                if shell_id in self._shells:
+                    self._drop(shell_id)
+                self._shells[shell_id] = (expires_at, copy.deepcopy(shell))
+                for field, value in self._keys(shell).items():
+                    if value:
+                        self._by_field[field].setdefault(value, set()).add(shell_id)
+            if complete is not None:
+                self._complete[complete] = expires_at
+            while len(self._shells) > self._maxsize:
+                self._drop(next(iter(self._shells)))
+
+    def lookup(self, field: str, value: str) -> list[dict[str, Any]] | None:
+        """Return every shell whose ``field`` equals ``value``, or ``None``
+        when the index does not hold the complete result."""
+        now = self._clock()
+        with self._lock:
+            matches: list[dict[str, Any]] | None = None
+            complete_until = self._complete.get((field, value))
+            if complete_until is not None and complete_until <= now:
+                del self._complete[(field, value)]
+            elif complete_until is not None:
+                matches = []
+                for shell_id in sorted(self._by_field[field].get(value, ())):
+                    expires_at, shell = self._shells[shell_id]
+                    if expires_at <= now:
+                        # Dropping it also drops the completeness claim.
+                        self._drop(shell_id)
+                        matches = None
+                        break
+                    matches.append(copy.deepcopy(shell))
+        result = "miss" if matches is None else "hit"
+        SHELL_INDEX_LOOKUPS.labels(filter=field, result=result).inc()
+        return matches
+
+    def clear(self) -> None:
+        with self._lock:
+            self._shells.clear()
+            self._complete.clear()
+            for values in self._by_field.values():
+                values.clear()
+
+    def __len__(self) -> int:
+        return len(self._shells)
+
+
+SHELL_INDEX = ShellIndex()
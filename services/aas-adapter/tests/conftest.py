@@ -9,3 +9,17 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 if str(SERVICE_DIR) not in sys.path:
     sys.path.insert(0, str(SERVICE_DIR))
+
+import pytest  # noqa: E402
+
+from app.core.shell_index import SHELL_INDEX  # noqa: E402
+from services.shared.basyx_client import reset_basyx_state  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _fresh_basyx_state():
+    reset_basyx_state()
+    SHELL_INDEX.clear()
+    yield
+    reset_basyx_state()
+    SHELL_INDEX.clear()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Any
 
+import requests
 from fastapi.testclient import TestClient
 
 from app import main
@@ -31,7 +32,7 @@ class DummyResponse:
 
     def raise_for_status(self) -> None:
         if self.status_code >= 400:
-            raise RuntimeError(f"status {self.status_code}")
+            raise requests.HTTPError(f"status {self.status_code}", response=self)
 
 
 def test_get_submodel_elements_maps_payload(monkeypatch):
@@ -59,7 +60,7 @@ def test_get_submodel_elements_maps_payload(monkeypatch):
             {"submodelElements": [{"idShort": "batteryType", "value": "Li-Ion"}]}
         )
 
-    monkeypatch.setattr("app.api.v2.aas.pooled_request", fake_request)
+    monkeypatch.setattr("services.shared.basyx_client.pooled_request", fake_request)
 
     client = TestClient(main.app)
     response = client.get("/api/v2/aas/submodels/submodel-1/elements")
@@ -71,9 +72,13 @@ def test_get_submodel_elements_maps_payload(monkeypatch):
     assert calls[0]["url"].endswith("/submodels/submodel-1/submodel-elements")
 
 
-def test_patch_submodel_elements_passes_elements(monkeypatch):
+def test_patch_submodel_elements_sends_only_changed_elements(monkeypatch):
     monkeypatch.setattr(main, "verify_request", _set_roles(["manufacturer"]))
     calls: list[dict[str, Any]] = []
+    current = [
+        {"idShort": "batteryType", "modelType": "Property", "value": "LFP"},
+        {"idShort": "capacity", "modelType": "Property", "value": "75"},
+    ]
 
     def fake_request(
         *,
@@ -92,17 +97,159 @@ def test_patch_submodel_elements_passes_elements(monkeypatch):
                 "session_name": session_name,
             }
         )
-        return DummyResponse([{"idShort": "batteryType", "value": "NMC"}])
+        if method == "GET":
+            return DummyResponse({"result": current})
+        return DummyResponse(None, status_code=204)
 
-    monkeypatch.setattr("app.api.v2.aas.pooled_request", fake_request)
+    monkeypatch.setattr("services.shared.basyx_client.pooled_request", fake_request)
 
     client = TestClient(main.app)
     response = client.patch(
         "/api/v2/aas/submodels/submodel-1/elements",
-        json={"elements": [{"idShort": "batteryType", "value": "NMC"}]},
+        json={
+            "elements": [{"idShort": "batteryType", "value": "NMC"}],
+            "prune": False,
+        },
     )
     assert response.status_code == 200
-    assert response.json()["status"] == "updated"
-    assert calls
-    assert calls[0]["method"] in {"PATCH", "PUT"}
-    assert calls[0]["json"] == [{"idShort": "batteryType", "value": "NMC"}]
+    body = response.json()
+    assert body["status"] == "updated"
+    assert body["elements"][0] == {
+        "idShort": "batteryType",
+        "modelType": "Property",
+        "value": "NMC",
+    }
+    assert body["diff"]["mode"] == "elements"
+    assert [call["method"] for call in calls] == ["GET", "PATCH"]
+    assert calls[1]["url"].endswith(
+        "/submodels/submodel-1/submodel-elements/batteryType/$value"
+    )
+    assert calls[1]["json"] == "NMC"
+
+
+def test_patch_submodel_elements_replaces_the_list_by_default(monkeypatch):
+    monkeypatch.setattr(main, "verify_request", _set_roles(["manufacturer"]))
+    calls: list[tuple[str, str]] = []
+    current = [
+        {"idShort": "batteryType", "modelType": "Property", "value": "LFP"},
+        {"idShort": "capacity", "modelType": "Property", "value": "75"},
+    ]
+
+    def fake_request(*, method: str, url: str, json: Any = None, **_kwargs):
+        calls.append((method, url))
+        if method == "GET":
+            return DummyResponse({"result": current})
+        return DummyResponse(None, status_code=204)
+
+    monkeypatch.setattr("services.shared.basyx_client.pooled_request", fake_request)
+
+    response = TestClient(main.app).patch(
+        "/api/v2/aas/submodels/submodel-1/elements",
+        json={"elements": [current[0]]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["elements"] == [current[0]]
+    assert [method for method, _url in calls] == ["GET", "DELETE"]
+    assert calls[1][1].endswith("/submodels/submodel-1/submodel-elements/capacity")
+
+
+def test_batch_creates_submodels_and_shells(monkeypatch):
+    monkeypatch.setattr(main, "verify_request", _set_roles(["manufacturer"]))
+    calls: list[tuple[str, str]] = []
+
+    def fake_request(*, method: str, url: str, json: Any = None, **_kwargs):
+        calls.append((method, url))
+        if json.get("id") == "urn:sm:broken":
+            return DummyResponse({"message": "conflict"}, status_code=409)
+        return DummyResponse(json, status_code=201)
+
+    monkeypatch.setattr("services.shared.basyx_client.pooled_request", fake_request)
+
+    client = TestClient(main.app)
+    response = client.post(
+        "/api/v2/aas/batch",
+        json={
+            "shells": [{"id": "urn:aas:1"}, {"id": "urn:aas:2"}],
+            "submodels": [{"id": "urn:sm:ok"}, {"id": "urn:sm:broken"}],
+        },
+    )
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["status"] == "partial"
+    assert body["failed"] == 1
+    assert [item["id"] for item in body["shells"]] == ["urn:aas:1", "urn:aas:2"]
+    assert [item["status"] for item in body["submodels"]] == ["created", "error"]
+    assert {method for method, _url in calls} == {"POST"}
+
+
+def test_list_shells_pages_filters_and_answers_only_complete_results_locally(
+    monkeypatch,
+):
+    monkeypatch.setattr(main, "verify_request", _set_roles(["manufacturer"]))
+    calls: list[tuple[str, str]] = []
+    shell = {
+        "id": "urn:aas:battery-1",
+        "idShort": "Battery1",
+        "assetInformation": {"globalAssetId": "urn:asset:battery-1"},
+        "submodels": [{"keys": [{"type": "Submodel", "value": "urn:sm:1"}]}],
+    }
+
+    def fake_request(*, method: str, url: str, json: Any = None, **_kwargs):
+        calls.append((method, url))
+        if method == "POST":
+            return DummyResponse(json, status_code=201)
+        if "idShort=" in url or "assetIds=" in url:
+            return DummyResponse({"result": [shell]})
+        return DummyResponse(
+            {"result": [shell], "paging_metadata": {"cursor": "next-page"}}
+        )
+
+    monkeypatch.setattr("services.shared.basyx_client.pooled_request", fake_request)
+    client = TestClient(main.app)
+
+    def by_id_short(**params: Any) -> dict[str, Any]:
+        return client.get(
+            "/api/v2/aas/shells", params={"idShort": "Battery1", **params}
+        ).json()
+
+    page = client.get(
+        "/api/v2/aas/shells", params={"limit": 1, "fields": "idShort,globalAssetId"}
+    ).json()
+    # A listing page only holds part of the environment: ask BaSyx.
+    first = by_id_short()
+    # BaSyx returned the whole filtered result: answer it locally.
+    second = by_id_short()
+    client.post(
+        "/api/v2/aas/shells",
+        json={"aas_identifier": "urn:aas:new", "product_name": "Battery1"},
+    )
+    after_create = by_id_short()
+    # The complete result no longer fits the page: BaSyx pages it.
+    paged = by_id_short(limit=1)
+    by_asset = client.get(
+        "/api/v2/aas/shells", params={"globalAssetId": "urn:asset:battery-1"}
+    ).json()
+
+    assert page["items"] == [
+        {
+            "id": "urn:aas:battery-1",
+            "idShort": "Battery1",
+            "globalAssetId": "urn:asset:battery-1",
+        }
+    ]
+    assert page["next_cursor"] == "next-page"
+    assert page["source"] == "basyx"
+    assert calls[0] == ("GET", "http://aas-environment:8081/api/v3.0/shells?limit=1")
+    assert first["source"] == "basyx"
+    assert second["source"] == "index"
+    assert [item["id"] for item in second["items"]] == ["urn:aas:battery-1"]
+    assert after_create["source"] == "index"
+    assert [item["id"] for item in after_create["items"]] == [
+        "urn:aas:battery-1",
+        "urn:aas:new",
+    ]
+    assert paged["source"] == "basyx"
+    assert by_asset["source"] == "basyx"
+    assert [method for method, _url in calls] == ["GET", "GET", "POST", "GET", "GET"]
@@ -18,6 +18,7 @@ from ...config import (
     EVENT_STREAM_MAXLEN,
     REDIS_URL,
 )
+from ...core import state_history
 from ...core.db import SessionLocal, get_db
 from ...dsp.negotiation_state_machine import can_transition
 from ...models.negotiation import EdcNegotiation
@@ -82,16 +83,18 @@ def _resolved_step_delay_ms(value: int | None) -> int:
     return min(value, 60_000)
 
 
-def _set_state(item: EdcNegotiation, state: str) -> None:
-    history = item.state_history or []
-    history.append(
-        {"state": state, "timestamp": datetime.now(timezone.utc).isoformat()}
+def _set_state(db: Session, item: EdcNegotiation, state: str) -> None:
+    state_history.record_transition(
+        db,
+        entity_type=state_history.NEGOTIATION,
+        entity_id=item.negotiation_id,
+        state=state,
+        previous_state=item.current_state,
     )
-    item.state_history = history
     item.current_state = state
 
 
-def _to_dict(item: EdcNegotiation) -> dict[str, Any]:
+def _to_dict(db: Session, item: EdcNegotiation) -> dict[str, Any]:
     return {
         "id": str(item.negotiation_id),
         "state": item.current_state,
@@ -99,7 +102,12 @@ def _to_dict(item: EdcNegotiation) -> dict[str, Any]:
         "asset_id": item.asset_id,
         "consumer_id": item.consumer_participant_id,
         "provider_id": item.provider_participant_id,
-        "state_history": item.state_history or [],
+        "state_history": state_history.load_history(
+            db,
+            entity_type=state_history.NEGOTIATION,
+            entity_id=item.negotiation_id,
+            legacy_history=item.state_history,
+        ),
         "session_id": str(item.session_id) if item.session_id else None,
     }
 
@@ -267,7 +275,7 @@ def _run_async_negotiation_flow(
                 continue
 
             previous_state = item.current_state
-            _set_state(item, target_state)
+            _set_state(db, item, target_state)
             db.commit()
 
             _publish_state_change_event(
@@ -332,7 +340,7 @@ def create_negotiation(
         policy_odrl=payload.policy,
         session_id=_safe_uuid(payload.session_id),
     )
-    _set_state(item, "INITIAL")
+    _set_state(db, item, "INITIAL")
     db.add(item)
     db.commit()
     db.refresh(item)
@@ -350,7 +358,19 @@ def create_negotiation(
             request_id=str(getattr(request.state, "request_id", "")) or None,
         )
 
-    return _to_dict(item)
+    return _to_dict(db, item)
+
+
+@router.get("/negotiations/stats/time-in-state")
+def negotiation_time_in_state(request: Request, db: Session = Depends(get_db)):
+    require_roles(
+        request.state.user, ["developer", "manufacturer", "admin", "regulator"]
+    )
+    return state_history.time_in_state_stats(
+        db,
+        entity_type=state_history.NEGOTIATION,
+        terminal_states=frozenset({"FINALIZED", "TERMINATED"}),
+    )
 
 
 @router.get("/negotiations/{negotiation_id}")
@@ -367,7 +387,7 @@ def get_negotiation(
     )
     if not item:
         raise HTTPException(status_code=404, detail="Not found")
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/negotiations/{negotiation_id}/simulate")
@@ -388,7 +408,7 @@ def simulate_negotiation(
         raise HTTPException(status_code=404, detail="Not found")
 
     if item.current_state in {"FINALIZED", "TERMINATED"}:
-        return _to_dict(item)
+        return _to_dict(db, item)
 
     user_id = resolve_user_id(db, request.state.user)
     background_tasks.add_task(
@@ -401,7 +421,7 @@ def simulate_negotiation(
         actor_subject_value=actor_subject(getattr(request.state, "user", None)),
         request_id=str(getattr(request.state, "request_id", "")) or None,
     )
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/negotiations/{negotiation_id}/accept")
@@ -422,9 +442,9 @@ def accept_offer(
     if not can_transition(item.current_state, "ACCEPTED"):
         raise HTTPException(status_code=400, detail="Invalid transition")
     _enforce_policy(item, payload)
-    _set_state(item, "ACCEPTED")
+    _set_state(db, item, "ACCEPTED")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/negotiations/{negotiation_id}/request")
@@ -445,9 +465,9 @@ def request_offer(
     if not can_transition(item.current_state, "REQUESTING"):
         raise HTTPException(status_code=400, detail="Invalid transition")
     _enforce_policy(item, payload)
-    _set_state(item, "REQUESTING")
+    _set_state(db, item, "REQUESTING")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/negotiations/{negotiation_id}/requested")
@@ -468,9 +488,9 @@ def mark_requested(
     if not can_transition(item.current_state, "REQUESTED"):
         raise HTTPException(status_code=400, detail="Invalid transition")
     _enforce_policy(item, payload)
-    _set_state(item, "REQUESTED")
+    _set_state(db, item, "REQUESTED")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/negotiations/{negotiation_id}/offer")
@@ -491,9 +511,9 @@ def offer(
     if not can_transition(item.current_state, "OFFERED"):
         raise HTTPException(status_code=400, detail="Invalid transition")
     _enforce_policy(item, payload)
-    _set_state(item, "OFFERED")
+    _set_state(db, item, "OFFERED")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/negotiations/{negotiation_id}/agree")
@@ -514,9 +534,9 @@ def agree(
     if not can_transition(item.current_state, "AGREED"):
         raise HTTPException(status_code=400, detail="Invalid transition")
     _enforce_policy(item, payload)
-    _set_state(item, "AGREED")
+    _set_state(db, item, "AGREED")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/negotiations/{negotiation_id}/verify")
@@ -537,9 +557,9 @@ def verify(
     if not can_transition(item.current_state, "VERIFIED"):
         raise HTTPException(status_code=400, detail="Invalid transition")
     _enforce_policy(item, payload)
-    _set_state(item, "VERIFIED")
+    _set_state(db, item, "VERIFIED")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/negotiations/{negotiation_id}/finalize")
@@ -561,7 +581,7 @@ def finalize(
         raise HTTPException(status_code=400, detail="Invalid transition")
     _enforce_policy(item, payload)
     previous_state = item.current_state
-    _set_state(item, "FINALIZED")
+    _set_state(db, item, "FINALIZED")
     db.commit()
 
     user_id = resolve_user_id(db, request.state.user)
@@ -581,7 +601,7 @@ def finalize(
         actor_subject_value=actor_subject(getattr(request.state, "user", None)),
         request_id=str(getattr(request.state, "request_id", "")) or None,
     )
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/negotiations/{negotiation_id}/terminate")
@@ -596,6 +616,6 @@ def terminate(request: Request, negotiation_id: str, db: Session = Depends(get_d
         raise HTTPException(status_code=404, detail="Not found")
     if not can_transition(item.current_state, "TERMINATED"):
         raise HTTPException(status_code=400, detail="Invalid transition")
-    _set_state(item, "TERMINATED")
+    _set_state(db, item, "TERMINATED")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
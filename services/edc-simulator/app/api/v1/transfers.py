@@ -18,6 +18,7 @@ from ...config import (
     EVENT_STREAM_MAXLEN,
     REDIS_URL,
 )
+from ...core import state_history
 from ...core.db import SessionLocal, get_db
 from ...dsp.transfer_state_machine import can_transition
 from ...models.transfer import EdcTransfer
@@ -74,23 +75,30 @@ def _resolved_step_delay_ms(value: int | None) -> int:
     return min(value, 60_000)
 
 
-def _set_state(item: EdcTransfer, state: str) -> None:
-    history = item.state_history or []
-    history.append(
-        {"state": state, "timestamp": datetime.now(timezone.utc).isoformat()}
+def _set_state(db: Session, item: EdcTransfer, state: str) -> None:
+    state_history.record_transition(
+        db,
+        entity_type=state_history.TRANSFER,
+        entity_id=item.transfer_id,
+        state=state,
+        previous_state=item.current_state,
     )
-    item.state_history = history
     item.current_state = state
 
 
-def _to_dict(item: EdcTransfer) -> dict[str, Any]:
+def _to_dict(db: Session, item: EdcTransfer) -> dict[str, Any]:
     return {
         "id": str(item.transfer_id),
         "state": item.current_state,
         "asset_id": item.asset_id,
         "consumer_id": item.consumer_participant_id,
         "provider_id": item.provider_participant_id,
-        "state_history": item.state_history or [],
+        "state_history": state_history.load_history(
+            db,
+            entity_type=state_history.TRANSFER,
+            entity_id=item.transfer_id,
+            legacy_history=item.state_history,
+        ),
         "session_id": str(item.session_id) if item.session_id else None,
     }
 
@@ -248,7 +256,7 @@ def _run_async_transfer_flow(
                 continue
 
             previous_state = item.current_state
-            _set_state(item, target_state)
+            _set_state(db, item, target_state)
             db.commit()
 
             _publish_state_change_event(
@@ -311,7 +319,7 @@ def create_transfer(
         consumer_participant_id=payload.consumer_id,
         provider_participant_id=payload.provider_id,
     )
-    _set_state(item, "INITIAL")
+    _set_state(db, item, "INITIAL")
     db.add(item)
     db.commit()
     db.refresh(item)
@@ -329,7 +337,19 @@ def create_transfer(
             request_id=str(getattr(request.state, "request_id", "")) or None,
         )
 
-    return _to_dict(item)
+    return _to_dict(db, item)
+
+
+@router.get("/transfers/stats/time-in-state")
+def transfer_time_in_state(request: Request, db: Session = Depends(get_db)):
+    require_roles(
+        request.state.user, ["developer", "manufacturer", "admin", "regulator"]
+    )
+    return state_history.time_in_state_stats(
+        db,
+        entity_type=state_history.TRANSFER,
+        terminal_states=frozenset({"COMPLETED", "TERMINATED"}),
+    )
 
 
 @router.get("/transfers/{transfer_id}")
@@ -340,7 +360,7 @@ def get_transfer(request: Request, transfer_id: str, db: Session = Depends(get_d
     item = db.query(EdcTransfer).filter(EdcTransfer.transfer_id == transfer_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Not found")
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/transfers/{transfer_id}/simulate")
@@ -357,7 +377,7 @@ def simulate_transfer(
         raise HTTPException(status_code=404, detail="Not found")
 
     if item.current_state in {"COMPLETED", "TERMINATED"}:
-        return _to_dict(item)
+        return _to_dict(db, item)
 
     user_id = resolve_user_id(db, request.state.user)
     background_tasks.add_task(
@@ -370,7 +390,7 @@ def simulate_transfer(
         actor_subject_value=actor_subject(getattr(request.state, "user", None)),
         request_id=str(getattr(request.state, "request_id", "")) or None,
     )
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/transfers/{transfer_id}/provision")
@@ -383,9 +403,9 @@ def provision_transfer(
         raise HTTPException(status_code=404, detail="Not found")
     if not can_transition(item.current_state, "PROVISIONING"):
         raise HTTPException(status_code=400, detail="Invalid transition")
-    _set_state(item, "PROVISIONING")
+    _set_state(db, item, "PROVISIONING")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/transfers/{transfer_id}/provisioned")
@@ -396,9 +416,9 @@ def provisioned(request: Request, transfer_id: str, db: Session = Depends(get_db
         raise HTTPException(status_code=404, detail="Not found")
     if not can_transition(item.current_state, "PROVISIONED"):
         raise HTTPException(status_code=400, detail="Invalid transition")
-    _set_state(item, "PROVISIONED")
+    _set_state(db, item, "PROVISIONED")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/transfers/{transfer_id}/request")
@@ -409,9 +429,9 @@ def request_transfer(request: Request, transfer_id: str, db: Session = Depends(g
         raise HTTPException(status_code=404, detail="Not found")
     if not can_transition(item.current_state, "REQUESTING"):
         raise HTTPException(status_code=400, detail="Invalid transition")
-    _set_state(item, "REQUESTING")
+    _set_state(db, item, "REQUESTING")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/transfers/{transfer_id}/requested")
@@ -422,9 +442,9 @@ def requested(request: Request, transfer_id: str, db: Session = Depends(get_db))
         raise HTTPException(status_code=404, detail="Not found")
     if not can_transition(item.current_state, "REQUESTED"):
         raise HTTPException(status_code=400, detail="Invalid transition")
-    _set_state(item, "REQUESTED")
+    _set_state(db, item, "REQUESTED")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/transfers/{transfer_id}/start")
@@ -435,9 +455,9 @@ def start_transfer(request: Request, transfer_id: str, db: Session = Depends(get
         raise HTTPException(status_code=404, detail="Not found")
     if not can_transition(item.current_state, "STARTED"):
         raise HTTPException(status_code=400, detail="Invalid transition")
-    _set_state(item, "STARTED")
+    _set_state(db, item, "STARTED")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/transfers/{transfer_id}/complete")
@@ -450,7 +470,7 @@ def complete(request: Request, transfer_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Invalid transition")
 
     previous_state = item.current_state
-    _set_state(item, "COMPLETED")
+    _set_state(db, item, "COMPLETED")
     db.commit()
 
     user_id = resolve_user_id(db, request.state.user)
@@ -470,7 +490,7 @@ def complete(request: Request, transfer_id: str, db: Session = Depends(get_db)):
         actor_subject_value=actor_subject(getattr(request.state, "user", None)),
         request_id=str(getattr(request.state, "request_id", "")) or None,
     )
-    return _to_dict(item)
+    return _to_dict(db, item)
 
 
 @router.post("/transfers/{transfer_id}/terminate")
@@ -481,6 +501,6 @@ def terminate(request: Request, transfer_id: str, db: Session = Depends(get_db))
         raise HTTPException(status_code=404, detail="Not found")
     if not can_transition(item.current_state, "TERMINATED"):
         raise HTTPException(status_code=400, detail="Invalid transition")
-    _set_state(item, "TERMINATED")
+    _set_state(db, item, "TERMINATED")
     db.commit()
-    return _to_dict(item)
+    return _to_dict(db, item)
@@ -2,11 +2,16 @@ from __future__ import annotations
 
 from typing import Any
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
 
 from ...auth import require_roles
-from ...core.webhook_store import clear_webhook_events, list_webhook_events, record_webhook_event
+from ...core.webhook_store import (
+    InvalidCursorError,
+    clear_webhook_events,
+    list_webhook_page,
+    record_webhook_event,
+)
 
 router = APIRouter()
 
@@ -22,9 +27,18 @@ class SimulatedWebhookPayload(BaseModel):
 
 
 @router.get("/webhooks/simulated")
-def get_simulated_webhooks(request: Request, limit: int = 100):
+def get_simulated_webhooks(
+    request: Request,
+    limit: int = 100,
+    cursor: str | None = None,
+    channel: str | None = None,
+):
     require_roles(request.state.user, ALL_ROLES)
-    return {"items": list_webhook_events(limit=limit)}
+    try:
+        items, next_cursor = list_webhook_page(limit, cursor=cursor, channel=channel)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=422, detail="Invalid cursor") from exc
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.post("/webhooks/simulated")
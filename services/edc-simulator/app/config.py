@@ -18,3 +18,10 @@ def _as_int(name: str, default: int) -> int:
 EVENT_STREAM_MAXLEN = _as_int("EVENT_STREAM_MAXLEN", 50000)
 ASYNC_SIMULATION_DEFAULT_STEP_DELAY_MS = _as_int("ASYNC_SIMULATION_DEFAULT_STEP_DELAY_MS", 250)
 ASYNC_SIMULATION_CALLBACK_TIMEOUT_SECONDS = _as_int("ASYNC_SIMULATION_CALLBACK_TIMEOUT_SECONDS", 5)
+
+WEBHOOK_STORE_BACKEND = os.getenv("WEBHOOK_STORE_BACKEND", "memory").strip().lower()
+WEBHOOK_STORE_MAXLEN = _as_int("WEBHOOK_STORE_MAXLEN", 500)
+WEBHOOK_STREAM_KEY = os.getenv("WEBHOOK_STREAM_KEY", "edc:webhooks")
+
+STORE_FALLBACK_MAX_ITEMS = _as_int("STORE_FALLBACK_MAX_ITEMS", 1000)
+STORE_FALLBACK_TTL_SECONDS = _as_int("STORE_FALLBACK_TTL_SECONDS", 900)
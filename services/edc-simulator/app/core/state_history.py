@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from ..models.state_transition import EdcStateTransition
+
+NEGOTIATION = "negotiation"
+TRANSFER = "transfer"
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite drops tzinfo on read; timestamps are always written in UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def record_transition(
+    db: Session,
+    *,
+    entity_type: str,
+    entity_id: str,
+    state: str,
+    previous_state: str | None = None,
+) -> EdcStateTransition:
+    row = EdcStateTransition(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        previous_state=previous_state,
+        state=state,
+        timestamp=datetime.now(timezone.utc),
+    )
+    db.add(row)
+    return row
+
+
+def load_history(
+    db: Session,
+    *,
+    entity_type: str,
+    entity_id: str,
+    legacy_history: list[dict[str, Any]] | None = None,
+) -> list[dict[str, Any]]:
+    rows = (
+        db.query(EdcStateTransition.state, EdcStateTransition.timestamp)
+        .filter(EdcStateTransition.entity_type == entity_type)
+        .filter(EdcStateTransition.entity_id == entity_id)
+        .order_by(EdcStateTransition.timestamp.asc(), EdcStateTransition.id.asc())
+        .all()
+    )
+    history = [
+        {"state": state, "timestamp": _as_utc(timestamp).isoformat()}
+        for state, timestamp in rows
+    ]
+    # Rows created before the transitions table existed only carry the JSON column.
+    return list(legacy_history or []) + history
+
+
+def time_in_state_stats(
+    db: Session,
+    *,
+    entity_type: str,
+    terminal_states: frozenset[str] = frozenset(),
+    now: datetime | None = None,
+) -> dict[str, Any]:
+    """Aggregate dwell time per state across all entities of one type.
+
+    Only the narrow (entity_id, state, timestamp) columns are streamed in index
+    order, so the cost is independent of policy or history payload sizes. The
+    last state of each entity is counted as open and measured up to ``now``
+    unless it is terminal, in which case only the visit is counted.
+    """
+    reference = _as_utc(now or datetime.now(timezone.utc))
+    query = (
+        db.query(
+            EdcStateTransition.entity_id,
+            EdcStateTransition.state,
+            EdcStateTransition.timestamp,
+        )
+        .filter(EdcStateTransition.entity_type == entity_type)
+        .order_by(
+            EdcStateTransition.entity_id.asc(),
+            EdcStateTransition.timestamp.asc(),
+            EdcStateTransition.id.asc(),
+        )
+        .yield_per(1000)
+    )
+
+    stats: dict[str, dict[str, Any]] = {}
+    entities = 0
+
+    def _accumulate(state: str, seconds: float, *, open_interval: bool) -> None:
+        bucket = stats.setdefault(
+            state,
+            {
+                "state": state,
+                "visits": 0,
+                "open": 0,
+                "measured": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0,
+            },
+        )
+        bucket["visits"] += 1
+        if open_interval:
+            bucket["open"] += 1
+            if state in terminal_states:
+                return
+        bucket["measured"] += 1
+        bucket["total_seconds"] += seconds
+        bucket["max_seconds"] = max(bucket["max_seconds"], seconds)
+
+    previous: tuple[str, str, datetime] | None = None
+    for entity_id, state, timestamp in query:
+        timestamp = _as_utc(timestamp)
+        if previous is not None:
+            prev_entity, prev_state, prev_timestamp = previous
+            if prev_entity == entity_id:
+                _accumulate(
+                    prev_state,
+                    max(0.0, (timestamp - prev_timestamp).total_seconds()),
+                    open_interval=False,
+                )
+            else:
+                _accumulate(
+                    prev_state,
+                    max(0.0, (reference - prev_timestamp).total_seconds()),
+                    open_interval=True,
+                )
+        if previous is None or previous[0] != entity_id:
+            entities += 1
+        previous = (entity_id, state, timestamp)
+
+    if previous is not None:
+        _, prev_state, prev_timestamp = previous
+        _accumulate(
+            prev_state,
+            max(0.0, (reference - prev_timestamp).total_seconds()),
+            open_interval=True,
+        )
+
+    items = []
+    for bucket in sorted(stats.values(), key=lambda item: item["state"]):
+        measured = bucket.pop("measured")
+        items.append(
+            {
+                **bucket,
+                "total_seconds": round(bucket["total_seconds"], 3),
+                "max_seconds": round(bucket["max_seconds"], 3),
+                "avg_seconds": round(bucket["total_seconds"] / measured, 3)
+                if measured
+                else 0.0,
+            }
+        )
+    return {"entity_type": entity_type, "entities": entities, "states": items}
@@ -1,12 +1,269 @@
 from __future__ import annotations
 
-from collections import deque
+import json
+import logging
+import re
+from bisect import bisect_left
 from datetime import datetime, timezone
 from threading import Lock
-from typing import Any
+from typing import Any, Protocol
 
-_events: deque[dict[str, Any]] = deque(maxlen=500)
-_lock = Lock()
+from services.shared.redis_client import get_redis
+
+from ..config import (
+    REDIS_URL,
+    WEBHOOK_STORE_BACKEND,
+    WEBHOOK_STORE_MAXLEN,
+    WEBHOOK_STREAM_KEY,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 500
+
+_STREAM_ID = re.compile(r"^\d+-\d+$")
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a page cursor was not issued by the active store."""
+
+
+class WebhookStore(Protocol):
+    def append(self, entry: dict[str, Any]) -> dict[str, Any]: ...
+
+    def page(
+        self,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        channel: str | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]: ...
+
+    def clear(self) -> int: ...
+
+
+class _Ring:
+    """Fixed-capacity buffer of (seq, entry) pairs ordered by ascending seq."""
+
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self._slots: list[tuple[int, dict[str, Any]] | None] = [None] * capacity
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _at(self, index: int) -> tuple[int, dict[str, Any]]:
+        slot = self._slots[(self._head + index) % self._capacity]
+        assert slot is not None
+        return slot
+
+    def append(self, seq: int, entry: dict[str, Any]) -> None:
+        if self._size < self._capacity:
+            self._slots[(self._head + self._size) % self._capacity] = (seq, entry)
+            self._size += 1
+            return
+        self._slots[self._head] = (seq, entry)
+        self._head = (self._head + 1) % self._capacity
+
+    def newest_before(self, seq: int | None, limit: int) -> list[dict[str, Any]]:
+        if seq is None:
+            end = self._size
+        else:
+            end = bisect_left(
+                range(self._size), seq, key=lambda index: self._at(index)[0]
+            )
+        start = max(0, end - limit)
+        return [self._at(index)[1] for index in range(end - 1, start - 1, -1)]
+
+    def clear(self) -> None:
+        self._slots = [None] * self._capacity
+        self._head = 0
+        self._size = 0
+
+
+class InMemoryWebhookStore:
+    """Process-local store; each channel keeps its own bounded ring so that
+    filtered pages cost O(log n + page) like unfiltered ones."""
+
+    def __init__(self, maxlen: int = WEBHOOK_STORE_MAXLEN):
+        self._maxlen = maxlen
+        self._all = _Ring(maxlen)
+        self._channels: dict[str, _Ring] = {}
+        self._seq = 0
+        self._lock = Lock()
+
+    def append(self, entry: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            self._seq += 1
+            stored = {"id": str(self._seq), **entry}
+            self._all.append(self._seq, stored)
+            ring = self._channels.get(entry["channel"])
+            if ring is None:
+                ring = self._channels[entry["channel"]] = _Ring(self._maxlen)
+            ring.append(self._seq, stored)
+        return stored
+
+    def page(
+        self,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        channel: str | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        if cursor and not cursor.isdigit():
+            raise InvalidCursorError(cursor)
+        before = int(cursor) if cursor else None
+        with self._lock:
+            ring = self._all if channel is None else self._channels.get(channel)
+            if ring is None:
+                return [], None
+            items = ring.newest_before(before, limit)
+        next_cursor = items[-1]["id"] if len(items) == limit else None
+        return items, next_cursor
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._all)
+            self._all.clear()
+            self._channels.clear()
+        return count
+
+
+class RedisStreamWebhookStore:
+    """Stream-backed store shared by every replica.
+
+    Each event is written to a global stream and a per-channel stream in one
+    pipeline; both are trimmed server-side with ``MAXLEN ~``. Pages are read
+    newest-first with ``XREVRANGE`` and an exclusive stream-id cursor.
+
+    While Redis is unreachable events go to a process-local ring instead;
+    its cursors are plain sequence numbers, so a page that started in
+    degraded mode keeps reading from the ring. A stream cursor cannot be
+    continued from the ring, so such a page ends empty instead.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        key: str = WEBHOOK_STREAM_KEY,
+        maxlen: int = WEBHOOK_STORE_MAXLEN,
+    ):
+        self._client = client
+        self._key = key
+        self._maxlen = maxlen
+        self._fallback = InMemoryWebhookStore(maxlen)
+
+    def _channel_key(self, channel: str) -> str:
+        return f"{self._key}:channel:{channel}"
+
+    @property
+    def _channels_key(self) -> str:
+        return f"{self._key}:channels"
+
+    def append(self, entry: dict[str, Any]) -> dict[str, Any]:
+        fields = {"entry": json.dumps(entry)}
+        channel = entry["channel"]
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.xadd(self._key, fields, maxlen=self._maxlen, approximate=True)
+            pipe.xadd(
+                self._channel_key(channel),
+                fields,
+                maxlen=self._maxlen,
+                approximate=True,
+            )
+            pipe.sadd(self._channels_key, channel)
+            message_id, _, _ = pipe.execute()
+        except Exception as exc:
+            logger.warning(
+                "Failed to persist webhook event",
+                extra={"channel": channel, "error": str(exc)},
+            )
+            return self._fallback.append(entry)
+        if isinstance(message_id, bytes):
+            message_id = message_id.decode("utf-8")
+        return {"id": str(message_id), **entry}
+
+    def page(
+        self,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        channel: str | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        if cursor and cursor.isdigit():
+            return self._fallback.page(limit=limit, cursor=cursor, channel=channel)
+        if cursor and not _STREAM_ID.match(cursor):
+            raise InvalidCursorError(cursor)
+        key = self._key if channel is None else self._channel_key(channel)
+        upper = f"({cursor}" if cursor else "+"
+        try:
+            rows = self._client.xrevrange(key, max=upper, min="-", count=limit)
+        except Exception as exc:
+            logger.warning(
+                "Failed to read webhook events",
+                extra={"channel": channel, "error": str(exc)},
+            )
+            if cursor:
+                return [], None
+            return self._fallback.page(limit=limit, channel=channel)
+        items: list[dict[str, Any]] = []
+        for message_id, fields in rows:
+            if isinstance(message_id, bytes):
+                message_id = message_id.decode("utf-8")
+            raw = fields.get(b"entry", fields.get("entry"))
+            try:
+                entry = json.loads(raw)
+            except (TypeError, ValueError):
+                continue
+            items.append({"id": str(message_id), **entry})
+        next_cursor = items[-1]["id"] if len(rows) == limit and items else None
+        return items, next_cursor
+
+    def clear(self) -> int:
+        count = self._fallback.clear()
+        try:
+            channels = [
+                value.decode("utf-8") if isinstance(value, bytes) else str(value)
+                for value in self._client.smembers(self._channels_key)
+            ]
+            count += int(self._client.xlen(self._key))
+            self._client.delete(
+                self._key,
+                self._channels_key,
+                *(self._channel_key(channel) for channel in channels),
+            )
+        except Exception as exc:
+            logger.warning("Failed to clear webhook events", extra={"error": str(exc)})
+        return count
+
+
+_store: WebhookStore | None = None
+_store_lock = Lock()
+
+
+def _build_store() -> WebhookStore:
+    if WEBHOOK_STORE_BACKEND == "redis":
+        return RedisStreamWebhookStore(get_redis(REDIS_URL))
+    return InMemoryWebhookStore()
+
+
+def get_webhook_store() -> WebhookStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _build_store()
+    return _store
+
+
+def set_webhook_store(store: WebhookStore | None) -> None:
+    global _store
+    with _store_lock:
+        _store = store
 
 
 def record_webhook_event(
@@ -25,19 +282,23 @@ def record_webhook_event(
         "error": error,
         "payload": payload,
     }
-    with _lock:
-        _events.appendleft(entry)
-    return entry
+    return get_webhook_store().append(entry)
+
+
+def list_webhook_page(
+    limit: int = 100,
+    *,
+    cursor: str | None = None,
+    channel: str | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    bounded_limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return get_webhook_store().page(limit=bounded_limit, cursor=cursor, channel=channel)
 
 
 def list_webhook_events(limit: int = 100) -> list[dict[str, Any]]:
-    bounded_limit = max(1, min(limit, 500))
-    with _lock:
-        return list(_events)[:bounded_limit]
+    items, _ = list_webhook_page(limit)
+    return items
 
 
 def clear_webhook_events() -> int:
-    with _lock:
-        count = len(_events)
-        _events.clear()
-    return count
+    return get_webhook_store().clear()
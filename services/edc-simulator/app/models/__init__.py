@@ -3,5 +3,13 @@ from .participant import EdcParticipant
 from .asset import EdcAsset
 from .negotiation import EdcNegotiation
 from .transfer import EdcTransfer
+from .state_transition import EdcStateTransition
 
-__all__ = ["Base", "EdcParticipant", "EdcAsset", "EdcNegotiation", "EdcTransfer"]
+__all__ = [
+    "Base",
+    "EdcParticipant",
+    "EdcAsset",
+    "EdcNegotiation",
+    "EdcTransfer",
+    "EdcStateTransition",
+]
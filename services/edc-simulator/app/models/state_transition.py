@@ -0,0 +1,23 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+from .base import Base
+
+
+class EdcStateTransition(Base):
+    __tablename__ = "edc_state_transitions"
+    __table_args__ = (
+        Index(
+            "ix_edc_state_transitions_entity_timestamp",
+            "entity_type",
+            "entity_id",
+            "timestamp",
+        ),
+        Index("ix_edc_state_transitions_type_state", "entity_type", "state"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String(30), nullable=False)
+    entity_id = Column(String(255), nullable=False)
+    previous_state = Column(String(30))
+    state = Column(String(30), nullable=False)
+    timestamp = Column(DateTime(timezone=True), nullable=False)
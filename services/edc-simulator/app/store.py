@@ -1,28 +1,269 @@
-import json
-from typing import Dict, Any
+from __future__ import annotations
 
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Iterable, Mapping
+
+import orjson
+
+from services.shared.metrics import build_counter, build_gauge
 from services.shared.redis_client import get_redis
 
-from .config import REDIS_URL
+from .config import REDIS_URL, STORE_FALLBACK_MAX_ITEMS, STORE_FALLBACK_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
 
+STORE_FALLBACK_OPERATIONS = build_counter(
+    "dpp_edc_store_fallback_total",
+    "EDC key/value store operations served by the in-process fallback",
+    ["operation"],
+)
+STORE_FALLBACK_EVICTIONS = build_counter(
+    "dpp_edc_store_fallback_evictions_total",
+    "Fallback entries dropped by LRU capacity or TTL expiry",
+    ["reason"],
+)
+STORE_FALLBACK_REPLAYED = build_counter(
+    "dpp_edc_store_fallback_replayed_total",
+    "Fallback entries written back to Redis after it recovered",
+    [],
+)
+STORE_FALLBACK_SIZE = build_gauge(
+    "dpp_edc_store_fallback_items",
+    "Entries currently held by the in-process fallback",
+    [],
+)
 
 _client = get_redis(REDIS_URL)
-_fallback: Dict[str, Dict[str, Any]] = {}
+
+# Every write goes through ``_GUARDED_SET``, which keeps the key's last-write
+# time (epoch ms) in a sibling key so a fallback entry replayed after an
+# outage can never overwrite a value another replica wrote to Redis later.
+# Fallback entries expire after STORE_FALLBACK_TTL_SECONDS, so the stamp only
+# has to live that long and expires with the same TTL.
+_WRITTEN_AT_PREFIX = "edc:store:written_at:"
+_WRITTEN_AT_TTL_MS = max(1, STORE_FALLBACK_TTL_SECONDS) * 1000
+_GUARDED_SET = """
+local previous = redis.call('GET', KEYS[2])
+if previous and tonumber(previous) > tonumber(ARGV[2]) then
+  return 0
+end
+redis.call('SET', KEYS[1], ARGV[1])
+redis.call('SET', KEYS[2], ARGV[2], 'PX', ARGV[3])
+return 1
+"""
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _guarded_set(
+    target: Any, key: str, payload: Mapping[str, Any], written_at: int
+) -> Any:
+    """Queue (on a pipeline) or run the guarded write of ``payload``."""
+    return target.eval(
+        _GUARDED_SET,
+        2,
+        key,
+        f"{_WRITTEN_AT_PREFIX}{key}",
+        _dumps(payload),
+        written_at,
+        _WRITTEN_AT_TTL_MS,
+    )
+
+
+def _dumps(payload: Mapping[str, Any]) -> bytes:
+    return orjson.dumps(payload)
+
+
+def _loads(raw: bytes | str | None) -> Dict[str, Any] | None:
+    if not raw:
+        return None
+    return orjson.loads(raw)
+
+
+class _FallbackCache:
+    """Bounded LRU used while Redis is unavailable.
+
+    Entries expire after ``ttl_seconds`` and the least recently used entry is
+    evicted beyond ``max_items``. Writes are remembered as pending, with the
+    wall-clock time they were made, until they are replayed into Redis.
+    """
+
+    def __init__(self, max_items: int, ttl_seconds: int):
+        self._max_items = max_items
+        self._ttl_seconds = ttl_seconds
+        self._items: OrderedDict[str, tuple[float, int, Dict[str, Any]]] = OrderedDict()
+        self._pending: set[str] = set()
+        self._lock = Lock()
+        self.hits = 0
+        self.writes = 0
+        self.evictions = 0
+        self.replayed = 0
+
+    def _evict(self, key: str, reason: str) -> None:
+        self._items.pop(key, None)
+        self._pending.discard(key)
+        self.evictions += 1
+        STORE_FALLBACK_EVICTIONS.labels(reason=reason).inc()
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._items[key] = (
+                time.monotonic() + self._ttl_seconds,
+                _now_ms(),
+                payload,
+            )
+            self._items.move_to_end(key)
+            self._pending.add(key)
+            self.writes += 1
+            while len(self._items) > self._max_items:
+                oldest = next(iter(self._items))
+                self._evict(oldest, "capacity")
+            STORE_FALLBACK_SIZE.set(len(self._items))
+        STORE_FALLBACK_OPERATIONS.labels(operation="save").inc()
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            expires_at, _, payload = entry
+            if expires_at <= time.monotonic():
+                self._evict(key, "ttl")
+                STORE_FALLBACK_SIZE.set(len(self._items))
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+        STORE_FALLBACK_OPERATIONS.labels(operation="load").inc()
+        return payload
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def drain_pending(self) -> dict[str, tuple[int, Dict[str, Any]]]:
+        now = time.monotonic()
+        with self._lock:
+            drained = {
+                key: self._items[key][1:]
+                for key in self._pending
+                if key in self._items and self._items[key][0] > now
+            }
+            self._pending.clear()
+        return drained
+
+    def mark_replayed(
+        self, drained: Mapping[str, tuple[int, Dict[str, Any]]], applied: int
+    ) -> None:
+        """Drop the drained entries, except ones re-put since the drain."""
+        with self._lock:
+            for key, (written_at, _) in drained.items():
+                entry = self._items.get(key)
+                if entry is not None and entry[1] == written_at:
+                    del self._items[key]
+            self.replayed += applied
+            STORE_FALLBACK_REPLAYED.inc(applied)
+            STORE_FALLBACK_SIZE.set(len(self._items))
+
+    def restore_pending(
+        self, drained: Mapping[str, tuple[int, Dict[str, Any]]]
+    ) -> None:
+        with self._lock:
+            self._pending.update(
+                key
+                for key, (written_at, _) in drained.items()
+                if key in self._items and self._items[key][1] == written_at
+            )
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "items": len(self._items),
+                "pending": len(self._pending),
+                "hits": self.hits,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "replayed": self.replayed,
+            }
+
+
+_fallback = _FallbackCache(STORE_FALLBACK_MAX_ITEMS, STORE_FALLBACK_TTL_SECONDS)
+
+
+def _replay_fallback() -> None:
+    if not _fallback.has_pending():
+        return
+    pending = _fallback.drain_pending()
+    if not pending:
+        return
+    try:
+        pipe = _client.pipeline(transaction=False)
+        for key, (written_at, payload) in pending.items():
+            _guarded_set(pipe, key, payload, written_at)
+        results = pipe.execute()
+    except Exception:
+        _fallback.restore_pending(pending)
+        return
+    applied = sum(1 for result in results if int(result) == 1)
+    # Entries Redis rejected as older than its current value are stale, so
+    # they are dropped along with the applied ones.
+    _fallback.mark_replayed(pending, applied)
+    logger.info(
+        "Replayed fallback store entries into Redis",
+        extra={"count": applied, "superseded": len(pending) - applied},
+    )
 
 
 def save_item(key: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     try:
-        _client.set(key, json.dumps(payload))
+        # Replay first so a stale fallback entry never overwrites this write.
+        _replay_fallback()
+        _guarded_set(_client, key, payload, _now_ms())
     except Exception:
-        _fallback[key] = payload
+        _fallback.put(key, payload)
     return payload
 
 
+def save_many(items: Mapping[str, Dict[str, Any]]) -> None:
+    """Write several items in one pipelined round trip."""
+    if not items:
+        return
+    try:
+        _replay_fallback()
+        written_at = _now_ms()
+        pipe = _client.pipeline(transaction=False)
+        for key, payload in items.items():
+            _guarded_set(pipe, key, payload, written_at)
+        pipe.execute()
+    except Exception:
+        for key, payload in items.items():
+            _fallback.put(key, payload)
+
+
 def load_item(key: str) -> Dict[str, Any] | None:
     try:
+        _replay_fallback()
         raw = _client.get(key)
-        if raw:
-            return json.loads(raw)
     except Exception:
         return _fallback.get(key)
-    return None
+    return _loads(raw)
+
+
+def load_many(keys: Iterable[str]) -> dict[str, Dict[str, Any] | None]:
+    """Read several items with one ``MGET``; missing keys map to None."""
+    ordered = list(dict.fromkeys(keys))
+    if not ordered:
+        return {}
+    try:
+        _replay_fallback()
+        raws = _client.mget(ordered)
+    except Exception:
+        return {key: _fallback.get(key) for key in ordered}
+    return {key: _loads(raw) for key, raw in zip(ordered, raws)}
+
+
+def fallback_stats() -> dict[str, int]:
+    return _fallback.stats()
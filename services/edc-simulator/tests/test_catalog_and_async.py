@@ -168,6 +168,9 @@ def test_simulated_webhook_endpoints(monkeypatch):
         for item in list_resp.json()["items"]
     )
 
+    bad_cursor = client.get("/api/v1/edc/webhooks/simulated?cursor=abc")
+    assert bad_cursor.status_code == 422
+
     delete_resp = client.delete("/api/v1/edc/webhooks/simulated")
     assert delete_resp.status_code == 200
     assert delete_resp.json()["deleted"] >= 1
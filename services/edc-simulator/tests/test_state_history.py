@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core import state_history
+from app.core.db import SessionLocal
+from app.models.state_transition import EdcStateTransition
+
+
+def _set_roles(roles: list[str]):
+    def _verify(request):
+        request.state.user = {"sub": "test-user", "realm_access": {"roles": roles}}
+
+    return _verify
+
+
+def test_negotiation_history_is_assembled_from_transition_rows(monkeypatch):
+    monkeypatch.setattr(main, "verify_request", _set_roles(["developer"]))
+    client = TestClient(main.app)
+
+    created = client.post(
+        "/api/v1/edc/negotiations",
+        json={
+            "consumer_id": "consumer-a",
+            "provider_id": "provider-a",
+            "asset_id": f"asset-{uuid4()}",
+            "policy": {},
+        },
+    )
+    assert created.status_code == 200
+    negotiation_id = created.json()["id"]
+
+    assert (
+        client.post(f"/api/v1/edc/negotiations/{negotiation_id}/request").status_code
+        == 200
+    )
+    detail = client.get(f"/api/v1/edc/negotiations/{negotiation_id}").json()
+
+    assert [entry["state"] for entry in detail["state_history"]] == [
+        "INITIAL",
+        "REQUESTING",
+    ]
+    assert detail["state"] == "REQUESTING"
+
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(EdcStateTransition)
+            .filter(EdcStateTransition.entity_id == negotiation_id)
+            .order_by(EdcStateTransition.id.asc())
+            .all()
+        )
+        assert [(row.previous_state, row.state) for row in rows] == [
+            (None, "INITIAL"),
+            ("INITIAL", "REQUESTING"),
+        ]
+    finally:
+        db.close()
+
+
+def test_time_in_state_stats_measures_closed_and_open_intervals():
+    db = SessionLocal()
+    entity_type = f"test-{uuid4()}"
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    try:
+        for entity_id, states in {
+            "a": ["INITIAL", "STARTED", "COMPLETED"],
+            "b": ["INITIAL", "STARTED"],
+        }.items():
+            for offset, state in enumerate(states):
+                db.add(
+                    EdcStateTransition(
+                        entity_type=entity_type,
+                        entity_id=entity_id,
+                        state=state,
+                        timestamp=start + timedelta(seconds=10 * offset),
+                    )
+                )
+        db.commit()
+
+        stats = state_history.time_in_state_stats(
+            db,
+            entity_type=entity_type,
+            terminal_states=frozenset({"COMPLETED"}),
+            now=start + timedelta(seconds=40),
+        )
+    finally:
+        db.query(EdcStateTransition).filter(
+            EdcStateTransition.entity_type == entity_type
+        ).delete()
+        db.commit()
+        db.close()
+
+    by_state = {item["state"]: item for item in stats["states"]}
+    assert stats["entities"] == 2
+    assert by_state["INITIAL"]["visits"] == 2
+    assert by_state["INITIAL"]["avg_seconds"] == 10.0
+    assert by_state["STARTED"]["open"] == 1
+    assert by_state["STARTED"]["total_seconds"] == 40.0
+    assert by_state["COMPLETED"]["visits"] == 1
+    assert by_state["COMPLETED"]["total_seconds"] == 0.0
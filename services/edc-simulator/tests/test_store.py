@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import pytest
+
+from app import store
+
+
+class _FlakyPipeline:
+    def __init__(self, client: "_FlakyRedis"):
+        self._client = client
+        self._ops: list[tuple] = []
+
+    def eval(self, *args):
+        self._ops.append(args)
+
+    def execute(self):
+        self._client._check("execute")
+        return [self._client.eval(*args, _record=False) for args in self._ops]
+
+
+class _FlakyRedis:
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.stamps: dict[str, tuple[int, int]] = {}
+        self.available = True
+        self.calls: list[str] = []
+
+    def _check(self, name: str) -> None:
+        self.calls.append(name)
+        if not self.available:
+            raise ConnectionError("redis down")
+
+    def pipeline(self, transaction: bool = True):
+        return _FlakyPipeline(self)
+
+    def eval(
+        self, _script, _numkeys, key, ts_key, value, written_at, ttl_ms, _record=True
+    ):
+        if _record:
+            self._check("eval")
+        previous = self.stamps.get(ts_key)
+        if previous is not None and previous[0] > int(written_at):
+            return 0
+        self.data[key] = value
+        self.stamps[ts_key] = (int(written_at), int(ttl_ms))
+        return 1
+
+    def get(self, key):
+        self._check("get")
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self._check("mget")
+        return [self.data.get(key) for key in keys]
+
+
+@pytest.fixture
+def flaky(monkeypatch):
+    client = _FlakyRedis()
+    monkeypatch.setattr(store, "_client", client)
+    monkeypatch.setattr(
+        store, "_fallback", store._FallbackCache(max_items=2, ttl_seconds=60)
+    )
+    return client
+
+
+def test_fallback_is_bounded_and_replayed_when_redis_recovers(flaky):
+    flaky.available = False
+    for index in range(3):
+        store.save_item(f"k{index}", {"value": index})
+
+    assert store.load_item("k0") is None
+    assert store.load_item("k2") == {"value": 2}
+    stats = store.fallback_stats()
+    assert stats["items"] == 2
+    assert stats["evictions"] == 1
+
+    flaky.available = True
+    assert store.load_item("k1") == {"value": 1}
+    assert store.fallback_stats()["items"] == 0
+    assert store.fallback_stats()["replayed"] == 2
+    assert store.load_item("k2") == {"value": 2}
+
+
+def test_replay_does_not_overwrite_newer_redis_values(flaky, monkeypatch):
+    monkeypatch.setattr(store, "_now_ms", lambda: 1_000)
+
+    flaky.available = False
+    store.save_item("k", {"value": "stale"})
+    # Another replica reached Redis during the outage with a later write.
+    flaky.data["k"] = store._dumps({"value": "new"})
+    flaky.stamps["edc:store:written_at:k"] = (2_000, 60_000)
+
+    flaky.available = True
+    assert store.load_item("k") == {"value": "new"}
+    stats = store.fallback_stats()
+    assert stats["items"] == 0
+    assert stats["replayed"] == 0
+
+
+def test_mark_replayed_keeps_entries_re_put_after_drain(monkeypatch):
+    clock = iter([1_000, 2_000])
+    monkeypatch.setattr(store, "_now_ms", lambda: next(clock))
+    cache = store._FallbackCache(max_items=10, ttl_seconds=60)
+
+    cache.put("k", {"value": 1})
+    drained = cache.drain_pending()
+    cache.put("k", {"value": 2})
+    cache.mark_replayed(drained, applied=1)
+
+    assert cache.get("k") == {"value": 2}
+    assert cache.has_pending()
+
+
+def test_batch_apis_pipeline_writes_and_read_with_one_mget(flaky):
+    store.save_many({"a": {"value": 1}, "b": {"value": 2}})
+
+    assert flaky.calls == ["execute"]
+    assert store.load_many(["b", "missing", "a", "b"]) == {
+        "b": {"value": 2},
+        "missing": None,
+        "a": {"value": 1},
+    }
+    assert flaky.calls == ["execute", "mget"]
+    # Each key gets its own expiring write stamp; nothing accumulates.
+    assert {ts_key: ttl for ts_key, (_, ttl) in flaky.stamps.items()} == {
+        "edc:store:written_at:a": store._WRITTEN_AT_TTL_MS,
+        "edc:store:written_at:b": store._WRITTEN_AT_TTL_MS,
+    }
+
+
+def test_batch_apis_use_the_fallback_while_redis_is_down(flaky):
+    flaky.available = False
+    store.save_many({"a": {"value": 1}, "b": {"value": 2}})
+
+    assert store.load_many(["a", "b", "c"]) == {
+        "a": {"value": 1},
+        "b": {"value": 2},
+        "c": None,
+    }
+    flaky.available = True
+    assert store.load_many(["a"]) == {"a": {"value": 1}}
+    assert store.fallback_stats()["replayed"] == 2
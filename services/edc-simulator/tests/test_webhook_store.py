@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.webhook_store import (
+    InMemoryWebhookStore,
+    InvalidCursorError,
+    RedisStreamWebhookStore,
+)
+
+
+def _entry(channel: str, index: int) -> dict:
+    return {"channel": channel, "payload": {"index": index}}
+
+
+def test_in_memory_store_pages_newest_first_with_cursor():
+    store = InMemoryWebhookStore(maxlen=5)
+    for index in range(7):
+        store.append(_entry("inbound" if index % 2 else "outbound", index))
+
+    first, cursor = store.page(limit=3)
+    assert [item["payload"]["index"] for item in first] == [6, 5, 4]
+    assert cursor == first[-1]["id"]
+
+    second, cursor = store.page(limit=3, cursor=cursor)
+    assert [item["payload"]["index"] for item in second] == [3, 2]
+    assert cursor is None
+
+
+def test_in_memory_store_filters_by_channel_and_clears():
+    store = InMemoryWebhookStore(maxlen=10)
+    for index in range(6):
+        store.append(_entry("inbound" if index % 2 else "outbound", index))
+
+    inbound, cursor = store.page(limit=2, channel="inbound")
+    assert [item["payload"]["index"] for item in inbound] == [5, 3]
+    rest, _ = store.page(limit=2, channel="inbound", cursor=cursor)
+    assert [item["payload"]["index"] for item in rest] == [1]
+    assert store.page(limit=2, channel="missing") == ([], None)
+
+    assert store.clear() == 6
+    assert store.page(limit=10) == ([], None)
+
+
+class _FakePipeline:
+    def __init__(self, client: "_FakeRedis"):
+        self._client = client
+        self._ops: list = []
+
+    def xadd(self, *args, **kwargs):
+        self._ops.append(("xadd", args, kwargs))
+
+    def sadd(self, *args):
+        self._ops.append(("sadd", args, {}))
+
+    def execute(self):
+        return [
+            getattr(self._client, name)(*args, **kwargs)
+            for name, args, kwargs in self._ops
+        ]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.streams: dict[str, list[tuple[str, dict]]] = {}
+        self.sets: dict[str, set[str]] = {}
+        self._seq = 0
+
+    def pipeline(self, transaction: bool = True):
+        return _FakePipeline(self)
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        self._seq += 1
+        message_id = f"{self._seq}-0"
+        stream = self.streams.setdefault(key, [])
+        stream.append((message_id, {k.encode(): v.encode() for k, v in fields.items()}))
+        if maxlen:
+            del stream[:-maxlen]
+        return message_id.encode()
+
+    def sadd(self, key, value):
+        self.sets.setdefault(key, set()).add(value)
+
+    def smembers(self, key):
+        return {value.encode() for value in self.sets.get(key, set())}
+
+    def xrevrange(self, key, max="+", min="-", count=None):
+        rows = list(reversed(self.streams.get(key, [])))
+        if max.startswith("("):
+            bound = int(max[1:].split("-")[0])
+            rows = [row for row in rows if int(row[0].split("-")[0]) < bound]
+        return [(message_id.encode(), fields) for message_id, fields in rows[:count]]
+
+    def xlen(self, key):
+        return len(self.streams.get(key, []))
+
+    def delete(self, *keys):
+        for key in keys:
+            self.streams.pop(key, None)
+            self.sets.pop(key, None)
+
+
+def test_redis_stream_store_pages_and_filters_by_channel():
+    client = _FakeRedis()
+    store = RedisStreamWebhookStore(client, key="test:webhooks", maxlen=100)
+    for index in range(5):
+        stored = store.append(_entry("inbound" if index % 2 else "outbound", index))
+        assert stored["id"]
+
+    first, cursor = store.page(limit=2)
+    assert [item["payload"]["index"] for item in first] == [4, 3]
+    second, _ = store.page(limit=2, cursor=cursor)
+    assert [item["payload"]["index"] for item in second] == [2, 1]
+
+    inbound, _ = store.page(limit=10, channel="inbound")
+    assert [item["payload"]["index"] for item in inbound] == [3, 1]
+
+    assert store.clear() == 5
+    assert client.streams == {}
+
+
+class _DownRedis:
+    def __getattr__(self, name):
+        def _fail(*_args, **_kwargs):
+            raise ConnectionError("redis unavailable")
+
+        return _fail
+
+
+def test_redis_stream_store_rejects_malformed_cursor():
+    store = RedisStreamWebhookStore(_FakeRedis(), key="test:webhooks")
+    with pytest.raises(InvalidCursorError):
+        store.page(limit=10, cursor="1-0) + junk")
+
+
+def test_redis_stream_store_degrades_to_memory_when_redis_is_down():
+    store = RedisStreamWebhookStore(_DownRedis(), key="test:webhooks", maxlen=10)
+    for index in range(3):
+        assert store.append(_entry("inbound", index))["id"]
+
+    first, cursor = store.page(limit=2)
+    assert [item["payload"]["index"] for item in first] == [2, 1]
+    rest, _ = store.page(limit=2, cursor=cursor)
+    assert [item["payload"]["index"] for item in rest] == [0]
+
+    assert store.clear() == 3
+    assert store.page(limit=10) == ([], None)
+
+
+class _FlakyRedis(_FakeRedis):
+    def __init__(self) -> None:
+        super().__init__()
+        self.down = False
+
+    def xrevrange(self, *args, **kwargs):
+        if self.down:
+            raise ConnectionError("redis unavailable")
+        return super().xrevrange(*args, **kwargs)
+
+
+def test_redis_stream_store_ends_a_stream_cursor_page_when_redis_goes_down():
+    client = _FlakyRedis()
+    store = RedisStreamWebhookStore(client, key="test:webhooks", maxlen=100)
+    for index in range(4):
+        store.append(_entry("inbound", index))
+    _first, cursor = store.page(limit=2)
+
+    client.down = True
+
+    # The ring cannot continue a stream cursor; restarting would loop.
+    assert store.page(limit=2, cursor=cursor) == ([], None)
@@ -13,7 +13,7 @@ from ...config import (
     GAMIFICATION_URL,
     SIMULATION_URL,
 )
-from ...core.proxy import request_json
+from ...core.proxy import stream_json
 
 router = APIRouter()
 
@@ -29,31 +29,31 @@ def health():
 
 
 @router.get("/stories")
-def list_stories(request: Request):
+async def list_stories(request: Request):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(request, "GET", f"{SIMULATION_URL}/api/v1/stories")
+    return await stream_json(request, "GET", f"{SIMULATION_URL}/api/v1/stories")
 
 
 @router.post("/sessions")
-def create_session(request: Request, payload: dict[str, Any]):
+async def create_session(request: Request, payload: dict[str, Any]):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request, "POST", f"{SIMULATION_URL}/api/v1/sessions", json_body=payload
     )
 
 
 @router.get("/sessions/{session_id}")
-def get_session(request: Request, session_id: str):
+async def get_session(request: Request, session_id: str):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request, "GET", f"{SIMULATION_URL}/api/v1/sessions/{session_id}"
     )
 
 
 @router.patch("/sessions/{session_id}")
-def patch_session(request: Request, session_id: str, payload: dict[str, Any]):
+async def patch_session(request: Request, session_id: str, payload: dict[str, Any]):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request,
         "PATCH",
         f"{SIMULATION_URL}/api/v1/sessions/{session_id}",
@@ -62,43 +62,43 @@ def patch_session(request: Request, session_id: str, payload: dict[str, Any]):
 
 
 @router.delete("/sessions/{session_id}")
-def delete_session(request: Request, session_id: str):
+async def delete_session(request: Request, session_id: str):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request, "DELETE", f"{SIMULATION_URL}/api/v1/sessions/{session_id}"
     )
 
 
 @router.post("/sessions/{session_id}/pause")
-def pause_session(request: Request, session_id: str):
+async def pause_session(request: Request, session_id: str):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request, "POST", f"{SIMULATION_URL}/api/v1/sessions/{session_id}/pause"
     )
 
 
 @router.post("/sessions/{session_id}/resume")
-def resume_session(request: Request, session_id: str):
+async def resume_session(request: Request, session_id: str):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request, "POST", f"{SIMULATION_URL}/api/v1/sessions/{session_id}/resume"
     )
 
 
 @router.post("/sessions/{session_id}/complete")
-def complete_session(request: Request, session_id: str):
+async def complete_session(request: Request, session_id: str):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request, "POST", f"{SIMULATION_URL}/api/v1/sessions/{session_id}/complete"
     )
 
 
 @router.post("/sessions/{session_id}/stories/{code}/start")
-def start_story(
+async def start_story(
     request: Request, session_id: str, code: str, payload: dict[str, Any] | None = None
 ):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request,
         "POST",
         f"{SIMULATION_URL}/api/v1/sessions/{session_id}/stories/{code}/start",
@@ -107,7 +107,7 @@ def start_story(
 
 
 @router.post("/sessions/{session_id}/stories/{code}/steps/{idx}/execute")
-def execute_step(
+async def execute_step(
     request: Request,
     session_id: str,
     code: str,
@@ -115,7 +115,7 @@ def execute_step(
     payload: dict[str, Any],
 ):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request,
         "POST",
         f"{SIMULATION_URL}/api/v1/sessions/{session_id}/stories/{code}/steps/{idx}/execute",
@@ -124,14 +124,14 @@ def execute_step(
 
 
 @router.post("/sessions/{session_id}/stories/{code}/validate")
-def validate_story(
+async def validate_story(
     request: Request,
     session_id: str,
     code: str,
     payload: dict[str, Any],
 ):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request,
         "POST",
         f"{SIMULATION_URL}/api/v1/sessions/{session_id}/stories/{code}/validate",
@@ -140,7 +140,7 @@ def validate_story(
 
 
 @router.get("/progress")
-def get_progress(
+async def get_progress(
     request: Request,
     session_id: str | None = None,
     role: str | None = None,
@@ -161,25 +161,25 @@ def get_progress(
         "offset": offset,
     }
     clean_params = {key: value for key, value in params.items() if value is not None}
-    return request_json(
+    return await stream_json(
         request, "GET", f"{SIMULATION_URL}/api/v1/progress", params=clean_params
     )
 
 
 @router.get("/progress/epics")
-def get_epic_progress(request: Request):
+async def get_epic_progress(request: Request):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(request, "GET", f"{SIMULATION_URL}/api/v1/progress/epics")
+    return await stream_json(request, "GET", f"{SIMULATION_URL}/api/v1/progress/epics")
 
 
 @router.get("/aas/shells")
-def list_shells(request: Request):
+async def list_shells(request: Request):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(request, "GET", f"{AAS_ADAPTER_URL}/api/v2/aas/shells")
+    return await stream_json(request, "GET", f"{AAS_ADAPTER_URL}/api/v2/aas/shells")
 
 
 @router.post("/aas/shells")
-def create_shell(request: Request, payload: dict[str, Any]):
+async def create_shell(request: Request, payload: dict[str, Any]):
     require_roles(request.state.user, CREATOR_ROLES)
     asset_information = payload.get("assetInformation")
     global_asset_id = (
@@ -192,7 +192,7 @@ def create_shell(request: Request, payload: dict[str, Any]):
         "product_name": payload.get("product_name") or payload.get("idShort"),
         "product_identifier": payload.get("product_identifier") or global_asset_id,
     }
-    return request_json(
+    return await stream_json(
         request,
         "POST",
         f"{AAS_ADAPTER_URL}/api/v2/aas/shells",
@@ -201,29 +201,29 @@ def create_shell(request: Request, payload: dict[str, Any]):
 
 
 @router.post("/aas/submodels")
-def create_submodel(request: Request, payload: dict[str, Any]):
+async def create_submodel(request: Request, payload: dict[str, Any]):
     require_roles(request.state.user, CREATOR_ROLES)
     body = {"submodel": payload.get("submodel") or payload}
-    return request_json(
+    return await stream_json(
         request, "POST", f"{AAS_ADAPTER_URL}/api/v2/aas/submodels", json_body=body
     )
 
 
 @router.get("/aas/submodels/{submodel_id}/elements")
-def get_submodel_elements(request: Request, submodel_id: str):
+async def get_submodel_elements(request: Request, submodel_id: str):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request, "GET", f"{AAS_ADAPTER_URL}/api/v2/aas/submodels/{submodel_id}/elements"
     )
 
 
 @router.patch("/aas/submodels/{submodel_id}/elements")
-def patch_submodel_elements(
+async def patch_submodel_elements(
     request: Request, submodel_id: str, payload: dict[str, Any]
 ):
     require_roles(request.state.user, CREATOR_ROLES)
     body = {"elements": payload.get("elements", payload)}
-    return request_json(
+    return await stream_json(
         request,
         "PATCH",
         f"{AAS_ADAPTER_URL}/api/v2/aas/submodels/{submodel_id}/elements",
@@ -232,35 +232,35 @@ def patch_submodel_elements(
 
 
 @router.post("/aas/validate")
-def validate_aas(request: Request, payload: dict[str, Any]):
+async def validate_aas(request: Request, payload: dict[str, Any]):
     require_roles(request.state.user, REGULATOR_ROLES)
-    return request_json(
+    return await stream_json(
         request, "POST", f"{SIMULATION_URL}/api/v1/aas/validate", json_body=payload
     )
 
 
 @router.post("/aasx/upload")
-def upload_aasx(request: Request, payload: dict[str, Any]):
+async def upload_aasx(request: Request, payload: dict[str, Any]):
     require_roles(request.state.user, CREATOR_ROLES)
     body = {
         "filename": payload.get("filename"),
         "content_base64": payload.get("content_base64"),
     }
-    return request_json(
+    return await stream_json(
         request, "POST", f"{AAS_ADAPTER_URL}/api/v2/aasx/upload", json_body=body
     )
 
 
 @router.post("/compliance/check")
-def check_compliance(request: Request, payload: dict[str, Any]):
+async def check_compliance(request: Request, payload: dict[str, Any]):
     require_roles(request.state.user, COMPLIANCE_ROLES)
-    return request_json(
+    return await stream_json(
         request, "POST", f"{COMPLIANCE_URL}/api/v1/compliance/check", json_body=payload
     )
 
 
 @router.get("/reports")
-def list_reports(
+async def list_reports(
     request: Request,
     session_id: str | None = None,
     story_code: str | None = None,
@@ -275,52 +275,54 @@ def list_reports(
         "limit": limit,
     }
     clean_params = {key: value for key, value in params.items() if value is not None}
-    return request_json(
+    return await stream_json(
         request, "GET", f"{COMPLIANCE_URL}/api/v1/reports", params=clean_params
     )
 
 
 @router.get("/reports/{report_id}")
-def get_report(request: Request, report_id: str):
+async def get_report(request: Request, report_id: str):
     require_roles(request.state.user, REGULATOR_ROLES)
-    return request_json(request, "GET", f"{COMPLIANCE_URL}/api/v1/reports/{report_id}")
+    return await stream_json(
+        request, "GET", f"{COMPLIANCE_URL}/api/v1/reports/{report_id}"
+    )
 
 
 @router.get("/edc/catalog")
-def get_catalog(request: Request):
+async def get_catalog(request: Request):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(request, "GET", f"{EDC_URL}/api/v1/edc/catalog")
+    return await stream_json(request, "GET", f"{EDC_URL}/api/v1/edc/catalog")
 
 
 @router.get("/edc/participants")
-def get_participants(request: Request):
+async def get_participants(request: Request):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(request, "GET", f"{EDC_URL}/api/v1/edc/participants")
+    return await stream_json(request, "GET", f"{EDC_URL}/api/v1/edc/participants")
 
 
 @router.get("/edc/assets")
-def get_assets(request: Request):
+async def get_assets(request: Request):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(request, "GET", f"{EDC_URL}/api/v1/edc/assets")
+    return await stream_json(request, "GET", f"{EDC_URL}/api/v1/edc/assets")
 
 
 @router.post("/edc/negotiations")
-def create_negotiation(request: Request, payload: dict[str, Any]):
+async def create_negotiation(request: Request, payload: dict[str, Any]):
     require_roles(request.state.user, CREATOR_ROLES)
-    return request_json(
+    return await stream_json(
         request, "POST", f"{EDC_URL}/api/v1/edc/negotiations", json_body=payload
     )
 
 
 @router.post("/edc/negotiations/{negotiation_id}/{action}")
-def negotiation_action(
+async def negotiation_action(
     request: Request,
     negotiation_id: str,
     action: str,
     payload: dict[str, Any] | None = None,
 ):
     require_roles(request.state.user, CREATOR_ROLES)
-    return request_json(
+    return await stream_json(
         request,
         "POST",
         f"{EDC_URL}/api/v1/edc/negotiations/{negotiation_id}/{action}",
@@ -329,22 +331,22 @@ def negotiation_action(
 
 
 @router.post("/edc/transfers")
-def create_transfer(request: Request, payload: dict[str, Any]):
+async def create_transfer(request: Request, payload: dict[str, Any]):
     require_roles(request.state.user, CREATOR_ROLES)
-    return request_json(
+    return await stream_json(
         request, "POST", f"{EDC_URL}/api/v1/edc/transfers", json_body=payload
     )
 
 
 @router.post("/edc/transfers/{transfer_id}/{action}")
-def transfer_action(
+async def transfer_action(
     request: Request,
     transfer_id: str,
     action: str,
     payload: dict[str, Any] | None = None,
 ):
     require_roles(request.state.user, CREATOR_ROLES)
-    return request_json(
+    return await stream_json(
         request,
         "POST",
         f"{EDC_URL}/api/v1/edc/transfers/{transfer_id}/{action}",
@@ -353,13 +355,13 @@ def transfer_action(
 
 
 @router.get("/achievements")
-def list_achievements(request: Request):
+async def list_achievements(request: Request):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(request, "GET", f"{GAMIFICATION_URL}/api/v1/achievements")
+    return await stream_json(request, "GET", f"{GAMIFICATION_URL}/api/v1/achievements")
 
 
 @router.get("/leaderboard")
-def leaderboard(
+async def leaderboard(
     request: Request,
     limit: int = 10,
     offset: int = 0,
@@ -370,7 +372,7 @@ def leaderboard(
     params = {"limit": limit, "offset": offset, "window": window}
     if role is not None:
         params["role"] = role
-    return request_json(
+    return await stream_json(
         request,
         "GET",
         f"{GAMIFICATION_URL}/api/v1/leaderboard",
@@ -379,13 +381,13 @@ def leaderboard(
 
 
 @router.get("/streaks")
-def streaks(request: Request):
+async def streaks(request: Request):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(request, "GET", f"{GAMIFICATION_URL}/api/v1/streaks")
+    return await stream_json(request, "GET", f"{GAMIFICATION_URL}/api/v1/streaks")
 
 
 @router.get("/annotations")
-def list_annotations(
+async def list_annotations(
     request: Request,
     story_id: int | None = None,
     status: str | None = None,
@@ -402,21 +404,21 @@ def list_annotations(
         "offset": offset,
     }
     clean_params = {key: value for key, value in params.items() if value is not None}
-    return request_json(
+    return await stream_json(
         request, "GET", f"{COLLABORATION_URL}/api/v1/annotations", params=clean_params
     )
 
 
 @router.post("/annotations")
-def add_annotation(request: Request, payload: dict[str, Any]):
+async def add_annotation(request: Request, payload: dict[str, Any]):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request, "POST", f"{COLLABORATION_URL}/api/v1/annotations", json_body=payload
     )
 
 
 @router.get("/gap_reports")
-def gap_reports(
+async def gap_reports(
     request: Request,
     story_id: int | None = None,
     status: str | None = None,
@@ -431,34 +433,34 @@ def gap_reports(
         "offset": offset,
     }
     clean_params = {key: value for key, value in params.items() if value is not None}
-    return request_json(
+    return await stream_json(
         request, "GET", f"{COLLABORATION_URL}/api/v1/gap_reports", params=clean_params
     )
 
 
 @router.post("/gap_reports")
-def add_gap_report(request: Request, payload: dict[str, Any]):
+async def add_gap_report(request: Request, payload: dict[str, Any]):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request, "POST", f"{COLLABORATION_URL}/api/v1/gap_reports", json_body=payload
     )
 
 
 @router.get("/votes")
-def votes(
+async def votes(
     request: Request, target_id: str | None = None, limit: int = 50, offset: int = 0
 ):
     require_roles(request.state.user, ALL_ROLES)
     params = {"target_id": target_id, "limit": limit, "offset": offset}
     clean_params = {key: value for key, value in params.items() if value is not None}
-    return request_json(
+    return await stream_json(
         request, "GET", f"{COLLABORATION_URL}/api/v1/votes", params=clean_params
     )
 
 
 @router.post("/votes")
-def vote(request: Request, payload: dict[str, Any]):
+async def vote(request: Request, payload: dict[str, Any]):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await stream_json(
         request, "POST", f"{COLLABORATION_URL}/api/v1/votes", json_body=payload
     )
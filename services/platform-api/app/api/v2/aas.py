@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Query, Request
 
 from ...auth import require_roles
-from ...config import AAS_ADAPTER_URL
-from ...core.proxy import request_json
+from ...config import AAS_ADAPTER_URL, SIMULATION_URL
+from ...core.proxy import forward_body, request_json
 from ...schemas.v2 import (
     AasCreateRequest,
     AasShellCreateResponse,
@@ -21,21 +21,38 @@ router = APIRouter()
 
 
 @router.get("/aas/shells", response_model=AasShellListResponse)
-def list_shells(request: Request):
+async def list_shells(
+    request: Request,
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = None,
+    id_short: str | None = Query(default=None, alias="idShort"),
+    global_asset_id: str | None = Query(default=None, alias="globalAssetId"),
+    fields: str | None = None,
+):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    payload = request_json(request, "GET", f"{AAS_ADAPTER_URL}/api/v2/aas/shells")
-    return {"items": payload.get("items", [])}
+    params = {
+        "limit": limit,
+        "cursor": cursor,
+        "idShort": id_short,
+        "globalAssetId": global_asset_id,
+        "fields": fields,
+    }
+    clean_params = {k: v for k, v in params.items() if v is not None}
+    payload = await request_json(
+        request, "GET", f"{AAS_ADAPTER_URL}/api/v2/aas/shells", params=clean_params
+    )
+    return {"items": payload.get("items", []), "next_cursor": payload.get("next_cursor")}
 
 
 @router.post("/aas/shells", response_model=AasShellCreateResponse)
-def create_shell(request: Request, payload: AasCreateRequest):
+async def create_shell(request: Request, payload: AasCreateRequest):
     require_roles(request.state.user, ["manufacturer", "developer", "admin"])
     adapter_payload = {
         "aas_identifier": payload.aas_identifier,
         "product_name": payload.product_name,
         "product_identifier": payload.product_identifier,
     }
-    response = request_json(
+    response = await request_json(
         request,
         "POST",
         f"{AAS_ADAPTER_URL}/api/v2/aas/shells",
@@ -49,9 +66,9 @@ def create_shell(request: Request, payload: AasCreateRequest):
 
 
 @router.post("/aas/submodels", response_model=AasSubmodelCreateResponse)
-def create_submodel(request: Request, payload: AasSubmodelCreateRequest):
+async def create_submodel(request: Request, payload: AasSubmodelCreateRequest):
     require_roles(request.state.user, ["manufacturer", "developer", "admin"])
-    response = request_json(
+    response = await request_json(
         request,
         "POST",
         f"{AAS_ADAPTER_URL}/api/v2/aas/submodels",
@@ -65,9 +82,9 @@ def create_submodel(request: Request, payload: AasSubmodelCreateRequest):
 
 
 @router.patch("/aas/submodels/{submodel_id}/elements", response_model=AasSubmodelPatchResponse)
-def patch_submodel_elements(request: Request, submodel_id: str, payload: AasSubmodelPatchRequest):
+async def patch_submodel_elements(request: Request, submodel_id: str, payload: AasSubmodelPatchRequest):
     require_roles(request.state.user, ["manufacturer", "developer", "admin"])
-    response = request_json(
+    response = await request_json(
         request,
         "PATCH",
         f"{AAS_ADAPTER_URL}/api/v2/aas/submodels/{submodel_id}/elements",
@@ -77,14 +94,15 @@ def patch_submodel_elements(request: Request, submodel_id: str, payload: AasSubm
         "status": response.get("status", "unknown"),
         "submodel_id": response.get("submodel_id") or submodel_id,
         "elements": response.get("elements", payload.elements),
+        "diff": response.get("diff"),
         "error": response.get("error"),
     }
 
 
 @router.post("/aasx/upload", response_model=AasxUploadResponse)
-def upload_aasx(request: Request, payload: AasxUploadRequest):
+async def upload_aasx(request: Request, payload: AasxUploadRequest):
     require_roles(request.state.user, ["manufacturer", "developer", "admin"])
-    response = request_json(
+    response = await request_json(
         request,
         "POST",
         f"{AAS_ADAPTER_URL}/api/v2/aasx/upload",
@@ -96,3 +114,26 @@ def upload_aasx(request: Request, payload: AasxUploadRequest):
         "bytes": response.get("bytes"),
         "storage": response.get("storage"),
     }
+
+
+@router.post("/aasx/files", response_model=AasxUploadResponse)
+async def upload_aasx_file(request: Request):
+    """Relay a ``multipart/form-data`` AASX upload to simulation-engine.
+
+    The body is streamed through untouched, so the gateway never holds the
+    package in memory.
+    """
+    require_roles(request.state.user, ["manufacturer", "developer", "admin"])
+    response = await forward_body(request, f"{SIMULATION_URL}/api/v1/aasx/files")
+    return {
+        "status": response.get("status", "unknown"),
+        "filename": response.get("filename"),
+        "bytes": response.get("bytes"),
+        "storage": response.get("storage"),
+    }
+
+
+@router.get("/aasx/{dpp_id}/submodels")
+async def list_aasx_submodels(request: Request, dpp_id: str):
+    require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
+    return await request_json(request, "GET", f"{SIMULATION_URL}/api/v1/aasx/{dpp_id}/submodels")
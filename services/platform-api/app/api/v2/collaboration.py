@@ -24,7 +24,7 @@ router = APIRouter()
 
 
 @router.get("/collaboration/annotations", response_model=AnnotationListResponse)
-def list_annotations(
+async def list_annotations(
     request: Request,
     story_id: int | None = None,
     status: str | None = None,
@@ -41,7 +41,7 @@ def list_annotations(
         "offset": offset,
     }
     clean_params = {k: v for k, v in params.items() if v is not None}
-    payload = request_json(
+    payload = await request_json(
         request,
         "GET",
         f"{COLLABORATION_URL}/api/v1/annotations",
@@ -51,9 +51,9 @@ def list_annotations(
 
 
 @router.post("/collaboration/annotations", response_model=AnnotationItem)
-def add_annotation(request: Request, payload: AnnotationCreate):
+async def add_annotation(request: Request, payload: AnnotationCreate):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    upstream = request_json(
+    upstream = await request_json(
         request,
         "POST",
         f"{COLLABORATION_URL}/api/v1/annotations",
@@ -63,7 +63,7 @@ def add_annotation(request: Request, payload: AnnotationCreate):
 
 
 @router.get("/collaboration/gaps", response_model=GapListResponse)
-def list_gaps(
+async def list_gaps(
     request: Request,
     story_id: int | None = None,
     status: str | None = None,
@@ -78,7 +78,7 @@ def list_gaps(
         "offset": offset,
     }
     clean_params = {k: v for k, v in params.items() if v is not None}
-    payload = request_json(
+    payload = await request_json(
         request,
         "GET",
         f"{COLLABORATION_URL}/api/v1/gap_reports",
@@ -88,9 +88,9 @@ def list_gaps(
 
 
 @router.post("/collaboration/gaps", response_model=GapItem)
-def add_gap(request: Request, payload: GapCreate):
+async def add_gap(request: Request, payload: GapCreate):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    upstream = request_json(
+    upstream = await request_json(
         request,
         "POST",
         f"{COLLABORATION_URL}/api/v1/gap_reports",
@@ -100,7 +100,7 @@ def add_gap(request: Request, payload: GapCreate):
 
 
 @router.get("/collaboration/votes", response_model=VoteListResponse)
-def list_votes(
+async def list_votes(
     request: Request,
     target_id: str | None = None,
     limit: int = 50,
@@ -113,7 +113,7 @@ def list_votes(
         "offset": offset,
     }
     clean_params = {k: v for k, v in params.items() if v is not None}
-    payload = request_json(
+    payload = await request_json(
         request,
         "GET",
         f"{COLLABORATION_URL}/api/v1/votes",
@@ -123,9 +123,9 @@ def list_votes(
 
 
 @router.post("/collaboration/votes", response_model=VoteItem)
-def vote(request: Request, payload: VoteCreate):
+async def vote(request: Request, payload: VoteCreate):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    upstream = request_json(
+    upstream = await request_json(
         request,
         "POST",
         f"{COLLABORATION_URL}/api/v1/votes",
@@ -135,7 +135,7 @@ def vote(request: Request, payload: VoteCreate):
 
 
 @router.get("/collaboration/comments", response_model=CommentListResponse)
-def list_comments(
+async def list_comments(
     request: Request,
     target_id: str | None = None,
     limit: int = 50,
@@ -148,7 +148,7 @@ def list_comments(
         "offset": offset,
     }
     clean_params = {k: v for k, v in params.items() if v is not None}
-    payload = request_json(
+    payload = await request_json(
         request,
         "GET",
         f"{COLLABORATION_URL}/api/v1/comments",
@@ -158,9 +158,9 @@ def list_comments(
 
 
 @router.post("/collaboration/comments", response_model=CommentItem)
-def add_comment(request: Request, payload: CommentCreate):
+async def add_comment(request: Request, payload: CommentCreate):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    upstream = request_json(
+    upstream = await request_json(
         request,
         "POST",
         f"{COLLABORATION_URL}/api/v1/comments",
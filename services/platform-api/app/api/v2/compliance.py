@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Any, Literal
 
 from fastapi import APIRouter, Request
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from ...auth import require_roles
 from ...config import COMPLIANCE_URL, PLATFORM_CORE_URL
@@ -35,15 +35,18 @@ class ComplianceFixRequest(BaseModel):
 
 
 class JsonPatchOperation(BaseModel):
-    op: Literal["add", "replace", "remove"]
+    model_config = ConfigDict(populate_by_name=True)
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
     path: str
     value: Any | None = None
+    from_: str | None = Field(default=None, alias="from")
 
 
 @router.post("/compliance/runs")
-def create_run(request: Request, payload: ComplianceRunCreate):
+async def create_run(request: Request, payload: ComplianceRunCreate):
     require_roles(request.state.user, COMPLIANCE_ROLES)
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{PLATFORM_CORE_URL}/api/v2/core/compliance/runs",
@@ -52,24 +55,26 @@ def create_run(request: Request, payload: ComplianceRunCreate):
 
 
 @router.get("/compliance/runs/{run_id}")
-def get_run(request: Request, run_id: str):
+async def get_run(request: Request, run_id: str):
     require_roles(request.state.user, COMPLIANCE_ROLES)
-    return request_json(request, "GET", f"{PLATFORM_CORE_URL}/api/v2/core/compliance/runs/{run_id}")
+    return await request_json(request, "GET", f"{PLATFORM_CORE_URL}/api/v2/core/compliance/runs/{run_id}")
 
 
 @router.post("/compliance/runs/{run_id}/apply-fix")
-def apply_fix(request: Request, run_id: str, payload: ComplianceFixRequest):
+async def apply_fix(request: Request, run_id: str, payload: ComplianceFixRequest):
     require_roles(request.state.user, COMPLIANCE_ROLES)
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{PLATFORM_CORE_URL}/api/v2/core/compliance/runs/{run_id}/apply-fix",
-        json_body=payload.model_dump(),
+        # Unset fields stay absent: a JSON Patch "value" of null is not a
+        # missing value.
+        json_body=payload.model_dump(by_alias=True, exclude_unset=True),
     )
 
 
 @router.get("/compliance/reports")
-def list_reports(
+async def list_reports(
     request: Request,
     session_id: str | None = None,
     story_code: str | None = None,
@@ -80,7 +85,7 @@ def list_reports(
     require_roles(request.state.user, ["regulator", "developer", "admin"])
     params = {"session_id": session_id, "story_code": story_code, "status": status, "limit": limit, "offset": offset}
     clean_params = {k: v for k, v in params.items() if v is not None}
-    payload = request_json(request, "GET", f"{COMPLIANCE_URL}/api/v1/reports", params=clean_params)
+    payload = await request_json(request, "GET", f"{COMPLIANCE_URL}/api/v1/reports", params=clean_params)
     items = payload.get("items")
     if not isinstance(items, list):
         items = payload.get("reports", [])
@@ -104,6 +109,6 @@ def list_reports(
 
 
 @router.get("/compliance/reports/{report_id}")
-def get_report(request: Request, report_id: str):
+async def get_report(request: Request, report_id: str):
     require_roles(request.state.user, ["regulator", "developer", "admin"])
-    return request_json(request, "GET", f"{COMPLIANCE_URL}/api/v1/reports/{report_id}")
+    return await request_json(request, "GET", f"{COMPLIANCE_URL}/api/v1/reports/{report_id}")
@@ -1,8 +1,10 @@
+from typing import Literal
+
 from fastapi import APIRouter, Query, Request
 
 from ...auth import require_roles
 from ...config import PLATFORM_CORE_URL
-from ...core.proxy import request_json
+from ...core.proxy import request_json, stream_json
 from ...schemas.v2 import DigitalTwinDiffResponse, DigitalTwinHistoryResponse, DigitalTwinResponse
 
 router = APIRouter()
@@ -13,9 +15,9 @@ router = APIRouter()
     response_model=DigitalTwinResponse,
     response_model_exclude_unset=True,
 )
-def get_digital_twin(request: Request, dpp_id: str):
+async def get_digital_twin(request: Request, dpp_id: str):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator"])
-    return request_json(request, "GET", f"{PLATFORM_CORE_URL}/api/v2/core/digital-twins/{dpp_id}")
+    return await request_json(request, "GET", f"{PLATFORM_CORE_URL}/api/v2/core/digital-twins/{dpp_id}")
 
 
 @router.get(
@@ -23,14 +25,14 @@ def get_digital_twin(request: Request, dpp_id: str):
     response_model=DigitalTwinHistoryResponse,
     response_model_exclude_unset=True,
 )
-def get_digital_twin_history(
+async def get_digital_twin_history(
     request: Request,
     dpp_id: str,
     limit: int = 25,
     offset: int = 0,
 ):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator"])
-    return request_json(
+    return await request_json(
         request,
         "GET",
         f"{PLATFORM_CORE_URL}/api/v2/core/digital-twins/{dpp_id}/history",
@@ -43,16 +45,26 @@ def get_digital_twin_history(
     response_model=DigitalTwinDiffResponse,
     response_model_exclude_unset=True,
 )
-def get_digital_twin_diff(
+async def get_digital_twin_diff(
     request: Request,
     dpp_id: str,
     from_snapshot: str = Query(..., alias="from"),
     to_snapshot: str = Query(..., alias="to"),
+    summary_only: bool = False,
+    limit: int | None = None,
+    offset: int = 0,
+    response_format: Literal["json", "ndjson"] = Query("json", alias="format"),
 ):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator"])
-    return request_json(
-        request,
-        "GET",
-        f"{PLATFORM_CORE_URL}/api/v2/core/digital-twins/{dpp_id}/diff",
-        params={"from": from_snapshot, "to": to_snapshot},
-    )
+    url = f"{PLATFORM_CORE_URL}/api/v2/core/digital-twins/{dpp_id}/diff"
+    params: dict[str, str | int | bool] = {"from": from_snapshot, "to": to_snapshot}
+    if summary_only:
+        params["summary_only"] = True
+    if limit is not None:
+        params["limit"] = limit
+    if offset:
+        params["offset"] = offset
+    if response_format == "ndjson":
+        params["format"] = response_format
+        return await stream_json(request, "GET", url, params=params, media_type="application/x-ndjson")
+    return await request_json(request, "GET", url, params=params)
@@ -20,30 +20,32 @@ router = APIRouter()
 
 
 @router.get("/edc/catalog", response_model=CatalogResponse)
-def get_catalog(request: Request):
+async def get_catalog(request: Request):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    payload = request_json(request, "GET", f"{EDC_URL}/api/v1/edc/catalog")
+    payload = await request_json(
+        request, "GET", f"{EDC_URL}/api/v1/edc/catalog", cache="edc.catalog"
+    )
     return {"dataset": payload.get("dataset", [])}
 
 
 @router.get("/edc/participants", response_model=ParticipantListResponse)
-def get_participants(request: Request):
+async def get_participants(request: Request):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    payload = request_json(request, "GET", f"{EDC_URL}/api/v1/edc/participants")
+    payload = await request_json(request, "GET", f"{EDC_URL}/api/v1/edc/participants")
     return {"items": payload.get("items", [])}
 
 
 @router.get("/edc/assets", response_model=AssetListResponse)
-def get_assets(request: Request):
+async def get_assets(request: Request):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    payload = request_json(request, "GET", f"{EDC_URL}/api/v1/edc/assets")
+    payload = await request_json(request, "GET", f"{EDC_URL}/api/v1/edc/assets")
     return {"items": payload.get("items", [])}
 
 
 @router.post("/edc/negotiations", response_model=NegotiationResponse)
-def create_negotiation(request: Request, payload: NegotiationCreate):
+async def create_negotiation(request: Request, payload: NegotiationCreate):
     require_roles(request.state.user, ["manufacturer", "developer", "admin"])
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{EDC_URL}/api/v1/edc/negotiations",
@@ -52,9 +54,9 @@ def create_negotiation(request: Request, payload: NegotiationCreate):
 
 
 @router.post("/edc/negotiations/{negotiation_id}/actions/{action}", response_model=NegotiationResponse)
-def run_negotiation_action(request: Request, negotiation_id: str, action: str):
+async def run_negotiation_action(request: Request, negotiation_id: str, action: str):
     require_roles(request.state.user, ["manufacturer", "developer", "admin"])
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{EDC_URL}/api/v1/edc/negotiations/{negotiation_id}/{action}",
@@ -63,12 +65,12 @@ def run_negotiation_action(request: Request, negotiation_id: str, action: str):
 
 
 @router.post("/edc/negotiations/{negotiation_id}/simulate", response_model=NegotiationResponse)
-def simulate_negotiation(request: Request, negotiation_id: str, payload: AsyncSimulationRequest):
+async def simulate_negotiation(request: Request, negotiation_id: str, payload: AsyncSimulationRequest):
     require_roles(request.state.user, ["manufacturer", "developer", "admin"])
     body = payload.model_dump()
     if not body.get("callback_headers"):
         body.pop("callback_headers", None)
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{EDC_URL}/api/v1/edc/negotiations/{negotiation_id}/simulate",
@@ -77,9 +79,9 @@ def simulate_negotiation(request: Request, negotiation_id: str, payload: AsyncSi
 
 
 @router.post("/edc/transfers", response_model=TransferResponse)
-def create_transfer(request: Request, payload: TransferCreate):
+async def create_transfer(request: Request, payload: TransferCreate):
     require_roles(request.state.user, ["manufacturer", "developer", "admin"])
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{EDC_URL}/api/v1/edc/transfers",
@@ -88,9 +90,9 @@ def create_transfer(request: Request, payload: TransferCreate):
 
 
 @router.post("/edc/transfers/{transfer_id}/actions/{action}", response_model=TransferResponse)
-def run_transfer_action(request: Request, transfer_id: str, action: str):
+async def run_transfer_action(request: Request, transfer_id: str, action: str):
     require_roles(request.state.user, ["manufacturer", "developer", "admin"])
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{EDC_URL}/api/v1/edc/transfers/{transfer_id}/{action}",
@@ -99,12 +101,12 @@ def run_transfer_action(request: Request, transfer_id: str, action: str):
 
 
 @router.post("/edc/transfers/{transfer_id}/simulate", response_model=TransferResponse)
-def simulate_transfer(request: Request, transfer_id: str, payload: AsyncSimulationRequest):
+async def simulate_transfer(request: Request, transfer_id: str, payload: AsyncSimulationRequest):
     require_roles(request.state.user, ["manufacturer", "developer", "admin"])
     body = payload.model_dump()
     if not body.get("callback_headers"):
         body.pop("callback_headers", None)
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{EDC_URL}/api/v1/edc/transfers/{transfer_id}/simulate",
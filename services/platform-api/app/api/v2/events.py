@@ -13,7 +13,7 @@ ALL_ROLES = ["manufacturer", "developer", "admin", "regulator", "consumer", "rec
 
 
 @router.get("/events", response_model=EventListResponse)
-def list_events(
+async def list_events(
     request: Request,
     session_id: str | None = None,
     run_id: str | None = None,
@@ -34,7 +34,7 @@ def list_events(
     }
     clean_params = {key: value for key, value in params.items() if value is not None}
 
-    payload = request_json(
+    payload = await request_json(
         request,
         "GET",
         f"{PLATFORM_CORE_URL}/api/v2/core/events",
@@ -21,9 +21,9 @@ class CsatFeedback(BaseModel):
 
 
 @router.post("/feedback/csat")
-def submit_csat(request: Request, payload: CsatFeedback):
+async def submit_csat(request: Request, payload: CsatFeedback):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{PLATFORM_CORE_URL}/api/v2/core/feedback/csat",
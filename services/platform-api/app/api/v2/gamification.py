@@ -11,14 +11,14 @@ router = APIRouter()
 
 
 @router.get("/gamification/achievements", response_model=AchievementListResponse)
-def list_achievements(request: Request):
+async def list_achievements(request: Request):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    payload = request_json(request, "GET", f"{GAMIFICATION_URL}/api/v1/achievements")
+    payload = await request_json(request, "GET", f"{GAMIFICATION_URL}/api/v1/achievements")
     return {"items": payload.get("items", [])}
 
 
 @router.get("/gamification/leaderboard", response_model=LeaderboardResponse)
-def get_leaderboard(
+async def get_leaderboard(
     request: Request,
     limit: int = 10,
     offset: int = 0,
@@ -29,11 +29,12 @@ def get_leaderboard(
     params = {"limit": limit, "offset": offset, "window": window}
     if role is not None:
         params["role"] = role
-    payload = request_json(
+    payload = await request_json(
         request,
         "GET",
         f"{GAMIFICATION_URL}/api/v1/leaderboard",
         params=params,
+        cache="gamification.leaderboard",
     )
     return {
         "items": payload.get("items", []),
@@ -43,7 +44,7 @@ def get_leaderboard(
 
 
 @router.get("/gamification/streaks", response_model=StreakResponse)
-def get_streaks(request: Request):
+async def get_streaks(request: Request):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    payload = request_json(request, "GET", f"{GAMIFICATION_URL}/api/v1/streaks")
+    payload = await request_json(request, "GET", f"{GAMIFICATION_URL}/api/v1/streaks")
     return {"items": payload.get("items", [])}
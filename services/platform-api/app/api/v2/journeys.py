@@ -27,9 +27,9 @@ class JourneyStepExecution(BaseModel):
 
 
 @router.post("/journeys/runs")
-def create_run(request: Request, payload: JourneyRunCreate):
+async def create_run(request: Request, payload: JourneyRunCreate):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{PLATFORM_CORE_URL}/api/v2/core/journeys/runs",
@@ -38,15 +38,15 @@ def create_run(request: Request, payload: JourneyRunCreate):
 
 
 @router.get("/journeys/runs/{run_id}")
-def get_run(request: Request, run_id: str):
+async def get_run(request: Request, run_id: str):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(request, "GET", f"{PLATFORM_CORE_URL}/api/v2/core/journeys/runs/{run_id}")
+    return await request_json(request, "GET", f"{PLATFORM_CORE_URL}/api/v2/core/journeys/runs/{run_id}")
 
 
 @router.post("/journeys/runs/{run_id}/steps/{step_id}/execute")
-def execute_step(request: Request, run_id: str, step_id: str, payload: JourneyStepExecution):
+async def execute_step(request: Request, run_id: str, step_id: str, payload: JourneyStepExecution):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{PLATFORM_CORE_URL}/api/v2/core/journeys/runs/{run_id}/steps/{step_id}/execute",
@@ -55,12 +55,17 @@ def execute_step(request: Request, run_id: str, step_id: str, payload: JourneySt
 
 
 @router.get("/journeys/templates")
-def list_templates(request: Request):
+async def list_templates(request: Request):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(request, "GET", f"{PLATFORM_CORE_URL}/api/v2/core/journeys/templates")
+    return await request_json(
+        request,
+        "GET",
+        f"{PLATFORM_CORE_URL}/api/v2/core/journeys/templates",
+        cache="journeys.templates",
+    )
 
 
 @router.get("/journeys/templates/{code}")
-def get_template(request: Request, code: str):
+async def get_template(request: Request, code: str):
     require_roles(request.state.user, ALL_ROLES)
-    return request_json(request, "GET", f"{PLATFORM_CORE_URL}/api/v2/core/journeys/templates/{code}")
+    return await request_json(request, "GET", f"{PLATFORM_CORE_URL}/api/v2/core/journeys/templates/{code}")
@@ -10,6 +10,7 @@ from ...schemas.v2 import (
     ProgressResponse,
     SessionCreateRequest,
     SessionResponse,
+    SessionTimelineResponse,
     SessionUpdateRequest,
     StepExecuteRequest,
     StepExecuteResponse,
@@ -23,16 +24,18 @@ router = APIRouter()
 
 
 @router.get("/simulation/stories", response_model=StoryListResponse)
-def list_stories(request: Request):
+async def list_stories(request: Request):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    payload = request_json(request, "GET", f"{SIMULATION_URL}/api/v1/stories")
+    payload = await request_json(
+        request, "GET", f"{SIMULATION_URL}/api/v1/stories", cache="simulation.stories"
+    )
     return {"items": payload.get("items", [])}
 
 
 @router.post("/simulation/sessions", response_model=SessionResponse)
-def create_session(request: Request, payload: SessionCreateRequest):
+async def create_session(request: Request, payload: SessionCreateRequest):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{SIMULATION_URL}/api/v1/sessions",
@@ -41,16 +44,35 @@ def create_session(request: Request, payload: SessionCreateRequest):
 
 
 @router.get("/simulation/sessions/{session_id}", response_model=SessionResponse)
-def get_session(request: Request, session_id: str):
+async def get_session(request: Request, session_id: str):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    payload = request_json(request, "GET", f"{SIMULATION_URL}/api/v1/sessions/{session_id}")
+    payload = await request_json(request, "GET", f"{SIMULATION_URL}/api/v1/sessions/{session_id}")
     return payload
 
 
+@router.get("/simulation/sessions/{session_id}/timeline", response_model=SessionTimelineResponse)
+async def get_session_timeline(
+    request: Request,
+    session_id: str,
+    cursor: int | None = None,
+    limit: int = 50,
+    kind: str | None = None,
+):
+    require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
+    params = {"cursor": cursor, "limit": limit, "kind": kind}
+    clean_params = {k: v for k, v in params.items() if v is not None}
+    return await request_json(
+        request,
+        "GET",
+        f"{SIMULATION_URL}/api/v1/sessions/{session_id}/timeline",
+        params=clean_params,
+    )
+
+
 @router.patch("/simulation/sessions/{session_id}", response_model=SessionResponse)
-def update_session(request: Request, session_id: str, payload: SessionUpdateRequest):
+async def update_session(request: Request, session_id: str, payload: SessionUpdateRequest):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    return request_json(
+    return await request_json(
         request,
         "PATCH",
         f"{SIMULATION_URL}/api/v1/sessions/{session_id}",
@@ -59,27 +81,27 @@ def update_session(request: Request, session_id: str, payload: SessionUpdateRequ
 
 
 @router.post("/simulation/sessions/{session_id}/pause", response_model=SessionResponse)
-def pause_session(request: Request, session_id: str):
+async def pause_session(request: Request, session_id: str):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    return request_json(request, "POST", f"{SIMULATION_URL}/api/v1/sessions/{session_id}/pause")
+    return await request_json(request, "POST", f"{SIMULATION_URL}/api/v1/sessions/{session_id}/pause")
 
 
 @router.post("/simulation/sessions/{session_id}/resume", response_model=SessionResponse)
-def resume_session(request: Request, session_id: str):
+async def resume_session(request: Request, session_id: str):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    return request_json(request, "POST", f"{SIMULATION_URL}/api/v1/sessions/{session_id}/resume")
+    return await request_json(request, "POST", f"{SIMULATION_URL}/api/v1/sessions/{session_id}/resume")
 
 
 @router.post("/simulation/sessions/{session_id}/complete", response_model=SessionResponse)
-def complete_session(request: Request, session_id: str):
+async def complete_session(request: Request, session_id: str):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    return request_json(request, "POST", f"{SIMULATION_URL}/api/v1/sessions/{session_id}/complete")
+    return await request_json(request, "POST", f"{SIMULATION_URL}/api/v1/sessions/{session_id}/complete")
 
 
 @router.post("/simulation/sessions/{session_id}/stories/{code}/start", response_model=StoryStartResponse)
-def start_story(request: Request, session_id: str, code: str):
+async def start_story(request: Request, session_id: str, code: str):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{SIMULATION_URL}/api/v1/sessions/{session_id}/stories/{code}/start",
@@ -91,7 +113,7 @@ def start_story(request: Request, session_id: str, code: str):
     "/simulation/sessions/{session_id}/stories/{code}/steps/{idx}/execute",
     response_model=StepExecuteResponse,
 )
-def execute_step(
+async def execute_step(
     request: Request,
     session_id: str,
     code: str,
@@ -99,7 +121,7 @@ def execute_step(
     payload: StepExecuteRequest,
 ):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{SIMULATION_URL}/api/v1/sessions/{session_id}/stories/{code}/steps/{idx}/execute",
@@ -111,14 +133,14 @@ def execute_step(
     "/simulation/sessions/{session_id}/stories/{code}/validate",
     response_model=StoryValidateResponse,
 )
-def validate_story(
+async def validate_story(
     request: Request,
     session_id: str,
     code: str,
     payload: StoryValidateRequest,
 ):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    return request_json(
+    return await request_json(
         request,
         "POST",
         f"{SIMULATION_URL}/api/v1/sessions/{session_id}/stories/{code}/validate",
@@ -127,7 +149,7 @@ def validate_story(
 
 
 @router.get("/simulation/progress", response_model=ProgressResponse)
-def get_progress(
+async def get_progress(
     request: Request,
     session_id: str | None = None,
     role: str | None = None,
@@ -148,7 +170,7 @@ def get_progress(
         "offset": offset,
     }
     clean_params = {k: v for k, v in params.items() if v is not None}
-    payload = request_json(request, "GET", f"{SIMULATION_URL}/api/v1/progress", params=clean_params)
+    payload = await request_json(request, "GET", f"{SIMULATION_URL}/api/v1/progress", params=clean_params)
     items = payload.get("items")
     if not isinstance(items, list):
         items = payload.get("progress", [])
@@ -165,7 +187,12 @@ def get_progress(
 
 
 @router.get("/simulation/progress/epics", response_model=EpicProgressResponse)
-def get_epic_progress(request: Request):
+async def get_epic_progress(request: Request):
     require_roles(request.state.user, ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"])
-    payload = request_json(request, "GET", f"{SIMULATION_URL}/api/v1/progress/epics")
+    payload = await request_json(
+        request,
+        "GET",
+        f"{SIMULATION_URL}/api/v1/progress/epics",
+        cache="simulation.progress.epics",
+    )
     return {"epics": payload.get("epics", [])}
@@ -19,3 +19,27 @@ def _as_bool(value: str | None, *, default: bool = False) -> bool:
 # In production this should stay false so upstream identity cannot be spoofed
 # through dev headers when Authorization is absent.
 ALLOW_DEV_HEADERS = _as_bool(os.getenv("ALLOW_DEV_HEADERS"), default=False)
+
+
+def _as_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+# Upstream connection pool shared by all proxied routes. HTTP/2 is used when
+# the optional ``h2`` package is installed and UPSTREAM_HTTP2 is not disabled.
+UPSTREAM_HTTP2 = _as_bool(os.getenv("UPSTREAM_HTTP2"), default=True)
+UPSTREAM_MAX_CONNECTIONS = _as_int("UPSTREAM_MAX_CONNECTIONS", 512)
+UPSTREAM_MAX_KEEPALIVE = _as_int("UPSTREAM_MAX_KEEPALIVE", 128)
+# In-flight requests allowed per upstream host before callers queue.
+UPSTREAM_CONCURRENCY = _as_int("UPSTREAM_CONCURRENCY", 128)
+
+# Short-TTL gateway cache for hot read routes (see app/core/response_cache.py).
+GATEWAY_CACHE_ENABLED = _as_bool(os.getenv("GATEWAY_CACHE_ENABLED"), default=True)
+GATEWAY_CACHE_MAX_ENTRIES = _as_int("GATEWAY_CACHE_MAX_ENTRIES", 1024)
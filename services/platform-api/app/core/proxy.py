@@ -1,16 +1,56 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+from urllib.parse import urlsplit
 
-import requests
+import httpx
 from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
 
-from ..config import ALLOW_DEV_HEADERS
-from services.shared.http_client import request as pooled_request
+from ..config import (
+    ALLOW_DEV_HEADERS,
+    UPSTREAM_CONCURRENCY,
+    UPSTREAM_HTTP2,
+    UPSTREAM_MAX_CONNECTIONS,
+    UPSTREAM_MAX_KEEPALIVE,
+)
+from .response_cache import (
+    CACHE_LOOKUPS,
+    CACHE_POLICIES,
+    RESPONSE_CACHE,
+    CacheEntry,
+    CachePolicy,
+    cache_key,
+    etag_for,
+    mark_cached,
+)
+from services.shared.metrics import build_counter, build_gauge, build_histogram
 
 
 TRACE_HEADERS = ("traceparent", "tracestate", "baggage")
 
+UPSTREAM_REQUESTS = build_counter(
+    "dpp_gateway_upstream_requests_total",
+    "Proxied upstream requests by upstream host and outcome",
+    ["upstream", "outcome"],
+)
+UPSTREAM_SECONDS = build_histogram(
+    "dpp_gateway_upstream_seconds",
+    "Upstream latency of proxied requests, including queueing for a slot",
+    ["upstream"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+UPSTREAM_INFLIGHT = build_gauge(
+    "dpp_gateway_upstream_inflight",
+    "Proxied requests currently holding an upstream concurrency slot",
+    ["upstream"],
+)
+
 
 def _forward_context_headers(request: Request) -> dict[str, str]:
     headers: dict[str, str] = {}
@@ -50,44 +90,383 @@ def _forward_headers(request: Request) -> dict[str, str]:
     return headers
 
 
-def request_json(
-    request: Request,
+def _upstream_key(url: str) -> str:
+    return urlsplit(url).netloc or url
+
+
+def _http2_enabled() -> bool:
+    if not UPSTREAM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _LoopState:
+    """Client pool and per-upstream limits owned by one event loop."""
+
+    def __init__(self) -> None:
+        self.client = httpx.AsyncClient(
+            http2=_http2_enabled(),
+            limits=httpx.Limits(
+                max_connections=UPSTREAM_MAX_CONNECTIONS,
+                max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+            ),
+        )
+        self.slots: dict[str, asyncio.Semaphore] = {}
+
+    def slot(self, upstream: str) -> asyncio.Semaphore:
+        semaphore = self.slots.get(upstream)
+        if semaphore is None:
+            semaphore = self.slots[upstream] = asyncio.Semaphore(UPSTREAM_CONCURRENCY)
+        return semaphore
+
+
+# httpx connections belong to the loop that opened them; keying by loop keeps
+# the pool valid when the app is driven by more than one loop (tests, workers).
+_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _loop_state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    state = _states.get(loop)
+    if state is None:
+        state = _states[loop] = _LoopState()
+    return state
+
+
+async def send_upstream(
     method: str,
     url: str,
     *,
-    params: dict[str, Any] | None = None,
-    json_body: dict[str, Any] | None = None,
-    timeout: int = 8,
-) -> dict[str, Any]:
+    params: dict[str, Any] | None,
+    json: dict[str, Any] | None,
+    headers: dict[str, str],
+    timeout: float,
+    content: AsyncIterator[bytes] | None = None,
+) -> httpx.Response:
+    """Send a request on the pooled client; the body is left unread."""
+    client = _loop_state().client
+    upstream_request = client.build_request(
+        method,
+        url,
+        params=params,
+        json=json,
+        content=content,
+        headers=headers,
+        timeout=timeout,
+    )
+    return await client.send(upstream_request, stream=True)
+
+
+async def _acquire_slot(url: str, timeout: float) -> asyncio.Semaphore:
+    upstream = _upstream_key(url)
+    semaphore = _loop_state().slot(upstream)
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout)
+    except asyncio.TimeoutError as exc:
+        UPSTREAM_REQUESTS.labels(upstream=upstream, outcome="saturated").inc()
+        raise HTTPException(
+            status_code=503, detail=f"Upstream busy: {upstream}"
+        ) from exc
+    UPSTREAM_INFLIGHT.labels(upstream=upstream).inc()
+    return semaphore
+
+
+def _release_slot(url: str, semaphore: asyncio.Semaphore) -> None:
+    UPSTREAM_INFLIGHT.labels(upstream=_upstream_key(url)).dec()
+    semaphore.release()
+
+
+@asynccontextmanager
+async def _upstream_slot(url: str, timeout: float) -> AsyncIterator[None]:
+    semaphore = await _acquire_slot(url, timeout)
     try:
-        response = pooled_request(
+        yield
+    finally:
+        _release_slot(url, semaphore)
+
+
+async def _open(
+    request: Request,
+    method: str,
+    url: str,
+    params: dict[str, Any] | None,
+    json_body: dict[str, Any] | None,
+    timeout: float,
+    extra_headers: dict[str, str] | None = None,
+    content: AsyncIterator[bytes] | None = None,
+) -> httpx.Response:
+    headers = _forward_headers(request)
+    if extra_headers:
+        headers.update(extra_headers)
+    try:
+        return await send_upstream(
             method=method,
             url=url,
             params=params,
             json=json_body,
-            headers=_forward_headers(request),
-            session_name="platform-api-proxy",
+            headers=headers,
             timeout=timeout,
+            content=content,
         )
-    except requests.RequestException as exc:
+    except httpx.HTTPError as exc:
+        UPSTREAM_REQUESTS.labels(upstream=_upstream_key(url), outcome="error").inc()
         raise HTTPException(
             status_code=502, detail=f"Upstream unavailable: {exc}"
         ) from exc
 
-    payload: Any = {}
-    if response.content:
+
+async def _read_payload(response: httpx.Response) -> Any:
+    content = await response.aread()
+    if not content:
+        return {}
+    try:
+        return response.json()
+    except ValueError:
+        return {"detail": response.text}
+
+
+def _raise_for_upstream(response: httpx.Response, payload: Any) -> None:
+    if isinstance(payload, dict):
+        detail = payload.get("detail") or payload.get("error") or payload
+    else:
+        detail = payload or "Upstream request failed"
+    raise HTTPException(status_code=response.status_code, detail=detail)
+
+
+def _succeeded(response: httpx.Response) -> bool:
+    return 200 <= response.status_code < 300
+
+
+async def _fetch(
+    request: Request,
+    method: str,
+    url: str,
+    params: dict[str, Any] | None,
+    json_body: dict[str, Any] | None,
+    timeout: float,
+    extra_headers: dict[str, str] | None = None,
+) -> tuple[httpx.Response, Any]:
+    started = time.perf_counter()
+    async with _upstream_slot(url, timeout):
+        response = await _open(
+            request, method, url, params, json_body, timeout, extra_headers
+        )
         try:
-            payload = response.json()
-        except ValueError:
-            payload = {"detail": response.text}
+            payload = await _read_payload(response)
+        finally:
+            await response.aclose()
+    _observe(url, response, started)
+    return response, payload
 
-    if not response.ok:
-        if isinstance(payload, dict):
-            detail = payload.get("detail") or payload.get("error") or payload
-        else:
-            detail = payload or "Upstream request failed"
-        raise HTTPException(status_code=response.status_code, detail=detail)
 
+def _as_document(payload: Any) -> dict[str, Any]:
     if isinstance(payload, dict):
         return payload
     return {"items": payload}
+
+
+async def _fetch_entry(
+    request: Request,
+    route: str,
+    url: str,
+    params: dict[str, Any] | None,
+    timeout: float,
+    policy: CachePolicy,
+    stale: CacheEntry | None,
+) -> CacheEntry:
+    extra_headers = None
+    if stale is not None and stale.upstream_etag:
+        extra_headers = {"If-None-Match": stale.upstream_etag}
+    response, payload = await _fetch(
+        request, "GET", url, params, None, timeout, extra_headers
+    )
+    if response.status_code == 304 and stale is not None:
+        CACHE_LOOKUPS.labels(route=route, result="revalidated").inc()
+        return CacheEntry(
+            payload=stale.payload,
+            etag=stale.etag,
+            expires_at=RESPONSE_CACHE.expires_at(policy.ttl_seconds),
+            upstream_etag=stale.upstream_etag,
+        )
+    if not _succeeded(response):
+        _raise_for_upstream(response, payload)
+    document = _as_document(payload)
+    upstream_etag = response.headers.get("etag")
+    return CacheEntry(
+        payload=document,
+        etag=f"W/{upstream_etag.removeprefix('W/')}"
+        if upstream_etag
+        else etag_for(document),
+        expires_at=RESPONSE_CACHE.expires_at(policy.ttl_seconds),
+        upstream_etag=upstream_etag,
+    )
+
+
+async def request_json(
+    request: Request,
+    method: str,
+    url: str,
+    *,
+    params: dict[str, Any] | None = None,
+    json_body: dict[str, Any] | None = None,
+    timeout: int = 8,
+    cache: str | None = None,
+) -> dict[str, Any]:
+    """Call an upstream and return its JSON document.
+
+    ``cache`` names a route in ``CACHE_POLICIES``; GET requests for such
+    routes are served from the gateway response cache, coalescing identical
+    concurrent upstream calls. The returned document is shared between
+    callers and must not be mutated.
+    """
+    policy = CACHE_POLICIES.get(cache) if cache and method == "GET" else None
+    if cache is not None and policy is not None:
+        entry = await RESPONSE_CACHE.load(
+            cache,
+            cache_key(cache, request, url, params, policy),
+            lambda stale: _fetch_entry(
+                request, cache, url, params, timeout, policy, stale
+            ),
+        )
+        mark_cached(request, cache, entry, policy)
+        return entry.payload
+
+    response, payload = await _fetch(request, method, url, params, json_body, timeout)
+    if not _succeeded(response):
+        _raise_for_upstream(response, payload)
+    return _as_document(payload)
+
+
+async def forward_body(
+    request: Request,
+    url: str,
+    *,
+    timeout: int = 120,
+) -> dict[str, Any]:
+    """POST the incoming request body upstream as it arrives.
+
+    Used for uploads: the body is relayed chunk by chunk with its original
+    ``Content-Type`` (including any multipart boundary) instead of being
+    parsed and re-encoded by the gateway.
+    """
+    extra_headers = {}
+    content_type = request.headers.get("content-type")
+    if content_type:
+        extra_headers["Content-Type"] = content_type
+    started = time.perf_counter()
+    async with _upstream_slot(url, timeout):
+        response = await _open(
+            request,
+            "POST",
+            url,
+            None,
+            None,
+            timeout,
+            extra_headers,
+            content=request.stream(),
+        )
+        try:
+            payload = await _read_payload(response)
+        finally:
+            await response.aclose()
+    _observe(url, response, started)
+    if not _succeeded(response):
+        _raise_for_upstream(response, payload)
+    return _as_document(payload)
+
+
+async def stream_json(
+    request: Request,
+    method: str,
+    url: str,
+    *,
+    params: dict[str, Any] | None = None,
+    json_body: dict[str, Any] | None = None,
+    timeout: int = 8,
+    media_type: str = "application/json",
+) -> Response:
+    """Relay a successful upstream JSON body without decoding it.
+
+    Produces the same document as :func:`request_json` (top-level arrays are
+    wrapped as ``{"items": [...]}``, error bodies become ``HTTPException``)
+    for routes that have no response model to validate against. NDJSON
+    bodies start with an object, so they pass through unchanged.
+    """
+    started = time.perf_counter()
+    semaphore = await _acquire_slot(url, timeout)
+    response: httpx.Response | None = None
+    try:
+        response = await _open(request, method, url, params, json_body, timeout)
+        if not _succeeded(response):
+            try:
+                payload = await _read_payload(response)
+            finally:
+                await response.aclose()
+            _observe(url, response, started)
+            _raise_for_upstream(response, payload)
+        chunks = response.aiter_bytes()
+        first = b""
+        async for chunk in chunks:
+            first = chunk.lstrip()
+            if first:
+                break
+    except BaseException:
+        if response is not None:
+            await response.aclose()
+        _release_slot(url, semaphore)
+        raise
+
+    async def _relay() -> AsyncIterator[bytes]:
+        if not first:
+            yield b"{}"
+            return
+        wrap = first.startswith(b"[")
+        if wrap:
+            yield b'{"items":'
+        yield first
+        async for chunk in chunks:
+            yield chunk
+        if wrap:
+            yield b"}"
+
+    async def _close() -> None:
+        await response.aclose()
+        _release_slot(url, semaphore)
+        _observe(url, response, started)
+
+    return _RelayResponse(_relay(), media_type=media_type, on_close=_close)
+
+
+class _RelayResponse(StreamingResponse):
+    """A streaming response that runs ``on_close`` once it is done with,
+    including when the client disconnects before the body is iterated (the
+    body generator's own ``finally`` would never run then)."""
+
+    def __init__(
+        self,
+        content: AsyncIterator[bytes],
+        *,
+        media_type: str,
+        on_close: Callable[[], Awaitable[None]],
+    ):
+        super().__init__(content, media_type=media_type)
+        self._on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self._on_close()
+
+
+def _observe(url: str, response: httpx.Response, started: float) -> None:
+    upstream = _upstream_key(url)
+    outcome = "ok" if _succeeded(response) else f"http_{response.status_code // 100}xx"
+    UPSTREAM_REQUESTS.labels(upstream=upstream, outcome=outcome).inc()
+    UPSTREAM_SECONDS.labels(upstream=upstream).observe(time.perf_counter() - started)
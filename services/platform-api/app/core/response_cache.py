@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from ..config import GATEWAY_CACHE_ENABLED, GATEWAY_CACHE_MAX_ENTRIES
+from services.shared.metrics import build_counter, build_gauge
+
+
+CACHE_LOOKUPS = build_counter(
+    "dpp_gateway_cache_total",
+    "Gateway response cache lookups by route and result",
+    ["route", "result"],
+)
+CACHE_ENTRIES = build_gauge(
+    "dpp_gateway_cache_entries",
+    "Upstream payloads currently held by the gateway response cache",
+    [],
+)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl_seconds: float
+    # Key by subject as well as role set, for routes whose payload depends on
+    # who is asking rather than what they may see.
+    per_user: bool = False
+
+
+# Hot read routes polled by the frontend. TTLs can be overridden with
+# GATEWAY_CACHE_TTLS="route=seconds,..."; a TTL of 0 disables a route.
+DEFAULT_POLICIES: dict[str, CachePolicy] = {
+    "simulation.stories": CachePolicy(ttl_seconds=30),
+    "simulation.progress.epics": CachePolicy(ttl_seconds=5, per_user=True),
+    "journeys.templates": CachePolicy(ttl_seconds=30),
+    "gamification.leaderboard": CachePolicy(ttl_seconds=5),
+    "edc.catalog": CachePolicy(ttl_seconds=10),
+}
+
+
+def _policies_from_env() -> dict[str, CachePolicy]:
+    policies = dict(DEFAULT_POLICIES)
+    raw = os.getenv("GATEWAY_CACHE_TTLS", "")
+    for item in raw.split(","):
+        route, _, value = item.partition("=")
+        route = route.strip()
+        if route not in policies:
+            continue
+        try:
+            ttl = float(value)
+        except ValueError:
+            continue
+        policies[route] = replace(policies[route], ttl_seconds=max(0.0, ttl))
+    return {
+        route: policy for route, policy in policies.items() if policy.ttl_seconds > 0
+    }
+
+
+CACHE_POLICIES = _policies_from_env() if GATEWAY_CACHE_ENABLED else {}
+
+
+@dataclass
+class CacheEntry:
+    payload: dict[str, Any]
+    etag: str
+    expires_at: float
+    # Validator sent by the upstream, replayed as If-None-Match on refresh.
+    upstream_etag: str | None = None
+
+
+def etag_for(payload: Any) -> str:
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return f'W/"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def cache_key(
+    route: str,
+    request: Request,
+    url: str,
+    params: dict[str, Any] | None,
+    policy: CachePolicy,
+) -> Hashable:
+    user = getattr(request.state, "user", None) or {}
+    roles = (
+        user.get("realm_access", {}).get("roles", []) if isinstance(user, dict) else []
+    )
+    subject = None
+    if policy.per_user and isinstance(user, dict):
+        subject = user.get("sub") or user.get("preferred_username")
+    query = tuple(
+        sorted(
+            (str(name), str(value))
+            for name, value in (params or {}).items()
+            if value is not None
+        )
+    )
+    return (route, url, query, tuple(sorted({str(role) for role in roles})), subject)
+
+
+class ResponseCache:
+    """Short-TTL cache of upstream JSON payloads with single-flight refresh.
+
+    Concurrent misses for the same key share one upstream call: the first
+    caller starts the fetch as a task and later callers await it. The task is
+    shielded, so a client disconnecting does not cancel the fetch for the
+    others. Expired entries are kept until replaced, so their upstream ETag
+    can be used to revalidate.
+    """
+
+    def __init__(self, maxsize: int = 1024, *, clock=time.monotonic):
+        self._maxsize = maxsize
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        # Tasks belong to the loop that created them.
+        self._inflight: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[Hashable, asyncio.Task]
+        ] = weakref.WeakKeyDictionary()
+
+    def _get(self, key: Hashable) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: Hashable, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+            size = len(self._entries)
+        CACHE_ENTRIES.set(size)
+
+    async def load(
+        self,
+        route: str,
+        key: Hashable,
+        fetch: Callable[[CacheEntry | None], Awaitable[CacheEntry]],
+    ) -> CacheEntry:
+        entry = self._get(key)
+        if entry is not None and entry.expires_at > self._clock():
+            CACHE_LOOKUPS.labels(route=route, result="hit").inc()
+            return entry
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.setdefault(loop, {})
+        task = inflight.get(key)
+        if task is None:
+            CACHE_LOOKUPS.labels(route=route, result="miss").inc()
+            task = loop.create_task(self._refresh(key, fetch, entry))
+            inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(inflight, key, done))
+        else:
+            CACHE_LOOKUPS.labels(route=route, result="coalesced").inc()
+        return await asyncio.shield(task)
+
+    async def _refresh(
+        self,
+        key: Hashable,
+        fetch: Callable[[CacheEntry | None], Awaitable[CacheEntry]],
+        stale: CacheEntry | None,
+    ) -> CacheEntry:
+        entry = await fetch(stale)
+        self._store(key, entry)
+        return entry
+
+    @staticmethod
+    def _forget(
+        inflight: dict[Hashable, asyncio.Task], key: Hashable, task: asyncio.Task
+    ) -> None:
+        if inflight.get(key) is task:
+            del inflight[key]
+        if not task.cancelled():
+            # Mark the error retrieved even when every waiter went away.
+            task.exception()
+
+    def expires_at(self, ttl_seconds: float) -> float:
+        return self._clock() + ttl_seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        CACHE_ENTRIES.set(0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+RESPONSE_CACHE = ResponseCache(GATEWAY_CACHE_MAX_ENTRIES)
+
+
+def mark_cached(
+    request: Request, route: str, entry: CacheEntry, policy: CachePolicy
+) -> None:
+    """Expose the entry's validator to :func:`etag_middleware`."""
+    request.state.cache_route = route
+    request.state.cache_etag = entry.etag
+    request.state.cache_max_age = int(policy.ttl_seconds)
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: the W/ prefix is ignored.
+    wanted = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == wanted
+        for candidate in header.split(",")
+    )
+
+
+async def etag_middleware(request: Request, call_next):
+    response = await call_next(request)
+    etag = getattr(request.state, "cache_etag", None)
+    if not etag or response.status_code != 200:
+        return response
+
+    # Role-keyed payloads must not be reused by shared caches.
+    cache_control = f"private, max-age={request.state.cache_max_age}"
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        async for _ in response.body_iterator:
+            pass
+        CACHE_LOOKUPS.labels(
+            route=request.state.cache_route, result="not_modified"
+        ).inc()
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        request_id = response.headers.get("x-request-id")
+        if request_id:
+            headers["X-Request-ID"] = request_id
+        return Response(status_code=304, headers=headers)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
@@ -7,6 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from .api.router import api_router
 from .auth import verify_request
+from .core.response_cache import etag_middleware
 from services.shared.app_factory import create_service_app
 
 
@@ -38,6 +39,9 @@ app = create_service_app(
     verify_request=_verify_request,
 )
 
+# Outside the auth middleware, so 304s are only derived from authorised responses.
+app.middleware("http")(etag_middleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=_cors_origins(),
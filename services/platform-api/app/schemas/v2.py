@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 class HealthResponse(BaseModel):
@@ -54,6 +54,11 @@ class SessionResponse(BaseModel):
     is_active: bool | None = None
 
 
+class SessionTimelineResponse(BaseModel):
+    items: list[dict[str, Any]] = Field(default_factory=list)
+    next_cursor: int | None = None
+
+
 class StoryStartResponse(BaseModel):
     session_id: str
     story: StoryItem
@@ -126,6 +131,7 @@ class AasCreateRequest(BaseModel):
 
 class AasShellListResponse(BaseModel):
     items: list[dict[str, Any]] = Field(default_factory=list)
+    next_cursor: str | None = None
 
 
 class AasShellCreateResponse(BaseModel):
@@ -146,12 +152,14 @@ class AasSubmodelCreateResponse(BaseModel):
 
 class AasSubmodelPatchRequest(BaseModel):
     elements: list[dict[str, Any]] = Field(default_factory=list)
+    prune: bool = True
 
 
 class AasSubmodelPatchResponse(BaseModel):
     status: str
     submodel_id: str
     elements: list[dict[str, Any]] = Field(default_factory=list)
+    diff: dict[str, Any] | None = None
     error: str | None = None
 
 
@@ -187,7 +195,9 @@ class ComplianceSummary(BaseModel):
 
 class ComplianceRunCreate(BaseModel):
     dpp_id: str | None = None
-    regulations: list[str] = Field(default_factory=lambda: ["ESPR", "Battery Regulation", "WEEE", "RoHS"])
+    regulations: list[str] = Field(
+        default_factory=lambda: ["ESPR", "Battery Regulation", "WEEE", "RoHS"]
+    )
     payload: dict[str, Any] = Field(default_factory=dict)
 
 
@@ -220,14 +230,22 @@ class ComplianceFixRequest(BaseModel):
 
 
 class JsonPatchOperation(BaseModel):
-    op: Literal["add", "replace", "remove"]
+    model_config = ConfigDict(populate_by_name=True)
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
     path: str
     value: Any | None = None
+    from_: str | None = Field(default=None, alias="from")
 
     @model_validator(mode="after")
     def validate_value(self):
-        if self.op in {"add", "replace"} and self.value is None:
-            raise ValueError("value is required for add/replace operations")
+        if (
+            self.op in {"add", "replace", "test"}
+            and "value" not in self.model_fields_set
+        ):
+            raise ValueError("value is required for add/replace/test operations")
+        if self.op in {"move", "copy"} and self.from_ is None:
+            raise ValueError("from is required for move/copy operations")
         return self
 
 
@@ -486,6 +504,7 @@ class JourneyStepResult(BaseModel):
     status: str
     payload: dict[str, Any] = Field(default_factory=dict)
     metadata: dict[str, Any] = Field(default_factory=dict)
+    result: dict[str, Any] = Field(default_factory=dict)
     executed_at: str
 
 
@@ -564,6 +583,8 @@ class DigitalTwinResponse(BaseModel):
     nodes: list[DigitalTwinNode] = Field(default_factory=list)
     edges: list[DigitalTwinEdge] = Field(default_factory=list)
     timeline: list[dict[str, Any]] = Field(default_factory=list)
+    # A journey step requested a snapshot that has not been captured yet.
+    snapshot_pending: bool = False
 
 
 class DigitalTwinHistoryResponse(BaseModel):
@@ -595,10 +616,20 @@ class DigitalTwinDiffSummary(BaseModel):
     edges_changed: int = 0
 
 
+class DigitalTwinDiffPage(BaseModel):
+    offset: int = 0
+    limit: int | None = None
+    total: int = 0
+    has_more: bool = False
+
+
 class DigitalTwinDiffResult(BaseModel):
     summary: DigitalTwinDiffSummary
-    nodes: DigitalTwinDiffGroup
-    edges: DigitalTwinDiffGroup
+    nodes: DigitalTwinDiffGroup = Field(default_factory=DigitalTwinDiffGroup)
+    edges: DigitalTwinDiffGroup = Field(default_factory=DigitalTwinDiffGroup)
+    # Which slice of the changes ``nodes`` and ``edges`` hold; the summary
+    # always counts all of them.
+    page: DigitalTwinDiffPage | None = None
     generated_at: str | None = None
 
 
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Load-test the gateway proxy: async pooled client vs the legacy sync path.
+
+Starts a stub upstream (fixed latency, JSON body) and the platform-api app
+in separate uvicorn processes, then drives ``--clients`` concurrent
+keep-alive clients against three routes for ``--seconds`` each:
+
+* ``legacy``  - a ``def`` route proxying through ``requests`` as the gateway
+  did before (one threadpool thread per in-flight call, body decoded and
+  re-encoded);
+* ``async``   - ``request_json`` on the pooled ``httpx.AsyncClient``;
+* ``stream``  - ``stream_json``, relaying the upstream body undecoded.
+
+Reports requests/second and p50/p99 latency per route. Annotations are left
+unpostponed so FastAPI can resolve the locally imported ``Request`` type.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+for path in (ROOT, SERVICE_DIR):
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+
+ROUTES = {
+    "legacy": "/bench/legacy",
+    "async": "/bench/async",
+    "stream": "/api/v1/stories",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve_upstream(port: int, latency_ms: float, items: int) -> None:
+    import json
+
+    import uvicorn
+    from fastapi import FastAPI
+    from fastapi.responses import Response
+
+    body = json.dumps(
+        [
+            {"code": f"US-{idx:04d}", "title": "Benchmark story", "steps": []}
+            for idx in range(items)
+        ]
+    ).encode()
+    upstream = FastAPI()
+
+    @upstream.get("/api/v1/stories")
+    async def stories():
+        await asyncio.sleep(latency_ms / 1000)
+        return Response(body, media_type="application/json")
+
+    uvicorn.run(upstream, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _serve_gateway(port: int) -> None:
+    import uvicorn
+    from fastapi import Request
+
+    from app import main as app_main
+    from app.config import SIMULATION_URL
+    from app.core.proxy import _forward_headers, request_json
+    from services.shared.http_client import request as pooled_request
+
+    app_main.verify_request = lambda request: setattr(
+        request.state,
+        "user",
+        {"sub": "bench", "realm_access": {"roles": ["developer"]}},
+    )
+
+    @app_main.app.get("/bench/legacy")
+    def legacy(request: Request):
+        response = pooled_request(
+            method="GET",
+            url=f"{SIMULATION_URL}/api/v1/stories",
+            headers=_forward_headers(request),
+            session_name="bench-legacy",
+            timeout=8,
+        )
+        payload = response.json()
+        return payload if isinstance(payload, dict) else {"items": payload}
+
+    @app_main.app.get("/bench/async")
+    async def async_json(request: Request):
+        return await request_json(request, "GET", f"{SIMULATION_URL}/api/v1/stories")
+
+    uvicorn.run(app_main.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _wait_for(port: int, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+async def _load(url: str, clients: int, seconds: float) -> tuple[int, int, list[float]]:
+    import httpx
+
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    headers = {"Authorization": "Bearer bench"}
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+
+        async def _worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url, headers=headers)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(_worker() for _ in range(clients)))
+    return len(latencies), errors, latencies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the gateway proxy.")
+    parser.add_argument("--clients", type=int, default=1000, help="Concurrent clients.")
+    parser.add_argument(
+        "--seconds", type=float, default=10.0, help="Duration per route."
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=20.0, help="Upstream latency."
+    )
+    parser.add_argument(
+        "--items", type=int, default=50, help="Stories in the upstream body."
+    )
+    parser.add_argument(
+        "--routes",
+        nargs="*",
+        default=list(ROUTES),
+        choices=list(ROUTES),
+        help="Routes to run.",
+    )
+    parser.add_argument("--serve-upstream", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--serve-gateway", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_upstream:
+        _serve_upstream(args.serve_upstream, args.latency_ms, args.items)
+        return 0
+    if args.serve_gateway:
+        _serve_gateway(args.serve_gateway)
+        return 0
+
+    upstream_port, gateway_port = _free_port(), _free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": f"{ROOT}{os.pathsep}{SERVICE_DIR}",
+        "SIMULATION_URL": f"http://127.0.0.1:{upstream_port}",
+        "ALLOW_DEV_HEADERS": "true",
+        "AUTH_MODE": "bypass",
+    }
+    script = str(Path(__file__).resolve())
+    servers = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                script,
+                "--serve-upstream",
+                str(upstream_port),
+                "--latency-ms",
+                str(args.latency_ms),
+                "--items",
+                str(args.items),
+            ],
+            env=env,
+        ),
+        subprocess.Popen(
+            [sys.executable, script, "--serve-gateway", str(gateway_port)],
+            cwd=SERVICE_DIR,
+            env=env,
+        ),
+    ]
+    try:
+        _wait_for(upstream_port)
+        _wait_for(gateway_port)
+        print(
+            f"clients={args.clients} upstream latency={args.latency_ms:.0f}ms "
+            f"items={args.items} duration={args.seconds:.0f}s per route"
+        )
+        for name in args.routes:
+            url = f"http://127.0.0.1:{gateway_port}{ROUTES[name]}"
+            done, errors, latencies = asyncio.run(
+                _load(url, args.clients, args.seconds)
+            )
+            if not latencies:
+                print(f"{name:<7} no successful requests ({errors} errors)")
+                continue
+            ordered = sorted(latencies)
+            p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+            print(
+                f"{name:<7} rps={done / args.seconds:8.1f} "
+                f"p50={statistics.median(ordered) * 1000:8.1f}ms "
+                f"p99={p99 * 1000:8.1f}ms errors={errors}"
+            )
+    finally:
+        for server in servers:
+            server.terminate()
+        for server in servers:
+            server.wait(timeout=10)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,6 +4,8 @@ import os
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[3]
 SERVICE_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
@@ -13,3 +15,12 @@ if str(SERVICE_DIR) not in sys.path:
 
 # Platform API tests use header-based local auth/bypass semantics.
 os.environ.setdefault("ALLOW_DEV_HEADERS", "true")
+
+
+@pytest.fixture(autouse=True)
+def _clear_gateway_cache():
+    from app.core.response_cache import RESPONSE_CACHE
+
+    RESPONSE_CACHE.clear()
+    yield
+    RESPONSE_CACHE.clear()
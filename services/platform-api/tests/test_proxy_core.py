@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+from app.core import proxy
+from app.main import app
+
+
+client = TestClient(app)
+
+HEADERS = {
+    "X-Dev-User": "proxy-core-tester",
+    "X-Dev-Roles": "developer,manufacturer,admin,regulator,consumer,recycler",
+}
+
+
+def test_stream_json_relays_objects_and_wraps_top_level_arrays(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    bodies = {
+        "/api/v1/stories": b'[{"code": "US-01-01"}]',
+        "/api/v1/progress": b'{"items": [], "total": 0}',
+    }
+
+    async def fake_send(method: str, url: str, **kwargs: Any) -> httpx.Response:
+        path = httpx.URL(url).path
+        return httpx.Response(200, content=bodies[path])
+
+    monkeypatch.setattr(proxy, "send_upstream", fake_send)
+
+    stories = client.get("/api/v1/stories", headers=HEADERS)
+    progress = client.get("/api/v1/progress", headers=HEADERS)
+
+    assert stories.status_code == 200
+    assert stories.json() == {"items": [{"code": "US-01-01"}]}
+    assert progress.content == bodies["/api/v1/progress"]
+
+
+def test_stream_json_releases_its_slot_when_the_client_never_reads_the_body(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(proxy, "UPSTREAM_CONCURRENCY", 1)
+    closed: list[bool] = []
+
+    class _Stream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield b'{"ok": true}'
+
+        async def aclose(self) -> None:
+            closed.append(True)
+
+    async def fake_send(method: str, url: str, **kwargs: Any) -> httpx.Response:
+        return httpx.Response(200, stream=_Stream())
+
+    monkeypatch.setattr(proxy, "send_upstream", fake_send)
+
+    class _Request:
+        headers: dict[str, str] = {}
+
+        class state:
+            request_id = "req-1"
+
+    async def _disconnect() -> dict[str, Any]:
+        return {"type": "http.disconnect"}
+
+    async def _broken_send(message: dict[str, Any]) -> None:
+        raise OSError("client went away")
+
+    async def _run() -> None:
+        url = "http://gamma:8000/x"
+        for _ in range(2):
+            response = await proxy.stream_json(_Request(), "GET", url, timeout=1)
+            scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+            with pytest.raises(ClientDisconnect):
+                await response(scope, _disconnect, _broken_send)
+
+    # With one slot, the second request would be refused if the first leaked.
+    asyncio.run(_run())
+    assert closed == [True, True]
+
+
+def test_upstream_concurrency_is_bounded_per_host(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(proxy, "UPSTREAM_CONCURRENCY", 2)
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def fake_send(method: str, url: str, **kwargs: Any) -> httpx.Response:
+        host = httpx.URL(url).host
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return httpx.Response(200, json={"ok": True})
+
+    monkeypatch.setattr(proxy, "send_upstream", fake_send)
+
+    class _Request:
+        headers = {"authorization": "Bearer t"}
+
+        class state:
+            request_id = "req-1"
+
+    async def _run() -> None:
+        await asyncio.gather(
+            *(
+                proxy.request_json(_Request(), "GET", f"http://{host}:8000/x")
+                for host in ("alpha", "beta")
+                for _ in range(6)
+            )
+        )
+
+    asyncio.run(_run())
+
+    assert peak == {"alpha": 2, "beta": 2}
+
+
+def test_aasx_file_upload_streams_the_multipart_body_upstream(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    seen: dict[str, Any] = {}
+
+    async def fake_send(method: str, url: str, **kwargs: Any) -> httpx.Response:
+        seen["url"] = url
+        seen["content_type"] = kwargs["headers"]["Content-Type"]
+        seen["body"] = b"".join([chunk async for chunk in kwargs["content"]])
+        return httpx.Response(
+            200,
+            json={
+                "status": "stored",
+                "filename": "dpp.aasx",
+                "bytes": 7,
+                "storage": {"sha256": "abc"},
+            },
+        )
+
+    monkeypatch.setattr(proxy, "send_upstream", fake_send)
+
+    response = client.post(
+        "/api/v2/aasx/files",
+        headers=HEADERS,
+        files={"file": ("dpp.aasx", b"PK\x03\x04abc", "application/octet-stream")},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["bytes"] == 7
+    assert seen["url"].endswith("/api/v1/aasx/files")
+    assert seen["content_type"].startswith("multipart/form-data; boundary=")
+    assert b"PK\x03\x04abc" in seen["body"]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import proxy
+from app.core.response_cache import RESPONSE_CACHE
+from app.main import app
+
+
+client = TestClient(app)
+
+HEADERS = {
+    "X-Dev-User": "cache-tester",
+    "X-Dev-Roles": "developer,manufacturer",
+}
+
+
+class _Request:
+    headers = {"authorization": "Bearer t"}
+
+    def __init__(self, roles: list[str]):
+        self.state = type("State", (), {})()
+        self.state.request_id = "req-1"
+        self.state.user = {"sub": "u-1", "realm_access": {"roles": roles}}
+
+
+def test_identical_concurrent_reads_share_one_upstream_call(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    calls: list[str] = []
+
+    async def fake_send(method: str, url: str, **kwargs: Any) -> httpx.Response:
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=[{"code": "US-01-01"}])
+
+    monkeypatch.setattr(proxy, "send_upstream", fake_send)
+    url = "http://simulation-engine:8001/api/v1/stories"
+
+    async def _run() -> list[dict[str, Any]]:
+        first = await asyncio.gather(
+            *(
+                proxy.request_json(
+                    _Request(["manufacturer", "developer"]),
+                    "GET",
+                    url,
+                    cache="simulation.stories",
+                )
+                for _ in range(10)
+            )
+        )
+        again = await proxy.request_json(
+            _Request(["developer", "manufacturer"]),
+            "GET",
+            url,
+            cache="simulation.stories",
+        )
+        other_roles = await proxy.request_json(
+            _Request(["consumer"]), "GET", url, cache="simulation.stories"
+        )
+        return [*first, again, other_roles]
+
+    results = asyncio.run(_run())
+
+    assert all(result == {"items": [{"code": "US-01-01"}]} for result in results)
+    # One call for the coalesced burst and the cached repeat, one for the
+    # different role set.
+    assert len(calls) == 2
+    assert len(RESPONSE_CACHE) == 2
+
+
+def test_cached_route_answers_if_none_match_with_304(monkeypatch: pytest.MonkeyPatch):
+    calls: list[str] = []
+
+    async def fake_send(method: str, url: str, **kwargs: Any) -> httpx.Response:
+        calls.append(url)
+        return httpx.Response(200, json={"dataset": [{"id": "asset-1"}]})
+
+    monkeypatch.setattr(proxy, "send_upstream", fake_send)
+
+    first = client.get("/api/v2/edc/catalog", headers=HEADERS)
+    etag = first.headers["etag"]
+    revalidated = client.get(
+        "/api/v2/edc/catalog", headers={**HEADERS, "If-None-Match": etag}
+    )
+    changed = client.get(
+        "/api/v2/edc/catalog", headers={**HEADERS, "If-None-Match": 'W/"other"'}
+    )
+
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "private, max-age=10"
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert changed.status_code == 200
+    assert changed.json() == first.json()
+    assert len(calls) == 1
+
+
+def test_expired_entry_is_revalidated_with_upstream_etag(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    sent: list[dict[str, str]] = []
+
+    async def fake_send(
+        method: str, url: str, *, headers: dict[str, str], **kwargs: Any
+    ) -> httpx.Response:
+        sent.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(
+            200, json={"items": [{"code": "T-1"}]}, headers={"ETag": '"v1"'}
+        )
+
+    monkeypatch.setattr(proxy, "send_upstream", fake_send)
+
+    first = client.get("/api/v2/journeys/templates", headers=HEADERS)
+    for entry in RESPONSE_CACHE._entries.values():
+        entry.expires_at = 0
+    second = client.get("/api/v2/journeys/templates", headers=HEADERS)
+
+    assert first.json() == second.json() == {"items": [{"code": "T-1"}]}
+    assert first.headers["etag"] == second.headers["etag"] == 'W/"v1"'
+    assert "If-None-Match" not in sent[0]
+    assert sent[1]["If-None-Match"] == '"v1"'
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import threading
+import time
 from types import SimpleNamespace
 
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
 
 from services.shared import auth
+from services.shared.claims_cache import ClaimsCache
 
 
 def _request_with_bearer() -> SimpleNamespace:
@@ -86,3 +89,130 @@ def test_verify_request_applies_clock_skew_leeway(monkeypatch: pytest.MonkeyPatc
     assert payload["sub"] == "u-1"
     assert captured["options"] == {"verify_aud": False, "leeway": 90}
     assert request.state.user["aud"] == "dpp-platform"
+
+
+@pytest.fixture
+def fresh_auth_state(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(
+        auth, "_cache", {"keys": None, "fetched": 0, "keycloak_ok": None, "keycloak_checked": 0}
+    )
+    monkeypatch.setattr(auth, "_refresher", auth._AuthRefresher())
+    monkeypatch.setattr(auth, "_claims_cache", ClaimsCache(8))
+    monkeypatch.setattr(auth, "_bypass_enabled", lambda: False)
+    monkeypatch.setenv("REQUIRE_TOKEN_AUDIENCE", "false")
+
+
+def _valid_claims() -> dict:
+    return {
+        "sub": "u-1",
+        "iss": "http://keycloak:8080/realms/dpp",
+        "exp": time.time() + 300,
+        "realm_access": {"roles": ["developer"]},
+    }
+
+
+def test_keycloak_availability_is_checked_off_the_request_path(
+    monkeypatch: pytest.MonkeyPatch, fresh_auth_state
+):
+    checks: list[int] = []
+
+    def _check():
+        checks.append(1)
+        time.sleep(0.05)
+        return False
+
+    monkeypatch.setattr(auth, "_check_keycloak", _check)
+    monkeypatch.setattr(auth._refresher, "start", lambda: None)
+
+    with auth.deferred_auth_fetch():
+        with pytest.raises(auth.AuthStatePending) as exc_info:
+            auth._keycloak_available()
+    assert exc_info.value.future.result(timeout=1) is False
+
+    assert auth._keycloak_available() is False
+    assert auth._keycloak_available() is False
+    assert checks == [1]
+
+
+def test_unknown_kid_triggers_single_jwks_fetch_and_claims_are_cached(
+    monkeypatch: pytest.MonkeyPatch, fresh_auth_state
+):
+    fetches: list[int] = []
+    decodes: list[int] = []
+    release = threading.Event()
+
+    def _fetch():
+        fetches.append(1)
+        release.wait(1)
+        return [{"kid": "kid-1"}]
+
+    def _decode(*args, **kwargs):
+        decodes.append(1)
+        return _valid_claims()
+
+    monkeypatch.setattr(auth, "_fetch_jwks", _fetch)
+    monkeypatch.setattr(auth.jwt, "get_unverified_header", lambda token: {"kid": "kid-1"})
+    monkeypatch.setattr(auth.jwt, "decode", _decode)
+
+    results: list[dict] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(auth.verify_request(_request_with_bearer())))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(fetches) == 1
+    assert [item["sub"] for item in results] == ["u-1"] * 5
+
+    decodes.clear()
+    assert auth.verify_request(_request_with_bearer())["sub"] == "u-1"
+    assert decodes == []
+
+
+def test_middleware_awaits_deferred_key_fetch(
+    monkeypatch: pytest.MonkeyPatch, fresh_auth_state
+):
+    from fastapi import APIRouter
+    from fastapi.testclient import TestClient
+
+    from services.shared.app_factory import create_service_app
+
+    pending_seen: list[bool] = []
+    original_resolve = auth._resolve_key
+
+    def _resolve(kid):
+        try:
+            return original_resolve(kid)
+        except auth.AuthStatePending:
+            pending_seen.append(True)
+            raise
+
+    monkeypatch.setattr(auth, "_resolve_key", _resolve)
+    monkeypatch.setattr(auth, "_fetch_jwks", lambda: time.sleep(0.05) or [{"kid": "kid-1"}])
+    monkeypatch.setattr(auth.jwt, "get_unverified_header", lambda token: {"kid": "kid-1"})
+    monkeypatch.setattr(auth.jwt, "decode", lambda *args, **kwargs: _valid_claims())
+
+    router = APIRouter()
+
+    @router.get("/whoami")
+    def whoami(request: Request):
+        return {"sub": request.state.user["sub"]}
+
+    app = create_service_app(
+        title="auth-test",
+        version="0",
+        router=router,
+        service_name="auth-test",
+        verify_request=auth.verify_request,
+        enable_tracing=False,
+    )
+    response = TestClient(app).get("/whoami", headers={"Authorization": "Bearer token"})
+
+    assert response.status_code == 200
+    assert response.json() == {"sub": "u-1"}
+    assert pending_seen == [True]
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from typing import Any
 
+import httpx
 import pytest
-import requests
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -26,21 +25,12 @@ HEADERS = {
 }
 
 
-@dataclass
-class DummyResponse:
-    payload: Any
-    status_code: int = 200
+class DummyResponse(httpx.Response):
+    """Upstream ``httpx.Response`` carrying a JSON payload."""
 
-    @property
-    def ok(self) -> bool:
-        return 200 <= self.status_code < 300
-
-    @property
-    def content(self) -> bytes:
-        return b"{}"
-
-    def json(self) -> Any:
-        return self.payload
+    def __init__(self, payload: Any, status_code: int = 200):
+        super().__init__(status_code, json=payload)
+        self.payload = payload
 
 
 def test_v1_health():
@@ -176,7 +166,7 @@ def test_v1_compat_routes_proxy_to_upstream(
 ):
     calls: list[dict[str, Any]] = []
 
-    def fake_request(
+    async def fake_request(
         method: str,
         url: str,
         params: dict[str, Any] | None,
@@ -186,7 +176,7 @@ def test_v1_compat_routes_proxy_to_upstream(
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     request_kwargs: dict[str, Any] = {"headers": HEADERS}
     if body is not None:
@@ -223,7 +213,7 @@ def test_v1_compat_passthrough_upstream_errors(
     upstream_payload: dict[str, Any],
     expected_detail: str | dict[str, Any],
 ):
-    def fake_request(
+    async def fake_request(
         method: str,
         url: str,
         params: dict[str, Any] | None,
@@ -232,7 +222,7 @@ def test_v1_compat_passthrough_upstream_errors(
     ):
         return DummyResponse(upstream_payload, status_code=upstream_status)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.post(
         "/api/v1/compliance/check",
@@ -247,16 +237,16 @@ def test_v1_compat_passthrough_upstream_errors(
 def test_v1_compat_returns_502_when_upstream_unavailable(
     monkeypatch: pytest.MonkeyPatch,
 ):
-    def fake_request(
+    async def fake_request(
         method: str,
         url: str,
         params: dict[str, Any] | None,
         json: dict[str, Any] | None,
         **kwargs: Any,
     ):
-        raise requests.RequestException("connection refused")
+        raise httpx.ConnectError("connection refused")
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get("/api/v1/stories", headers=HEADERS)
     assert response.status_code == 502
@@ -268,7 +258,7 @@ def test_v1_create_shell_maps_legacy_payload_to_aas_adapter(
 ):
     calls: list[dict[str, Any]] = []
 
-    def fake_request(
+    async def fake_request(
         method: str,
         url: str,
         params: dict[str, Any] | None,
@@ -280,7 +270,7 @@ def test_v1_create_shell_maps_legacy_payload_to_aas_adapter(
             {"status": "created", "shell": {"id": "urn:uuid:us-02-01"}}
         )
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.post(
         "/api/v1/aas/shells",
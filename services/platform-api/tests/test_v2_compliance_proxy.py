@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from typing import Any
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
@@ -17,23 +17,12 @@ HEADERS = {
 }
 
 
-@dataclass
-class DummyResponse:
-    payload: Any
-    status_code: int = 200
+class DummyResponse(httpx.Response):
+    """Upstream ``httpx.Response`` carrying a JSON payload."""
 
-    @property
-    def ok(self) -> bool:
-        return 200 <= self.status_code < 300
-
-    @property
-    def content(self) -> bytes:
-        import json
-
-        return json.dumps(self.payload).encode()
-
-    def json(self) -> Any:
-        return self.payload
+    def __init__(self, payload: Any, status_code: int = 200):
+        super().__init__(status_code, json=payload)
+        self.payload = payload
 
 
 def test_v2_compliance_reports_normalized_with_new_shape(
@@ -41,7 +30,7 @@ def test_v2_compliance_reports_normalized_with_new_shape(
 ):
     calls: list[dict[str, Any]] = []
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
@@ -60,7 +49,7 @@ def test_v2_compliance_reports_normalized_with_new_shape(
             }
         )
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get(
         "/api/v2/compliance/reports?limit=5&offset=2", headers=HEADERS
@@ -77,12 +66,12 @@ def test_v2_compliance_reports_normalized_with_new_shape(
 def test_v2_compliance_reports_normalized_with_legacy_shape(
     monkeypatch: pytest.MonkeyPatch,
 ):
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         return DummyResponse({"reports": [{"id": "r-legacy", "status": "compliant"}]})
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get("/api/v2/compliance/reports", headers=HEADERS)
     assert response.status_code == 200
@@ -95,13 +84,13 @@ def test_v2_compliance_reports_normalized_with_legacy_shape(
 def test_v2_apply_fix_forwards_json_patch_payload(monkeypatch: pytest.MonkeyPatch):
     calls: list[dict[str, Any]] = []
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse({"run_id": "run-1", "status": "compliant", "payload": {}})
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.post(
         "/api/v2/compliance/runs/run-1/apply-fix",
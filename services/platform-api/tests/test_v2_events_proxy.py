@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from typing import Any
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
@@ -18,23 +18,12 @@ HEADERS = {
 }
 
 
-@dataclass
-class DummyResponse:
-    payload: Any
-    status_code: int = 200
+class DummyResponse(httpx.Response):
+    """Upstream ``httpx.Response`` carrying a JSON payload."""
 
-    @property
-    def ok(self) -> bool:
-        return 200 <= self.status_code < 300
-
-    @property
-    def content(self) -> bytes:
-        import json
-
-        return json.dumps(self.payload).encode()
-
-    def json(self) -> Any:
-        return self.payload
+    def __init__(self, payload: Any, status_code: int = 200):
+        super().__init__(status_code, json=payload)
+        self.payload = payload
 
 
 def test_v2_events_proxy_forwards_filters(monkeypatch: pytest.MonkeyPatch):
@@ -62,13 +51,13 @@ def test_v2_events_proxy_forwards_filters(monkeypatch: pytest.MonkeyPatch):
         "offset": 0,
     }
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get(
         "/api/v2/events?session_id=sess-1&event_type=story_step_completed&limit=25&offset=0",
@@ -86,12 +75,12 @@ def test_v2_events_proxy_forwards_filters(monkeypatch: pytest.MonkeyPatch):
 
 
 def test_v2_events_proxy_normalizes_missing_pagination(monkeypatch: pytest.MonkeyPatch):
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         return DummyResponse({"items": []})
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get(
         "/api/v2/events?run_id=run-77&limit=10&offset=5", headers=HEADERS
@@ -6,9 +6,9 @@ for journeys, digital-twins, and feedback endpoints.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
 from typing import Any
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
@@ -24,25 +24,12 @@ HEADERS = {
 }
 
 
-@dataclass
-class DummyResponse:
-    """Minimal stand-in for ``requests.Response``."""
+class DummyResponse(httpx.Response):
+    """Upstream ``httpx.Response`` carrying a JSON payload."""
 
-    payload: Any
-    status_code: int = 200
-
-    @property
-    def ok(self) -> bool:
-        return 200 <= self.status_code < 300
-
-    @property
-    def content(self) -> bytes:
-        import json
-
-        return json.dumps(self.payload).encode()
-
-    def json(self) -> Any:
-        return self.payload
+    def __init__(self, payload: Any, status_code: int = 200):
+        super().__init__(status_code, json=payload)
+        self.payload = payload
 
 
 # ---- Journeys -----------------------------------------------------------------
@@ -65,13 +52,13 @@ def test_create_run_proxies_to_platform_core(monkeypatch: pytest.MonkeyPatch):
         "updated_at": "2025-01-01T00:00:00",
     }
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.post(
         "/api/v2/journeys/runs",
@@ -108,13 +95,13 @@ def test_get_run_proxies_to_platform_core(monkeypatch: pytest.MonkeyPatch):
         "updated_at": "2025-01-01T00:00:00",
     }
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get(f"/api/v2/journeys/runs/{run_id}", headers=HEADERS)
     assert response.status_code == 200
@@ -139,13 +126,13 @@ def test_get_digital_twin_proxies_to_platform_core(monkeypatch: pytest.MonkeyPat
         "timeline": [],
     }
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get(f"/api/v2/digital-twins/{dpp_id}", headers=HEADERS)
     assert response.status_code == 200
@@ -177,13 +164,13 @@ def test_get_digital_twin_history_proxies_to_platform_core(
         "offset": 0,
     }
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get(
         f"/api/v2/digital-twins/{dpp_id}/history", params={"limit": 10}, headers=HEADERS
@@ -241,13 +228,13 @@ def test_get_digital_twin_diff_proxies_to_platform_core(
         },
     }
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get(
         f"/api/v2/digital-twins/{dpp_id}/diff",
@@ -265,6 +252,44 @@ def test_get_digital_twin_diff_proxies_to_platform_core(
     assert calls[0]["params"] == {"from": "s1", "to": "s2"}
 
 
+def test_get_digital_twin_diff_relays_ndjson_pages(monkeypatch: pytest.MonkeyPatch):
+    calls: list[dict[str, Any]] = []
+    body = (
+        b'{"type": "header", "dpp_id": "dpp-1"}\n'
+        b'{"type": "change", "kind": "nodes", "change": "added", "key": "transfer"}\n'
+        b'{"type": "summary", "summary": {"nodes_added": 1}}\n'
+    )
+
+    async def fake_request(method: str, url: str, params: Any = None, **kwargs: Any):
+        calls.append({"url": url, "params": params})
+        return httpx.Response(200, content=body)
+
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
+
+    response = client.get(
+        "/api/v2/digital-twins/dpp-1/diff",
+        params={
+            "from": "s1",
+            "to": "s2",
+            "format": "ndjson",
+            "limit": 100,
+            "offset": 200,
+        },
+        headers=HEADERS,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.content == body
+    assert calls[0]["params"] == {
+        "from": "s1",
+        "to": "s2",
+        "limit": 100,
+        "offset": 200,
+        "format": "ndjson",
+    }
+
+
 # ---- Feedback ----------------------------------------------------------------
 
 
@@ -282,13 +307,13 @@ def test_submit_csat_proxies_to_platform_core(monkeypatch: pytest.MonkeyPatch):
         "created_at": "2025-01-01T00:00:00",
     }
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.post(
         "/api/v2/feedback/csat",
@@ -327,13 +352,13 @@ def test_simulate_negotiation_proxies_to_edc(monkeypatch: pytest.MonkeyPatch):
         "session_id": None,
     }
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.post(
         f"/api/v2/edc/negotiations/{negotiation_id}/simulate",
@@ -364,13 +389,13 @@ def test_simulate_transfer_proxies_to_edc(monkeypatch: pytest.MonkeyPatch):
         "session_id": None,
     }
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.post(
         f"/api/v2/edc/transfers/{transfer_id}/simulate",
@@ -406,13 +431,13 @@ def test_get_leaderboard_proxies_window_and_role_params(
         "role": "manufacturer",
     }
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get(
         "/api/v2/gamification/leaderboard?limit=5&offset=1&window=weekly&role=manufacturer",
@@ -447,13 +472,13 @@ def test_list_comments_proxies_to_collaboration(monkeypatch: pytest.MonkeyPatch)
         ]
     }
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get(
         "/api/v2/collaboration/comments?target_id=gap-1&limit=10&offset=2",
@@ -476,13 +501,13 @@ def test_add_comment_proxies_to_collaboration(monkeypatch: pytest.MonkeyPatch):
         "created_at": "2025-01-01T00:00:01",
     }
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.post(
         "/api/v2/collaboration/comments",
@@ -569,12 +594,12 @@ def test_v2_proxy_forwards_upstream_errors(
     """When platform-core returns an error, platform-api should forward
     the upstream status code and detail."""
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         return DummyResponse({"detail": "Upstream not found"}, status_code=404)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     request_kwargs: dict[str, Any] = {"headers": HEADERS}
     if body is not None:
@@ -590,7 +615,7 @@ def test_v2_proxy_forwards_upstream_errors(
 def test_v2_proxy_forwards_request_id_header(monkeypatch: pytest.MonkeyPatch):
     calls: list[dict[str, Any]] = []
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append(
@@ -604,7 +629,7 @@ def test_v2_proxy_forwards_request_id_header(monkeypatch: pytest.MonkeyPatch):
         )
         return DummyResponse({"items": []})
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     request_id = "req-test-123"
     response = client.get(
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from typing import Any
 
+import httpx
 import pytest
-import requests
 from fastapi.testclient import TestClient
 
 from app.config import COLLABORATION_URL, EDC_URL, SIMULATION_URL
@@ -19,21 +18,12 @@ HEADERS = {
 }
 
 
-@dataclass
-class DummyResponse:
-    payload: Any
-    status_code: int = 200
+class DummyResponse(httpx.Response):
+    """Upstream ``httpx.Response`` carrying a JSON payload."""
 
-    @property
-    def ok(self) -> bool:
-        return 200 <= self.status_code < 300
-
-    @property
-    def content(self) -> bytes:
-        return b"{}"
-
-    def json(self) -> Any:
-        return self.payload
+    def __init__(self, payload: Any, status_code: int = 200):
+        super().__init__(status_code, json=payload)
+        self.payload = payload
 
 
 @pytest.mark.parametrize(
@@ -80,7 +70,7 @@ def test_v2_proxy_error_passthrough(
 ):
     calls: list[dict[str, Any]] = []
 
-    def fake_request(
+    async def fake_request(
         method: str,
         url: str,
         params: dict[str, Any] | None,
@@ -90,7 +80,7 @@ def test_v2_proxy_error_passthrough(
         calls.append({"method": method, "url": url, "params": params, "json": json})
         return DummyResponse(upstream_payload, status_code=upstream_status)
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     request_kwargs: dict[str, Any] = {"headers": HEADERS}
     if body is not None:
@@ -106,16 +96,16 @@ def test_v2_proxy_error_passthrough(
 
 
 def test_v2_proxy_returns_502_for_request_exception(monkeypatch: pytest.MonkeyPatch):
-    def fake_request(
+    async def fake_request(
         method: str,
         url: str,
         params: dict[str, Any] | None,
         json: dict[str, Any] | None,
         **kwargs: Any,
     ):
-        raise requests.RequestException("network timeout")
+        raise httpx.ConnectError("network timeout")
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get("/api/v2/simulation/stories", headers=HEADERS)
     assert response.status_code == 502
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from typing import Any
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
@@ -17,23 +17,12 @@ HEADERS = {
 }
 
 
-@dataclass
-class DummyResponse:
-    payload: Any
-    status_code: int = 200
+class DummyResponse(httpx.Response):
+    """Upstream ``httpx.Response`` carrying a JSON payload."""
 
-    @property
-    def ok(self) -> bool:
-        return 200 <= self.status_code < 300
-
-    @property
-    def content(self) -> bytes:
-        import json
-
-        return json.dumps(self.payload).encode()
-
-    def json(self) -> Any:
-        return self.payload
+    def __init__(self, payload: Any, status_code: int = 200):
+        super().__init__(status_code, json=payload)
+        self.payload = payload
 
 
 def test_v2_pause_session_proxies_to_simulation_service(
@@ -41,7 +30,7 @@ def test_v2_pause_session_proxies_to_simulation_service(
 ):
     calls: list[dict[str, Any]] = []
 
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         calls.append({"method": method, "url": url, "params": params, "json": json})
@@ -49,7 +38,7 @@ def test_v2_pause_session_proxies_to_simulation_service(
             {"id": "s-1", "user_id": "u-1", "role": "manufacturer", "state": {}}
         )
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.post("/api/v2/simulation/sessions/s-1/pause", headers=HEADERS)
     assert response.status_code == 200
@@ -59,7 +48,7 @@ def test_v2_pause_session_proxies_to_simulation_service(
 
 
 def test_v2_progress_normalizes_items_and_alias(monkeypatch: pytest.MonkeyPatch):
-    def fake_request(
+    async def fake_request(
         method: str, url: str, params: Any = None, json: Any = None, **kwargs: Any
     ):
         return DummyResponse(
@@ -78,7 +67,7 @@ def test_v2_progress_normalizes_items_and_alias(monkeypatch: pytest.MonkeyPatch)
             }
         )
 
-    monkeypatch.setattr("app.core.proxy.pooled_request", fake_request)
+    monkeypatch.setattr("app.core.proxy.send_upstream", fake_request)
 
     response = client.get(
         "/api/v2/simulation/progress?limit=10&offset=0", headers=HEADERS
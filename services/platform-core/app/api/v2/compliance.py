@@ -1,28 +1,28 @@
 from __future__ import annotations
 
-from copy import deepcopy
 from datetime import datetime, timezone
 from typing import Any, Literal
 from uuid import UUID, uuid4
 
 import requests
 from fastapi import APIRouter, Depends, HTTPException, Request
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from sqlalchemy.orm import Session
 
 from ...auth import require_roles
 from ...config import COMPLIANCE_URL
 from ...core.db import get_db
+from ...core.upstream import forward_upstream_headers
 from services.shared.audit import actor_subject, safe_record_audit
 from services.shared.models.compliance_report import ComplianceReport
 from services.shared.repositories import compliance_fix_repo
 from services.shared.user_registry import resolve_user_id
 from services.shared.http_client import request as pooled_request
+from services.shared.json_patch import JsonPatchError, apply_patch
 
 router = APIRouter()
 
 COMPLIANCE_ROLES = ["manufacturer", "developer", "admin", "regulator"]
-TRACE_HEADERS = ("traceparent", "tracestate", "baggage")
 
 
 class ComplianceRunCreateRequest(BaseModel):
@@ -34,22 +34,39 @@ class ComplianceRunCreateRequest(BaseModel):
 
 
 class JsonPatchOperation(BaseModel):
-    op: Literal["add", "replace", "remove"]
+    model_config = ConfigDict(populate_by_name=True)
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
     path: str
     value: Any | None = None
+    from_: str | None = Field(default=None, alias="from")
 
     @model_validator(mode="after")
     def validate_value(self):
-        if self.op in {"add", "replace"} and self.value is None:
-            raise ValueError("value is required for add/replace operations")
+        # ``null`` is a valid JSON value; only a missing one is an error.
+        if (
+            self.op in {"add", "replace", "test"}
+            and "value" not in self.model_fields_set
+        ):
+            raise ValueError("value is required for add/replace/test operations")
+        if self.op in {"move", "copy"} and self.from_ is None:
+            raise ValueError("from is required for move/copy operations")
         return self
 
+    def as_patch(self) -> dict[str, Any]:
+        patch: dict[str, Any] = {"op": self.op, "path": self.path}
+        if self.op in {"add", "replace", "test"}:
+            patch["value"] = self.value
+        if self.from_ is not None:
+            patch["from"] = self.from_
+        return patch
+
 
 class ComplianceFixApplyRequest(BaseModel):
     # Legacy compatibility fields.
     path: str | None = None
     value: Any | None = None
-    # New JSON Patch subset.
+    # RFC 6902 JSON Patch.
     operations: list[JsonPatchOperation] = Field(default_factory=list)
 
     @model_validator(mode="after")
@@ -68,32 +85,6 @@ def _to_uuid(value: str, *, field_name: str) -> UUID:
         raise HTTPException(status_code=422, detail=f"Invalid {field_name}") from exc
 
 
-def _forward_upstream_headers(request: Request) -> dict[str, str]:
-    headers: dict[str, str] = {}
-    request_id = getattr(request.state, "request_id", None) or request.headers.get(
-        "x-request-id"
-    )
-    if request_id:
-        headers["X-Request-ID"] = str(request_id)
-
-    authorization = request.headers.get("authorization")
-    if authorization:
-        headers["Authorization"] = authorization
-    else:
-        dev_user = request.headers.get("x-dev-user")
-        dev_roles = request.headers.get("x-dev-roles")
-        if dev_user:
-            headers["X-Dev-User"] = dev_user
-        if dev_roles:
-            headers["X-Dev-Roles"] = dev_roles
-
-    for header in TRACE_HEADERS:
-        value = request.headers.get(header)
-        if value:
-            headers[header] = value
-    return headers
-
-
 def _run_compliance_check(
     request: Request, payload: dict[str, Any], regulations: list[str]
 ) -> dict[str, Any]:
@@ -102,7 +93,7 @@ def _run_compliance_check(
             method="POST",
             url=f"{COMPLIANCE_URL}/api/v1/compliance/check",
             json={"data": payload, "regulations": regulations},
-            headers=_forward_upstream_headers(request),
+            headers=forward_upstream_headers(request),
             timeout=8,
             session_name="platform-core-compliance",
         )
@@ -114,14 +105,6 @@ def _run_compliance_check(
         ) from exc
 
 
-def _decode_pointer(path: str) -> list[str]:
-    if path == "":
-        return []
-    if not path.startswith("/"):
-        raise ValueError("path must use JSON Pointer syntax (must start with '/')")
-    return [part.replace("~1", "/").replace("~0", "~") for part in path[1:].split("/")]
-
-
 def _pointer_from_legacy_path(path: str) -> str:
     value = (path or "").strip()
     if not value:
@@ -140,82 +123,6 @@ def _pointer_from_legacy_path(path: str) -> str:
     return "/" + "/".join(escaped)
 
 
-def _parse_list_index(token: str, *, length: int, allow_end: bool) -> int:
-    if token == "-" and allow_end:
-        return length
-    if not token.isdigit():
-        raise ValueError(f"invalid array index '{token}'")
-    index = int(token)
-    if allow_end and index == length:
-        return index
-    if index < 0 or index >= length:
-        raise ValueError(f"array index out of bounds '{token}'")
-    return index
-
-
-def _resolve_parent(document: Any, path_tokens: list[str]) -> tuple[Any, str]:
-    if not path_tokens:
-        raise ValueError("empty pointer has no parent")
-    current = document
-    for token in path_tokens[:-1]:
-        if isinstance(current, dict):
-            if token not in current:
-                raise ValueError(f"path segment '{token}' not found")
-            current = current[token]
-            continue
-        if isinstance(current, list):
-            idx = _parse_list_index(token, length=len(current), allow_end=False)
-            current = current[idx]
-            continue
-        raise ValueError("cannot traverse non-container value")
-    return current, path_tokens[-1]
-
-
-def _apply_single_operation(document: Any, operation: JsonPatchOperation) -> Any:
-    tokens = _decode_pointer(operation.path)
-    if not tokens:
-        if operation.op == "remove":
-            raise ValueError("cannot remove root document")
-        return deepcopy(operation.value)
-
-    parent, token = _resolve_parent(document, tokens)
-    if isinstance(parent, dict):
-        if operation.op == "add":
-            parent[token] = deepcopy(operation.value)
-            return document
-        if operation.op == "replace":
-            if token not in parent:
-                raise ValueError(f"path '{operation.path}' does not exist for replace")
-            parent[token] = deepcopy(operation.value)
-            return document
-        if token not in parent:
-            raise ValueError(f"path '{operation.path}' does not exist for remove")
-        del parent[token]
-        return document
-
-    if isinstance(parent, list):
-        if operation.op == "add":
-            idx = _parse_list_index(token, length=len(parent), allow_end=True)
-            parent.insert(idx, deepcopy(operation.value))
-            return document
-        if operation.op == "replace":
-            idx = _parse_list_index(token, length=len(parent), allow_end=False)
-            parent[idx] = deepcopy(operation.value)
-            return document
-        idx = _parse_list_index(token, length=len(parent), allow_end=False)
-        parent.pop(idx)
-        return document
-
-    raise ValueError("target parent is not an object or array")
-
-
-def _apply_patch(document: Any, operations: list[JsonPatchOperation]) -> Any:
-    patched = deepcopy(document)
-    for operation in operations:
-        patched = _apply_single_operation(patched, operation)
-    return patched
-
-
 def _normalize_operations(
     payload: ComplianceFixApplyRequest,
 ) -> list[JsonPatchOperation]:
@@ -239,12 +146,13 @@ def _serialize_fix_history(report_id: UUID, db: Session) -> list[dict[str, Any]]
     ]
 
 
-def _resolve_actor_user_id(db: Session, user: dict | None) -> str | None:
+def _resolve_actor_user_id(db: Session, user: dict | None) -> UUID | None:
     try:
-        return resolve_user_id(db, user)
+        user_id = resolve_user_id(db, user)
     except Exception:
         db.rollback()
         return None
+    return UUID(user_id) if user_id else None
 
 
 @router.get("/core/compliance/status")
@@ -356,14 +264,17 @@ def apply_fix(
         raise HTTPException(
             status_code=409, detail="Compliance run payload is not patchable"
         )
-    before_payload = deepcopy(original_payload)
     before_violations = list(data.get("violations") or [])
     before_warnings = list(data.get("warnings") or [])
     before_recommendations = list(data.get("recommendations") or [])
 
+    # Copy-on-write: the stored payload is left untouched and shares every
+    # subtree the fix does not modify with the patched one.
     try:
-        patched_payload = _apply_patch(before_payload, operations)
-    except ValueError as exc:
+        patched_payload = apply_patch(
+            original_payload, [operation.as_patch() for operation in operations]
+        ).document
+    except JsonPatchError as exc:
         raise HTTPException(
             status_code=422, detail=f"Invalid patch operation: {exc}"
         ) from exc
@@ -372,9 +283,8 @@ def apply_fix(
 
     user_id = _resolve_actor_user_id(db, getattr(request.state, "user", None))
     for operation in operations:
-        stored_value: dict[str, Any] = {"op": operation.op}
-        if operation.op in {"add", "replace"}:
-            stored_value["value"] = operation.value
+        stored_value = operation.as_patch()
+        stored_value.pop("path")
         compliance_fix_repo.create_fix(
             db,
             report_id=report.id,
@@ -416,9 +326,7 @@ def apply_fix(
         actor_subject_value=actor_subject(getattr(request.state, "user", None)),
         request_id=str(getattr(request.state, "request_id", "")) or None,
         details={
-            "operations": [
-                operation.model_dump(exclude_none=True) for operation in operations
-            ],
+            "operations": [operation.as_patch() for operation in operations],
             "deltas": deltas,
             "status": report.status,
         },
@@ -427,9 +335,7 @@ def apply_fix(
         "run_id": str(report.id),
         "status": report.status,
         "payload": patched_payload,
-        "operations_applied": [
-            operation.model_dump(exclude_none=True) for operation in operations
-        ],
+        "operations_applied": [operation.as_patch() for operation in operations],
         "before": {"summary": before_counts},
         "after": {"summary": after_counts},
         "deltas": deltas,
@@ -1,16 +1,24 @@
 from __future__ import annotations
 
+import json
+from typing import Iterable, Iterator, Literal
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from ...auth import require_roles
 from ...core.db import get_db
+from services.shared.models.dpp_instance import DppInstance
 from services.shared.repositories import digital_twin_repo
 
 router = APIRouter()
 
+# Changes per page of the JSON diff; NDJSON streams are unbounded by default.
+DIFF_PAGE_DEFAULT = 500
+DIFF_PAGE_MAX = 5000
+
 ALL_ROLES = ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"]
 
 
@@ -21,6 +29,12 @@ def _parse_uuid(value: str, field_name: str) -> UUID:
         raise HTTPException(status_code=422, detail=f"Invalid {field_name}: '{value}'") from exc
 
 
+def _ndjson_lines(header: dict, records: Iterable[dict]) -> Iterator[bytes]:
+    yield json.dumps(header, default=str).encode("utf-8") + b"\n"
+    for record in records:
+        yield json.dumps(record, default=str).encode("utf-8") + b"\n"
+
+
 def _serialize_snapshot(snapshot, node_count: int = 0, edge_count: int = 0) -> dict:
     return {
         "snapshot_id": str(snapshot.id),
@@ -36,6 +50,14 @@ def _serialize_snapshot(snapshot, node_count: int = 0, edge_count: int = 0) -> d
 def get_digital_twin(request: Request, dpp_id: str, db: Session = Depends(get_db)):
     require_roles(request.state.user, ALL_ROLES)
     dpp_uuid = _parse_uuid(dpp_id, "dpp_id")
+    # True while a requested snapshot has not been captured yet; the graph
+    # below is then the one from before the latest journey steps.
+    snapshot_pending = (
+        db.query(DppInstance.snapshot_requested_at)
+        .filter(DppInstance.id == dpp_uuid)
+        .scalar()
+        is not None
+    )
     graph = digital_twin_repo.get_graph(db, dpp_uuid)
     if not graph:
         return {
@@ -43,9 +65,11 @@ def get_digital_twin(request: Request, dpp_id: str, db: Session = Depends(get_db
             "nodes": [],
             "edges": [],
             "timeline": [],
+            "snapshot_pending": snapshot_pending,
         }
     payload = digital_twin_repo.format_graph_payload(dpp_id, graph["snapshot"], graph["nodes"], graph["edges"])
     payload["timeline"] = []
+    payload["snapshot_pending"] = snapshot_pending
     return payload
 
 
@@ -93,6 +117,10 @@ def get_digital_twin_diff(
     dpp_id: str,
     from_snapshot: str = Query(..., alias="from"),
     to_snapshot: str = Query(..., alias="to"),
+    summary_only: bool = False,
+    limit: int | None = None,
+    offset: int = 0,
+    response_format: Literal["json", "ndjson"] = Query("json", alias="format"),
     db: Session = Depends(get_db),
 ):
     require_roles(request.state.user, ALL_ROLES)
@@ -105,33 +133,47 @@ def get_digital_twin_diff(
     if not from_item or not to_item:
         raise HTTPException(status_code=404, detail="One or both snapshots were not found for this dpp_id")
 
-    from_graph_data = digital_twin_repo.get_graph_for_snapshot(db, from_item.id)
-    to_graph_data = digital_twin_repo.get_graph_for_snapshot(db, to_item.id)
-
-    from_graph = digital_twin_repo.format_graph_payload(
-        dpp_id,
-        from_item,
-        from_graph_data["nodes"],
-        from_graph_data["edges"],
-    )
-    to_graph = digital_twin_repo.format_graph_payload(
-        dpp_id,
-        to_item,
-        to_graph_data["nodes"],
-        to_graph_data["edges"],
-    )
-
-    return {
+    node_counts, edge_counts = digital_twin_repo.get_snapshot_counts(db, [from_item.id, to_item.id])
+    header = {
         "dpp_id": dpp_id,
         "from_snapshot": _serialize_snapshot(
             from_item,
-            node_count=len(from_graph_data["nodes"]),
-            edge_count=len(from_graph_data["edges"]),
+            node_count=node_counts.get(from_item.id, 0),
+            edge_count=edge_counts.get(from_item.id, 0),
         ),
         "to_snapshot": _serialize_snapshot(
             to_item,
-            node_count=len(to_graph_data["nodes"]),
-            edge_count=len(to_graph_data["edges"]),
+            node_count=node_counts.get(to_item.id, 0),
+            edge_count=edge_counts.get(to_item.id, 0),
+        ),
+    }
+    bounded_offset = max(0, offset)
+
+    if response_format == "ndjson":
+        # One line per change, then a summary line; unbounded unless a
+        # limit is given.
+        records = digital_twin_repo.iter_diff(
+            db,
+            from_item.id,
+            to_item.id,
+            offset=bounded_offset,
+            limit=None if limit is None else max(1, limit),
+            summary_only=summary_only,
+        )
+        return StreamingResponse(
+            _ndjson_lines({"type": "header", **header}, records),
+            media_type="application/x-ndjson",
+        )
+
+    bounded_limit = max(1, min(limit or DIFF_PAGE_DEFAULT, DIFF_PAGE_MAX))
+    return {
+        **header,
+        "diff": digital_twin_repo.diff_snapshots(
+            db,
+            from_item.id,
+            to_item.id,
+            offset=bounded_offset,
+            limit=bounded_limit,
+            summary_only=summary_only,
         ),
-        "diff": digital_twin_repo.build_diff(from_graph, to_graph),
     }
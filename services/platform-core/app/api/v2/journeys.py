@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import logging
 from typing import Any
 from uuid import UUID
 
@@ -10,9 +9,10 @@ from sqlalchemy.orm import Session
 
 from ...auth import require_roles
 from ...core.db import get_db
-from services.shared.models.dpp_instance import DppInstance
-from services.shared.models.session import SimulationSession
-from services.shared.repositories import digital_twin_repo
+from ...core.snapshot_worker import request_snapshot
+from ...core.step_runtime import STEP_RUNTIME
+from ...core.template_cache import TEMPLATE_CACHE
+from ...core.upstream import forward_upstream_headers
 from services.shared.repositories import journey_repo
 
 
@@ -27,9 +27,10 @@ def _safe_uuid(value: str | None) -> UUID | None:
 
 
 router = APIRouter()
-logger = logging.getLogger(__name__)
 
 ALL_ROLES = ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"]
+# Step outcomes that keep the run on the current step.
+STEP_HOLD_STATUSES = {"error", "timeout", "awaiting_input"}
 
 
 class RunCreateRequest(BaseModel):
@@ -55,6 +56,7 @@ def _serialize_run(run, step_runs=None, template_code: str | None = None) -> dic
                     "status": sr.status or "completed",
                     "payload": sr.payload or {},
                     "metadata": sr.metadata_ or {},
+                    "result": sr.result or {},
                     "executed_at": sr.executed_at.isoformat() if sr.executed_at else "",
                 }
             )
@@ -102,7 +104,7 @@ def create_run(
     request: Request, payload: RunCreateRequest, db: Session = Depends(get_db)
 ):
     require_roles(request.state.user, ALL_ROLES)
-    template = journey_repo.get_template_by_code(db, payload.template_code)
+    template = TEMPLATE_CACHE.get_by_code(db, payload.template_code)
     if not template:
         raise HTTPException(
             status_code=404, detail=f"Template '{payload.template_code}' not found"
@@ -116,6 +118,7 @@ def create_run(
         locale=payload.locale,
         metadata=payload.metadata,
         session_id=_safe_uuid(payload.session_id),
+        first_step_key=template.first_step_key,
     )
     db.commit()
     return _serialize_run(run, template_code=template.code)
@@ -128,9 +131,7 @@ def get_run(request: Request, run_id: str, db: Session = Depends(get_db)):
     if not data:
         raise HTTPException(status_code=404, detail="Run not found")
     run = data["run"]
-    template = (
-        db.query(journey_repo.JourneyTemplate).filter_by(id=run.template_id).first()
-    )
+    template = TEMPLATE_CACHE.get(db, run.template_id)
     return _serialize_run(
         run, data["step_runs"], template_code=template.code if template else ""
     )
@@ -148,64 +149,57 @@ def execute_step(
     run = journey_repo.get_run(db, UUID(run_id))
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
+    template = TEMPLATE_CACHE.get(db, run.template_id)
+    step = template.step(step_id) if template else None
+    result: dict[str, Any] = {}
+    status = "completed"
+    # Steps whose action has a plugin run it here; others (UI-driven steps)
+    # are only recorded.
+    if step is not None and STEP_RUNTIME.get(step.action) is not None:
+        user_id = _safe_uuid(getattr(request.state, "user", {}).get("sub"))
+        result = STEP_RUNTIME.execute(
+            db,
+            step.action,
+            step.default_payload or {},
+            payload.payload,
+            {
+                "session_id": str(run.session_id) if run.session_id else None,
+                "user_id": str(user_id) if user_id else None,
+                "run_id": str(run.id),
+                "request_id": getattr(request.state, "request_id", None),
+            },
+            metadata=payload.metadata,
+            headers=forward_upstream_headers(request),
+        )
+        status = str(result.get("status") or "completed")
     step_run = journey_repo.create_step_run(
         db,
         run_id=run.id,
         step_key=step_id,
         payload=payload.payload,
+        result=result,
         metadata=payload.metadata,
+        status=status,
     )
-    # Advance to next step
-    template_steps = journey_repo.list_steps_for_template(db, run.template_id)
-    current_idx = next(
-        (i for i, s in enumerate(template_steps) if s.step_key == step_id), -1
-    )
-    next_step_key = (
-        template_steps[current_idx + 1].step_key
-        if current_idx + 1 < len(template_steps)
-        else "done"
-    )
-    journey_repo.update_run_step(db, run, next_step_key)
-
-    # Best-effort digital twin snapshot capture for run-linked DPPs.
+    # Advance to next step unless the action failed or still needs input.
+    if status in STEP_HOLD_STATUSES:
+        next_step_key = run.current_step_key or step_id
+    else:
+        next_step_key = template.next_step_key(step_id) if template else "done"
+        journey_repo.update_run_step(db, run, next_step_key)
+
+    # The snapshot is captured off the request path by the snapshot worker,
+    # which coalesces bursts of steps on the same session.
     if run.session_id:
-        dpp_instance = (
-            db.query(DppInstance)
-            .filter(DppInstance.session_id == run.session_id)
-            .order_by(DppInstance.created_at.desc())
-            .first()
+        request_snapshot(
+            db,
+            session_id=run.session_id,
+            run_id=str(run.id),
+            step_id=step_id,
+            step_status=step_run.status or "completed",
+            user_id=getattr(request.state, "user", {}).get("sub"),
+            request_id=getattr(request.state, "request_id", None),
         )
-        if dpp_instance:
-            session = (
-                db.query(SimulationSession)
-                .filter(SimulationSession.id == run.session_id)
-                .first()
-            )
-            session_state = (
-                session.session_state
-                if session and isinstance(session.session_state, dict)
-                else {}
-            )
-            try:
-                digital_twin_repo.capture_snapshot_for_dpp(
-                    db,
-                    dpp_instance=dpp_instance,
-                    label=f"Run {run.id} step {step_id}",
-                    metadata={
-                        "source": "platform-core.journeys.execute_step",
-                        "run_id": str(run.id),
-                        "step_id": step_id,
-                        "step_status": step_run.status or "completed",
-                    },
-                    session_state=session_state,
-                )
-            except (
-                Exception
-            ):  # pragma: no cover - failure should not block step progression
-                logger.exception(
-                    "Failed to capture digital twin snapshot",
-                    extra={"run_id": str(run.id), "step_id": step_id},
-                )
     db.commit()
 
     return {
@@ -215,6 +209,7 @@ def execute_step(
             "status": step_run.status or "completed",
             "payload": step_run.payload or {},
             "metadata": step_run.metadata_ or {},
+            "result": step_run.result or {},
             "executed_at": step_run.executed_at.isoformat()
             if step_run.executed_at
             else "",
@@ -233,8 +228,7 @@ def list_templates(request: Request, db: Session = Depends(get_db)):
 @router.get("/core/journeys/templates/{code}")
 def get_template(request: Request, code: str, db: Session = Depends(get_db)):
     require_roles(request.state.user, ALL_ROLES)
-    template = journey_repo.get_template_by_code(db, code)
+    template = TEMPLATE_CACHE.get_by_code(db, code)
     if not template:
         raise HTTPException(status_code=404, detail=f"Template '{code}' not found")
-    steps = journey_repo.list_steps_for_template(db, template.id)
-    return _serialize_template(template, steps)
+    return _serialize_template(template, template.steps)
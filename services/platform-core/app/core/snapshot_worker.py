@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable
+from uuid import UUID, uuid4
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..config import TWIN_SNAPSHOT_DEBOUNCE_SECONDS, TWIN_SNAPSHOT_WORKER_ENABLED
+from services.shared.events import TWIN_SNAPSHOT_REQUESTED, build_event
+from services.shared.metrics import build_counter
+from services.shared.models.dpp_instance import DppInstance
+from services.shared.models.session import SimulationSession
+from services.shared.outbox import enqueue_event
+from services.shared.redis_client import ensure_stream_group, get_redis
+from services.shared.repositories import digital_twin_repo
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_STREAM = "twin.snapshots"
+SNAPSHOT_GROUP = "platform-core-twin-snapshots"
+MAX_CAPTURE_ATTEMPTS = 3
+# Entries another (crashed) consumer left unacked this long are taken over.
+RECLAIM_IDLE_MS = 60_000
+RECLAIM_INTERVAL_SECONDS = 30.0
+
+TWIN_SNAPSHOT_REQUESTS = build_counter(
+    "dpp_twin_snapshot_requests_total",
+    "Twin snapshot requests by outcome "
+    "(captured, inline, skipped, coalesced, retried, reclaimed, failed)",
+    ["result"],
+)
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def request_snapshot(
+    db: Session,
+    *,
+    session_id: UUID,
+    run_id: str,
+    step_id: str,
+    step_status: str,
+    user_id: str | None = None,
+    request_id: str | None = None,
+) -> bool:
+    """Stage a snapshot request for the session's DPPs in the caller's
+    transaction: one UPDATE marks them pending and one outbox row carries the
+    request to the snapshot worker. Nothing is read and nothing is cloned.
+
+    Without the worker nothing would ever clear the pending flag, so the
+    snapshot is captured inline instead. Best effort either way: a failure is
+    logged and the caller's own changes are kept.
+    """
+    requested_at = datetime.now(timezone.utc)
+    event = build_event(
+        TWIN_SNAPSHOT_REQUESTED,
+        user_id=user_id,
+        source_service="platform-core",
+        session_id=str(session_id),
+        run_id=run_id,
+        request_id=request_id,
+        metadata={
+            "step_id": step_id,
+            "step_status": step_status,
+            "requested_at": requested_at.isoformat(),
+        },
+    )
+    try:
+        with db.begin_nested():
+            if not TWIN_SNAPSHOT_WORKER_ENABLED:
+                captured = _capture_snapshot(db, session_id, [event])
+                if captured:
+                    TWIN_SNAPSHOT_REQUESTS.labels(result="inline").inc()
+                return captured
+            flagged = (
+                db.query(DppInstance)
+                .filter(DppInstance.session_id == session_id)
+                .update(
+                    {DppInstance.snapshot_requested_at: requested_at},
+                    synchronize_session=False,
+                )
+            )
+            if not flagged:
+                return False
+            enqueue_event(db, stream=SNAPSHOT_STREAM, payload=event, commit=False)
+    except SQLAlchemyError:
+        logger.exception(
+            "Failed to request digital twin snapshot",
+            extra={"run_id": run_id, "step_id": step_id},
+        )
+        return False
+    return True
+
+
+def capture_requested_snapshot(
+    db: Session, session_id: str, events: list[dict[str, Any]]
+) -> bool:
+    """Capture one snapshot of the session's newest DPP for ``events`` (the
+    coalesced requests, oldest first) and clear the pending flag of every
+    DPP whose request it covers. False when the session has no DPP."""
+    captured = _capture_snapshot(db, UUID(str(session_id)), events)
+    db.commit()
+    return captured
+
+
+def abandon_requested_snapshot(
+    db: Session, session_id: str, events: list[dict[str, Any]]
+) -> None:
+    """Clear the pending flag ``events`` set once their capture has been
+    given up, so the twin stops reporting a snapshot that will not come.
+    Requests made after them stay pending."""
+    cutoff = max(
+        (_requested_at(event) for event in events),
+        default=datetime.now(timezone.utc),
+    )
+    db.query(DppInstance).filter(
+        DppInstance.session_id == UUID(str(session_id)),
+        DppInstance.snapshot_requested_at <= cutoff,
+    ).update({DppInstance.snapshot_requested_at: None}, synchronize_session=False)
+    db.commit()
+
+
+def _requested_at(event: dict[str, Any]) -> datetime:
+    metadata = event.get("metadata")
+    raw = metadata.get("requested_at") if isinstance(metadata, dict) else None
+    try:
+        return datetime.fromisoformat(str(raw))
+    except ValueError:
+        # Requests queued before the time was recorded: the flag predates now.
+        return datetime.now(timezone.utc)
+
+
+def _capture_snapshot(
+    db: Session, session_uuid: UUID, events: list[dict[str, Any]]
+) -> bool:
+    started = datetime.now(timezone.utc)
+    dpp_instance = (
+        db.query(DppInstance)
+        .filter(DppInstance.session_id == session_uuid)
+        .order_by(DppInstance.created_at.desc())
+        .first()
+    )
+    if dpp_instance is None:
+        return False
+    session = (
+        db.query(SimulationSession).filter(SimulationSession.id == session_uuid).first()
+    )
+    session_state = (
+        session.session_state
+        if session and isinstance(session.session_state, dict)
+        else {}
+    )
+    latest = events[-1] if events else {}
+    metadata = latest.get("metadata")
+    step: dict[str, Any] = metadata if isinstance(metadata, dict) else {}
+    run_id = latest.get("run_id")
+    digital_twin_repo.capture_snapshot_for_dpp(
+        db,
+        dpp_instance=dpp_instance,
+        label=f"Run {run_id} step {step.get('step_id')}",
+        metadata={
+            "source": "platform-core.journeys.execute_step",
+            "run_id": run_id,
+            "step_id": step.get("step_id"),
+            "step_status": step.get("step_status") or "completed",
+            "coalesced_requests": len(events),
+        },
+        session_state=session_state,
+    )
+    # Requests that arrived while capturing stay pending for the next window.
+    db.query(DppInstance).filter(
+        DppInstance.session_id == session_uuid,
+        DppInstance.snapshot_requested_at <= started,
+    ).update({DppInstance.snapshot_requested_at: None}, synchronize_session=False)
+    return True
+
+
+@dataclass
+class PendingSnapshot:
+    session_id: str
+    due_at: float
+    message_ids: list[Any] = field(default_factory=list)
+    events: list[dict[str, Any]] = field(default_factory=list)
+    attempts: int = 0
+
+
+class SnapshotCoalescer:
+    """Collects snapshot requests per session until its debounce window ends.
+
+    The first request for a session opens a window of ``debounce`` seconds;
+    requests arriving inside it join the same pending snapshot, so a burst of
+    steps produces a single capture describing the latest one.
+    """
+
+    def __init__(
+        self,
+        debounce: float = TWIN_SNAPSHOT_DEBOUNCE_SECONDS,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.debounce = debounce
+        self._clock = clock
+        self._pending: dict[str, PendingSnapshot] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def holds(self, message_id: Any) -> bool:
+        return any(message_id in p.message_ids for p in self._pending.values())
+
+    def add(self, message_id: Any, event: dict[str, Any]) -> None:
+        session_id = str(event.get("session_id") or "")
+        pending = self._pending.get(session_id)
+        if pending is None:
+            pending = self._pending[session_id] = PendingSnapshot(
+                session_id=session_id, due_at=self._clock() + self.debounce
+            )
+        else:
+            TWIN_SNAPSHOT_REQUESTS.labels(result="coalesced").inc()
+        pending.message_ids.append(message_id)
+        pending.events.append(event)
+
+    def seconds_until_due(self) -> float | None:
+        if not self._pending:
+            return None
+        due = min(pending.due_at for pending in self._pending.values())
+        return max(0.0, due - self._clock())
+
+    def pop_due(self) -> list[PendingSnapshot]:
+        now = self._clock()
+        due = [p for p in self._pending.values() if p.due_at <= now]
+        for pending in due:
+            del self._pending[pending.session_id]
+        return due
+
+    def retry(self, pending: PendingSnapshot) -> bool:
+        """Schedule a failed capture for the next window; False once it has
+        used up its attempts."""
+        pending.attempts += 1
+        if pending.attempts >= MAX_CAPTURE_ATTEMPTS:
+            return False
+        pending.due_at = self._clock() + self.debounce
+        existing = self._pending.get(pending.session_id)
+        if existing is not None:
+            pending.message_ids.extend(existing.message_ids)
+            pending.events.extend(existing.events)
+        self._pending[pending.session_id] = pending
+        return True
+
+
+def _decode_event(data: dict[Any, Any]) -> dict[str, Any]:
+    event: dict[str, Any] = {}
+    for key, value in data.items():
+        key = key.decode("utf-8") if isinstance(key, bytes) else key
+        value = value.decode("utf-8") if isinstance(value, bytes) else value
+        if key == "metadata" and isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        event[key] = value
+    return event
+
+
+def _capture(session_factory: sessionmaker, pending: PendingSnapshot) -> bool:
+    db: Session = session_factory()
+    try:
+        captured = capture_requested_snapshot(db, pending.session_id, pending.events)
+        # No DPP (any more): nothing to capture, but nothing to retry either.
+        result = "captured" if captured else "skipped"
+        TWIN_SNAPSHOT_REQUESTS.labels(result=result).inc()
+        return True
+    except Exception:
+        db.rollback()
+        logger.exception(
+            "Failed to capture digital twin snapshot",
+            extra={"session_id": pending.session_id, "attempt": pending.attempts + 1},
+        )
+        return False
+    finally:
+        db.close()
+
+
+def _abandon(session_factory: sessionmaker, pending: PendingSnapshot) -> None:
+    db: Session = session_factory()
+    try:
+        abandon_requested_snapshot(db, pending.session_id, pending.events)
+    except Exception:
+        db.rollback()
+        logger.exception(
+            "Failed to clear abandoned digital twin snapshot request",
+            extra={"session_id": pending.session_id},
+        )
+    finally:
+        db.close()
+
+
+def _reclaim(client: Any, consumer: str, coalescer: SnapshotCoalescer) -> None:
+    """Take over requests that were delivered to a consumer which never acked
+    them (a worker that crashed or was redeployed mid-window)."""
+    start = "0-0"
+    while True:
+        reply = client.xautoclaim(
+            SNAPSHOT_STREAM,
+            SNAPSHOT_GROUP,
+            consumer,
+            RECLAIM_IDLE_MS,
+            start_id=start,
+            count=100,
+        )
+        start, messages = reply[0], reply[1]
+        for message_id, data in messages:
+            # Entries trimmed from the stream come back without data.
+            if data is None:
+                client.xack(SNAPSHOT_STREAM, SNAPSHOT_GROUP, message_id)
+            elif not coalescer.holds(message_id):
+                TWIN_SNAPSHOT_REQUESTS.labels(result="reclaimed").inc()
+                coalescer.add(message_id, _decode_event(data))
+        if start in ("0-0", b"0-0"):
+            return
+
+
+def _run_loop(*, session_factory: sessionmaker, redis_url: str) -> None:
+    client = get_redis(redis_url)
+    consumer = f"snapshot-worker-{uuid4()}"
+    ensure_stream_group(client, SNAPSHOT_STREAM, SNAPSHOT_GROUP)
+    coalescer = SnapshotCoalescer()
+    reclaim_at = 0.0
+
+    while True:
+        if time.monotonic() >= reclaim_at:
+            try:
+                _reclaim(client, consumer, coalescer)
+            except Exception:
+                logger.warning("Snapshot worker reclaim failed", exc_info=True)
+            reclaim_at = time.monotonic() + RECLAIM_INTERVAL_SECONDS
+        wait = coalescer.seconds_until_due()
+        # Redis treats block=0 as "forever"; wake up in time for the next window.
+        block_ms = 5000 if wait is None else max(1, int(wait * 1000))
+        try:
+            result = client.xreadgroup(
+                SNAPSHOT_GROUP,
+                consumer,
+                {SNAPSHOT_STREAM: ">"},
+                block=block_ms,
+                count=100,
+            )
+        except Exception:
+            logger.warning("Snapshot worker read failed", exc_info=True)
+            time.sleep(2)
+            continue
+        for _stream, messages in result or []:
+            for message_id, data in messages:
+                coalescer.add(message_id, _decode_event(data))
+
+        for pending in coalescer.pop_due():
+            if not _capture(session_factory, pending) and coalescer.retry(pending):
+                TWIN_SNAPSHOT_REQUESTS.labels(result="retried").inc()
+                continue
+            if pending.attempts >= MAX_CAPTURE_ATTEMPTS:
+                TWIN_SNAPSHOT_REQUESTS.labels(result="failed").inc()
+                _abandon(session_factory, pending)
+            try:
+                client.xack(SNAPSHOT_STREAM, SNAPSHOT_GROUP, *pending.message_ids)
+            except Exception:
+                logger.warning("Snapshot worker ack failed", exc_info=True)
+
+
+def start_snapshot_worker(*, session_factory: sessionmaker, redis_url: str) -> None:
+    global _started
+    if not TWIN_SNAPSHOT_WORKER_ENABLED:
+        logger.info("Twin snapshot worker disabled")
+        return
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(
+        target=_run_loop,
+        kwargs={"session_factory": session_factory, "redis_url": redis_url},
+        daemon=True,
+        name="twin-snapshot-worker",
+    ).start()
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from ..config import AAS_ADAPTER_URL, COMPLIANCE_URL, EDC_URL
+from services.shared.step_plugins import BuiltinStepPlugins
+from services.shared.step_runtime import StepRuntime
+
+# Journey steps run the same action plugins as simulation stories.
+STEP_RUNTIME = BuiltinStepPlugins(
+    compliance_url=COMPLIANCE_URL,
+    edc_url=EDC_URL,
+    aas_adapter_url=AAS_ADAPTER_URL,
+    session_name="platform-core-journeys",
+).register(StepRuntime("platform-core"))
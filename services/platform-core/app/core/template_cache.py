@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from ..config import JOURNEY_TEMPLATE_CACHE_TTL_SECONDS
+from services.shared.metrics import build_counter
+from services.shared.repositories import journey_repo
+
+TEMPLATE_CACHE_LOOKUPS = build_counter(
+    "dpp_journey_template_cache_total",
+    "Journey template lookups by cache outcome",
+    ["result"],
+)
+
+DONE_STEP_KEY = "done"
+
+
+@dataclass(frozen=True)
+class CachedStep:
+    id: UUID
+    step_key: str
+    title: str
+    action: str
+    order_index: int
+    help_text: str | None
+    default_payload: dict[str, Any] | None
+
+
+@dataclass(frozen=True)
+class CachedTemplate:
+    """A detached journey template with its steps in order.
+
+    ``positions`` maps each ``step_key`` to ``(index, next_key)`` so the next
+    step is a dict lookup instead of a scan of the step list.
+    """
+
+    id: UUID
+    code: str
+    name: str
+    description: str | None
+    target_role: str
+    is_active: bool
+    version: int
+    steps: tuple[CachedStep, ...]
+    positions: dict[str, tuple[int, str]] = field(repr=False)
+
+    @property
+    def first_step_key(self) -> str | None:
+        return self.steps[0].step_key if self.steps else None
+
+    def step(self, step_key: str) -> CachedStep | None:
+        position = self.positions.get(step_key)
+        return self.steps[position[0]] if position is not None else None
+
+    def next_step_key(self, step_key: str) -> str:
+        position = self.positions.get(step_key)
+        if position is not None:
+            return position[1]
+        # Unknown steps restart the journey, as the step scan used to.
+        return self.first_step_key or DONE_STEP_KEY
+
+
+def _load(db: Session, template) -> CachedTemplate:
+    steps = tuple(
+        CachedStep(
+            id=step.id,
+            step_key=step.step_key,
+            title=step.title,
+            action=step.action,
+            order_index=step.order_index,
+            help_text=step.help_text,
+            default_payload=step.default_payload,
+        )
+        for step in journey_repo.list_steps_for_template(db, template.id)
+    )
+    positions = {
+        step.step_key: (
+            index,
+            steps[index + 1].step_key if index + 1 < len(steps) else DONE_STEP_KEY,
+        )
+        for index, step in enumerate(steps)
+    }
+    return CachedTemplate(
+        id=template.id,
+        code=template.code,
+        name=template.name,
+        description=template.description,
+        target_role=template.target_role,
+        is_active=bool(template.is_active),
+        version=template.version or 1,
+        steps=steps,
+        positions=positions,
+    )
+
+
+class TemplateCache:
+    """Journey templates and their step index, shared by all requests.
+
+    Within ``ttl`` seconds of being loaded or checked, an entry is served
+    without touching the database. After that the template's ``version``
+    is read (one small query) and the entry is reloaded only if it changed.
+    Unknown codes and ids are never cached, so new templates show up at once.
+    """
+
+    def __init__(
+        self,
+        ttl: float = JOURNEY_TEMPLATE_CACHE_TTL_SECONDS,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # template id -> (entry, time the version was last confirmed)
+        self._entries: dict[UUID, tuple[CachedTemplate, float]] = {}
+        self._ids_by_code: dict[str, UUID] = {}
+
+    def _store(self, entry: CachedTemplate) -> CachedTemplate:
+        with self._lock:
+            self._entries[entry.id] = (entry, self._clock())
+            self._ids_by_code[entry.code] = entry.id
+        return entry
+
+    def _fresh(self, db: Session, template_id: UUID) -> CachedTemplate | None:
+        with self._lock:
+            cached = self._entries.get(template_id)
+        if cached is None:
+            return None
+        entry, checked_at = cached
+        if self._clock() - checked_at < self.ttl:
+            TEMPLATE_CACHE_LOOKUPS.labels(result="hit").inc()
+            return entry
+        version = journey_repo.get_template_version(db, template_id)
+        if version == entry.version:
+            TEMPLATE_CACHE_LOOKUPS.labels(result="revalidated").inc()
+            return self._store(entry)
+        self.invalidate(template_id)
+        return None
+
+    def get(self, db: Session, template_id: UUID) -> CachedTemplate | None:
+        entry = self._fresh(db, template_id)
+        if entry is not None:
+            return entry
+        TEMPLATE_CACHE_LOOKUPS.labels(result="miss").inc()
+        template = (
+            db.query(journey_repo.JourneyTemplate)
+            .filter(journey_repo.JourneyTemplate.id == template_id)
+            .first()
+        )
+        return self._store(_load(db, template)) if template else None
+
+    def get_by_code(self, db: Session, code: str) -> CachedTemplate | None:
+        with self._lock:
+            template_id = self._ids_by_code.get(code)
+        if template_id is not None:
+            entry = self._fresh(db, template_id)
+            # A template recreated under the same code gets a new id.
+            if entry is not None and entry.code == code:
+                return entry
+        TEMPLATE_CACHE_LOOKUPS.labels(result="miss").inc()
+        template = journey_repo.get_template_by_code(db, code)
+        return self._store(_load(db, template)) if template else None
+
+    def invalidate(self, template_id: UUID | None = None) -> None:
+        with self._lock:
+            if template_id is None:
+                self._entries.clear()
+                self._ids_by_code.clear()
+                return
+            cached = self._entries.pop(template_id, None)
+            if cached and self._ids_by_code.get(cached[0].code) == template_id:
+                del self._ids_by_code[cached[0].code]
+
+
+TEMPLATE_CACHE = TemplateCache()
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from fastapi import Request
+
+TRACE_HEADERS = ("traceparent", "tracestate", "baggage")
+
+
+def forward_upstream_headers(request: Request) -> dict[str, str]:
+    """Headers for a call made on behalf of ``request``: its request id and
+    trace context, and the caller's own credentials.
+
+    The platform-core service token is never attached here; an anonymous
+    caller stays anonymous upstream.
+    """
+    headers: dict[str, str] = {}
+    request_id = getattr(request.state, "request_id", None) or request.headers.get(
+        "x-request-id"
+    )
+    if request_id:
+        headers["X-Request-ID"] = str(request_id)
+
+    authorization = request.headers.get("authorization")
+    if authorization:
+        headers["Authorization"] = authorization
+    else:
+        dev_user = request.headers.get("x-dev-user")
+        dev_roles = request.headers.get("x-dev-roles")
+        if dev_user:
+            headers["X-Dev-User"] = dev_user
+        if dev_roles:
+            headers["X-Dev-Roles"] = dev_roles
+
+    for header in TRACE_HEADERS:
+        value = request.headers.get(header)
+        if value:
+            headers[header] = value
+    return headers
@@ -4,7 +4,11 @@ from fastapi import Request
 
 from .api.router import api_router
 from .auth import verify_request
+from .config import REDIS_URL
+from .core.db import SessionLocal
+from .core.snapshot_worker import start_snapshot_worker
 from services.shared.app_factory import create_service_app
+from services.shared.outbox_worker import start_outbox_worker
 
 
 def _verify_request(request: Request):
@@ -18,3 +22,14 @@ app = create_service_app(
     service_name="platform-core",
     verify_request=_verify_request,
 )
+
+
+@app.on_event("startup")
+def start_background_workers():
+    # Publishes this service's outbox rows (twin snapshot requests) to Redis.
+    start_outbox_worker(
+        worker_name="platform-core",
+        session_factory=SessionLocal,
+        redis_url=REDIS_URL,
+    )
+    start_snapshot_worker(session_factory=SessionLocal, redis_url=REDIS_URL)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Measure journey step latency with inline and queued twin snapshots.
+
+Runs the journey step execute endpoint in-process against an in-memory SQLite
+database (or ``--database-url``, which should point at a scratch database)
+for a session with a DPP, once with the snapshot captured inside the request
+("inline", the behaviour without the snapshot worker) and once with it
+flagged and queued for the worker ("queued"). Steps have no action plugin, so
+the numbers reflect the request's own transaction. Inline captures clone the
+previous snapshot's graph. Statements per request are reported alongside,
+since each one is a round trip on a networked Postgres.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+for path in (ROOT, SERVICE_DIR):
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+# The bench drives the snapshot mode itself; no workers polling Redis.
+os.environ["OUTBOX_WORKER_ENABLED"] = "false"
+os.environ["TWIN_SNAPSHOT_WORKER_ENABLED"] = "false"
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _run(
+    mode: str, steps: int, database_url: str
+) -> tuple[list[float], list[int]] | None:
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app import main as app_main
+    from app.core import snapshot_worker
+    from app.core.db import get_db
+    from app.core.template_cache import TEMPLATE_CACHE
+    from services.shared.models.base import Base
+    from services.shared.models.dpp_instance import DppInstance
+    from services.shared.models.journey_step import JourneyStep
+    from services.shared.models.journey_template import JourneyTemplate
+    from services.shared.models.session import SimulationSession
+    from services.shared.models.user import User
+
+    engine = create_engine(
+        database_url,
+        **(
+            {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+            if database_url.startswith("sqlite")
+            else {}
+        ),
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    db = session_factory()
+
+    user_id, session_id, template_id = uuid4(), uuid4(), uuid4()
+    db.add(User(id=user_id, keycloak_id=f"bench-{user_id}"))
+    db.flush()
+    db.add(
+        SimulationSession(
+            id=session_id, user_id=user_id, active_role="manufacturer", session_state={}
+        )
+    )
+    db.add(
+        JourneyTemplate(
+            id=template_id,
+            code=f"bench-{mode}-{template_id}",
+            name="Bench",
+            target_role="manufacturer",
+            is_active=True,
+        )
+    )
+    db.flush()
+    db.add(
+        DppInstance(
+            id=uuid4(),
+            session_id=session_id,
+            aas_identifier=f"urn:bench:{session_id}",
+            product_name="Bench Product",
+        )
+    )
+    db.add_all(
+        JourneyStep(
+            id=uuid4(),
+            template_id=template_id,
+            step_key=f"step-{idx}",
+            title=f"Step {idx}",
+            action="bench.ui",
+            order_index=idx,
+            default_payload={},
+        )
+        for idx in range(steps)
+    )
+    db.commit()
+
+    counter = [0]
+
+    def _on_statement(*_args):
+        counter[0] += 1
+
+    event.listen(engine, "before_cursor_execute", _on_statement)
+
+    def _get_db():
+        yield db
+
+    def _verify(request):
+        request.state.user = {"sub": str(user_id), "realm_access": {"roles": ["admin"]}}
+
+    app_main.app.dependency_overrides[get_db] = _get_db
+    app_main.verify_request = _verify
+    snapshot_worker.TWIN_SNAPSHOT_WORKER_ENABLED = mode == "queued"
+    TEMPLATE_CACHE.invalidate()
+    client = TestClient(app_main.app)
+    prefix = "/api/v2/core/journeys"
+    try:
+        run_id = client.post(
+            f"{prefix}/runs",
+            json={
+                "template_code": f"bench-{mode}-{template_id}",
+                "role": "manufacturer",
+                "session_id": str(session_id),
+            },
+        ).json()["id"]
+        latencies: list[float] = []
+        statements: list[int] = []
+        for idx in range(steps):
+            counter[0] = 0
+            started = time.perf_counter()
+            response = client.post(
+                f"{prefix}/runs/{run_id}/steps/step-{idx}/execute",
+                json={"payload": {}, "metadata": {}},
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            statements.append(counter[0])
+            if response.status_code != 200:
+                print(f"Step {idx} failed: {response.status_code} {response.text}")
+                return None
+        return latencies, statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_statement)
+        app_main.app.dependency_overrides.clear()
+        db.close()
+        engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark journey step latency.")
+    parser.add_argument("--steps", type=int, default=200, help="Steps per mode.")
+    parser.add_argument(
+        "--database-url", default="sqlite://", help="Scratch database to run in."
+    )
+    args = parser.parse_args()
+
+    results: dict[str, float] = {}
+    for mode in ("inline", "queued"):
+        run = _run(mode, args.steps, args.database_url)
+        if run is None:
+            return 1
+        latencies, statements = run
+        results[mode] = _percentile(latencies, 95)
+        print(
+            f"{mode:<7} {len(latencies)} steps  latency ms: "
+            f"p50={statistics.median(latencies):.2f} "
+            f"p95={results[mode]:.2f} "
+            f"max={max(latencies):.2f}  "
+            f"statements={statistics.mean(statements):.1f}"
+        )
+    print(f"p95 saved per step: {results['inline'] - results['queued']:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 from uuid import uuid4
@@ -15,6 +16,9 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 if str(SERVICE_DIR) not in sys.path:
     sys.path.insert(0, str(SERVICE_DIR))
+# No background workers in tests: they would poll Postgres and Redis.
+os.environ.setdefault("OUTBOX_WORKER_ENABLED", "false")
+os.environ.setdefault("TWIN_SNAPSHOT_WORKER_ENABLED", "false")
 
 from services.shared.models.base import Base  # noqa: E402
 from services.shared.models.user import User  # noqa: E402, F401
@@ -33,6 +37,8 @@ from services.shared.models.event_log import EventLog  # noqa: E402, F401
 from services.shared.models.audit_log import AuditLog  # noqa: E402, F401
 
 from app.core.db import get_db  # noqa: E402
+from app.core.step_runtime import STEP_RUNTIME  # noqa: E402
+from app.core.template_cache import TEMPLATE_CACHE  # noqa: E402
 from app import main  # noqa: E402
 
 
@@ -56,6 +62,16 @@ def _set_all_roles(request):
     }
 
 
+@pytest.fixture(autouse=True)
+def _reset_process_caches():
+    # Each test gets a fresh database with new template ids.
+    TEMPLATE_CACHE.invalidate()
+    STEP_RUNTIME.clear_cache()
+    yield
+    TEMPLATE_CACHE.invalidate()
+    STEP_RUNTIME.clear_cache()
+
+
 @pytest.fixture()
 def db_session():
     """Create an in-memory SQLite database and yield a session.
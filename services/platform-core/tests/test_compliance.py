@@ -177,3 +177,48 @@ def test_apply_fix_rejects_invalid_json_pointer(
     )
 
     assert response.status_code == 422
+
+
+def test_apply_fix_supports_move_copy_and_atomic_test(
+    client, db_session, monkeypatch: pytest.MonkeyPatch
+):
+    report = _seed_report(db_session, payload={"battery": {"mass": 5, "unit": "kg"}})
+
+    def fake_post(*args, **kwargs):
+        return DummyComplianceResponse({"status": "compliant", "violations": []})
+
+    monkeypatch.setattr("app.api.v2.compliance.pooled_request", fake_post)
+    url = f"/api/v2/core/compliance/runs/{report.id}/apply-fix"
+
+    failed = client.post(
+        url,
+        json={
+            "operations": [
+                {"op": "move", "from": "/battery/mass", "path": "/battery/weight"},
+                {"op": "test", "path": "/battery/unit", "value": "g"},
+            ]
+        },
+        headers=HEADERS,
+    )
+    assert failed.status_code == 422
+
+    response = client.post(
+        url,
+        json={
+            "operations": [
+                {"op": "test", "path": "/battery/unit", "value": "kg"},
+                {"op": "move", "from": "/battery/mass", "path": "/battery/weight"},
+                {"op": "copy", "from": "/battery/unit", "path": "/unit"},
+            ]
+        },
+        headers=HEADERS,
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["payload"] == {"battery": {"weight": 5, "unit": "kg"}, "unit": "kg"}
+    assert body["operations_applied"][1] == {
+        "op": "move",
+        "from": "/battery/mass",
+        "path": "/battery/weight",
+    }
@@ -5,9 +5,11 @@ Covers:
 - GET /api/v2/core/digital-twins/{dpp_id}          (populated graph with nodes/edges)
 - GET /api/v2/core/digital-twins/{dpp_id}/history  (timeline snapshots)
 - GET /api/v2/core/digital-twins/{dpp_id}/diff     (snapshot diff)
+- GET /api/v2/core/digital-twins/{dpp_id}/diff     (paging, summary_only, NDJSON)
 """
 from __future__ import annotations
 
+import json
 from uuid import uuid4
 
 from services.shared.models.digital_twin_snapshot import DigitalTwinSnapshot
@@ -308,3 +310,106 @@ def test_get_digital_twin_diff_returns_404_for_unknown_snapshot(client):
         params={"from": str(uuid4()), "to": str(uuid4())},
     )
     assert response.status_code == 404
+
+
+def _seed_large_diff(db_session, keycloak_id: str):
+    """Two snapshots of 50 nodes: 10 changed, 5 removed, 5 added, 1 new edge."""
+    user_id = uuid4()
+    db_session.add(User(id=user_id, keycloak_id=keycloak_id, email=f"{keycloak_id}@test.com"))
+    db_session.flush()
+    session_id = uuid4()
+    db_session.add(SimulationSession(id=session_id, user_id=user_id, active_role="manufacturer"))
+    db_session.flush()
+    dpp_id = uuid4()
+    db_session.add(DppInstance(id=dpp_id, session_id=session_id, aas_identifier=f"urn:{keycloak_id}"))
+    db_session.flush()
+    before_id, after_id = uuid4(), uuid4()
+    db_session.add_all(
+        [
+            DigitalTwinSnapshot(id=before_id, dpp_instance_id=dpp_id, label="before"),
+            DigitalTwinSnapshot(id=after_id, dpp_instance_id=dpp_id, label="after"),
+        ]
+    )
+    db_session.flush()
+    for index in range(50):
+        key = f"cell-{index:02d}"
+        if index < 45:
+            db_session.add(
+                DigitalTwinNode(
+                    id=uuid4(), snapshot_id=before_id, node_key=key, node_type="cell",
+                    label=key, payload={"voltage": 3.7},
+                )
+            )
+        if index >= 5:
+            db_session.add(
+                DigitalTwinNode(
+                    id=uuid4(), snapshot_id=after_id, node_key=key, node_type="cell",
+                    label=key, payload={"voltage": 3.6 if index % 4 == 0 else 3.7},
+                )
+            )
+    db_session.add(
+        DigitalTwinEdge(
+            id=uuid4(), snapshot_id=after_id, edge_key="cell-05-cell-06",
+            source_node_key="cell-05", target_node_key="cell-06", label="links",
+        )
+    )
+    db_session.commit()
+    return dpp_id, before_id, after_id
+
+
+def test_get_digital_twin_diff_pages_changes_and_counts_all(client, db_session):
+    dpp_id, before_id, after_id = _seed_large_diff(db_session, "dt-diff-page")
+    params = {"from": str(before_id), "to": str(after_id)}
+
+    first = client.get(f"{PREFIX}/{dpp_id}/diff", params={**params, "limit": 12}).json()
+    second = client.get(f"{PREFIX}/{dpp_id}/diff", params={**params, "limit": 12, "offset": 12}).json()
+    summary_only = client.get(f"{PREFIX}/{dpp_id}/diff", params={**params, "summary_only": True}).json()
+
+    expected = {
+        "nodes_added": 5,
+        "nodes_removed": 5,
+        "nodes_changed": 10,
+        "edges_added": 1,
+        "edges_removed": 0,
+        "edges_changed": 0,
+    }
+    assert db_session.query(DigitalTwinNode).filter(DigitalTwinNode.content_hash.is_(None)).count() == 0
+    assert first["diff"]["summary"] == expected
+    assert first["diff"]["page"] == {"offset": 0, "limit": 12, "total": 21, "has_more": True}
+    assert [node["id"] for node in first["diff"]["nodes"]["removed"]] == [f"cell-0{i}" for i in range(5)]
+    assert [item["key"] for item in first["diff"]["nodes"]["changed"]][:2] == ["cell-08", "cell-12"]
+    assert first["diff"]["nodes"]["changed"][0]["after"]["payload"] == {"voltage": 3.6}
+    assert second["diff"]["page"]["has_more"] is False
+    assert [node["id"] for node in second["diff"]["nodes"]["added"]] == [f"cell-{i}" for i in range(45, 50)]
+    assert second["diff"]["edges"]["added"][0]["id"] == "cell-05-cell-06"
+    assert summary_only["diff"]["summary"] == expected
+    assert summary_only["diff"]["nodes"] == {"added": [], "removed": [], "changed": []}
+    assert summary_only["from_snapshot"]["node_count"] == 45
+
+
+def test_get_digital_twin_diff_streams_ndjson(client, db_session):
+    dpp_id, before_id, after_id = _seed_large_diff(db_session, "dt-diff-ndjson")
+    # Rows written before content hashes existed are compared by payload.
+    db_session.query(DigitalTwinNode).update({DigitalTwinNode.content_hash: None})
+    db_session.commit()
+
+    response = client.get(
+        f"{PREFIX}/{dpp_id}/diff",
+        params={"from": str(before_id), "to": str(after_id), "format": "ndjson"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["type"] == "header"
+    assert lines[0]["to_snapshot"]["node_count"] == 45
+    changes = [line for line in lines if line["type"] == "change"]
+    assert len(changes) == 21
+    assert {change["change"] for change in changes if change["kind"] == "nodes"} == {
+        "added",
+        "removed",
+        "changed",
+    }
+    assert lines[-1]["type"] == "summary"
+    assert lines[-1]["summary"]["nodes_changed"] == 10
+    assert lines[-1]["page"]["total"] == 21
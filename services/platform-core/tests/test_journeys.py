@@ -7,10 +7,25 @@ Covers:
 - GET  /api/v2/core/journeys/runs/{run_id}       (get run)
 - POST /api/v2/core/journeys/runs/{run_id}/steps/{step_id}/execute (execute step)
 """
+
 from __future__ import annotations
 
 from uuid import uuid4
 
+import pytest
+import requests
+from sqlalchemy import event
+
+from app.core.snapshot_worker import (
+    SNAPSHOT_STREAM,
+    SnapshotCoalescer,
+    _reclaim,
+    abandon_requested_snapshot,
+    capture_requested_snapshot,
+)
+from app.core.template_cache import TEMPLATE_CACHE
+from services.shared.models.event_outbox import EventOutbox
+from services.shared.models.journey_step import JourneyStep
 from services.shared.models.digital_twin_snapshot import DigitalTwinSnapshot
 from services.shared.models.dpp_instance import DppInstance
 from services.shared.models.session import SimulationSession
@@ -157,6 +172,78 @@ def test_execute_step_advances_to_done_on_last_step(client, seed_template):
     assert response.json()["next_step"] == "done"
 
 
+def test_execute_step_reads_no_template_rows_once_cached(
+    client, seed_template, db_session
+):
+    template, steps = seed_template
+    run_id = client.post(
+        f"{PREFIX}/runs",
+        json={"template_code": template.code, "role": "manufacturer"},
+    ).json()["id"]
+    first_key, second_key = steps[0].step_key, steps[1].step_key
+
+    statements: list[str] = []
+
+    def _record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        response = client.post(
+            f"{PREFIX}/runs/{run_id}/steps/{first_key}/execute",
+            json={"payload": {}, "metadata": {}},
+        )
+        client.get(f"{PREFIX}/runs/{run_id}")
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    assert response.json()["next_step"] == second_key
+    assert not [
+        statement
+        for statement in statements
+        if "FROM journey_templates" in statement or "FROM journey_steps" in statement
+    ]
+
+
+def test_template_version_bump_reloads_steps(
+    client, seed_template, db_session, monkeypatch: pytest.MonkeyPatch
+):
+    template, steps = seed_template
+    run_id = client.post(
+        f"{PREFIX}/runs",
+        json={"template_code": template.code, "role": "manufacturer"},
+    ).json()["id"]
+
+    db_session.add(
+        JourneyStep(
+            id=uuid4(),
+            template_id=template.id,
+            step_key="publish-passport",
+            title="Publish Passport",
+            action="publish",
+            order_index=2,
+        )
+    )
+    db_session.commit()
+    monkeypatch.setattr(TEMPLATE_CACHE, "ttl", 0)
+
+    # Same version: the cached step list is still authoritative.
+    stale = client.post(
+        f"{PREFIX}/runs/{run_id}/steps/{steps[1].step_key}/execute",
+        json={"payload": {}, "metadata": {}},
+    )
+    template.version = 2
+    db_session.commit()
+    fresh = client.post(
+        f"{PREFIX}/runs/{run_id}/steps/{steps[1].step_key}/execute",
+        json={"payload": {}, "metadata": {}},
+    )
+
+    assert stale.json()["next_step"] == "done"
+    assert fresh.json()["next_step"] == "publish-passport"
+
+
 def test_execute_step_returns_404_for_unknown_run(client):
     fake_id = str(uuid4())
     response = client.post(
@@ -167,11 +254,11 @@ def test_execute_step_returns_404_for_unknown_run(client):
     assert "Run not found" in response.json()["detail"]
 
 
-def test_execute_step_captures_digital_twin_snapshot_when_run_has_dpp(client, seed_template, db_session):
-    template, steps = seed_template
-
+def _session_with_dpp(db_session):
     user_id = uuid4()
-    db_session.add(User(id=user_id, keycloak_id="journey-dt-user", email="journey-dt@test.com"))
+    db_session.add(
+        User(id=user_id, keycloak_id="journey-dt-user", email="journey-dt@test.com")
+    )
     db_session.flush()
 
     session_id = uuid4()
@@ -195,6 +282,15 @@ def test_execute_step_captures_digital_twin_snapshot_when_run_has_dpp(client, se
         )
     )
     db_session.commit()
+    return session_id, dpp_id
+
+
+def test_execute_step_queues_one_coalesced_twin_snapshot_per_burst(
+    client, seed_template, db_session, monkeypatch: pytest.MonkeyPatch
+):
+    template, steps = seed_template
+    session_id, dpp_id = _session_with_dpp(db_session)
+    monkeypatch.setattr("app.core.snapshot_worker.TWIN_SNAPSHOT_WORKER_ENABLED", True)
 
     create_resp = client.post(
         f"{PREFIX}/runs",
@@ -208,19 +304,243 @@ def test_execute_step_captures_digital_twin_snapshot_when_run_has_dpp(client, se
     assert create_resp.status_code == 200
     run_id = create_resp.json()["id"]
 
+    for step in steps:
+        response = client.post(
+            f"{PREFIX}/runs/{run_id}/steps/{step.step_key}/execute",
+            json={"payload": {"product_name": "Battery"}, "metadata": {}},
+        )
+        assert response.status_code == 200
+
+    # Nothing is captured on the request path; the twin reports it as pending.
+    assert db_session.query(DigitalTwinSnapshot).count() == 0
+    twin = client.get(f"/api/v2/core/digital-twins/{dpp_id}").json()
+    assert twin["snapshot_pending"] is True
+    requests_ = (
+        db_session.query(EventOutbox)
+        .filter(EventOutbox.stream == SNAPSHOT_STREAM)
+        .order_by(EventOutbox.id)
+        .all()
+    )
+    assert len(requests_) == 2
+
+    clock = [0.0]
+    coalescer = SnapshotCoalescer(debounce=2.0, clock=lambda: clock[0])
+    for row in requests_:
+        coalescer.add(row.id, row.payload)
+    assert coalescer.pop_due() == []
+    clock[0] = 2.0
+    (pending,) = coalescer.pop_due()
+    assert capture_requested_snapshot(db_session, pending.session_id, pending.events)
+
+    snapshots = (
+        db_session.query(DigitalTwinSnapshot)
+        .filter(DigitalTwinSnapshot.dpp_instance_id == dpp_id)
+        .all()
+    )
+    assert len(snapshots) == 1
+    metadata = snapshots[0].metadata_ or {}
+    assert metadata["run_id"] == run_id
+    assert metadata["step_id"] == steps[-1].step_key
+    assert metadata["coalesced_requests"] == 2
+    twin = client.get(f"/api/v2/core/digital-twins/{dpp_id}").json()
+    assert twin["snapshot_pending"] is False
+    assert not capture_requested_snapshot(db_session, str(uuid4()), pending.events)
+
+
+def test_abandoned_snapshot_requests_stop_reporting_the_twin_as_pending(
+    client, seed_template, db_session, monkeypatch: pytest.MonkeyPatch
+):
+    template, steps = seed_template
+    session_id, dpp_id = _session_with_dpp(db_session)
+    monkeypatch.setattr("app.core.snapshot_worker.TWIN_SNAPSHOT_WORKER_ENABLED", True)
+    run_id = client.post(
+        f"{PREFIX}/runs",
+        json={
+            "template_code": template.code,
+            "role": "manufacturer",
+            "session_id": str(session_id),
+        },
+    ).json()["id"]
+    for step in steps:
+        client.post(
+            f"{PREFIX}/runs/{run_id}/steps/{step.step_key}/execute",
+            json={"payload": {"product_name": "Battery"}, "metadata": {}},
+        )
+    first, second = [
+        row.payload
+        for row in db_session.query(EventOutbox)
+        .filter(EventOutbox.stream == SNAPSHOT_STREAM)
+        .order_by(EventOutbox.id)
+    ]
+
+    # Giving up on the first request leaves the later one pending.
+    abandon_requested_snapshot(db_session, str(session_id), [first])
+    twin = client.get(f"/api/v2/core/digital-twins/{dpp_id}").json()
+    assert twin["snapshot_pending"] is True
+
+    abandon_requested_snapshot(db_session, str(session_id), [first, second])
+    twin = client.get(f"/api/v2/core/digital-twins/{dpp_id}").json()
+    assert twin["snapshot_pending"] is False
+    assert db_session.query(DigitalTwinSnapshot).count() == 0
+
+
+def test_execute_step_captures_inline_without_the_snapshot_worker(
+    client, seed_template, db_session
+):
+    template, steps = seed_template
+    session_id, dpp_id = _session_with_dpp(db_session)
+    run_id = client.post(
+        f"{PREFIX}/runs",
+        json={
+            "template_code": template.code,
+            "role": "manufacturer",
+            "session_id": str(session_id),
+        },
+    ).json()["id"]
+
     response = client.post(
         f"{PREFIX}/runs/{run_id}/steps/{steps[0].step_key}/execute",
         json={"payload": {"product_name": "Battery"}, "metadata": {}},
     )
-    assert response.status_code == 200
 
+    assert response.status_code == 200
     snapshots = (
         db_session.query(DigitalTwinSnapshot)
         .filter(DigitalTwinSnapshot.dpp_instance_id == dpp_id)
         .all()
     )
     assert len(snapshots) == 1
-    snapshot = snapshots[0]
-    metadata = snapshot.metadata_ or {}
-    assert metadata["run_id"] == run_id
-    assert metadata["step_id"] == steps[0].step_key
+    assert (snapshots[0].metadata_ or {})["step_id"] == steps[0].step_key
+    assert (
+        db_session.query(EventOutbox)
+        .filter(EventOutbox.stream == SNAPSHOT_STREAM)
+        .count()
+        == 0
+    )
+    twin = client.get(f"/api/v2/core/digital-twins/{dpp_id}").json()
+    assert twin["snapshot_pending"] is False
+
+
+class _PluginResponse:
+    def __init__(self, payload, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+        self.content = b"{}"
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"status {self.status_code}", response=self)
+
+    def json(self):
+        return self._payload
+
+
+def test_execute_step_runs_the_step_action_through_the_plugin_runtime(
+    client, seed_template, db_session, monkeypatch: pytest.MonkeyPatch
+):
+    template, _steps = seed_template
+    db_session.add(
+        JourneyStep(
+            id=uuid4(),
+            template_id=template.id,
+            step_key="check-compliance",
+            title="Check Compliance",
+            action="compliance.check",
+            order_index=2,
+            default_payload={"regulations": ["ESPR"]},
+        )
+    )
+    db_session.commit()
+    calls: list[dict] = []
+    outcomes = [
+        _PluginResponse({"message": "unavailable"}, status_code=503),
+        _PluginResponse({"status": "compliant", "violations": []}),
+    ]
+
+    def _fake_request(*, method, url, json=None, headers=None, **_kwargs):
+        calls.append({"url": url, "json": json, "headers": headers or {}})
+        return outcomes.pop(0)
+
+    monkeypatch.setattr("services.shared.step_plugins.pooled_request", _fake_request)
+    run_id = client.post(
+        f"{PREFIX}/runs",
+        json={"template_code": template.code, "role": "manufacturer"},
+    ).json()["id"]
+    url = f"{PREFIX}/runs/{run_id}/steps/check-compliance/execute"
+    body = {"payload": {"data": {"product_name": "Battery"}}, "metadata": {}}
+
+    failed = client.post(url, json=body).json()
+    passed = client.post(url, json=body).json()
+
+    assert failed["execution"]["status"] == "error"
+    assert failed["next_step"] == "create-product"
+    assert passed["execution"]["status"] == "compliant"
+    assert passed["execution"]["result"]["data"]["status"] == "compliant"
+    assert passed["next_step"] == "done"
+    assert calls[0]["url"].endswith("/api/v1/compliance/check")
+    assert calls[0]["json"]["regulations"] == ["ESPR"]
+    assert calls[0]["json"]["data"] == {"product_name": "Battery"}
+    run = client.get(f"{PREFIX}/runs/{run_id}").json()
+    assert [step["status"] for step in run["steps"]] == ["error", "compliant"]
+
+
+def test_snapshot_coalescer_debounces_per_session_and_bounds_retries():
+    clock = [0.0]
+    coalescer = SnapshotCoalescer(debounce=2.0, clock=lambda: clock[0])
+    coalescer.add("1-0", {"session_id": "a"})
+    clock[0] = 1.0
+    coalescer.add("2-0", {"session_id": "a"})
+    coalescer.add("3-0", {"session_id": "b"})
+
+    assert coalescer.seconds_until_due() == 1.0
+    clock[0] = 2.0
+    (first,) = coalescer.pop_due()
+    assert first.session_id == "a"
+    assert first.message_ids == ["1-0", "2-0"]
+
+    # A failed capture waits for another window, up to MAX_CAPTURE_ATTEMPTS.
+    assert coalescer.retry(first)
+    clock[0] = 4.0
+    due = {pending.session_id: pending for pending in coalescer.pop_due()}
+    assert set(due) == {"a", "b"}
+    assert coalescer.retry(due["a"])
+    assert not coalescer.retry(due["a"])
+    assert len(coalescer) == 1
+
+
+class _StrandedStream:
+    """Pending entries a crashed consumer never acked, served in two pages."""
+
+    def __init__(self) -> None:
+        self.pages = [
+            (b"5-0", [(b"1-0", {b"session_id": b"a"}), (b"2-0", None)]),
+            (
+                b"0-0",
+                [(b"3-0", {b"session_id": b"a"}), (b"4-0", {b"session_id": b"b"})],
+            ),
+        ]
+        self.acked: list = []
+        self.starts: list = []
+
+    def xautoclaim(self, stream, group, consumer, min_idle_time, *, start_id, count):
+        self.starts.append(start_id)
+        next_id, messages = self.pages.pop(0)
+        return [next_id, messages, []]
+
+    def xack(self, stream, group, *ids):
+        self.acked.extend(ids)
+
+
+def test_snapshot_worker_reclaims_requests_left_pending_by_another_consumer():
+    coalescer = SnapshotCoalescer(debounce=0.0, clock=lambda: 0.0)
+    coalescer.add(b"3-0", {"session_id": "a"})
+    stream = _StrandedStream()
+
+    _reclaim(stream, "worker-2", coalescer)
+
+    assert stream.starts == ["0-0", b"5-0"]
+    # Trimmed entries are acked; ones this worker already holds are not re-added.
+    assert stream.acked == [b"2-0"]
+    due = {pending.session_id: pending for pending in coalescer.pop_due()}
+    assert due["a"].message_ids == [b"3-0", b"1-0"]
+    assert due["b"].message_ids == [b"4-0"]
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from starlette.requests import Request
+
+from app.core.upstream import forward_upstream_headers
+
+
+def _request(headers: dict[str, str]) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/",
+            "headers": [
+                (key.lower().encode(), value.encode()) for key, value in headers.items()
+            ],
+        }
+    )
+
+
+def test_forwards_only_the_callers_credentials():
+    forwarded = forward_upstream_headers(
+        _request({"Authorization": "Bearer caller", "traceparent": "00-abc-01"})
+    )
+    assert forwarded["Authorization"] == "Bearer caller"
+    assert forwarded["traceparent"] == "00-abc-01"
+
+    dev = forward_upstream_headers(
+        _request({"X-Dev-User": "dev", "X-Dev-Roles": "manufacturer"})
+    )
+    assert dev == {"X-Dev-User": "dev", "X-Dev-Roles": "manufacturer"}
+
+
+def test_anonymous_callers_get_no_service_token():
+    assert "Authorization" not in forward_upstream_headers(_request({}))
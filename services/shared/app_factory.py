@@ -4,8 +4,9 @@ import logging
 from typing import Any, Callable
 from uuid import uuid4
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 
+from .auth import AuthStatePending, deferred_auth_fetch, start_auth_refresher
 from .error_handling import install_error_handlers
 
 AuthVerifier = Callable[[Request], Any]
@@ -39,13 +40,30 @@ def create_service_app(
         except Exception:
             logger.debug("Tracing setup unavailable", exc_info=True)
 
+    if verify_request:
+
+        @app.on_event("startup")
+        def _start_auth_refresher() -> None:
+            start_auth_refresher(prime=True)
+
     @app.middleware("http")
     async def request_context_middleware(request: Request, call_next):
         request.state.request_id = request.headers.get("x-request-id") or str(uuid4())
         is_probe = _is_probe_request(request.url.path, probe_paths)
 
         if verify_request and request.method != "OPTIONS" and not is_probe:
-            verify_request(request)
+            # Verification only reads cached auth state; a Keycloak fetch it
+            # depends on is awaited here rather than blocking the event loop.
+            with deferred_auth_fetch():
+                try:
+                    verify_request(request)
+                except AuthStatePending as pending:
+                    await pending.wait()
+                    if not pending.future.done():
+                        raise HTTPException(
+                            status_code=503, detail="Auth provider unavailable"
+                        )
+                    verify_request(request)
 
         response = await call_next(request)
         response.headers["X-Request-ID"] = str(request.state.request_id)
@@ -1,12 +1,19 @@
+import asyncio
 import os
+import threading
 import time
-from typing import Iterable, List
+from concurrent.futures import Future, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Iterator, List
 import requests
 from jose import jwt
 from fastapi import HTTPException, Request
 from uuid import uuid4
 import logging
 
+from .claims_cache import build_claims_cache, token_key
+
 KEYCLOAK_URL = os.getenv("KEYCLOAK_URL", "http://keycloak:8080")
 KEYCLOAK_REALM = os.getenv("KEYCLOAK_REALM", "dpp")
 JWKS_URL = os.getenv(
@@ -19,6 +26,42 @@ AUTH_MODE = os.getenv("AUTH_MODE", "auto").lower()
 _cache = {"keys": None, "fetched": 0, "keycloak_ok": None, "keycloak_checked": 0}
 logger = logging.getLogger(__name__)
 
+HEALTH_CHECK_INTERVAL_SECONDS = 30
+JWKS_REFRESH_SECONDS = 3600
+# An unknown ``kid`` triggers at most one JWKS fetch per interval, so forged
+# key ids cannot turn into a request flood against Keycloak.
+JWKS_MISS_REFETCH_SECONDS = 10
+AUTH_FETCH_WAIT_SECONDS = 2.0
+
+_defer_auth_fetch: ContextVar[bool] = ContextVar("defer_auth_fetch", default=False)
+
+
+class AuthStatePending(Exception):
+    """Raised inside :func:`deferred_auth_fetch` while a needed fetch runs.
+
+    The async middleware awaits :attr:`future` and verifies the request again
+    instead of blocking the event loop on Keycloak.
+    """
+
+    def __init__(self, future: Future):
+        super().__init__("Auth state is being refreshed")
+        self.future = future
+
+    async def wait(self, timeout: float = AUTH_FETCH_WAIT_SECONDS) -> None:
+        try:
+            await asyncio.wait_for(asyncio.wrap_future(self.future), timeout)
+        except Exception:
+            return
+
+
+@contextmanager
+def deferred_auth_fetch() -> Iterator[None]:
+    token = _defer_auth_fetch.set(True)
+    try:
+        yield
+    finally:
+        _defer_auth_fetch.reset(token)
+
 
 def _as_bool(value: str | None, *, default: bool = False) -> bool:
     if value is None:
@@ -66,21 +109,164 @@ def _require_audience_check() -> bool:
     return _as_bool(os.getenv("REQUIRE_TOKEN_AUDIENCE"), default=True)
 
 
-def _keycloak_available() -> bool:
-    now = time.time()
-    cached = _cache.get("keycloak_ok")
-    if cached is not None and now - _cache.get("keycloak_checked", 0) < 30:
-        return bool(cached)
+def _check_keycloak() -> bool:
     try:
         resp = requests.get(f"{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}", timeout=1.5)
-        ok = resp.status_code == 200
+        return resp.status_code == 200
     except Exception:
-        ok = False
+        return False
+
+
+def _fetch_jwks() -> list[dict]:
+    resp = requests.get(JWKS_URL, timeout=5)
+    resp.raise_for_status()
+    return resp.json().get("keys", [])
+
+
+class _AuthRefresher:
+    """Background thread that owns every network call made for auth.
+
+    It re-checks realm health on an interval and refreshes the JWKS before
+    it ages out. Request handling only reads ``_cache``; when it needs data
+    that is missing (first health check, unknown ``kid``) it asks for a
+    single-flight fetch and gets back the future of the fetch that is
+    already running, if any.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._inflight: dict[str, Future] = {}
+        self._last_key_attempt = 0.0
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="auth-refresher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            if (
+                time.time() - _cache["keycloak_checked"]
+                >= HEALTH_CHECK_INTERVAL_SECONDS
+            ):
+                self.request_health().exception()
+            if _cache["keycloak_ok"] is not False and (
+                not _cache["keys"]
+                or time.time() - _cache["fetched"] >= JWKS_REFRESH_SECONDS
+            ):
+                self.request_keys(force=True).exception()
+            time.sleep(HEALTH_CHECK_INTERVAL_SECONDS)
+
+    def _single_flight(self, name: str, func) -> Future:
+        with self._lock:
+            future = self._inflight.get(name)
+            if future is not None:
+                return future
+            future = Future()
+            self._inflight[name] = future
+
+        def _run_fetch() -> None:
+            try:
+                result = func()
+            except Exception as exc:
+                with self._lock:
+                    self._inflight.pop(name, None)
+                future.set_exception(exc)
+                return
+            with self._lock:
+                self._inflight.pop(name, None)
+            future.set_result(result)
+
+        threading.Thread(target=_run_fetch, name=f"auth-{name}", daemon=True).start()
+        return future
+
+    def request_health(self) -> Future:
+        return self._single_flight("health", _refresh_health)
+
+    def request_keys(self, *, force: bool = False) -> Future:
+        with self._lock:
+            if "keys" not in self._inflight and not force:
+                if time.time() - self._last_key_attempt < JWKS_MISS_REFETCH_SECONDS:
+                    done: Future = Future()
+                    done.set_result(_cache["keys"] or [])
+                    return done
+            self._last_key_attempt = time.time()
+        return self._single_flight("keys", _refresh_jwks)
+
+
+def _refresh_health() -> bool:
+    ok = _check_keycloak()
+    if ok != _cache.get("keycloak_ok"):
+        logger.info(
+            "Keycloak realm availability changed",
+            extra={"keycloak_url": KEYCLOAK_URL, "available": ok},
+        )
     _cache["keycloak_ok"] = ok
-    _cache["keycloak_checked"] = now
+    _cache["keycloak_checked"] = time.time()
     return ok
 
 
+def _refresh_jwks() -> list[dict]:
+    try:
+        keys = _fetch_jwks()
+    except Exception as exc:
+        logger.warning("JWKS refresh failed", extra={"error": str(exc)})
+        raise
+    previous = {key.get("kid") for key in _cache["keys"] or []}
+    _cache["keys"] = keys
+    _cache["fetched"] = time.time()
+    if previous - {key.get("kid") for key in keys}:
+        # A key was retired; claims verified with it must be re-checked.
+        _claims_cache.clear()
+    return keys
+
+
+def _await_refresh(future: Future) -> None:
+    """Wait for a refresh the request depends on without blocking the loop.
+
+    Inside :func:`deferred_auth_fetch` the wait is handed to the caller by
+    raising :class:`AuthStatePending`; elsewhere it blocks for a bounded time.
+    """
+    if future.done():
+        return
+    if _defer_auth_fetch.get():
+        raise AuthStatePending(future)
+    try:
+        future.result(timeout=AUTH_FETCH_WAIT_SECONDS)
+    except Exception:
+        return
+
+
+_refresher = _AuthRefresher()
+_claims_cache = build_claims_cache()
+
+
+def start_auth_refresher(*, prime: bool = False) -> None:
+    """Start the background refresher; ``prime`` checks the realm right away.
+
+    Priming is meant for application startup, before requests are served.
+    """
+    if DEV_BYPASS_AUTH or AUTH_MODE == "bypass":
+        return
+    if prime and _cache.get("keycloak_ok") is None:
+        wait([_refresher.request_health()], timeout=AUTH_FETCH_WAIT_SECONDS)
+    _refresher.start()
+
+
+def _keycloak_available() -> bool:
+    if _cache.get("keycloak_ok") is None:
+        _refresher.start()
+        _await_refresh(_refresher.request_health())
+    return bool(_cache.get("keycloak_ok"))
+
+
 def _bypass_enabled() -> bool:
     if DEV_BYPASS_AUTH:
         return True
@@ -103,16 +289,16 @@ def _bypass_enabled() -> bool:
     return False
 
 
-def _get_jwks():
-    now = time.time()
-    if _cache["keys"] and now - _cache["fetched"] < 3600:
-        return _cache["keys"]
-    resp = requests.get(JWKS_URL, timeout=5)
-    resp.raise_for_status()
-    data = resp.json()
-    _cache["keys"] = data.get("keys", [])
-    _cache["fetched"] = now
-    return _cache["keys"]
+def _get_jwks() -> list[dict]:
+    return _cache["keys"] or []
+
+
+def _resolve_key(kid: str | None) -> dict | None:
+    key = _pick_key(_get_jwks(), kid)
+    if key or not kid:
+        return key
+    _await_refresh(_refresher.request_keys())
+    return _pick_key(_get_jwks(), kid)
 
 
 def _parse_roles(value: str | None) -> List[str]:
@@ -172,32 +358,16 @@ def _validate_audience(payload: dict) -> None:
         raise HTTPException(status_code=401, detail="Invalid token audience")
 
 
-def verify_request(request: Request) -> dict:
-    if not getattr(request.state, "request_id", None):
-        request.state.request_id = request.headers.get("x-request-id") or str(uuid4())
-    dev_payload = _dev_bypass(request)
-    if dev_payload:
-        return dev_payload
-
-    auth = request.headers.get("authorization", "")
-    if not auth.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing bearer token")
-    token = auth.split(" ", 1)[1]
+def _decode_token(token: str) -> dict:
     try:
         header = jwt.get_unverified_header(token)
     except Exception as exc:
         raise HTTPException(status_code=401, detail="Malformed bearer token") from exc
-    kid = header.get("kid")
-    keys = _get_jwks()
-    key = _pick_key(keys, kid)
-    if not key:
-        _cache["keys"] = None
-        keys = _get_jwks()
-        key = _pick_key(keys, kid)
+    key = _resolve_key(header.get("kid"))
     if not key:
         raise HTTPException(status_code=401, detail="Invalid token key")
     try:
-        payload = jwt.decode(
+        return jwt.decode(
             token,
             key,
             algorithms=["RS256"],
@@ -206,8 +376,30 @@ def verify_request(request: Request) -> dict:
     except Exception as exc:
         raise HTTPException(status_code=401, detail="Invalid bearer token") from exc
 
+
+def verify_request(request: Request) -> dict:
+    if not getattr(request.state, "request_id", None):
+        request.state.request_id = request.headers.get("x-request-id") or str(uuid4())
+    dev_payload = _dev_bypass(request)
+    if dev_payload:
+        return dev_payload
+
+    auth = request.headers.get("authorization", "")
+    if not auth.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    token = auth.split(" ", 1)[1]
+    cache_key = token_key(token)
+    payload = _claims_cache.get(cache_key)
+    cached = payload is not None
+    if not cached:
+        payload = _decode_token(token)
+
+    # Issuer and audience are cheap and service-specific, so they are checked
+    # on every request; the cache only saves the signature verification.
     _validate_issuer(payload)
     _validate_audience(payload)
+    if not cached:
+        _claims_cache.put(cache_key, payload)
     request.state.user = payload
     return payload
 
@@ -0,0 +1,507 @@
+from __future__ import annotations
+
+import base64
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Hashable
+from urllib.parse import urlencode
+
+import requests
+
+from .env import float_from_env, int_from_env
+from .http_client import request as pooled_request
+from .metrics import build_counter
+from .submodel_diff import ElementOp, diff_elements
+from .ttl_cache import TtlLruCache
+
+BASYX_CACHE_LOOKUPS = build_counter(
+    "dpp_basyx_cache_total",
+    "BaSyx read-through cache lookups by resource and result",
+    ["resource", "result"],
+)
+
+
+BASYX_CACHE_TTL_SECONDS = float_from_env("BASYX_CACHE_TTL_SECONDS", 2.0, minimum=0.0)
+BASYX_CACHE_MAX_ENTRIES = int_from_env("BASYX_CACHE_MAX_ENTRIES", 512, minimum=1)
+BASYX_BATCH_CONCURRENCY = int_from_env("BASYX_BATCH_CONCURRENCY", 8, minimum=1)
+
+# PATCH on a whole element list is optional in the AAS API; these statuses
+# mean the server does not offer it and a PUT is needed instead.
+_PATCH_UNSUPPORTED = {405, 501}
+# Element operations failing with these were computed from an outdated list.
+_STALE_DIFF = {404, 409}
+
+# Per base URL and configured API prefix: the path prefix that answered last
+# time ("" when the server serves the API at its root). Per base URL: whether
+# PATCH is known to be unsupported, and whether element-level endpoints
+# (submodel-elements/{idShortPath}) are.
+_prefix_by_base: dict[tuple[str, str], str] = {}
+_patch_unsupported: set[str] = set()
+_element_ops_unsupported: set[str] = set()
+_state_lock = threading.Lock()
+
+
+def _element_list(payload: Any) -> list[dict[str, Any]]:
+    if isinstance(payload, dict):
+        payload = (
+            payload.get("result")
+            or payload.get("submodelElements")
+            or payload.get("items")
+            or []
+        )
+    if not isinstance(payload, list):
+        return []
+    return [element for element in payload if isinstance(element, dict)]
+
+
+def _encode_asset_id(name: str, value: str) -> str:
+    raw = json.dumps({"name": name, "value": value}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+_MISSING = object()
+
+
+class _TtlCache:
+    """Small LRU of decoded BaSyx payloads that expire after ``ttl`` seconds.
+
+    Every :meth:`invalidate` bumps a generation; a fill that started before a
+    write is dropped rather than caching the pre-write payload.
+    """
+
+    def __init__(self, ttl: float, maxsize: int, *, clock=time.monotonic):
+        self._ttl = ttl
+        self._entries: TtlLruCache[Hashable, Any] = TtlLruCache(
+            maxsize if ttl > 0 else 0, clock=clock
+        )
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> tuple[bool, Any, int]:
+        with self._lock:
+            generation = self._generation
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            return False, None, generation
+        return True, value, generation
+
+    def put(self, key: Hashable, value: Any, generation: int) -> None:
+        with self._lock:
+            if generation == self._generation:
+                self._entries.put(key, value, ttl=self._ttl)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key)
+            self._generation += 1
+
+    def invalidate_group(self, group: Hashable) -> None:
+        """Drop every entry whose key starts with ``group``."""
+        with self._lock:
+            self._entries.discard_where(lambda key: key[0] == group)
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+
+class BasyxClient:
+    """Client for a BaSyx AAS environment over pooled ``requests`` sessions.
+
+    * The API prefix that works for a base URL is remembered process-wide, so
+      servers that expose the API at their root cost one request, not a 404
+      followed by a retry.
+    * ``GET shells`` and ``GET submodel-elements`` are served from a short-TTL
+      cache; writes through this client invalidate the affected entry.
+    * :meth:`create_shells` and :meth:`create_submodels` post in parallel.
+
+    Returned payloads are copies, so callers may modify them freely.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_prefix: str = "/api/v3.0",
+        *,
+        session_name: str = "basyx",
+        timeout: float = 8,
+        cache_ttl: float = BASYX_CACHE_TTL_SECONDS,
+        cache_maxsize: int = BASYX_CACHE_MAX_ENTRIES,
+        batch_concurrency: int = BASYX_BATCH_CONCURRENCY,
+        clock=time.monotonic,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_prefix = f"/{api_prefix.strip('/')}" if api_prefix else ""
+        self.session_name = session_name
+        self.timeout = timeout
+        self.batch_concurrency = max(1, batch_concurrency)
+        self._cache = _TtlCache(cache_ttl, cache_maxsize, clock=clock)
+        self._cache_maxsize = cache_maxsize
+        # Last known element list per submodel, for diffing element patches:
+        # submodel id -> (ETag, elements). Only ETag-confirmed reads are kept.
+        self._versions: OrderedDict[str, tuple[str, list[dict[str, Any]]]] = (
+            OrderedDict()
+        )
+        self._versions_lock = threading.Lock()
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        json: dict[str, Any] | list | None,
+        headers: dict[str, str] | None = None,
+    ) -> requests.Response:
+        extra: dict[str, Any] = {"headers": headers} if headers else {}
+        return pooled_request(
+            method=method,
+            url=url,
+            json=json,
+            timeout=self.timeout,
+            session_name=self.session_name,
+            **extra,
+        )
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        json: dict[str, Any] | list | None = None,
+        *,
+        headers: dict[str, str] | None = None,
+    ) -> requests.Response:
+        clean_path = path.lstrip("/")
+        state_key = (self.base_url, self.api_prefix)
+        with _state_lock:
+            known = _prefix_by_base.get(state_key)
+        if known is not None or not self.api_prefix:
+            prefix = self.api_prefix if known is None else known
+            response = self._send(
+                method, f"{self.base_url}{prefix}/{clean_path}", json, headers
+            )
+            response.raise_for_status()
+            return response
+
+        response = self._send(
+            method, f"{self.base_url}{self.api_prefix}/{clean_path}", json, headers
+        )
+        resolved = self.api_prefix
+        if response.status_code == 404:
+            fallback = self._send(
+                method, f"{self.base_url}/{clean_path}", json, headers
+            )
+            # Only a success proves the API lives at the root; a 401 or 405
+            # there may come from anything else mounted on the host.
+            if fallback.status_code < 300:
+                response, resolved = fallback, ""
+        if response.status_code < 300:
+            with _state_lock:
+                _prefix_by_base[state_key] = resolved
+        response.raise_for_status()
+        return response
+
+    def _cached_get(self, resource: str, path: str) -> Any:
+        key = (resource, path)
+        hit, payload, generation = self._cache.get(key)
+        if hit:
+            BASYX_CACHE_LOOKUPS.labels(resource=resource, result="hit").inc()
+            return copy.deepcopy(payload)
+        BASYX_CACHE_LOOKUPS.labels(resource=resource, result="miss").inc()
+        response = self.request("GET", path)
+        payload = response.json() if response.content else None
+        self._cache.put(key, payload, generation)
+        return copy.deepcopy(payload)
+
+    @staticmethod
+    def _elements_path(submodel_id: str) -> str:
+        return f"submodels/{submodel_id}/submodel-elements"
+
+    def invalidate_shells(self) -> None:
+        # Every page and filter combination of the listing may have changed.
+        self._cache.invalidate_group("shells")
+
+    def invalidate_submodel(self, submodel_id: str) -> None:
+        self._cache.invalidate(("elements", self._elements_path(submodel_id)))
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+        with self._versions_lock:
+            self._versions.clear()
+
+    def list_shells(
+        self,
+        *,
+        limit: int | None = None,
+        cursor: str | None = None,
+        id_short: str | None = None,
+        global_asset_id: str | None = None,
+    ) -> Any:
+        """``GET shells`` with the AAS API's paging and filter parameters.
+
+        ``global_asset_id`` is sent as an ``assetIds`` filter, a base64url
+        encoded ``SpecificAssetId`` named ``globalAssetId``.
+        """
+        query: dict[str, Any] = {}
+        if limit is not None:
+            query["limit"] = limit
+        if cursor:
+            query["cursor"] = cursor
+        if id_short:
+            query["idShort"] = id_short
+        if global_asset_id:
+            query["assetIds"] = _encode_asset_id("globalAssetId", global_asset_id)
+        path = f"shells?{urlencode(query)}" if query else "shells"
+        return self._cached_get("shells", path)
+
+    def create_shell(self, shell: dict[str, Any]) -> dict[str, Any]:
+        try:
+            response = self.request("POST", "shells", json=shell)
+        finally:
+            self.invalidate_shells()
+        return response.json() if response.content else shell
+
+    def create_submodel(self, submodel: dict[str, Any]) -> dict[str, Any]:
+        try:
+            response = self.request("POST", "submodels", json=submodel)
+        finally:
+            if submodel.get("id"):
+                self.invalidate_submodel(str(submodel["id"]))
+        return response.json() if response.content else submodel
+
+    def get_submodel_elements(self, submodel_id: str) -> Any:
+        return self._cached_get("elements", self._elements_path(submodel_id))
+
+    def patch_submodel_elements(
+        self, submodel_id: str, elements: dict[str, Any] | list
+    ) -> Any:
+        """Update a submodel's elements with PATCH, or PUT where PATCH is not
+        offered. Other errors are raised, not retried as a full PUT."""
+        path = self._elements_path(submodel_id)
+        try:
+            with _state_lock:
+                use_put = self.base_url in _patch_unsupported
+            if not use_put:
+                try:
+                    response = self.request("PATCH", path, json=elements)
+                except requests.HTTPError as exc:
+                    status = getattr(exc.response, "status_code", None)
+                    if status not in _PATCH_UNSUPPORTED:
+                        raise
+                    with _state_lock:
+                        _patch_unsupported.add(self.base_url)
+                    use_put = True
+            if use_put:
+                response = self.request("PUT", path, json=elements)
+        finally:
+            self.invalidate_submodel(submodel_id)
+        return response.json() if response.content else elements
+
+    def _remember_version(
+        self, submodel_id: str, etag: str, elements: list[dict[str, Any]]
+    ) -> None:
+        with self._versions_lock:
+            self._versions[submodel_id] = (etag, copy.deepcopy(elements))
+            self._versions.move_to_end(submodel_id)
+            while len(self._versions) > self._cache_maxsize:
+                self._versions.popitem(last=False)
+
+    def _forget_version(self, submodel_id: str) -> None:
+        with self._versions_lock:
+            self._versions.pop(submodel_id, None)
+
+    def _current_elements(self, submodel_id: str) -> list[dict[str, Any]]:
+        """The submodel's element list, from the version cache only when BaSyx
+        confirms it (``304`` to ``If-None-Match``); servers without ETags are
+        always re-read, since other writers may have changed the submodel."""
+        with self._versions_lock:
+            known = self._versions.get(submodel_id)
+        headers = {"If-None-Match": known[0]} if known is not None else None
+        response = self.request(
+            "GET", self._elements_path(submodel_id), headers=headers
+        )
+        if response.status_code == 304 and known is not None:
+            BASYX_CACHE_LOOKUPS.labels(resource="versions", result="revalidated").inc()
+            return copy.deepcopy(known[1])
+        BASYX_CACHE_LOOKUPS.labels(resource="versions", result="miss").inc()
+        elements = _element_list(response.json() if response.content else None)
+        etag = (getattr(response, "headers", None) or {}).get("ETag")
+        if etag:
+            self._remember_version(submodel_id, etag, elements)
+        return elements
+
+    def _run_ops(
+        self, submodel_id: str, ops: list[ElementOp]
+    ) -> list[tuple[int | None, requests.RequestException]]:
+        def _one(op: ElementOp):
+            method, path, body = op.request(submodel_id)
+            try:
+                self.request(method, path, json=body)
+            except requests.RequestException as exc:
+                return getattr(exc.response, "status_code", None), exc
+            return None
+
+        if len(ops) <= 1:
+            results = [_one(op) for op in ops]
+        else:
+            workers = min(self.batch_concurrency, len(ops))
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="basyx-elements"
+            ) as pool:
+                results = list(pool.map(_one, ops))
+        return [failure for failure in results if failure is not None]
+
+    def _apply_diff(
+        self,
+        submodel_id: str,
+        elements: list[dict[str, Any]],
+        prune: bool,
+        *,
+        retry_stale: bool,
+    ) -> dict[str, Any] | None:
+        diff = diff_elements(self._current_elements(submodel_id), elements, prune=prune)
+        report = {"elements": diff.merged, **diff.summary()}
+        if not diff.ops:
+            return {"mode": "unchanged", **report}
+
+        with _state_lock:
+            element_ops = self.base_url not in _element_ops_unsupported
+        failures = self._run_ops(submodel_id, diff.ops) if element_ops else []
+        self.invalidate_submodel(submodel_id)
+        statuses = {status for status, _exc in failures}
+        if not element_ops or statuses & _PATCH_UNSUPPORTED:
+            with _state_lock:
+                _element_ops_unsupported.add(self.base_url)
+            self._forget_version(submodel_id)
+            self.patch_submodel_elements(submodel_id, diff.merged)
+            report.update(sent_bytes=report["full_bytes"], bytes_saved=0)
+            return {"mode": "full", **report}
+        # BaSyx's new ETag is unknown, so the next diff starts from a read.
+        self._forget_version(submodel_id)
+        if not failures:
+            return {"mode": "elements", **report}
+        if retry_stale and statuses & _STALE_DIFF:
+            return None
+        raise failures[0][1]
+
+    def apply_submodel_elements(
+        self,
+        submodel_id: str,
+        elements: list[dict[str, Any]],
+        *,
+        prune: bool = False,
+    ) -> dict[str, Any]:
+        """Bring a submodel's elements to ``elements`` with the fewest writes.
+
+        The desired list is diffed (see :func:`diff_elements`) against the
+        last known version and only the resulting element operations are
+        sent, in parallel. A diff based on a stale version (``404``/``409``
+        from BaSyx) is recomputed once against a fresh read. Servers without
+        element-level endpoints get one full write of the merged list.
+
+        Returns the merged elements and a byte count of what was sent versus
+        what rewriting the full list would have sent.
+        """
+        report = self._apply_diff(submodel_id, elements, prune, retry_stale=True)
+        if report is None:
+            report = self._apply_diff(submodel_id, elements, prune, retry_stale=False)
+        return report
+
+    def _create_many(
+        self, create, payloads: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        def _one(payload: dict[str, Any]) -> dict[str, Any]:
+            try:
+                created = create(payload)
+            except requests.RequestException as exc:
+                return {"id": payload.get("id"), "status": "error", "error": str(exc)}
+            return {"id": payload.get("id"), "status": "created", "payload": created}
+
+        if len(payloads) <= 1:
+            return [_one(payload) for payload in payloads]
+        workers = min(self.batch_concurrency, len(payloads))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="basyx-batch"
+        ) as pool:
+            return list(pool.map(_one, payloads))
+
+    def create_shells(self, shells: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Create shells concurrently; results keep input order and failures
+        are reported per item instead of aborting the batch."""
+        return self._create_many(self.create_shell, shells)
+
+    def create_submodels(self, submodels: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return self._create_many(self.create_submodel, submodels)
+
+    def _register(
+        self, registry_url: str, collection: str, resource: str, item: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        if not registry_url:
+            return None
+        with _state_lock:
+            prefix = _prefix_by_base.get(
+                (self.base_url, self.api_prefix), self.api_prefix
+            )
+        descriptor = {
+            "id": item.get("id"),
+            "idShort": item.get("idShort"),
+            "endpoints": [
+                {
+                    "protocolInformation": {
+                        "href": f"{self.base_url}{prefix}/{resource}/{item.get('id')}"
+                    }
+                }
+            ],
+        }
+        response = self._send(
+            "POST",
+            f"{registry_url.rstrip('/')}/api/v3.0/registry/{collection}",
+            descriptor,
+        )
+        response.raise_for_status()
+        return response.json() if response.content else descriptor
+
+    def register_shell_descriptor(
+        self, registry_url: str, shell: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        return self._register(registry_url, "shell-descriptors", "shells", shell)
+
+    def register_submodel_descriptor(
+        self, registry_url: str, submodel: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        return self._register(
+            registry_url, "submodel-descriptors", "submodels", submodel
+        )
+
+
+_clients: dict[tuple[str, str, str], BasyxClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_basyx_client(
+    base_url: str, api_prefix: str = "/api/v3.0", *, session_name: str = "basyx"
+) -> BasyxClient:
+    """Return the process-wide client for ``base_url``, so its cache is shared
+    by every request handled in this process."""
+    key = (base_url.rstrip("/"), api_prefix, session_name)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = BasyxClient(base_url, api_prefix, session_name=session_name)
+            _clients[key] = client
+        return client
+
+
+def reset_basyx_state() -> None:
+    """Forget cached payloads and learned prefixes (tests, config reloads)."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.clear_cache()
+    with _state_lock:
+        _prefix_by_base.clear()
+        _patch_unsupported.clear()
+        _element_ops_unsupported.clear()
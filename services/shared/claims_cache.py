@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any
+
+from .env import int_from_env
+from .metrics import build_counter
+from .ttl_cache import TtlLruCache
+
+logger = logging.getLogger(__name__)
+
+CLAIMS_CACHE_LOOKUPS = build_counter(
+    "dpp_auth_claims_cache_total",
+    "Verified JWT claims cache lookups by tier and result",
+    ["tier", "result"],
+)
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class ClaimsCache:
+    """Bounded cache of signature-verified JWT claims, valid until ``exp``.
+
+    Entries are keyed by the SHA-256 of the raw token, so tokens are never
+    stored. The in-process LRU answers repeat requests on the same pod; an
+    optional Redis tier lets the next service on a request's path (platform-api
+    to platform-core to compliance-service) skip the RS256 check done by the
+    first. Redis failures count as misses.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        *,
+        redis_client: Any | None = None,
+        prefix: str = "dpp:auth:claims",
+        clock=time.time,
+    ):
+        self._redis = redis_client
+        self._prefix = prefix
+        self._clock = clock
+        self._entries: TtlLruCache[str, dict] = TtlLruCache(maxsize, clock=clock)
+
+    def _store_local(self, key: str, exp: float, claims: dict) -> None:
+        self._entries.put_until(key, claims, exp)
+
+    def get(self, key: str) -> dict | None:
+        now = self._clock()
+        local = self._entries.get(key)
+        if local is not None:
+            CLAIMS_CACHE_LOOKUPS.labels(tier="local", result="hit").inc()
+            return dict(local)
+        CLAIMS_CACHE_LOOKUPS.labels(tier="local", result="miss").inc()
+        if self._redis is None:
+            return None
+        try:
+            raw = self._redis.get(f"{self._prefix}:{key}")
+        except Exception as exc:
+            CLAIMS_CACHE_LOOKUPS.labels(tier="redis", result="error").inc()
+            logger.debug("Claims cache lookup failed", extra={"error": str(exc)})
+            return None
+        if not raw:
+            CLAIMS_CACHE_LOOKUPS.labels(tier="redis", result="miss").inc()
+            return None
+        claims = json.loads(raw)
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or exp <= now:
+            CLAIMS_CACHE_LOOKUPS.labels(tier="redis", result="miss").inc()
+            return None
+        CLAIMS_CACHE_LOOKUPS.labels(tier="redis", result="hit").inc()
+        self._store_local(key, float(exp), claims)
+        return dict(claims)
+
+    def put(self, key: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        ttl = int(exp - self._clock())
+        if ttl <= 0:
+            return
+        self._store_local(key, float(exp), dict(claims))
+        if self._redis is None:
+            return
+        try:
+            self._redis.set(f"{self._prefix}:{key}", json.dumps(claims), ex=ttl)
+        except Exception as exc:
+            logger.debug("Claims cache write failed", extra={"error": str(exc)})
+
+    def clear(self) -> None:
+        """Drop local entries; Redis entries expire with their tokens."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def build_claims_cache() -> ClaimsCache:
+    """Build the process cache from ``AUTH_CLAIMS_CACHE_*`` settings."""
+    redis_client = None
+    redis_url = os.getenv("AUTH_CLAIMS_CACHE_REDIS_URL", "").strip()
+    if redis_url:
+        from .redis_client import get_redis
+
+        redis_client = get_redis(redis_url)
+    return ClaimsCache(
+        int_from_env("AUTH_CLAIMS_CACHE_SIZE", 4096, minimum=1),
+        redis_client=redis_client,
+    )
@@ -25,6 +25,7 @@ GAP_REPORTED = "gap_reported"
 ANNOTATION_CREATED = "annotation_created"
 VOTE_CAST = "vote_cast"
 COMMENT_ADDED = "comment_added"
+TWIN_SNAPSHOT_REQUESTED = "twin_snapshot_requested"
 EVENT_SCHEMA_VERSION = "1"
 
 REQUIRED_EVENT_FIELDS = (
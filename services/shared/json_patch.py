@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Iterable, Mapping
+
+OPERATIONS = frozenset({"add", "remove", "replace", "move", "copy", "test"})
+_VALUE_OPERATIONS = frozenset({"add", "replace", "test"})
+
+
+class JsonPatchError(ValueError):
+    """A patch operation is malformed or cannot be applied (RFC 6902)."""
+
+
+@lru_cache(maxsize=4096)
+def decode_pointer(pointer: str) -> tuple[str, ...]:
+    """Split an RFC 6901 JSON Pointer into unescaped reference tokens."""
+    if pointer == "":
+        return ()
+    if not pointer.startswith("/"):
+        raise JsonPatchError(
+            f"path '{pointer}' must use JSON Pointer syntax (must start with '/')"
+        )
+    return tuple(
+        token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")
+    )
+
+
+def encode_pointer(tokens: Iterable[str]) -> str:
+    return "".join(
+        "/" + str(token).replace("~", "~0").replace("/", "~1") for token in tokens
+    )
+
+
+def _index(token: str, length: int, *, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return length
+    # RFC 6901: decimal digits without leading zeros.
+    if not token.isdigit() or (len(token) > 1 and token[0] == "0"):
+        raise JsonPatchError(f"invalid array index '{token}'")
+    index = int(token)
+    if index > length or (index == length and not allow_end):
+        raise JsonPatchError(f"array index out of bounds '{token}'")
+    return index
+
+
+def json_equal(left: Any, right: Any) -> bool:
+    """Equality as defined for the ``test`` operation: like ``==`` but a
+    boolean never equals a number."""
+    if isinstance(left, bool) or isinstance(right, bool):
+        return type(left) is type(right) and left == right
+    if isinstance(left, dict) and isinstance(right, dict):
+        return left.keys() == right.keys() and all(
+            json_equal(value, right[key]) for key, value in left.items()
+        )
+    if isinstance(left, list) and isinstance(right, list):
+        return len(left) == len(right) and all(
+            json_equal(a, b) for a, b in zip(left, right)
+        )
+    if isinstance(left, (dict, list)) or isinstance(right, (dict, list)):
+        return False
+    return left == right
+
+
+@dataclass
+class PatchResult:
+    document: Any
+    # Pointers written by the patch, in first-touched order. Unchanged
+    # siblings of these paths are shared with the input document.
+    touched: list[str] = field(default_factory=list)
+
+
+class _Patcher:
+    """Applies operations with copy-on-write path copying.
+
+    Containers copied during this patch are "owned" and may be mutated in
+    place; anything else belongs to the caller (or to an operation's
+    ``value``) and is shallow-copied, together with every container on its
+    path from the root, the first time it would be written. Only the spine
+    of each modified path is copied, whatever the document size.
+    """
+
+    def __init__(self, document: Any, *, in_place: bool):
+        self.root = document
+        self.in_place = in_place
+        # id -> container; holding the object keeps its id from being reused.
+        self._owned: dict[int, Any] = {}
+        self._touched: dict[str, None] = {}
+
+    def _own(self, container: Any) -> Any:
+        if self.in_place or id(container) in self._owned:
+            return container
+        copied = dict(container) if isinstance(container, dict) else list(container)
+        self._owned[id(copied)] = copied
+        return copied
+
+    def _disown(self, value: Any) -> None:
+        """Make ``value`` shared again once it is reachable from two places.
+        Owned containers only ever hang below owned ones, so the walk stops
+        at the first container that is not owned."""
+        if self.in_place or id(value) not in self._owned:
+            return
+        del self._owned[id(value)]
+        children = value.values() if isinstance(value, dict) else value
+        for child in children:
+            if isinstance(child, (dict, list)):
+                self._disown(child)
+
+    def _get(self, tokens: tuple[str, ...], pointer: str) -> Any:
+        current = self.root
+        for token in tokens:
+            if isinstance(current, dict):
+                if token not in current:
+                    raise JsonPatchError(f"path '{pointer}' does not exist")
+                current = current[token]
+            elif isinstance(current, list):
+                current = current[_index(token, len(current), allow_end=False)]
+            else:
+                raise JsonPatchError(f"path '{pointer}' traverses a scalar value")
+        return current
+
+    def _writable_parent(self, tokens: tuple[str, ...], pointer: str) -> Any:
+        """Walk to the parent of ``tokens``, copying each container on the way
+        that is not owned yet, and return it (owned)."""
+        if not isinstance(self.root, (dict, list)):
+            raise JsonPatchError(f"path '{pointer}' traverses a scalar value")
+        self.root = parent = self._own(self.root)
+        for token in tokens[:-1]:
+            if isinstance(parent, dict):
+                if token not in parent:
+                    raise JsonPatchError(f"path '{pointer}' does not exist")
+                key: Any = token
+            else:
+                key = _index(token, len(parent), allow_end=False)
+            child = parent[key]
+            if not isinstance(child, (dict, list)):
+                raise JsonPatchError(f"path '{pointer}' traverses a scalar value")
+            parent[key] = child = self._own(child)
+            parent = child
+        return parent
+
+    def _touch(self, pointer: str) -> None:
+        self._touched[pointer] = None
+
+    def _add(self, tokens: tuple[str, ...], pointer: str, value: Any) -> None:
+        if not tokens:
+            self.root = value
+            self._touch(pointer)
+            return
+        parent = self._writable_parent(tokens, pointer)
+        token = tokens[-1]
+        if isinstance(parent, dict):
+            parent[token] = value
+        else:
+            index = _index(token, len(parent), allow_end=True)
+            parent.insert(index, value)
+            if token == "-":
+                # Report where the value landed, not the append marker.
+                pointer = encode_pointer((*tokens[:-1], str(index)))
+        self._touch(pointer)
+
+    def _remove(self, tokens: tuple[str, ...], pointer: str) -> Any:
+        if not tokens:
+            raise JsonPatchError("cannot remove the document root")
+        parent = self._writable_parent(tokens, pointer)
+        token = tokens[-1]
+        if isinstance(parent, dict):
+            if token not in parent:
+                raise JsonPatchError(f"path '{pointer}' does not exist")
+            removed = parent.pop(token)
+        else:
+            removed = parent.pop(_index(token, len(parent), allow_end=False))
+        self._touch(pointer)
+        return removed
+
+    def _replace(self, tokens: tuple[str, ...], pointer: str, value: Any) -> None:
+        if not tokens:
+            self.root = value
+            self._touch(pointer)
+            return
+        parent = self._writable_parent(tokens, pointer)
+        token = tokens[-1]
+        if isinstance(parent, dict):
+            if token not in parent:
+                raise JsonPatchError(f"path '{pointer}' does not exist")
+            parent[token] = value
+        else:
+            parent[_index(token, len(parent), allow_end=False)] = value
+        self._touch(pointer)
+
+    def apply(self, operation: Mapping[str, Any]) -> None:
+        if not isinstance(operation, Mapping):
+            raise JsonPatchError("operation must be an object")
+        op = operation.get("op")
+        if op not in OPERATIONS:
+            raise JsonPatchError(f"unknown operation '{op}'")
+        pointer = operation.get("path")
+        if not isinstance(pointer, str):
+            raise JsonPatchError(f"'{op}' operation requires a string 'path'")
+        if op in _VALUE_OPERATIONS and "value" not in operation:
+            raise JsonPatchError(f"'{op}' operation requires 'value'")
+        tokens = decode_pointer(pointer)
+
+        if op == "add":
+            self._add(tokens, pointer, operation["value"])
+        elif op == "remove":
+            self._remove(tokens, pointer)
+        elif op == "replace":
+            self._replace(tokens, pointer, operation["value"])
+        elif op == "test":
+            if not json_equal(self._get(tokens, pointer), operation["value"]):
+                raise JsonPatchError(f"test failed at '{pointer}'")
+        else:
+            source = operation.get("from")
+            if not isinstance(source, str):
+                raise JsonPatchError(f"'{op}' operation requires a string 'from'")
+            from_tokens = decode_pointer(source)
+            if op == "move":
+                if source == pointer:
+                    self._get(from_tokens, source)
+                    return
+                if tokens[: len(from_tokens)] == from_tokens:
+                    raise JsonPatchError(
+                        f"cannot move '{source}' into its own child '{pointer}'"
+                    )
+                self._add(tokens, pointer, self._remove(from_tokens, source))
+            else:
+                value = self._get(from_tokens, source)
+                # The value is now reachable from two paths: writes below
+                # either of them must copy first.
+                self._disown(value)
+                self._add(tokens, pointer, value)
+
+    @property
+    def touched(self) -> list[str]:
+        return list(self._touched)
+
+
+def apply_patch(
+    document: Any,
+    operations: Iterable[Mapping[str, Any]],
+    *,
+    in_place: bool = False,
+) -> PatchResult:
+    """Apply an RFC 6902 JSON Patch and return the new document.
+
+    The input document is never modified unless ``in_place`` is set; the
+    result shares every subtree the patch did not touch with it, so treat
+    both as read-only or copy before mutating. Operation values are inserted
+    as given, not copied. The patch is atomic: on :class:`JsonPatchError`
+    nothing is returned and (without ``in_place``) the input is unchanged.
+    """
+    patcher = _Patcher(document, in_place=in_place)
+    for position, operation in enumerate(operations):
+        try:
+            patcher.apply(operation)
+        except JsonPatchError as exc:
+            raise JsonPatchError(f"operation {position}: {exc}") from None
+    return PatchResult(document=patcher.root, touched=patcher.touched)
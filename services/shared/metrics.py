@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class _NoopMetric:
+    def labels(self, *_args: Any, **_kwargs: Any) -> "_NoopMetric":
+        return self
+
+    def inc(self, _amount: float = 1.0) -> None:
+        return
+
+    def dec(self, _amount: float = 1.0) -> None:
+        return
+
+    def set(self, _value: float) -> None:
+        return
+
+    def observe(self, _value: float) -> None:
+        return
+
+
+_registered: dict[str, Any] = {}
+
+
+def _build(
+    kind: str, name: str, documentation: str, labelnames: list[str], **kwargs: Any
+):
+    # Modules can be imported more than once under different package paths in
+    # tests; reuse the collector instead of tripping the duplicate-name check.
+    if name in _registered:
+        return _registered[name]
+    try:
+        import prometheus_client
+
+        metric = getattr(prometheus_client, kind)(
+            name, documentation, labelnames, **kwargs
+        )
+    except Exception:
+        logger.debug("Prometheus metric %s unavailable", name, exc_info=True)
+        metric = _NoopMetric()
+    _registered[name] = metric
+    return metric
+
+
+def build_counter(name: str, documentation: str, labelnames: list[str]):
+    return _build("Counter", name, documentation, labelnames)
+
+
+def build_gauge(name: str, documentation: str, labelnames: list[str]):
+    return _build("Gauge", name, documentation, labelnames)
+
+
+def build_histogram(
+    name: str,
+    documentation: str,
+    labelnames: list[str],
+    *,
+    buckets: tuple[float, ...] | None = None,
+):
+    kwargs: dict[str, Any] = {}
+    if buckets is not None:
+        kwargs["buckets"] = buckets
+    return _build("Histogram", name, documentation, labelnames, **kwargs)
@@ -0,0 +1,41 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "017_edc_state_transitions"
+down_revision = "016_add_event_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "edc_state_transitions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("entity_type", sa.String(length=30), nullable=False),
+        sa.Column("entity_id", sa.String(length=255), nullable=False),
+        sa.Column("previous_state", sa.String(length=30), nullable=True),
+        sa.Column("state", sa.String(length=30), nullable=False),
+        sa.Column("timestamp", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_edc_state_transitions_entity_timestamp",
+        "edc_state_transitions",
+        ["entity_type", "entity_id", "timestamp"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_edc_state_transitions_type_state",
+        "edc_state_transitions",
+        ["entity_type", "state"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_edc_state_transitions_type_state", table_name="edc_state_transitions"
+    )
+    op.drop_index(
+        "ix_edc_state_transitions_entity_timestamp", table_name="edc_state_transitions"
+    )
+    op.drop_table("edc_state_transitions")
@@ -0,0 +1,166 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "018_session_timeline_tables"
+down_revision = "017_edc_state_transitions"
+branch_labels = None
+depends_on = None
+
+LEGACY_KEYS = ("timeline", "step_receipts", "aas_updates")
+LEGACY_RECEIPT_TTL_HOURS = 24
+
+
+def _backfill(bind) -> None:
+    sessions = sa.table(
+        "simulation_sessions",
+        sa.column("id", postgresql.UUID(as_uuid=True)),
+        sa.column("session_state", sa.JSON()),
+    )
+    timeline = sa.table(
+        "session_timeline_entries",
+        sa.column("session_id", postgresql.UUID(as_uuid=True)),
+        sa.column("seq", sa.Integer()),
+        sa.column("kind", sa.String()),
+        sa.column("step_idx", sa.Integer()),
+        sa.column("action", sa.String()),
+        sa.column("payload", sa.JSON()),
+    )
+    receipts = sa.table(
+        "session_step_receipts",
+        sa.column("session_id", postgresql.UUID(as_uuid=True)),
+        sa.column("receipt_key", sa.String()),
+        sa.column("result", sa.JSON()),
+        sa.column("expires_at", sa.DateTime(timezone=True)),
+    )
+    expires_at = sa.func.now() + sa.text(f"interval '{LEGACY_RECEIPT_TTL_HOURS} hours'")
+
+    rows = bind.execute(sa.select(sessions.c.id, sessions.c.session_state)).fetchall()
+    for session_id, state in rows:
+        if not isinstance(state, dict) or not any(key in state for key in LEGACY_KEYS):
+            continue
+        entries = [
+            {
+                "kind": "step",
+                "step_idx": item.get("step"),
+                "action": item.get("action"),
+                "payload": item,
+            }
+            for item in state.get("timeline") or []
+        ] + [
+            {
+                "kind": "aas_update",
+                "step_idx": None,
+                "action": "aas.update",
+                "payload": item,
+            }
+            for item in state.get("aas_updates") or []
+        ]
+        entries.sort(key=lambda entry: str(entry["payload"].get("timestamp") or ""))
+        if entries:
+            bind.execute(
+                timeline.insert(),
+                [
+                    {"session_id": session_id, "seq": seq, **entry}
+                    for seq, entry in enumerate(entries, start=1)
+                ],
+            )
+        step_receipts = state.get("step_receipts") or {}
+        # Legacy keys were ``{session_id}:{code}:{idx}:{key}``; rows are
+        # already scoped by session, so receipts use ``{code}:{idx}:{key}``.
+        legacy_prefix = f"{session_id}:"
+        for receipt_key, result in step_receipts.items():
+            if receipt_key.startswith(legacy_prefix):
+                receipt_key = receipt_key[len(legacy_prefix) :]
+            bind.execute(
+                receipts.insert().values(
+                    session_id=session_id,
+                    receipt_key=receipt_key,
+                    result=result,
+                    expires_at=expires_at,
+                )
+            )
+        next_state = {
+            key: value for key, value in state.items() if key not in LEGACY_KEYS
+        }
+        next_state["timeline_summary"] = {
+            "count": len(entries),
+            "recent": [
+                {
+                    "seq": seq,
+                    "kind": entry["kind"],
+                    "step": entry["step_idx"],
+                    "action": entry["action"],
+                }
+                for seq, entry in list(enumerate(entries, start=1))[-5:]
+            ],
+        }
+        bind.execute(
+            sessions.update()
+            .where(sessions.c.id == session_id)
+            .values(session_state=next_state)
+        )
+
+
+def upgrade():
+    op.create_table(
+        "session_timeline_entries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "session_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("simulation_sessions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=30), nullable=False),
+        sa.Column("step_idx", sa.Integer(), nullable=True),
+        sa.Column("action", sa.String(length=120), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.UniqueConstraint(
+            "session_id", "seq", name="uq_session_timeline_entries_session_seq"
+        ),
+    )
+    op.create_table(
+        "session_step_receipts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "session_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("simulation_sessions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("receipt_key", sa.String(length=255), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint(
+            "session_id", "receipt_key", name="uq_session_step_receipts_session_key"
+        ),
+    )
+    op.create_index(
+        "ix_session_step_receipts_expires_at",
+        "session_step_receipts",
+        ["expires_at"],
+        unique=False,
+    )
+    _backfill(op.get_bind())
+
+
+def downgrade():
+    op.drop_index(
+        "ix_session_step_receipts_expires_at", table_name="session_step_receipts"
+    )
+    op.drop_table("session_step_receipts")
+    op.drop_table("session_timeline_entries")
@@ -0,0 +1,19 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "019_aasx_manifest"
+down_revision = "018_session_timeline_tables"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "dpp_instances", sa.Column("aasx_sha256", sa.String(length=64), nullable=True)
+    )
+    op.add_column("dpp_instances", sa.Column("aasx_manifest", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("dpp_instances", "aasx_manifest")
+    op.drop_column("dpp_instances", "aasx_sha256")
@@ -0,0 +1,18 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "020_journey_template_version"
+down_revision = "019_aasx_manifest"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "journey_templates",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade():
+    op.drop_column("journey_templates", "version")
@@ -0,0 +1,18 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "021_twin_snapshot_pending"
+down_revision = "020_journey_template_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "dpp_instances",
+        sa.Column("snapshot_requested_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_column("dpp_instances", "snapshot_requested_at")
@@ -0,0 +1,33 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "022_twin_content_hash"
+down_revision = "021_twin_snapshot_pending"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "digital_twin_nodes", sa.Column("content_hash", sa.String(64), nullable=True)
+    )
+    op.add_column(
+        "digital_twin_edges", sa.Column("content_hash", sa.String(64), nullable=True)
+    )
+    # The diff merge-joins (key, hash) pairs in code point order; these
+    # indexes serve that scan without touching the payloads.
+    op.execute(
+        "CREATE INDEX ix_digital_twin_nodes_diff ON digital_twin_nodes "
+        '(snapshot_id, node_key COLLATE "C", content_hash)'
+    )
+    op.execute(
+        "CREATE INDEX ix_digital_twin_edges_diff ON digital_twin_edges "
+        '(snapshot_id, edge_key COLLATE "C", content_hash)'
+    )
+
+
+def downgrade():
+    op.drop_index("ix_digital_twin_edges_diff", table_name="digital_twin_edges")
+    op.drop_index("ix_digital_twin_nodes_diff", table_name="digital_twin_nodes")
+    op.drop_column("digital_twin_edges", "content_hash")
+    op.drop_column("digital_twin_nodes", "content_hash")
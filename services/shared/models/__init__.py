@@ -1,6 +1,7 @@
 from .base import Base
 from .user import User
 from .session import SimulationSession
+from .session_timeline import SessionStepReceipt, SessionTimelineEntry
 from .story import UserStory
 from .story_progress import StoryProgress
 from .dpp_instance import DppInstance
@@ -32,6 +33,8 @@ __all__ = [
     "Base",
     "User",
     "SimulationSession",
+    "SessionTimelineEntry",
+    "SessionStepReceipt",
     "UserStory",
     "StoryProgress",
     "DppInstance",
@@ -14,3 +14,5 @@ class DigitalTwinEdge(Base):
     target_node_key = Column(String(120), nullable=False)
     label = Column(String(255))
     payload = Column(JSON, default=dict)
+    # sha256 of the diffed fields; set by digital_twin_repo on every write.
+    content_hash = Column(String(64))
@@ -13,3 +13,5 @@ class DigitalTwinNode(Base):
     node_type = Column(String(60), nullable=False)
     label = Column(String(255), nullable=False)
     payload = Column(JSON, default=dict)
+    # sha256 of the diffed fields; set by digital_twin_repo on every write.
+    content_hash = Column(String(64))
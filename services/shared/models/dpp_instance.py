@@ -17,4 +17,10 @@ class DppInstance(Base):
     aasx_object_key = Column(String(500))
     aasx_url = Column(String(500))
     aasx_filename = Column(String(255))
+    aasx_sha256 = Column(String(64))
+    # Package index built at upload by simulation-engine (core/aasx_manifest.py).
+    aasx_manifest = Column(JSON)
+    # Set when a twin snapshot has been requested and not captured yet
+    # (platform-core core/snapshot_worker.py clears it).
+    snapshot_requested_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
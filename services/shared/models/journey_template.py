@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime
+from sqlalchemy import Column, String, Text, Boolean, DateTime, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from .base import Base
@@ -13,4 +13,6 @@ class JourneyTemplate(Base):
     description = Column(Text)
     target_role = Column(String(50), nullable=False)
     is_active = Column(Boolean, server_default="true")
+    # Bumped whenever the template or its steps change; caches key on it.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,59 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    JSON,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from .base import Base
+
+
+class SessionTimelineEntry(Base):
+    __tablename__ = "session_timeline_entries"
+    __table_args__ = (
+        UniqueConstraint(
+            "session_id", "seq", name="uq_session_timeline_entries_session_seq"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    session_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("simulation_sessions.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    seq = Column(Integer, nullable=False)
+    kind = Column(String(30), nullable=False)
+    step_idx = Column(Integer, nullable=True)
+    action = Column(String(120), nullable=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class SessionStepReceipt(Base):
+    __tablename__ = "session_step_receipts"
+    __table_args__ = (
+        UniqueConstraint(
+            "session_id", "receipt_key", name="uq_session_step_receipts_session_key"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    session_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("simulation_sessions.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    receipt_key = Column(String(255), nullable=False)
+    result = Column(JSON, nullable=False, default=dict)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -56,3 +56,40 @@ def emit_event(
 
         active_logger.warning("Failed to enqueue outbox event", extra={"stream": stream, "error": str(exc)})
         return False, None
+
+
+def enqueue_events(
+    db: Session,
+    *,
+    stream: str,
+    payloads: list[dict[str, Any]],
+    redis_url: str,
+    maxlen: int | None = None,
+    log: logging.Logger | None = None,
+) -> int:
+    """Stage outbox rows in the caller's transaction without committing.
+
+    Rows are flushed under a savepoint, so a failing outbox insert leaves the
+    caller's other pending changes intact. Returns how many events were staged
+    (or published directly when the outbox table is missing on SQLite).
+    """
+    if not payloads:
+        return 0
+    active_logger = log or logger
+    staged: list[tuple[str, dict[str, Any]]] = []
+    for payload in payloads:
+        payload["event_id"] = str(payload.get("event_id") or uuid4())
+        staged.append((payload["event_id"], dict(payload)))
+
+    try:
+        with db.begin_nested():
+            event_outbox_repo.enqueue_events(db, stream=stream, events=staged)
+        return len(staged)
+    except SQLAlchemyError as exc:
+        if _is_sqlite_session(db) and _missing_outbox_table(exc):
+            active_logger.warning("Outbox table unavailable on SQLite; falling back to direct publish")
+            client = get_redis(redis_url)
+            return sum(1 for payload in payloads if publish_event(client, stream, payload, maxlen=maxlen)[0])
+
+        active_logger.warning("Failed to enqueue outbox events", extra={"stream": stream, "error": str(exc)})
+        return 0
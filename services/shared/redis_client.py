@@ -2,84 +2,43 @@ from __future__ import annotations
 
 import json
 import logging
-import os
 import time
 from typing import Any
 
 import redis
 
+from .env import bool_from_env, float_from_env, int_from_env
 from .event_log_store import persist_event
 from .events import validate_event
+from .metrics import build_counter
 
 logger = logging.getLogger(__name__)
 
 
-class _NoopCounter:
-    def labels(self, **_kwargs: Any) -> "_NoopCounter":
-        return self
-
-    def inc(self, _amount: float = 1.0) -> None:
-        return
-
-
-def _build_counter(name: str, documentation: str, labelnames: list[str]):
-    try:
-        from prometheus_client import Counter
-
-        return Counter(name, documentation, labelnames)
-    except Exception:
-        return _NoopCounter()
-
-
-EVENT_PUBLISH_ATTEMPTS = _build_counter(
+EVENT_PUBLISH_ATTEMPTS = build_counter(
     "dpp_event_publish_total",
     "Total event publish attempts by stream and result",
     ["stream", "result"],
 )
-EVENT_PUBLISH_RETRIES = _build_counter(
+EVENT_PUBLISH_RETRIES = build_counter(
     "dpp_event_publish_retries_total",
     "Total event publish retries by stream",
     ["stream"],
 )
 
 
-def _bool_from_env(name: str, default: bool) -> bool:
-    raw = os.getenv(name)
-    if raw is None:
-        return default
-    return raw.strip().lower() in {"1", "true", "yes", "on"}
-
-
-def _int_from_env(name: str, default: int, *, minimum: int) -> int:
-    raw = os.getenv(name)
-    if raw is None:
-        return default
-    try:
-        value = int(raw)
-    except ValueError:
-        return default
-    return max(minimum, value)
-
-
-def _float_from_env(name: str, default: float, *, minimum: float) -> float:
-    raw = os.getenv(name)
-    if raw is None:
-        return default
-    try:
-        value = float(raw)
-    except ValueError:
-        return default
-    return max(minimum, value)
-
-
 def redis_connection_kwargs() -> dict[str, Any]:
     return {
-        "protocol": _int_from_env("REDIS_PROTOCOL", 2, minimum=2),
-        "socket_timeout": _float_from_env("REDIS_SOCKET_TIMEOUT_SECONDS", 10.0, minimum=0.1),
-        "socket_connect_timeout": _float_from_env("REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS", 5.0, minimum=0.1),
-        "socket_keepalive": _bool_from_env("REDIS_SOCKET_KEEPALIVE", True),
-        "max_connections": _int_from_env("REDIS_MAX_CONNECTIONS", 100, minimum=1),
-        "retry_on_timeout": _bool_from_env("REDIS_RETRY_ON_TIMEOUT", False),
+        "protocol": int_from_env("REDIS_PROTOCOL", 2, minimum=2),
+        "socket_timeout": float_from_env(
+            "REDIS_SOCKET_TIMEOUT_SECONDS", 10.0, minimum=0.1
+        ),
+        "socket_connect_timeout": float_from_env(
+            "REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS", 5.0, minimum=0.1
+        ),
+        "socket_keepalive": bool_from_env("REDIS_SOCKET_KEEPALIVE", True),
+        "max_connections": int_from_env("REDIS_MAX_CONNECTIONS", 100, minimum=1),
+        "retry_on_timeout": bool_from_env("REDIS_RETRY_ON_TIMEOUT", False),
     }
 
 
@@ -119,7 +78,9 @@ def xadd_with_retry(
     for attempt in range(retries):
         try:
             if maxlen:
-                message_id = client.xadd(stream, normalized, maxlen=maxlen, approximate=True)
+                message_id = client.xadd(
+                    stream, normalized, maxlen=maxlen, approximate=True
+                )
             else:
                 message_id = client.xadd(stream, normalized)
             if isinstance(message_id, bytes):
@@ -131,9 +92,13 @@ def xadd_with_retry(
                 EVENT_PUBLISH_RETRIES.labels(stream=stream).inc()
                 logger.warning(
                     "Redis XADD failed, retrying",
-                    extra={"stream": stream, "attempt": attempt + 1, "max_attempts": retries},
+                    extra={
+                        "stream": stream,
+                        "attempt": attempt + 1,
+                        "max_attempts": retries,
+                    },
                 )
-                time.sleep(min(2 ** attempt, 4))
+                time.sleep(min(2**attempt, 4))
 
     if last_error is not None:
         logger.error(
@@ -156,14 +121,22 @@ def publish_event(
         EVENT_PUBLISH_ATTEMPTS.labels(stream=stream, result="invalid").inc()
         logger.error(
             "Rejected invalid event payload",
-            extra={"stream": stream, "reason": reason, "event_type": payload.get("event_type")},
+            extra={
+                "stream": stream,
+                "reason": reason,
+                "event_type": payload.get("event_type"),
+            },
         )
         persist_event(stream, payload, published=False, publish_error=reason)
         return False, None
 
-    message_id = xadd_with_retry(client, stream, payload, retries=retries, maxlen=maxlen)
+    message_id = xadd_with_retry(
+        client, stream, payload, retries=retries, maxlen=maxlen
+    )
     ok = message_id is not None
-    EVENT_PUBLISH_ATTEMPTS.labels(stream=stream, result="success" if ok else "failed").inc()
+    EVENT_PUBLISH_ATTEMPTS.labels(
+        stream=stream, result="success" if ok else "failed"
+    ).inc()
 
     if not ok:
         logger.error(
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 from copy import deepcopy
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Iterable, Iterator
 from uuid import uuid4
 
-from sqlalchemy import func
+from sqlalchemy import event, func
 from sqlalchemy.orm import Session
 
+from ..audit import payload_hash
 from ..models.digital_twin_snapshot import DigitalTwinSnapshot
 from ..models.digital_twin_node import DigitalTwinNode
 from ..models.digital_twin_edge import DigitalTwinEdge
@@ -185,6 +186,24 @@ def _edge_to_dict(edge: DigitalTwinEdge) -> dict[str, Any]:
     }
 
 
+def _content_hash(item: dict[str, Any]) -> str:
+    return payload_hash({key: value for key, value in item.items() if key != "id"})
+
+
+# Two nodes (or edges) with the same key differ exactly when their hashes do,
+# which lets the diff compare snapshots without loading payloads.
+@event.listens_for(DigitalTwinNode, "before_insert")
+@event.listens_for(DigitalTwinNode, "before_update")
+def _hash_node(_mapper, _connection, node: DigitalTwinNode) -> None:
+    node.content_hash = _content_hash(_node_to_dict(node))
+
+
+@event.listens_for(DigitalTwinEdge, "before_insert")
+@event.listens_for(DigitalTwinEdge, "before_update")
+def _hash_edge(_mapper, _connection, edge: DigitalTwinEdge) -> None:
+    edge.content_hash = _content_hash(_edge_to_dict(edge))
+
+
 def format_graph_payload(
     dpp_id: str,
     snapshot: DigitalTwinSnapshot,
@@ -433,3 +452,240 @@ def build_diff(from_graph: dict[str, Any], to_graph: dict[str, Any]) -> dict[str
         "edges": edge_diff,
         "generated_at": datetime.now(timezone.utc).isoformat(),
     }
+
+
+DIFF_KINDS = ("nodes", "edges")
+DIFF_CHANGES = ("added", "removed", "changed")
+_DIFF_BATCH = 500
+
+
+def _diff_spec(kind: str):
+    if kind == "nodes":
+        return DigitalTwinNode, DigitalTwinNode.node_key, _node_to_dict
+    return DigitalTwinEdge, DigitalTwinEdge.edge_key, _edge_to_dict
+
+
+def _hash_cursor(
+    db: Session, kind: str, snapshot_id
+) -> Iterable[tuple[str, str | None]]:
+    model, key, _ = _diff_spec(kind)
+    # The merge below compares keys with Python's code point order; Postgres
+    # sorts that way under the "C" collation, SQLite by default.
+    order = key.collate("C") if db.get_bind().dialect.name == "postgresql" else key
+    return (
+        db.query(key, model.content_hash)
+        .filter(model.snapshot_id == snapshot_id)
+        .order_by(order.asc())
+        .yield_per(_DIFF_BATCH)
+    )
+
+
+def _merge_join(
+    before: Iterable[tuple[str, str | None]], after: Iterable[tuple[str, str | None]]
+) -> Iterator[tuple[str, str]]:
+    before, after = iter(before), iter(after)
+    left, right = next(before, None), next(after, None)
+    while left is not None or right is not None:
+        if right is None or (left is not None and left[0] < right[0]):
+            yield left[0], "removed"
+            left = next(before, None)
+        elif left is None or right[0] < left[0]:
+            yield right[0], "added"
+            right = next(after, None)
+        else:
+            if left[1] is None or right[1] is None:
+                # Written before content hashes existed; compare payloads.
+                yield left[0], "unhashed"
+            elif left[1] != right[1]:
+                yield left[0], "changed"
+            left, right = next(before, None), next(after, None)
+
+
+def _load_items(
+    db: Session, kind: str, snapshot_id, keys: list[str]
+) -> dict[str, dict[str, Any]]:
+    model, key, to_dict = _diff_spec(kind)
+    items: dict[str, dict[str, Any]] = {}
+    for start in range(0, len(keys), _DIFF_BATCH):
+        rows = (
+            db.query(model)
+            .filter(
+                model.snapshot_id == snapshot_id,
+                key.in_(keys[start : start + _DIFF_BATCH]),
+            )
+            .all()
+        )
+        items.update((item["id"], item) for item in map(to_dict, rows))
+    return items
+
+
+def _resolve_unhashed(
+    db: Session,
+    kind: str,
+    from_snapshot_id,
+    to_snapshot_id,
+    batch: list[tuple[str, str]],
+) -> Iterator[tuple[str, str]]:
+    keys = [key for key, change in batch if change == "unhashed"]
+    before = _load_items(db, kind, from_snapshot_id, keys) if keys else {}
+    after = _load_items(db, kind, to_snapshot_id, keys) if keys else {}
+    for key, change in batch:
+        if change != "unhashed":
+            yield key, change
+        elif before.get(key) != after.get(key):
+            yield key, "changed"
+
+
+def iter_snapshot_changes(
+    db: Session, from_snapshot_id, to_snapshot_id, kind: str
+) -> Iterator[tuple[str, str]]:
+    """Yield ``(key, change)`` for the ``kind`` ("nodes" or "edges") that
+    differ between two snapshots, in key order.
+
+    Only keys and content hashes are read, from two key-ordered cursors.
+    """
+    merged = _merge_join(
+        _hash_cursor(db, kind, from_snapshot_id),
+        _hash_cursor(db, kind, to_snapshot_id),
+    )
+    batch: list[tuple[str, str]] = []
+    for entry in merged:
+        batch.append(entry)
+        if len(batch) >= _DIFF_BATCH:
+            yield from _resolve_unhashed(
+                db, kind, from_snapshot_id, to_snapshot_id, batch
+            )
+            batch = []
+    yield from _resolve_unhashed(db, kind, from_snapshot_id, to_snapshot_id, batch)
+
+
+def _change_records(
+    db: Session,
+    kind: str,
+    from_snapshot_id,
+    to_snapshot_id,
+    changes: list[tuple[str, str]],
+) -> Iterator[dict[str, Any]]:
+    before = _load_items(
+        db,
+        kind,
+        from_snapshot_id,
+        [key for key, change in changes if change != "added"],
+    )
+    after = _load_items(
+        db,
+        kind,
+        to_snapshot_id,
+        [key for key, change in changes if change != "removed"],
+    )
+    for key, change in changes:
+        record: dict[str, Any] = {
+            "type": "change",
+            "kind": kind,
+            "change": change,
+            "key": key,
+        }
+        if change != "added":
+            record["before"] = before.get(key)
+        if change != "removed":
+            record["after"] = after.get(key)
+        yield record
+
+
+def iter_diff(
+    db: Session,
+    from_snapshot_id,
+    to_snapshot_id,
+    *,
+    offset: int = 0,
+    limit: int | None = None,
+    summary_only: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """Stream the differences between two snapshots of a twin.
+
+    Changes are ordered nodes first, then edges, each by key. One
+    ``{"type": "change", ...}`` record is yielded per change inside the
+    ``offset``/``limit`` window (none with ``summary_only``), followed by a
+    ``{"type": "summary", ...}`` record that counts every change. Memory
+    stays flat in graph size: payloads are loaded in batches and only for
+    the changes yielded.
+    """
+    summary = {f"{kind}_{change}": 0 for kind in DIFF_KINDS for change in DIFF_CHANGES}
+    end = None if limit is None else offset + limit
+    position = 0
+    for kind in DIFF_KINDS:
+        window: list[tuple[str, str]] = []
+        for key, change in iter_snapshot_changes(
+            db, from_snapshot_id, to_snapshot_id, kind
+        ):
+            summary[f"{kind}_{change}"] += 1
+            if (
+                not summary_only
+                and position >= offset
+                and (end is None or position < end)
+            ):
+                window.append((key, change))
+                if len(window) >= _DIFF_BATCH:
+                    yield from _change_records(
+                        db, kind, from_snapshot_id, to_snapshot_id, window
+                    )
+                    window = []
+            position += 1
+        yield from _change_records(db, kind, from_snapshot_id, to_snapshot_id, window)
+    yield {
+        "type": "summary",
+        "summary": summary,
+        "page": {
+            "offset": offset,
+            "limit": limit,
+            "total": position,
+            "has_more": end is not None and position > end,
+        },
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def diff_snapshots(
+    db: Session,
+    from_snapshot_id,
+    to_snapshot_id,
+    *,
+    offset: int = 0,
+    limit: int | None = None,
+    summary_only: bool = False,
+) -> dict[str, Any]:
+    """:func:`iter_diff` collected into the :func:`build_diff` layout, plus
+    the ``page`` it covers."""
+    groups = {kind: {change: [] for change in DIFF_CHANGES} for kind in DIFF_KINDS}
+    result: dict[str, Any] = {}
+    for record in iter_diff(
+        db,
+        from_snapshot_id,
+        to_snapshot_id,
+        offset=offset,
+        limit=limit,
+        summary_only=summary_only,
+    ):
+        if record["type"] == "summary":
+            result = {key: value for key, value in record.items() if key != "type"}
+            continue
+        group = groups[record["kind"]][record["change"]]
+        if record["change"] == "added":
+            group.append(record["after"])
+        elif record["change"] == "removed":
+            group.append(record["before"])
+        else:
+            group.append(
+                {
+                    "key": record["key"],
+                    "before": record["before"],
+                    "after": record["after"],
+                }
+            )
+    return {
+        "summary": result["summary"],
+        "nodes": groups["nodes"],
+        "edges": groups["edges"],
+        "page": result["page"],
+        "generated_at": result["generated_at"],
+    }
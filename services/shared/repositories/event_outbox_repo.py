@@ -30,6 +30,30 @@ def enqueue_event(
     return row
 
 
+def enqueue_events(
+    db: Session,
+    *,
+    stream: str,
+    events: list[tuple[str, dict[str, Any]]],
+) -> list[EventOutbox]:
+    """Stage several ``(event_id, payload)`` rows with a single flush."""
+    now = datetime.now(timezone.utc)
+    rows = [
+        EventOutbox(
+            event_id=event_id,
+            stream=stream,
+            payload=payload,
+            status="pending",
+            attempts=0,
+            available_at=now,
+        )
+        for event_id, payload in events
+    ]
+    db.add_all(rows)
+    db.flush()
+    return rows
+
+
 def claim_pending_events(
     db: Session,
     *,
@@ -28,6 +28,14 @@ def list_steps_for_template(db: Session, template_id) -> list[JourneyStep]:
     )
 
 
+def get_template_version(db: Session, template_id) -> int | None:
+    return (
+        db.query(JourneyTemplate.version)
+        .filter(JourneyTemplate.id == template_id)
+        .scalar()
+    )
+
+
 def create_run(
     db: Session,
     template_id,
@@ -36,13 +44,16 @@ def create_run(
     locale: str,
     metadata: dict | None = None,
     session_id=None,
+    first_step_key: str | None = None,
 ) -> JourneyRun:
-    first_step = (
-        db.query(JourneyStep)
-        .filter(JourneyStep.template_id == template_id)
-        .order_by(JourneyStep.order_index)
-        .first()
-    )
+    if first_step_key is None:
+        first_step = (
+            db.query(JourneyStep)
+            .filter(JourneyStep.template_id == template_id)
+            .order_by(JourneyStep.order_index)
+            .first()
+        )
+        first_step_key = first_step.step_key if first_step else None
     run = JourneyRun(
         id=uuid4(),
         template_id=template_id,
@@ -50,7 +61,7 @@ def create_run(
         active_role=role,
         locale=locale,
         status="active",
-        current_step_key=first_step.step_key if first_step else None,
+        current_step_key=first_step_key,
         session_id=session_id,
         metadata_=metadata or {},
     )
@@ -84,12 +95,13 @@ def create_step_run(
     payload: dict | None = None,
     result: dict | None = None,
     metadata: dict | None = None,
+    status: str = "completed",
 ) -> JourneyStepRun:
     step_run = JourneyStepRun(
         id=uuid4(),
         journey_run_id=run_id,
         step_key=step_key,
-        status="completed",
+        status=status,
         payload=payload or {},
         result=result or {},
         metadata_=metadata or {},
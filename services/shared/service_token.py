@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable
+
+from .env import float_from_env
+from .http_client import get_session
+from .metrics import build_counter, build_gauge, build_histogram
+
+logger = logging.getLogger(__name__)
+
+SERVICE_TOKEN_REQUESTS = build_counter(
+    "dpp_service_token_requests_total",
+    "Service token lookups by client and how they were answered",
+    ["client", "result"],
+)
+SERVICE_TOKEN_REFRESHES = build_counter(
+    "dpp_service_token_refresh_total",
+    "Service token endpoint calls by client, trigger and result",
+    ["client", "trigger", "result"],
+)
+SERVICE_TOKEN_FETCH_SECONDS = build_histogram(
+    "dpp_service_token_fetch_seconds",
+    "Latency of client_credentials token requests",
+    ["client"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+SERVICE_TOKEN_TTL_SECONDS = build_gauge(
+    "dpp_service_token_ttl_seconds",
+    "Lifetime in seconds of the most recently issued service token",
+    ["client"],
+)
+
+TokenFetcher = Callable[[], tuple[str, int]]
+
+
+class ServiceTokenManager:
+    """Process-wide cache for one client_credentials token.
+
+    Callers read the cached token without I/O. Only one thread talks to the
+    token endpoint at a time: callers that need a token while a refresh is in
+    flight wait for its outcome instead of sending their own request. Once
+    the token enters its refresh window it is renewed in the background while
+    the still-valid token keeps being served. Failed refreshes are cached with
+    exponential backoff, so an outage costs one request per backoff interval
+    rather than one per caller.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: TokenFetcher,
+        *,
+        refresh_margin_seconds: float = 30.0,
+        min_backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 60.0,
+        wait_timeout_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self._fetch = fetch
+        self._refresh_margin = refresh_margin_seconds
+        self._min_backoff = min_backoff_seconds
+        self._max_backoff = max_backoff_seconds
+        self._wait_timeout = wait_timeout_seconds
+        self._clock = clock
+        self._token: str | None = None
+        self._expires_at = 0.0
+        self._backoff_until = 0.0
+        self._failures = 0
+        self._refreshing = False
+        self._cond = threading.Condition()
+
+    def _usable(self, now: float) -> bool:
+        return self._token is not None and now < self._expires_at
+
+    def _fresh(self, now: float) -> bool:
+        return self._usable(now) and now < self._expires_at - self._refresh_margin
+
+    def get_token(self) -> str | None:
+        now = self._clock()
+        with self._cond:
+            if self._fresh(now):
+                SERVICE_TOKEN_REQUESTS.labels(client=self.name, result="hit").inc()
+                return self._token
+            if self._usable(now):
+                # Inside the refresh window: keep serving the valid token and
+                # renew it off the request path.
+                if not self._refreshing and now >= self._backoff_until:
+                    self._refreshing = True
+                    threading.Thread(
+                        target=self._refresh,
+                        args=("proactive",),
+                        name=f"service-token-{self.name}",
+                        daemon=True,
+                    ).start()
+                SERVICE_TOKEN_REQUESTS.labels(client=self.name, result="stale").inc()
+                return self._token
+            if now < self._backoff_until:
+                SERVICE_TOKEN_REQUESTS.labels(client=self.name, result="backoff").inc()
+                return None
+            if self._refreshing:
+                self._cond.wait_for(
+                    lambda: not self._refreshing, timeout=self._wait_timeout
+                )
+                result = "coalesced" if self._usable(self._clock()) else "failed"
+                SERVICE_TOKEN_REQUESTS.labels(client=self.name, result=result).inc()
+                return self._token if result == "coalesced" else None
+            self._refreshing = True
+        token = self._refresh("expired")
+        SERVICE_TOKEN_REQUESTS.labels(
+            client=self.name, result="fetched" if token else "failed"
+        ).inc()
+        return token
+
+    def _refresh(self, trigger: str) -> str | None:
+        """Call the token endpoint; the caller must have set ``_refreshing``."""
+        started = self._clock()
+        try:
+            token, expires_in = self._fetch()
+        except Exception as exc:
+            with self._cond:
+                self._failures += 1
+                backoff = min(
+                    self._max_backoff, self._min_backoff * 2 ** (self._failures - 1)
+                )
+                self._backoff_until = self._clock() + backoff * random.uniform(0.8, 1.0)
+                self._refreshing = False
+                self._cond.notify_all()
+            SERVICE_TOKEN_REFRESHES.labels(
+                client=self.name, trigger=trigger, result="failed"
+            ).inc()
+            logger.warning(
+                "Service token refresh failed",
+                extra={
+                    "client": self.name,
+                    "failures": self._failures,
+                    "backoff_seconds": round(backoff, 2),
+                    "error": str(exc),
+                },
+            )
+            return None
+        finally:
+            SERVICE_TOKEN_FETCH_SECONDS.labels(client=self.name).observe(
+                self._clock() - started
+            )
+        with self._cond:
+            self._token = token
+            self._expires_at = started + expires_in
+            self._failures = 0
+            self._backoff_until = 0.0
+            self._refreshing = False
+            self._cond.notify_all()
+        SERVICE_TOKEN_REFRESHES.labels(
+            client=self.name, trigger=trigger, result="success"
+        ).inc()
+        SERVICE_TOKEN_TTL_SECONDS.labels(client=self.name).set(expires_in)
+        return token
+
+    def invalidate(self) -> None:
+        """Drop the cached token, e.g. after an upstream answered 401."""
+        with self._cond:
+            self._token = None
+            self._expires_at = 0.0
+
+
+def keycloak_token_fetcher(
+    token_url: str,
+    client_id: str,
+    client_secret: str,
+    *,
+    timeout: float = 5.0,
+    session_name: str = "service-token",
+) -> TokenFetcher:
+    # Retries are handled by the manager's backoff; the pooled session must
+    # not multiply a slow token endpoint by its own retry policy.
+    session = get_session(name=session_name, total_retries=0)
+
+    def _fetch() -> tuple[str, int]:
+        resp = session.post(
+            token_url,
+            data={
+                "grant_type": "client_credentials",
+                "client_id": client_id,
+                "client_secret": client_secret,
+            },
+            timeout=timeout,
+        )
+        resp.raise_for_status()
+        data: dict[str, Any] = resp.json()
+        token = data.get("access_token")
+        if not token:
+            raise ValueError("Token response did not include an access_token")
+        return token, int(data.get("expires_in", 60))
+
+    return _fetch
+
+
+_managers: dict[str, ServiceTokenManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_service_token_manager(name: str) -> ServiceTokenManager:
+    """Return the shared manager for ``name``, configured from the environment."""
+    manager = _managers.get(name)
+    if manager is not None:
+        return manager
+    with _managers_lock:
+        manager = _managers.get(name)
+        if manager is None:
+            keycloak_url = os.getenv("KEYCLOAK_URL", "http://keycloak:8080")
+            realm = os.getenv("KEYCLOAK_REALM", "dpp")
+            fetch = keycloak_token_fetcher(
+                f"{keycloak_url}/realms/{realm}/protocol/openid-connect/token",
+                os.getenv("SERVICE_CLIENT_ID", "dpp-services"),
+                os.getenv("SERVICE_CLIENT_SECRET", "dev-services-secret"),
+                timeout=float_from_env(
+                    "SERVICE_TOKEN_TIMEOUT_SECONDS", 5.0, minimum=0.1
+                ),
+                session_name=f"{name}-service-token",
+            )
+            manager = ServiceTokenManager(
+                name,
+                fetch,
+                refresh_margin_seconds=float_from_env(
+                    "SERVICE_TOKEN_REFRESH_MARGIN_SECONDS", 30.0, minimum=0.0
+                ),
+                max_backoff_seconds=float_from_env(
+                    "SERVICE_TOKEN_MAX_BACKOFF_SECONDS", 60.0, minimum=1.0
+                ),
+            )
+            _managers[name] = manager
+    return manager
+
+
+def set_service_token_manager(name: str, manager: ServiceTokenManager | None) -> None:
+    with _managers_lock:
+        if manager is None:
+            _managers.pop(name, None)
+        else:
+            _managers[name] = manager
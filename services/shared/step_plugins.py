@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+from typing import Any
+from uuid import uuid4
+
+import requests
+
+from .http_client import request as pooled_request
+from .json_patch import JsonPatchError, apply_patch
+from .models.dpp_instance import DppInstance
+from .step_runtime import StepRuntime
+
+# Actions whose result depends only on their inputs and that have no side
+# effects; the runtime caches them.
+IDEMPOTENT_ACTIONS = frozenset({"json_patch"})
+# Actions that only reshape their input: no I/O, so no timeout and no thread.
+LOCAL_ACTIONS = frozenset(
+    {"user.input", "aas.update", "api.call", "http_call", "json_patch"}
+)
+# Actions that write to the caller's DB session: inline, bounded by the
+# plugins' own HTTP timeout.
+SESSION_ACTIONS = frozenset(
+    {"compliance.check", "compliance_check", "aas.create", "aas_create_shell"}
+)
+
+
+def writable_copy(value: Any) -> Any:
+    """Plain dicts and lists all the way down, whatever mapping came in."""
+    if isinstance(value, dict):
+        return {key: writable_copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [writable_copy(item) for item in value]
+    return value
+
+
+def default_payload(payload: dict[str, Any], params: dict[str, Any]) -> dict[str, Any]:
+    if payload:
+        return payload
+    if not params:
+        return {}
+    # Step params are shared, read-only structures; hand handlers a copy.
+    if params.get("payload") is not None:
+        return writable_copy(params.get("payload") or {})
+    return writable_copy(params)
+
+
+def _with_session(outgoing: Any, context: dict[str, Any]) -> Any:
+    if (
+        isinstance(outgoing, dict)
+        and context.get("session_id")
+        and not outgoing.get("session_id")
+    ):
+        outgoing["session_id"] = context.get("session_id")
+    return outgoing
+
+
+class BuiltinStepPlugins:
+    """The step actions every runtime offers, bound to upstream base URLs."""
+
+    def __init__(
+        self,
+        *,
+        compliance_url: str,
+        edc_url: str,
+        aas_adapter_url: str,
+        session_name: str,
+        timeout: float = 8,
+    ):
+        self.compliance_url = compliance_url
+        self.edc_url = edc_url
+        self.aas_adapter_url = aas_adapter_url
+        self.session_name = session_name
+        self.timeout = timeout
+
+    def _post(self, url: str, body: Any, headers: dict[str, str]) -> Any:
+        response = pooled_request(
+            method="POST",
+            url=url,
+            json=body,
+            headers=headers,
+            timeout=self.timeout,
+            session_name=self.session_name,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _call_aas_adapter(
+        self,
+        method: str,
+        path: str,
+        *,
+        json_body: dict[str, Any] | None,
+        headers: dict[str, str],
+    ) -> dict[str, Any]:
+        response = pooled_request(
+            method=method,
+            url=f"{self.aas_adapter_url}{path}",
+            json=json_body,
+            headers=headers,
+            timeout=self.timeout,
+            session_name=self.session_name,
+        )
+        response.raise_for_status()
+        if not response.content:
+            return {}
+        payload = response.json()
+        return payload if isinstance(payload, dict) else {"items": payload}
+
+    def user_input(self, _db, params, payload, _context, _metadata, _headers):
+        if payload:
+            return {"status": "completed", "data": payload}
+        return {"status": "awaiting_input", "prompt": params.get("prompt")}
+
+    def compliance_check(self, db, params, payload, context, _metadata, headers):
+        regulations = payload.get("regulations") or params.get("regulations") or []
+        data = payload.get("data") if isinstance(payload, dict) else payload
+        if not data:
+            data = params.get("data")
+        body = {
+            "data": data,
+            "regulations": regulations,
+            "user_id": context.get("user_id"),
+            "session_id": context.get("session_id"),
+            "story_code": context.get("story_code"),
+        }
+        try:
+            result = self._post(
+                f"{self.compliance_url}/api/v1/compliance/check", body, headers
+            )
+        except requests.RequestException as exc:
+            return {"status": "error", "error": str(exc)}
+        # Keep digital twin compliance node in sync when a DPP exists. The
+        # write is flushed, not committed: the caller owns the transaction.
+        try:
+            from .repositories import digital_twin_repo
+
+            session_id = context.get("session_id")
+            if session_id:
+                dpp = (
+                    db.query(DppInstance)
+                    .filter(DppInstance.session_id == session_id)
+                    .first()
+                )
+                if dpp:
+                    graph = digital_twin_repo.get_graph(db, dpp.id)
+                    if graph:
+                        for node in graph["nodes"]:
+                            if node.node_key == "compliance":
+                                with db.begin_nested():
+                                    node.payload = {
+                                        "status": result.get("status", "unknown"),
+                                        "result": result,
+                                    }
+                                break
+        except Exception:
+            pass
+        return {"status": result.get("status", "unknown"), "data": result}
+
+    def edc_negotiation(self, _db, params, payload, context, _metadata, headers):
+        outgoing = _with_session(default_payload(payload, params), context)
+        try:
+            data = self._post(
+                f"{self.edc_url}/api/v1/edc/negotiations", outgoing, headers
+            )
+        except requests.RequestException as exc:
+            return {"status": "error", "error": str(exc)}
+        return {"status": "ok", "data": data}
+
+    def edc_transfer(self, _db, params, payload, context, _metadata, headers):
+        outgoing = _with_session(default_payload(payload, params), context)
+        try:
+            data = self._post(f"{self.edc_url}/api/v1/edc/transfers", outgoing, headers)
+        except requests.RequestException as exc:
+            return {"status": "error", "error": str(exc)}
+        return {"status": "ok", "data": data}
+
+    def aas_create(self, db, params, payload, context, _metadata, headers):
+        outgoing = default_payload(payload, params)
+        if not isinstance(outgoing, dict):
+            return {"status": "error", "error": "Payload must be object"}
+
+        aas_identifier = outgoing.get("aas_identifier") or outgoing.get("id")
+        product_name = outgoing.get("product_name") or outgoing.get("idShort")
+        asset_info = (
+            outgoing.get("assetInformation", {})
+            if isinstance(outgoing.get("assetInformation"), dict)
+            else {}
+        )
+        product_identifier = outgoing.get("product_identifier") or asset_info.get(
+            "globalAssetId"
+        )
+        if not aas_identifier:
+            return {"status": "error", "error": "Missing aas_identifier"}
+
+        adapter_payload = {
+            "aas_identifier": str(aas_identifier),
+            "product_name": product_name,
+            "product_identifier": product_identifier,
+        }
+        try:
+            adapter_result = self._call_aas_adapter(
+                "POST",
+                "/api/v2/aas/shells",
+                json_body=adapter_payload,
+                headers=headers,
+            )
+        except requests.RequestException as exc:
+            return {"status": "error", "error": str(exc)}
+        shell = adapter_result.get("shell") or adapter_result.get("aas") or outgoing
+        status = adapter_result.get("status") or "created"
+
+        dpp = DppInstance(
+            id=uuid4(),
+            session_id=context.get("session_id"),
+            aas_identifier=str(aas_identifier),
+            product_identifier=product_identifier,
+            product_name=product_name,
+            product_category=outgoing.get("product_category"),
+            compliance_status={},
+        )
+        # Each write is staged in a savepoint so a failure does not poison the
+        # caller's transaction; the caller commits them with the step.
+        try:
+            with db.begin_nested():
+                db.add(dpp)
+        except Exception:
+            pass
+
+        try:
+            from .repositories import digital_twin_repo
+
+            with db.begin_nested():
+                snapshot = digital_twin_repo.create_snapshot(
+                    db, dpp_instance_id=dpp.id, label="Initial DPP"
+                )
+                digital_twin_repo.add_node(
+                    db,
+                    snapshot.id,
+                    "product",
+                    "asset",
+                    product_name or "Product",
+                    {"aas_id": str(dpp.aas_identifier)},
+                )
+                digital_twin_repo.add_node(
+                    db,
+                    snapshot.id,
+                    "compliance",
+                    "status",
+                    "Compliance",
+                    {"status": "pending"},
+                )
+                digital_twin_repo.add_node(
+                    db, snapshot.id, "transfer", "dataspace", "Transfer", {}
+                )
+                digital_twin_repo.add_edge(
+                    db,
+                    snapshot.id,
+                    "product-compliance",
+                    "product",
+                    "compliance",
+                    "validates",
+                )
+                digital_twin_repo.add_edge(
+                    db,
+                    snapshot.id,
+                    "product-transfer",
+                    "product",
+                    "transfer",
+                    "transfers",
+                )
+        except Exception:
+            pass
+        return {"status": status, "data": shell}
+
+    def aas_submodel_add(self, _db, params, payload, _context, _metadata, headers):
+        outgoing = default_payload(payload, params)
+        if not isinstance(outgoing, dict):
+            return {"status": "error", "error": "Payload must be object"}
+        submodel = outgoing.get("submodel") or outgoing
+        try:
+            adapter_result = self._call_aas_adapter(
+                "POST",
+                "/api/v2/aas/submodels",
+                json_body={"submodel": submodel},
+                headers=headers,
+            )
+        except requests.RequestException as exc:
+            return {"status": "error", "error": str(exc)}
+        return {
+            "status": adapter_result.get("status") or "created",
+            "data": adapter_result.get("submodel", submodel),
+        }
+
+    def aas_submodel_patch(self, _db, params, payload, _context, _metadata, headers):
+        outgoing = default_payload(payload, params)
+        if not isinstance(outgoing, dict):
+            return {"status": "error", "error": "Payload must be object"}
+        submodel_id = outgoing.get("submodel_id")
+        elements = outgoing.get("elements")
+        if not submodel_id or elements is None:
+            return {"status": "error", "error": "Missing submodel_id or elements"}
+        # The adapter diffs against the submodel's current elements and sends
+        # only the changed ones. ``prune`` (on unless the step turns it off)
+        # deletes elements missing from the list, so the list replaces the
+        # current one as it always has.
+        body = {"elements": elements, "prune": bool(outgoing.get("prune", True))}
+        try:
+            adapter_result = self._call_aas_adapter(
+                "PATCH",
+                f"/api/v2/aas/submodels/{submodel_id}/elements",
+                json_body=body,
+                headers=headers,
+            )
+        except requests.RequestException as exc:
+            return {"status": "error", "error": str(exc)}
+        result = {
+            "status": adapter_result.get("status") or "updated",
+            "data": adapter_result.get("elements", elements),
+        }
+        if adapter_result.get("diff"):
+            result["diff"] = adapter_result["diff"]
+        return result
+
+    def aas_update(self, _db, params, payload, _context, _metadata, _headers):
+        # The named update is appended to the session timeline by the caller,
+        # inside the same transaction as the step's progress.
+        return {"status": "updated", "data": default_payload(payload, params)}
+
+    def api_call(self, _db, params, payload, _context, _metadata, _headers):
+        return {"status": "called", "data": default_payload(payload, params)}
+
+    def json_patch(self, _db, params, payload, _context, _metadata, _headers):
+        outgoing = default_payload(payload, params)
+        if not isinstance(outgoing, dict):
+            return {"status": "error", "error": "Payload must be object"}
+        document = outgoing.get("document")
+        operations = outgoing.get("operations")
+        if not isinstance(document, (dict, list)) or not isinstance(operations, list):
+            return {"status": "patched", "data": outgoing}
+        try:
+            result = apply_patch(document, operations)
+        except JsonPatchError as exc:
+            return {"status": "error", "error": str(exc)}
+        return {
+            "status": "patched",
+            "data": result.document,
+            "touched": result.touched,
+        }
+
+    def handlers(self) -> dict[str, Any]:
+        return {
+            "user.input": self.user_input,
+            "compliance.check": self.compliance_check,
+            "compliance_check": self.compliance_check,
+            "edc.negotiate": self.edc_negotiation,
+            "edc_negotiation": self.edc_negotiation,
+            "edc.transfer": self.edc_transfer,
+            "aas.create": self.aas_create,
+            "aas_create_shell": self.aas_create,
+            "aas.submodel.add": self.aas_submodel_add,
+            "aas.submodel.patch": self.aas_submodel_patch,
+            "aas.update": self.aas_update,
+            "api.call": self.api_call,
+            "http_call": self.api_call,
+            "json_patch": self.json_patch,
+        }
+
+    def register(self, runtime: StepRuntime) -> StepRuntime:
+        for action, handler in self.handlers().items():
+            options: dict[str, Any] = {"idempotent": action in IDEMPOTENT_ACTIONS}
+            if action in LOCAL_ACTIONS or action in SESSION_ACTIONS:
+                options["timeout"] = None
+            runtime.register(action, handler, **options)
+        return runtime
@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import copy
+import hashlib
+import inspect
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Union
+
+from .env import float_from_env, int_from_env
+from .metrics import build_counter, build_histogram
+from .ttl_cache import TtlLruCache
+
+STEP_PLUGIN_SECONDS = build_histogram(
+    "dpp_step_plugin_seconds",
+    "Step plugin latency by runtime, action and outcome",
+    ["runtime", "action", "outcome"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+STEP_RESULT_CACHE = build_counter(
+    "dpp_step_result_cache_total",
+    "Idempotent step result cache lookups by runtime, action and result",
+    ["runtime", "action", "result"],
+)
+
+# Handlers get (db, params, payload, context, metadata, headers) and return a
+# result dict, either directly or from a coroutine.
+StepHandler = Callable[
+    [
+        Any,
+        dict[str, Any],
+        dict[str, Any],
+        dict[str, Any],
+        Union[dict[str, Any], None],
+        dict[str, str],
+    ],
+    Union[dict[str, Any], Awaitable[dict[str, Any]]],
+]
+
+# Statuses that are never served from the result cache.
+UNCACHED_STATUSES = frozenset({"error", "timeout", "unknown_action", "awaiting_input"})
+# Context fields that are handler inputs; request ids and event ids are not.
+_CACHE_CONTEXT_KEYS = ("session_id", "user_id", "story_code")
+_UNSET: Any = object()
+
+
+@dataclass(frozen=True)
+class StepPlugin:
+    action: str
+    handler: StepHandler
+    # Seconds before the caller gets a ``timeout`` result; None runs inline
+    # and is the only way to receive the caller's DB session.
+    timeout: float | None = None
+    # Same inputs, same result: successful results are cached for a while.
+    idempotent: bool = False
+
+    @property
+    def is_async(self) -> bool:
+        return inspect.iscoroutinefunction(self.handler)
+
+
+class _ResultCache:
+    def __init__(self, ttl: float, maxsize: int, clock: Callable[[], float]):
+        self.ttl = ttl
+        self._entries: TtlLruCache[str, dict[str, Any]] = TtlLruCache(
+            maxsize if ttl > 0 else 0, clock=clock
+        )
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        result = self._entries.get(key)
+        return copy.deepcopy(result) if result is not None else None
+
+    def put(self, key: str, result: dict[str, Any]) -> None:
+        if self._entries.maxsize <= 0:
+            return
+        self._entries.put(key, copy.deepcopy(result), ttl=self.ttl)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def _cache_key(
+    action: str,
+    params: dict[str, Any],
+    payload: dict[str, Any],
+    context: dict[str, Any],
+) -> str:
+    material = {
+        "action": action,
+        "params": params,
+        "payload": payload,
+        "context": {key: context.get(key) for key in _CACHE_CONTEXT_KEYS},
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _finish(action: str, result: Any) -> dict[str, Any]:
+    if not isinstance(result, dict):
+        result = {"status": "completed", "data": result}
+    status = result.get("status", "completed")
+    result.setdefault("status", status)
+    result.setdefault("message", f"Step '{action}' finished with status '{status}'")
+    return result
+
+
+def _failed(action: str, exc: BaseException) -> dict[str, Any]:
+    return {
+        "status": "error",
+        "message": f"Step execution failed for '{action}'",
+        "error": str(exc),
+    }
+
+
+def _timed_out(action: str, timeout: float) -> dict[str, Any]:
+    return {
+        "status": "timeout",
+        "message": f"Step '{action}' did not finish within {timeout:g}s",
+        "action": action,
+    }
+
+
+def _handler_args(
+    plugin: StepPlugin,
+    db: Any,
+    params: dict[str, Any],
+    payload: dict[str, Any],
+    context: dict[str, Any],
+    metadata: dict[str, Any] | None,
+    headers: dict[str, str] | None,
+) -> tuple:
+    # A handler that can be abandoned must not share the caller's session.
+    session = db if plugin.timeout is None else None
+    return (session, params, payload, context, metadata, dict(headers or {}))
+
+
+def unknown_action(action: str) -> dict[str, Any]:
+    return {
+        "status": "unknown_action",
+        "message": f"No step plugin is registered for '{action}'",
+        "action": action,
+    }
+
+
+class StepRuntime:
+    """Registry and executor for step action plugins.
+
+    Stories (simulation-engine) and journeys (platform-core) both run their
+    step actions through a runtime, so an action behaves the same wherever
+    it is triggered. Handlers may be plain functions or coroutines.
+
+    A plugin with a ``timeout`` runs off the caller's thread (sync handlers on
+    a small shared pool, coroutines on an event loop) and the caller gets a
+    ``timeout`` result once it expires. Python cannot stop a running
+    function, so a timed-out sync handler finishes in the background and its
+    result is dropped. Such a handler could still be using the request's DB
+    session after the caller moved on, so plugins with a timeout get
+    ``db=None``; plugins that need the session register without a timeout
+    and bound their own I/O instead. Plugins without a timeout run inline.
+
+    Results of ``idempotent`` plugins are cached per action, params, payload
+    and calling user/session for ``cache_ttl`` seconds, except failures and
+    prompts (:data:`UNCACHED_STATUSES`).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        default_timeout: float | None = _UNSET,
+        cache_ttl: float | None = None,
+        cache_maxsize: int | None = None,
+        max_workers: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        if default_timeout is _UNSET:
+            # 0 turns timeouts off: every plugin runs inline.
+            default_timeout = (
+                float_from_env("STEP_PLUGIN_TIMEOUT_SECONDS", 20.0, minimum=0.0) or None
+            )
+        self.default_timeout = default_timeout
+        self._cache = _ResultCache(
+            float_from_env("STEP_RESULT_CACHE_TTL_SECONDS", 30.0, minimum=0.0)
+            if cache_ttl is None
+            else cache_ttl,
+            int_from_env("STEP_RESULT_CACHE_MAX_ENTRIES", 1024, minimum=0)
+            if cache_maxsize is None
+            else cache_maxsize,
+            clock,
+        )
+        self._max_workers = max_workers or int_from_env(
+            "STEP_PLUGIN_MAX_WORKERS", 16, minimum=1
+        )
+        self._plugins: dict[str, StepPlugin] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def register(
+        self,
+        action: str,
+        handler: StepHandler,
+        *,
+        timeout: float | None = _UNSET,
+        idempotent: bool = False,
+    ) -> StepPlugin:
+        """Register (or replace) the handler for ``action``.
+
+        ``timeout`` defaults to the runtime's ``default_timeout``; pass None
+        for local plugins that should run inline.
+        """
+        plugin = StepPlugin(
+            action=action,
+            handler=handler,
+            timeout=self.default_timeout if timeout is _UNSET else timeout,
+            idempotent=idempotent,
+        )
+        with self._lock:
+            self._plugins[action] = plugin
+        return plugin
+
+    def get(self, action: str) -> StepPlugin | None:
+        return self._plugins.get(action)
+
+    def actions(self) -> list[str]:
+        return sorted(self._plugins)
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix=f"{self.name}-steps",
+                )
+            return self._executor
+
+    def _cached(self, plugin: StepPlugin, key: str | None) -> dict[str, Any] | None:
+        if key is None:
+            return None
+        cached = self._cache.get(key)
+        STEP_RESULT_CACHE.labels(
+            runtime=self.name,
+            action=plugin.action,
+            result="hit" if cached is not None else "miss",
+        ).inc()
+        return cached
+
+    def _record(
+        self,
+        plugin: StepPlugin,
+        key: str | None,
+        result: dict[str, Any],
+        started: float,
+    ) -> dict[str, Any]:
+        status = result.get("status")
+        outcome = status if status in ("error", "timeout") else "ok"
+        STEP_PLUGIN_SECONDS.labels(
+            runtime=self.name, action=plugin.action, outcome=outcome
+        ).observe(time.perf_counter() - started)
+        if key is not None and status not in UNCACHED_STATUSES:
+            self._cache.put(key, result)
+        return result
+
+    def _prepare(
+        self,
+        action: str,
+        params: dict[str, Any],
+        payload: dict[str, Any],
+        context: dict[str, Any],
+    ) -> tuple[StepPlugin | None, str | None, dict[str, Any] | None]:
+        plugin = self._plugins.get(action)
+        if plugin is None:
+            return None, None, unknown_action(action)
+        key = (
+            _cache_key(action, params, payload, context) if plugin.idempotent else None
+        )
+        return plugin, key, self._cached(plugin, key)
+
+    def execute(
+        self,
+        db: Any,
+        action: str,
+        params: dict[str, Any],
+        payload: dict[str, Any],
+        context: dict[str, Any],
+        metadata: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> dict[str, Any]:
+        """Run ``action`` from synchronous code and return its result dict."""
+        plugin, key, early = self._prepare(action, params, payload, context)
+        if early is not None or plugin is None:
+            return early
+        args = _handler_args(plugin, db, params, payload, context, metadata, headers)
+        started = time.perf_counter()
+        try:
+            if plugin.is_async:
+                result = asyncio.run(self._await(plugin, args))
+            elif plugin.timeout is None:
+                result = _finish(action, plugin.handler(*args))
+            else:
+                call = contextvars.copy_context().run
+                future = self._pool().submit(call, plugin.handler, *args)
+                try:
+                    result = _finish(action, future.result(timeout=plugin.timeout))
+                except FutureTimeoutError:
+                    result = _timed_out(action, plugin.timeout)
+        except Exception as exc:
+            result = _failed(action, exc)
+        return self._record(plugin, key, result, started)
+
+    async def execute_async(
+        self,
+        db: Any,
+        action: str,
+        params: dict[str, Any],
+        payload: dict[str, Any],
+        context: dict[str, Any],
+        metadata: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> dict[str, Any]:
+        """Run ``action`` from a coroutine; sync handlers go to the pool."""
+        plugin, key, early = self._prepare(action, params, payload, context)
+        if early is not None or plugin is None:
+            return early
+        args = _handler_args(plugin, db, params, payload, context, metadata, headers)
+        started = time.perf_counter()
+        try:
+            result = await self._await(plugin, args)
+        except Exception as exc:
+            result = _failed(action, exc)
+        return self._record(plugin, key, result, started)
+
+    async def _await(self, plugin: StepPlugin, args: tuple) -> dict[str, Any]:
+        if plugin.is_async:
+            pending = plugin.handler(*args)
+        else:
+            loop = asyncio.get_running_loop()
+            call = contextvars.copy_context().run
+            pending = loop.run_in_executor(self._pool(), call, plugin.handler, *args)
+        if plugin.timeout is None:
+            return _finish(plugin.action, await pending)
+        try:
+            return _finish(
+                plugin.action, await asyncio.wait_for(pending, plugin.timeout)
+            )
+        except asyncio.TimeoutError:
+            return _timed_out(plugin.action, plugin.timeout)
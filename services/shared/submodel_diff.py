@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+# Elements whose ``$value`` is the plain ``value`` field, so a value-only
+# change can be sent as ``PATCH .../$value`` with just the new value.
+_VALUE_ONLY_TYPES = {"Property"}
+_COLLECTION_TYPES = {"SubmodelElementCollection"}
+
+
+class SubmodelDiffError(ValueError):
+    """The desired element list cannot be mapped onto element operations."""
+
+
+def payload_size(payload: Any) -> int:
+    """Bytes of ``payload`` as compact JSON, the way it goes on the wire."""
+    if payload is None:
+        return 0
+    return len(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+
+@dataclass(frozen=True)
+class ElementOp:
+    """One element-level AAS API call.
+
+    ``path`` is the element's idShortPath; for ``post`` it is the parent's
+    path, empty for a top-level element.
+    """
+
+    action: str
+    path: str
+    body: Any = None
+
+    def request(self, submodel_id: str) -> tuple[str, str, Any]:
+        base = f"submodels/{submodel_id}/submodel-elements"
+        if self.action == "value":
+            return "PATCH", f"{base}/{self.path}/$value", self.body
+        if self.action == "put":
+            return "PUT", f"{base}/{self.path}", self.body
+        if self.action == "post":
+            return "POST", f"{base}/{self.path}" if self.path else base, self.body
+        if self.action == "delete":
+            return "DELETE", f"{base}/{self.path}", None
+        raise SubmodelDiffError(f"Unknown element operation '{self.action}'")
+
+
+@dataclass
+class ElementDiff:
+    ops: list[ElementOp] = field(default_factory=list)
+    # The element list as it will be after the operations are applied.
+    merged: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def full_bytes(self) -> int:
+        """What rewriting the whole element list would have sent."""
+        return payload_size(self.merged)
+
+    @property
+    def sent_bytes(self) -> int:
+        return sum(payload_size(op.body) for op in self.ops)
+
+    def summary(self) -> dict[str, Any]:
+        counts: dict[str, int] = {}
+        for op in self.ops:
+            counts[op.action] = counts.get(op.action, 0) + 1
+        full, sent = self.full_bytes, self.sent_bytes
+        return {
+            "operations": counts,
+            "full_bytes": full,
+            "sent_bytes": sent,
+            "bytes_saved": max(0, full - sent),
+        }
+
+
+def _is_collection(element: dict[str, Any]) -> bool:
+    children = element.get("value")
+    return (
+        element.get("modelType") in _COLLECTION_TYPES
+        and isinstance(children, list)
+        and all(isinstance(child, dict) and child.get("idShort") for child in children)
+    )
+
+
+def _diff_level(
+    current: list[dict[str, Any]],
+    desired: list[dict[str, Any]],
+    parent: str,
+    prune: bool,
+    ops: list[ElementOp],
+) -> list[dict[str, Any]]:
+    existing = {
+        element["idShort"]: element
+        for element in current
+        if isinstance(element, dict) and element.get("idShort")
+    }
+    wanted: dict[str, dict[str, Any]] = {}
+    for element in desired:
+        if not isinstance(element, dict) or not element.get("idShort"):
+            raise SubmodelDiffError("Every element needs an idShort")
+        wanted[element["idShort"]] = element
+
+    replaced: dict[str, dict[str, Any]] = {}
+    added: list[dict[str, Any]] = []
+    for id_short, element in wanted.items():
+        path = f"{parent}.{id_short}" if parent else id_short
+        before = existing.get(id_short)
+        if before is None:
+            ops.append(ElementOp("post", parent, element))
+            added.append(element)
+            continue
+        # Elements may be given partially (e.g. only idShort and value).
+        after = {**before, **element}
+        if after == before:
+            continue
+        changed = {key for key in after if after[key] != before.get(key)}
+        if changed == {"value"} and after.get("modelType") in _VALUE_ONLY_TYPES:
+            ops.append(ElementOp("value", path, after["value"]))
+        elif (
+            changed == {"value"}
+            and _is_collection(before)
+            and _is_collection({**after, "modelType": before["modelType"]})
+        ):
+            after["value"] = _diff_level(
+                before["value"], element["value"], path, prune, ops
+            )
+        else:
+            ops.append(ElementOp("put", path, after))
+        replaced[id_short] = after
+
+    merged: list[dict[str, Any]] = []
+    for element in current:
+        id_short = element.get("idShort") if isinstance(element, dict) else None
+        if id_short in replaced:
+            merged.append(replaced[id_short])
+        elif prune and id_short not in wanted:
+            ops.append(
+                ElementOp("delete", f"{parent}.{id_short}" if parent else id_short)
+            )
+        else:
+            merged.append(element)
+    return merged + added
+
+
+def diff_elements(
+    current: list[dict[str, Any]],
+    desired: list[dict[str, Any]],
+    *,
+    prune: bool = False,
+) -> ElementDiff:
+    """Compute the element operations that turn ``current`` into ``desired``.
+
+    Elements are matched by idShort and merged field by field, so a desired
+    element may carry only the fields that change. Property value changes
+    become ``$value`` patches, changed collections are diffed child by child,
+    anything else is replaced whole, and new elements are posted. Elements
+    missing from ``desired`` are kept unless ``prune`` is set, in which case
+    they are deleted.
+    """
+    diff = ElementDiff()
+    diff.merged = _diff_level(current, desired, "", prune, diff.ops)
+    return diff
@@ -0,0 +1,233 @@
+import json
+import threading
+from typing import Any
+
+import pytest
+import requests
+
+from services.shared import basyx_client
+from services.shared.basyx_client import BasyxClient, reset_basyx_state
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Response:
+    def __init__(self, payload: Any, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode() if payload is not None else b""
+
+    def json(self) -> Any:
+        return self._payload
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"status {self.status_code}", response=self)
+
+
+class _FakeBasyx:
+    """Serves the AAS API at the server root, like a BaSyx behind a proxy."""
+
+    def __init__(self, patch_status: int | None = None) -> None:
+        self.calls: list[tuple[str, str]] = []
+        self.patch_status = patch_status
+        self._lock = threading.Lock()
+
+    def __call__(self, *, method: str, url: str, json: Any = None, **_kwargs):
+        with self._lock:
+            self.calls.append((method, url))
+        if "/api/v3.0/" in url:
+            return _Response({"message": "not found"}, status_code=404)
+        if method == "PATCH" and self.patch_status:
+            return _Response(None, status_code=self.patch_status)
+        if method == "GET":
+            return _Response({"result": [{"id": "urn:aas:1"}]})
+        return _Response(json, status_code=201)
+
+
+@pytest.fixture()
+def fake(monkeypatch):
+    reset_basyx_state()
+    server = _FakeBasyx()
+    monkeypatch.setattr(basyx_client, "pooled_request", server)
+    yield server
+    reset_basyx_state()
+
+
+def test_prefix_is_learned_and_reads_are_cached_until_a_write(fake):
+    clock = _Clock()
+    client = BasyxClient("http://basyx:8081", cache_ttl=5, clock=clock)
+
+    first = client.list_shells()
+    first["result"].clear()
+    second = client.list_shells()
+    client.create_shell({"id": "urn:aas:2"})
+    client.list_shells()
+    clock.now += 6
+    client.list_shells()
+
+    # One 404 probe, then every call goes straight to the server root.
+    assert fake.calls == [
+        ("GET", "http://basyx:8081/api/v3.0/shells"),
+        ("GET", "http://basyx:8081/shells"),
+        ("POST", "http://basyx:8081/shells"),
+        ("GET", "http://basyx:8081/shells"),
+        ("GET", "http://basyx:8081/shells"),
+    ]
+    assert second == {"result": [{"id": "urn:aas:1"}]}
+
+
+def test_patch_falls_back_to_put_only_when_patch_is_not_offered(fake):
+    client = BasyxClient("http://basyx:8081", cache_ttl=5)
+    client.get_submodel_elements("sm-1")
+
+    fake.patch_status = 405
+    client.patch_submodel_elements("sm-1", [{"idShort": "a"}])
+    client.patch_submodel_elements("sm-1", [{"idShort": "b"}])
+    client.get_submodel_elements("sm-1")
+
+    methods = [method for method, _url in fake.calls]
+    assert methods == ["GET", "GET", "PATCH", "PUT", "PUT", "GET"]
+
+    fake.patch_status = 409
+    reset_basyx_state()
+    with pytest.raises(requests.HTTPError):
+        client.patch_submodel_elements("sm-1", [])
+    assert fake.calls[-1][0] == "PATCH"
+
+
+def test_batch_creation_keeps_order_and_reports_failures(fake, monkeypatch):
+    original = fake.__call__
+
+    def _failing(*, method: str, url: str, json: Any = None, **kwargs):
+        if json and json.get("id") == "urn:sm:bad":
+            return _Response({"message": "conflict"}, status_code=409)
+        return original(method=method, url=url, json=json, **kwargs)
+
+    monkeypatch.setattr(basyx_client, "pooled_request", _failing)
+    client = BasyxClient("http://basyx:8081", api_prefix="", batch_concurrency=4)
+
+    results = client.create_submodels(
+        [{"id": f"urn:sm:{index}"} for index in range(6)] + [{"id": "urn:sm:bad"}]
+    )
+
+    assert [item["id"] for item in results][:6] == [
+        f"urn:sm:{index}" for index in range(6)
+    ]
+    assert [item["status"] for item in results] == ["created"] * 6 + ["error"]
+
+
+class _ElementServer:
+    """BaSyx submodel with element-level endpoints and ETags."""
+
+    def __init__(self) -> None:
+        self.etag = '"v1"'
+        self.elements = [
+            {"idShort": "Weight", "modelType": "Property", "value": "10"},
+            {"idShort": "Notes", "modelType": "Property", "value": "n" * 2000},
+        ]
+        self.calls: list[tuple[str, str, Any]] = []
+
+    def __call__(self, *, method: str, url: str, json: Any = None, headers=None, **_):
+        self.calls.append((method, url.split("/submodel-elements")[-1], json))
+        if method == "GET":
+            if (headers or {}).get("If-None-Match") == self.etag:
+                return _Response(None, status_code=304)
+            response = _Response({"result": self.elements})
+            response.headers = {"ETag": self.etag}
+            return response
+        return _Response(None, status_code=204)
+
+
+def test_apply_sends_only_changed_elements_and_revalidates_by_etag(monkeypatch):
+    reset_basyx_state()
+    server = _ElementServer()
+    monkeypatch.setattr(basyx_client, "pooled_request", server)
+    client = BasyxClient("http://basyx:8081", api_prefix="", cache_ttl=0)
+
+    unchanged = client.apply_submodel_elements(
+        "sm-1", [{"idShort": "Weight", "value": "10"}]
+    )
+    report = client.apply_submodel_elements(
+        "sm-1", [{"idShort": "Weight", "value": "12"}]
+    )
+
+    assert unchanged["mode"] == "unchanged"
+    assert report["mode"] == "elements"
+    assert report["operations"] == {"value": 1}
+    assert report["sent_bytes"] == len(b'"12"')
+    assert report["bytes_saved"] > 2000
+    assert report["elements"][1]["value"] == "n" * 2000
+    # First read is full, the second is a 304 revalidation; one element write.
+    assert server.calls == [
+        ("GET", "", None),
+        ("GET", "", None),
+        ("PATCH", "/Weight/$value", "12"),
+    ]
+    reset_basyx_state()
+
+
+def test_apply_without_etags_rereads_before_each_diff(monkeypatch):
+    reset_basyx_state()
+    server = _ElementServer()
+    server.etag = ""
+    monkeypatch.setattr(basyx_client, "pooled_request", server)
+    client = BasyxClient("http://basyx:8081", api_prefix="", cache_ttl=60)
+
+    client.apply_submodel_elements("sm-1", [{"idShort": "Weight", "value": "12"}])
+    # Another writer changes the submodel; our last write must not be trusted.
+    server.elements[0]["value"] = "15"
+    report = client.apply_submodel_elements(
+        "sm-1", [{"idShort": "Weight", "value": "12"}]
+    )
+
+    assert report["mode"] == "elements"
+    assert server.calls == [
+        ("GET", "", None),
+        ("PATCH", "/Weight/$value", "12"),
+        ("GET", "", None),
+        ("PATCH", "/Weight/$value", "12"),
+    ]
+    reset_basyx_state()
+
+
+def test_root_prefix_is_learned_only_from_a_successful_response(monkeypatch):
+    reset_basyx_state()
+    calls: list[str] = []
+    root_status = {"value": 401}
+
+    def _server(*, method: str, url: str, json: Any = None, **_kwargs):
+        calls.append(url)
+        if "/api/" in url:
+            return _Response({"message": "not found"}, status_code=404)
+        return _Response({"result": []}, status_code=root_status["value"])
+
+    monkeypatch.setattr(basyx_client, "pooled_request", _server)
+    client = BasyxClient("http://basyx:8081", cache_ttl=0)
+
+    # A 401 at the root says nothing about where the API lives.
+    with pytest.raises(requests.HTTPError) as error:
+        client.list_shells()
+    assert error.value.response.status_code == 404
+    root_status["value"] = 200
+    client.list_shells()
+    client.list_shells()
+    # A client configured with another prefix probes on its own.
+    BasyxClient("http://basyx:8081", api_prefix="/api/v3", cache_ttl=0).list_shells()
+
+    assert calls == [
+        "http://basyx:8081/api/v3.0/shells",
+        "http://basyx:8081/shells",
+        "http://basyx:8081/api/v3.0/shells",
+        "http://basyx:8081/shells",
+        "http://basyx:8081/shells",
+        "http://basyx:8081/api/v3/shells",
+        "http://basyx:8081/shells",
+    ]
+    reset_basyx_state()
@@ -0,0 +1,71 @@
+from services.shared.claims_cache import ClaimsCache, token_key
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+
+    def get(self, key: str):
+        return self.values.get(key)
+
+    def set(self, key: str, value: str, ex: int | None = None):
+        self.values[key] = value
+        self.ttls[key] = ex
+        return True
+
+
+def test_entries_expire_at_token_exp_and_lru_is_bounded():
+    clock = _Clock()
+    cache = ClaimsCache(2, clock=clock)
+    cache.put(token_key("a"), {"sub": "a", "exp": 1060})
+    cache.put(token_key("b"), {"sub": "b", "exp": 2000})
+    cache.put(token_key("no-exp"), {"sub": "x"})
+
+    assert cache.get(token_key("a"))["sub"] == "a"
+    cache.put(token_key("c"), {"sub": "c", "exp": 2000})
+    # "b" was least recently used.
+    assert cache.get(token_key("b")) is None
+    assert cache.get(token_key("no-exp")) is None
+
+    clock.now = 1060
+    assert cache.get(token_key("a")) is None
+    assert cache.get(token_key("c"))["sub"] == "c"
+
+
+def test_redis_tier_shares_claims_between_processes():
+    clock = _Clock()
+    redis = _FakeRedis()
+    first = ClaimsCache(8, redis_client=redis, clock=clock)
+    second = ClaimsCache(8, redis_client=redis, clock=clock)
+    key = token_key("shared-token")
+
+    first.put(key, {"sub": "u-1", "exp": 1300})
+
+    assert redis.ttls == {f"dpp:auth:claims:{key}": 300}
+    assert second.get(key) == {"sub": "u-1", "exp": 1300}
+    redis.values.clear()
+    # Promoted into the local tier on the Redis hit.
+    assert second.get(key) == {"sub": "u-1", "exp": 1300}
+
+
+def test_redis_errors_count_as_misses():
+    class _Broken:
+        def get(self, key):
+            raise ConnectionError("down")
+
+        def set(self, *args, **kwargs):
+            raise ConnectionError("down")
+
+    cache = ClaimsCache(8, redis_client=_Broken(), clock=_Clock())
+    cache.put(token_key("t"), {"sub": "u", "exp": 2000})
+    assert cache.get(token_key("t"))["sub"] == "u"
+    assert cache.get(token_key("other")) is None
@@ -0,0 +1,134 @@
+import copy
+
+import pytest
+
+from services.shared.json_patch import JsonPatchError, apply_patch
+
+
+@pytest.mark.parametrize(
+    ("document", "patch", "expected"),
+    [
+        # RFC 6902 appendix A examples.
+        (
+            {"foo": "bar"},
+            [{"op": "add", "path": "/baz", "value": "qux"}],
+            {"baz": "qux", "foo": "bar"},
+        ),
+        (
+            {"foo": ["bar", "baz"]},
+            [{"op": "add", "path": "/foo/1", "value": "qux"}],
+            {"foo": ["bar", "qux", "baz"]},
+        ),
+        (
+            {"baz": "qux", "foo": "bar"},
+            [{"op": "remove", "path": "/baz"}],
+            {"foo": "bar"},
+        ),
+        (
+            {"foo": ["bar", "qux", "baz"]},
+            [{"op": "remove", "path": "/foo/1"}],
+            {"foo": ["bar", "baz"]},
+        ),
+        (
+            {"baz": "qux", "foo": "bar"},
+            [{"op": "replace", "path": "/baz", "value": "boo"}],
+            {"baz": "boo", "foo": "bar"},
+        ),
+        (
+            {"foo": {"bar": "baz", "waldo": "fred"}, "qux": {"corge": "grault"}},
+            [{"op": "move", "from": "/foo/waldo", "path": "/qux/thud"}],
+            {"foo": {"bar": "baz"}, "qux": {"corge": "grault", "thud": "fred"}},
+        ),
+        (
+            {"foo": ["all", "grass", "cows", "eat"]},
+            [{"op": "move", "from": "/foo/1", "path": "/foo/3"}],
+            {"foo": ["all", "cows", "eat", "grass"]},
+        ),
+        (
+            {"baz": "qux", "foo": ["a", 2, "c"]},
+            [
+                {"op": "test", "path": "/baz", "value": "qux"},
+                {"op": "test", "path": "/foo/1", "value": 2},
+            ],
+            {"baz": "qux", "foo": ["a", 2, "c"]},
+        ),
+        (
+            {"foo": "bar"},
+            [{"op": "add", "path": "/child", "value": {"grandchild": {}}}],
+            {"foo": "bar", "child": {"grandchild": {}}},
+        ),
+        (
+            {"foo": ["bar"]},
+            [{"op": "add", "path": "/foo/-", "value": ["abc", "def"]}],
+            {"foo": ["bar", ["abc", "def"]]},
+        ),
+        (
+            {"/": 9, "~1": 10},
+            [{"op": "test", "path": "/~01", "value": 10}],
+            {"/": 9, "~1": 10},
+        ),
+        (
+            {"foo": None},
+            [{"op": "add", "path": "/bar", "value": None}],
+            {"foo": None, "bar": None},
+        ),
+    ],
+)
+def test_rfc6902_examples(document, patch, expected):
+    assert apply_patch(document, patch).document == expected
+
+
+@pytest.mark.parametrize(
+    ("document", "patch"),
+    [
+        ({"baz": "qux"}, [{"op": "test", "path": "/baz", "value": "bar"}]),
+        ({"foo": "bar"}, [{"op": "add", "path": "/baz/bat", "value": "qux"}]),
+        ({"foo": [1]}, [{"op": "add", "path": "/foo/01", "value": 2}]),
+        ({"foo": [1]}, [{"op": "replace", "path": "/foo/1", "value": 2}]),
+        ({"foo": 1}, [{"op": "test", "path": "/foo", "value": True}]),
+        ({"a": {"b": 1}}, [{"op": "move", "from": "/a", "path": "/a/c"}]),
+        ({"a": 1}, [{"op": "add", "path": "a", "value": 2}]),
+        ({"a": 1}, [{"op": "replace", "path": "/a"}]),
+        ({"a": 1}, [{"op": "frobnicate", "path": "/a"}]),
+    ],
+)
+def test_invalid_operations_raise_and_leave_input_untouched(document, patch):
+    before = copy.deepcopy(document)
+    with pytest.raises(JsonPatchError):
+        apply_patch(document, patch)
+    assert document == before
+
+
+def test_copy_on_write_shares_untouched_subtrees_and_reports_paths():
+    document = {
+        "battery": {"weight": 5, "cells": [{"id": 1}, {"id": 2}]},
+        "passport": {"sections": {"carbon": {"kg": 80}}},
+    }
+    before = copy.deepcopy(document)
+
+    result = apply_patch(
+        document,
+        [
+            {"op": "replace", "path": "/battery/cells/1/id", "value": 3},
+            {"op": "copy", "from": "/battery/cells/1", "path": "/spare"},
+            {"op": "add", "path": "/spare/id", "value": 9},
+            {"op": "move", "from": "/battery/weight", "path": "/weight"},
+        ],
+    )
+
+    assert document == before
+    patched = result.document
+    assert patched["battery"]["cells"] == [{"id": 1}, {"id": 3}]
+    assert patched["spare"] == {"id": 9}
+    assert patched["weight"] == 5
+    # Untouched subtrees are the same objects, touched spines are copies.
+    assert patched["passport"] is document["passport"]
+    assert patched["battery"]["cells"][0] is document["battery"]["cells"][0]
+    assert patched["battery"] is not document["battery"]
+    assert result.touched == [
+        "/battery/cells/1/id",
+        "/spare",
+        "/spare/id",
+        "/battery/weight",
+        "/weight",
+    ]
@@ -0,0 +1,115 @@
+import threading
+import time
+
+from services.shared.service_token import ServiceTokenManager
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _wait_until(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_concurrent_callers_share_one_token_request():
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(1)
+        return f"token-{len(calls)}", 300
+
+    manager = ServiceTokenManager("test", fetch)
+    results: list[str | None] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(manager.get_token()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: len(calls) == 1)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["token-1"] * 8
+    assert manager.get_token() == "token-1"
+
+
+def test_token_is_refreshed_in_background_before_expiry():
+    clock = _Clock()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return f"token-{len(calls)}", 60
+
+    manager = ServiceTokenManager("test", fetch, refresh_margin_seconds=30, clock=clock)
+    assert manager.get_token() == "token-1"
+
+    clock.now += 45
+    # Still valid: served immediately while the refresh runs off-thread.
+    assert manager.get_token() == "token-1"
+    _wait_until(lambda: len(calls) == 2)
+    _wait_until(lambda: manager.get_token() == "token-2")
+
+    assert manager.get_token() == "token-2"
+    assert len(calls) == 2
+
+
+def test_failures_are_cached_with_exponential_backoff():
+    clock = _Clock()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        raise ConnectionError("keycloak down")
+
+    manager = ServiceTokenManager(
+        "test", fetch, min_backoff_seconds=2, max_backoff_seconds=8, clock=clock
+    )
+    assert manager.get_token() is None
+    assert manager.get_token() is None
+    assert len(calls) == 1
+
+    clock.now += 2.1
+    assert manager.get_token() is None
+    assert len(calls) == 2
+
+    # Second failure doubles the backoff window.
+    clock.now += 2.1
+    assert manager.get_token() is None
+    assert len(calls) == 2
+    clock.now += 2.1
+    assert manager.get_token() is None
+    assert len(calls) == 3
+
+
+def test_success_after_outage_resets_backoff_and_invalidate_forces_refetch():
+    clock = _Clock()
+    outcomes = [ConnectionError("down"), ("token-a", 120), ("token-b", 120)]
+
+    def fetch():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    manager = ServiceTokenManager("test", fetch, min_backoff_seconds=1, clock=clock)
+    assert manager.get_token() is None
+    clock.now += 1.5
+    assert manager.get_token() == "token-a"
+
+    manager.invalidate()
+    assert manager.get_token() == "token-b"
+    assert outcomes == []
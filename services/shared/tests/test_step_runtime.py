@@ -0,0 +1,121 @@
+import asyncio
+import threading
+
+from services.shared.step_runtime import StepRuntime
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_sync_and_async_handlers_share_one_result_shape():
+    runtime = StepRuntime("test", default_timeout=None)
+
+    def _sync(db, params, payload, context, metadata, headers):
+        return {"status": "ok", "data": {"caller": threading.current_thread().name}}
+
+    async def _async(db, params, payload, context, metadata, headers):
+        await asyncio.sleep(0)
+        return {"status": "ok", "data": {"headers": headers}}
+
+    runtime.register("local.sync", _sync)
+    runtime.register("remote.async", _async, timeout=1)
+
+    inline = runtime.execute(None, "local.sync", {}, {}, {})
+    awaited = runtime.execute(None, "remote.async", {}, {}, {}, headers={"X-A": "1"})
+    from_loop = asyncio.run(runtime.execute_async(None, "local.sync", {}, {}, {}))
+    unknown = runtime.execute(None, "missing", {}, {}, {})
+
+    assert inline["data"]["caller"] == threading.current_thread().name
+    assert inline["message"] == "Step 'local.sync' finished with status 'ok'"
+    assert awaited["data"]["headers"] == {"X-A": "1"}
+    # From a coroutine, sync handlers never block the event loop.
+    assert from_loop["data"]["caller"].startswith("test-steps")
+    assert unknown["status"] == "unknown_action"
+    assert runtime.actions() == ["local.sync", "remote.async"]
+
+
+def test_slow_plugins_time_out_and_failures_become_error_results():
+    runtime = StepRuntime("test")
+    release = threading.Event()
+
+    def _slow(db, params, payload, context, metadata, headers):
+        release.wait(5)
+        return {"status": "ok"}
+
+    async def _slow_async(db, params, payload, context, metadata, headers):
+        await asyncio.sleep(5)
+
+    def _broken(db, params, payload, context, metadata, headers):
+        raise RuntimeError("boom")
+
+    runtime.register("slow", _slow, timeout=0.05)
+    runtime.register("slow.async", _slow_async, timeout=0.05)
+    runtime.register("broken", _broken, timeout=None)
+
+    try:
+        slow = runtime.execute(None, "slow", {}, {}, {})
+        slow_async = runtime.execute(None, "slow.async", {}, {}, {})
+    finally:
+        release.set()
+    broken = runtime.execute(None, "broken", {}, {}, {})
+
+    assert slow["status"] == "timeout"
+    assert slow_async["status"] == "timeout"
+    assert broken == {
+        "status": "error",
+        "message": "Step execution failed for 'broken'",
+        "error": "boom",
+    }
+
+
+def test_only_inline_plugins_receive_the_callers_session():
+    runtime = StepRuntime("test")
+    session = object()
+
+    def _sees(db, params, payload, context, metadata, headers):
+        return {"status": "ok", "data": {"has_session": db is session}}
+
+    runtime.register("inline", _sees, timeout=None)
+    runtime.register("pooled", _sees, timeout=1)
+
+    inline = runtime.execute(session, "inline", {}, {}, {})
+    pooled = runtime.execute(session, "pooled", {}, {}, {})
+    from_loop = asyncio.run(runtime.execute_async(session, "pooled", {}, {}, {}))
+
+    assert inline["data"] == {"has_session": True}
+    # An abandoned handler must not keep using the request's session.
+    assert pooled["data"] == {"has_session": False}
+    assert from_loop["data"] == {"has_session": False}
+
+
+def test_idempotent_results_are_cached_per_input_until_they_expire():
+    clock = _Clock()
+    runtime = StepRuntime("test", default_timeout=None, cache_ttl=10, clock=clock)
+    calls: list[dict] = []
+
+    def _check(db, params, payload, context, metadata, headers):
+        calls.append(payload)
+        if payload.get("fail"):
+            return {"status": "error", "error": "upstream down"}
+        return {"status": "compliant", "data": {"checked": payload["id"]}}
+
+    runtime.register("check", _check, idempotent=True)
+
+    first = runtime.execute(None, "check", {}, {"id": 1}, {"request_id": "a"})
+    first["data"]["checked"] = "mutated by caller"
+    again = runtime.execute(None, "check", {}, {"id": 1}, {"request_id": "b"})
+    other_session = runtime.execute(None, "check", {}, {"id": 1}, {"session_id": "s"})
+    runtime.execute(None, "check", {}, {"fail": True}, {})
+    runtime.execute(None, "check", {}, {"fail": True}, {})
+    clock.now += 11
+    runtime.execute(None, "check", {}, {"id": 1}, {})
+
+    assert again["data"] == {"checked": 1}
+    assert other_session["status"] == "compliant"
+    # Request ids do not split the cache; sessions do; errors are not cached.
+    assert calls == [{"id": 1}, {"id": 1}, {"fail": True}, {"fail": True}, {"id": 1}]
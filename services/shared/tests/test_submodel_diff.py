@@ -0,0 +1,92 @@
+import pytest
+
+from services.shared.submodel_diff import (
+    ElementOp,
+    SubmodelDiffError,
+    diff_elements,
+)
+
+CURRENT = [
+    {"idShort": "ManufacturerName", "modelType": "Property", "value": "ACME"},
+    {
+        "idShort": "Address",
+        "modelType": "SubmodelElementCollection",
+        "value": [
+            {"idShort": "Street", "modelType": "Property", "value": "Main"},
+            {"idShort": "City", "modelType": "Property", "value": "Berlin"},
+        ],
+    },
+    {
+        "idShort": "Markings",
+        "modelType": "SubmodelElementList",
+        "value": [{"modelType": "Property", "value": "CE"}],
+    },
+    {"idShort": "Legacy", "modelType": "Property", "value": "x"},
+]
+
+
+def test_diff_emits_minimal_element_operations():
+    diff = diff_elements(
+        CURRENT,
+        [
+            {"idShort": "ManufacturerName", "value": "ACME GmbH"},
+            {
+                "idShort": "Address",
+                "value": [{"idShort": "City", "value": "Hamburg"}],
+            },
+            {
+                "idShort": "Markings",
+                "value": [{"modelType": "Property", "value": "UKCA"}],
+            },
+            {"idShort": "Serial", "modelType": "Property", "value": "42"},
+        ],
+    )
+
+    assert diff.ops == [
+        ElementOp("value", "ManufacturerName", "ACME GmbH"),
+        ElementOp("value", "Address.City", "Hamburg"),
+        ElementOp(
+            "put",
+            "Markings",
+            {
+                "idShort": "Markings",
+                "modelType": "SubmodelElementList",
+                "value": [{"modelType": "Property", "value": "UKCA"}],
+            },
+        ),
+        ElementOp(
+            "post", "", {"idShort": "Serial", "modelType": "Property", "value": "42"}
+        ),
+    ]
+    # Unmentioned elements are kept; Street survives the Address change.
+    assert [element["idShort"] for element in diff.merged] == [
+        "ManufacturerName",
+        "Address",
+        "Markings",
+        "Legacy",
+        "Serial",
+    ]
+    assert diff.merged[1]["value"][0]["value"] == "Main"
+    summary = diff.summary()
+    assert summary["operations"] == {"value": 2, "put": 1, "post": 1}
+    assert summary["bytes_saved"] == summary["full_bytes"] - summary["sent_bytes"] > 0
+
+
+def test_unchanged_and_pruned_lists():
+    assert diff_elements(CURRENT, [dict(CURRENT[0])]).ops == []
+
+    pruned = diff_elements(CURRENT, [CURRENT[0]], prune=True)
+    assert pruned.ops == [
+        ElementOp("delete", "Address"),
+        ElementOp("delete", "Markings"),
+        ElementOp("delete", "Legacy"),
+    ]
+    assert pruned.merged == [CURRENT[0]]
+    assert pruned.ops[0].request("sm-1") == (
+        "DELETE",
+        "submodels/sm-1/submodel-elements/Address",
+        None,
+    )
+
+    with pytest.raises(SubmodelDiffError):
+        diff_elements(CURRENT, [{"value": "no idShort"}])
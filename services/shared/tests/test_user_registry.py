@@ -0,0 +1,94 @@
+from uuid import UUID
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from services.shared.models.user import User
+from services.shared.user_registry import resolve_user_id, resolve_user_ids
+
+
+@pytest.fixture()
+def db_and_statements():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    User.__table__.create(bind=engine)
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session, statements
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _insert_user(db, user_id: str, keycloak_id: str | None, email: str | None) -> None:
+    db.add(User(id=UUID(user_id), keycloak_id=keycloak_id, email=email))
+    db.commit()
+
+
+def test_resolve_user_id_creates_once_then_serves_from_cache(db_and_statements):
+    db, statements = db_and_statements
+    token = {"sub": "kc-1", "email": "one@example.com", "name": "One"}
+
+    user_id = resolve_user_id(db, token)
+    created = list(statements)
+    assert any("ON CONFLICT DO NOTHING" in sql for sql in created)
+
+    statements.clear()
+    assert resolve_user_id(db, token) == user_id
+    assert statements == []
+    assert db.query(User).count() == 1
+
+
+def test_resolve_user_id_links_existing_email_account(db_and_statements):
+    db, _ = db_and_statements
+    _insert_user(db, "6f1c2a4e-9d3b-4c1a-8e7f-1a2b3c4d5e6f", None, "a@b.c")
+
+    user_id = resolve_user_id(db, {"sub": "kc-new", "email": "a@b.c"})
+
+    assert user_id == "6f1c2a4e-9d3b-4c1a-8e7f-1a2b3c4d5e6f"
+    assert db.query(User).filter(User.keycloak_id == "kc-new").count() == 1
+
+
+def test_resolve_user_id_never_rebinds_a_linked_account(db_and_statements):
+    db, _ = db_and_statements
+    _insert_user(db, "6f1c2a4e-9d3b-4c1a-8e7f-1a2b3c4d5e6f", "kc-owner", "a@b.c")
+
+    user_id = resolve_user_id(db, {"sub": "kc-other", "email": "a@b.c"})
+
+    assert user_id != "6f1c2a4e-9d3b-4c1a-8e7f-1a2b3c4d5e6f"
+    owner = db.get(User, UUID("6f1c2a4e-9d3b-4c1a-8e7f-1a2b3c4d5e6f"))
+    assert owner.keycloak_id == "kc-owner"
+
+
+def test_resolve_user_ids_batches_lookups(db_and_statements):
+    db, statements = db_and_statements
+    existing = resolve_user_id(db, {"sub": "kc-cached"})
+    _insert_user(db, "a7d9e0f1-2b3c-4d5e-9f60-718293a4b5c6", "kc-stored", None)
+    statements.clear()
+
+    resolved = resolve_user_ids(
+        db,
+        [
+            {"sub": "kc-cached"},
+            {"sub": "kc-stored"},
+            {"sub": "kc-stored"},
+            {"sub": "kc-fresh"},
+            None,
+        ],
+    )
+
+    assert resolved["kc-cached"] == existing
+    assert resolved["kc-stored"] == "a7d9e0f1-2b3c-4d5e-9f60-718293a4b5c6"
+    assert set(resolved) == {"kc-cached", "kc-stored", "kc-fresh"}
+    # One IN query for the stored user, then lookup + upsert for the new one.
+    assert sum(" IN (" in sql for sql in statements) == 1
+    assert sum("INSERT INTO users" in sql for sql in statements) == 1
@@ -1,12 +1,114 @@
 from __future__ import annotations
 
-from typing import Optional
+import threading
+import weakref
+from typing import Any, Iterable, Optional
 from uuid import uuid4
 
-from sqlalchemy import text
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import String, Uuid, bindparam, text
 from sqlalchemy.orm import Session
 
+from .env import int_from_env
+from .metrics import build_counter, build_gauge
+from .ttl_cache import TtlLruCache
+
+USER_ID_CACHE_LOOKUPS = build_counter(
+    "dpp_user_id_cache_total",
+    "Keycloak id to user id cache lookups by result",
+    ["result"],
+)
+USER_ID_CACHE_HIT_RATIO = build_gauge(
+    "dpp_user_id_cache_hit_ratio",
+    "Share of user id resolutions answered from the process cache",
+    [],
+)
+
+# Typed so ids round-trip the same way the ORM stores them on every dialect.
+_SELECT_BY_KEYCLOAK_ID = text("SELECT id FROM users WHERE keycloak_id = :kid").columns(
+    id=Uuid()
+)
+_SELECT_BY_KEYCLOAK_ID_OR_EMAIL = text(
+    "SELECT id, keycloak_id FROM users "
+    "WHERE keycloak_id = :kid OR (email = :email AND keycloak_id IS NULL)"
+).columns(id=Uuid(), keycloak_id=String())
+_SELECT_MANY_BY_KEYCLOAK_ID = (
+    text("SELECT id, keycloak_id FROM users WHERE keycloak_id IN :kids")
+    .bindparams(bindparam("kids", expanding=True))
+    .columns(id=Uuid(), keycloak_id=String())
+)
+_LINK_KEYCLOAK_ID = text(
+    "UPDATE users SET keycloak_id = :kid WHERE id = :id AND keycloak_id IS NULL"
+).bindparams(bindparam("id", type_=Uuid()))
+_UPSERT_USER = (
+    text(
+        "INSERT INTO users (id, keycloak_id, email, display_name) "
+        "VALUES (:id, :kid, :email, :display_name) "
+        "ON CONFLICT DO NOTHING RETURNING id"
+    )
+    .bindparams(bindparam("id", type_=Uuid()))
+    .columns(id=Uuid())
+)
+
+
+class _IdentityCache:
+    """LRU of keycloak id -> user id with a TTL, plus hit-rate bookkeeping."""
+
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        self._ttl = ttl_seconds
+        self._entries: TtlLruCache[str, str] = TtlLruCache(maxsize)
+
+    def get(self, keycloak_id: str) -> str | None:
+        user_id = self._entries.get(keycloak_id)
+        _record_lookup(user_id is not None)
+        return user_id
+
+    def put(self, keycloak_id: str, user_id: str) -> None:
+        self._entries.put(keycloak_id, user_id, ttl=self._ttl)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_stats = {"hits": 0, "lookups": 0}
+_stats_lock = threading.Lock()
+
+
+def _record_lookup(hit: bool) -> None:
+    USER_ID_CACHE_LOOKUPS.labels(result="hit" if hit else "miss").inc()
+    with _stats_lock:
+        _stats["lookups"] += 1
+        if hit:
+            _stats["hits"] += 1
+        ratio = _stats["hits"] / _stats["lookups"]
+    USER_ID_CACHE_HIT_RATIO.set(ratio)
+
+
+# One cache per engine, so ids never leak between databases (tests create a
+# fresh engine per case) and disposed engines take their entries with them.
+_caches: "weakref.WeakKeyDictionary[Any, _IdentityCache]" = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def _cache_for(db: Session) -> _IdentityCache:
+    bind = db.get_bind()
+    engine = getattr(bind, "engine", bind)
+    with _caches_lock:
+        cache = _caches.get(engine)
+        if cache is None:
+            cache = _IdentityCache(
+                int_from_env("USER_ID_CACHE_SIZE", 10000, minimum=1),
+                int_from_env("USER_ID_CACHE_TTL_SECONDS", 300, minimum=1),
+            )
+            _caches[engine] = cache
+    return cache
+
+
+def clear_user_id_cache() -> None:
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
+
 
 def _truncate(value: str | None, limit: int) -> str | None:
     if value is None:
@@ -25,69 +127,95 @@ def _extract_keycloak_id(token: dict | None) -> str | None:
     )
 
 
-def resolve_user_id(db: Session, token: dict | None) -> Optional[str]:
+def _normalized_keycloak_id(token: dict | None) -> str | None:
     keycloak_id = _extract_keycloak_id(token)
     if not keycloak_id:
         return None
-    keycloak_id = _truncate(str(keycloak_id), 255) or None
-    if not keycloak_id:
-        return None
+    return _truncate(str(keycloak_id), 255) or None
+
 
-    email = token.get("email") if token else None
+def _create_or_link_user(db: Session, token: dict, keycloak_id: str) -> str:
+    email = token.get("email")
     email = _truncate(email, 255) if email else None
     display_name = (
-        (token.get("name") if token else None)
-        or (token.get("preferred_username") if token else None)
-        or email
-        or keycloak_id
+        token.get("name") or token.get("preferred_username") or email or keycloak_id
     )
     display_name = _truncate(display_name, 255) or keycloak_id
 
+    # One round trip answers both "known under this keycloak id" and "known
+    # under this email from before the account was linked". Accounts already
+    # linked to another keycloak id are never rebound.
+    rows = db.execute(
+        _SELECT_BY_KEYCLOAK_ID_OR_EMAIL, {"kid": keycloak_id, "email": email}
+    ).all()
+    for row in rows:
+        if row[1] == keycloak_id:
+            return str(row[0])
+    if rows:
+        user_id = rows[0][0]
+        linked = db.execute(_LINK_KEYCLOAK_ID, {"kid": keycloak_id, "id": user_id})
+        db.commit()
+        if linked.rowcount:
+            return str(user_id)
+        # A concurrent login linked the account first; fall through.
+
     row = db.execute(
-        text("SELECT id FROM users WHERE keycloak_id = :kid"),
-        {"kid": keycloak_id},
+        _UPSERT_USER,
+        {
+            "id": uuid4(),
+            "kid": keycloak_id,
+            "email": email or _truncate(f"{keycloak_id}@local", 255),
+            "display_name": display_name,
+        },
     ).first()
+    db.commit()
     if row:
         return str(row[0])
+    # Lost the race to a concurrent request creating the same user.
+    row = db.execute(_SELECT_BY_KEYCLOAK_ID, {"kid": keycloak_id}).first()
+    if row is None:
+        raise LookupError(f"User {keycloak_id!r} could not be created")
+    return str(row[0])
 
-    if email:
-        row = db.execute(text("SELECT id FROM users WHERE email = :email"), {"email": email}).first()
-        if row:
-            db.execute(
-                text("UPDATE users SET keycloak_id = :kid WHERE id = :id"),
-                {"kid": keycloak_id, "id": row[0]},
-            )
-            db.commit()
-            return str(row[0])
 
-    user_id = uuid4()
-    if not email:
-        email = _truncate(f"{keycloak_id}@local", 255)
-    try:
-        db.execute(
-            text(
-                "INSERT INTO users (id, keycloak_id, email, display_name) "
-                "VALUES (:id, :kid, :email, :display_name)"
-            ),
-            {
-                "id": user_id,
-                "kid": keycloak_id,
-                "email": email,
-                "display_name": display_name,
-            },
-        )
-        db.commit()
-        return str(user_id)
-    except IntegrityError:
-        db.rollback()
-        row = db.execute(
-            text("SELECT id FROM users WHERE keycloak_id = :kid"),
-            {"kid": keycloak_id},
-        ).first()
-        if row:
-            return str(row[0])
-        if email:
-            row = db.execute(text("SELECT id FROM users WHERE email = :email"), {"email": email}).first()
-            if row:
-                return str(row[0])
-        raise
+def resolve_user_id(db: Session, token: dict | None) -> Optional[str]:
+    keycloak_id = _normalized_keycloak_id(token)
+    if not keycloak_id:
+        return None
+    cache = _cache_for(db)
+    user_id = cache.get(keycloak_id)
+    if user_id is None:
+        user_id = _create_or_link_user(db, token, keycloak_id)
+        cache.put(keycloak_id, user_id)
+    return user_id
+
+
+def resolve_user_ids(db: Session, tokens: Iterable[dict | None]) -> dict[str, str]:
+    """Resolve many tokens to user ids, keyed by keycloak id.
+
+    Cached ids are served from memory, the rest is read with a single
+    ``IN`` query, and only users that do not exist yet are created one by one.
+    """
+    pending: dict[str, dict] = {}
+    resolved: dict[str, str] = {}
+    cache = _cache_for(db)
+    for token in tokens:
+        keycloak_id = _normalized_keycloak_id(token)
+        if not keycloak_id or keycloak_id in resolved or keycloak_id in pending:
+            continue
+        user_id = cache.get(keycloak_id)
+        if user_id is None:
+            pending[keycloak_id] = token
+        else:
+            resolved[keycloak_id] = user_id
+
+    if pending:
+        for row in db.execute(_SELECT_MANY_BY_KEYCLOAK_ID, {"kids": list(pending)}):
+            keycloak_id = row[1]
+            resolved[keycloak_id] = str(row[0])
+            cache.put(keycloak_id, resolved[keycloak_id])
+            pending.pop(keycloak_id, None)
+        for keycloak_id, token in pending.items():
+            resolved[keycloak_id] = _create_or_link_user(db, token, keycloak_id)
+            cache.put(keycloak_id, resolved[keycloak_id])
+    return resolved
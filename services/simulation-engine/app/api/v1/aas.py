@@ -1,16 +1,33 @@
 from __future__ import annotations
 
 import os
+import re
+from functools import partial
 from pathlib import Path
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 import requests
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from ...auth import require_roles
 from ...config import AAS_ADAPTER_URL, EVENT_STREAM_MAXLEN, REDIS_URL
-from ...core.aasx_storage import store_aasx_payload
+from ...core.aasx_manifest import ManifestError, find_file, read_file_range
+from ...core.aasx_storage import (
+    read_stored_range,
+    store_aasx_payload,
+    store_aasx_stream,
+)
 from ...core.db import get_db
 from ...models.dpp_instance import DppInstance
 from ...models.validation_result import ValidationResult
@@ -28,6 +45,8 @@ from services.shared.user_registry import resolve_user_id
 router = APIRouter()
 
 TRACE_HEADERS = ("traceparent", "tracestate", "baggage")
+ALL_ROLES = ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"]
+_BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
 
 
 def _mark_deprecated(response: Response, successor_path: str) -> None:
@@ -222,18 +241,9 @@ def patch_submodel_elements(
     }
 
 
-@router.post("/aasx/upload")
-def upload_aasx(
-    request: Request, payload: AasxUploadRequest, db: Session = Depends(get_db)
-):
-    require_roles(request.state.user, ["manufacturer", "developer", "admin"])
-    stored = store_aasx_payload(
-        db=db,
-        session_id=payload.session_id,
-        filename=payload.filename,
-        content_base64=payload.content_base64,
-        metadata={"source": "api"},
-    )
+def _emit_aasx_uploaded(
+    request: Request, db: Session, session_id: str | None, metadata: dict
+) -> None:
     user_id = resolve_user_id(db, request.state.user)
     emit_event(
         db,
@@ -243,11 +253,154 @@ def upload_aasx(
             user_id=user_id or "",
             source_service="simulation-engine",
             request_id=getattr(request.state, "request_id", None),
-            session_id=payload.session_id,
-            metadata={"source": "api"},
+            session_id=session_id,
+            metadata=metadata,
         ),
         redis_url=REDIS_URL,
         maxlen=EVENT_STREAM_MAXLEN,
         commit=True,
     )
+
+
+@router.post("/aasx/upload")
+def upload_aasx(
+    request: Request, payload: AasxUploadRequest, db: Session = Depends(get_db)
+):
+    require_roles(request.state.user, ["manufacturer", "developer", "admin"])
+    stored = store_aasx_payload(
+        db=db,
+        session_id=payload.session_id,
+        filename=payload.filename,
+        content_base64=payload.content_base64,
+        metadata={"source": "api"},
+    )
+    _emit_aasx_uploaded(request, db, payload.session_id, {"source": "api"})
     return {"status": "stored", "storage": stored}
+
+
+@router.post("/aasx/files")
+def upload_aasx_file(
+    request: Request,
+    file: UploadFile = File(...),
+    session_id: str | None = Form(None),
+    db: Session = Depends(get_db),
+):
+    """Store a ``multipart/form-data`` AASX upload without buffering it.
+
+    The form parser spools the part to a temporary file, which is then hashed
+    and copied to storage chunk by chunk.
+    """
+    require_roles(request.state.user, ["manufacturer", "developer", "admin"])
+    metadata = {"source": "multipart"}
+    try:
+        stored = store_aasx_stream(
+            db=db,
+            session_id=session_id,
+            filename=file.filename or "upload.aasx",
+            source=file.file,
+            metadata=metadata,
+        )
+    finally:
+        file.file.close()
+    _emit_aasx_uploaded(request, db, session_id, metadata)
+    return {
+        "status": "stored",
+        "filename": stored.get("filename"),
+        "bytes": stored.get("bytes"),
+        "sha256": stored.get("sha256"),
+        "deduplicated": stored.get("deduplicated", False),
+        "storage": stored,
+    }
+
+
+def _indexed_instance(db: Session, dpp_id: str) -> DppInstance:
+    try:
+        instance_id = UUID(dpp_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail="DPP instance not found") from exc
+    instance = db.query(DppInstance).filter(DppInstance.id == instance_id).first()
+    if instance is None:
+        raise HTTPException(status_code=404, detail="DPP instance not found")
+    manifest = instance.aasx_manifest
+    if not manifest:
+        raise HTTPException(status_code=404, detail="No indexed AASX package")
+    if manifest.get("error"):
+        raise HTTPException(status_code=422, detail=manifest["error"])
+    return instance
+
+
+def _byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Parse a single ``Range: bytes=`` spec into inclusive bounds."""
+    if not header:
+        return None
+    match = _BYTE_RANGE.match(header.strip())
+    if match is None or not any(match.groups()):
+        raise HTTPException(status_code=416, detail="Unsupported range")
+    first, last = match.groups()
+    if not first:
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise HTTPException(status_code=416, detail="Range not satisfiable")
+    return start, end
+
+
+@router.get("/aasx/{dpp_id}/submodels")
+def list_aasx_submodels(request: Request, dpp_id: str, db: Session = Depends(get_db)):
+    require_roles(request.state.user, ALL_ROLES)
+    manifest = _indexed_instance(db, dpp_id).aasx_manifest
+    return {
+        "shells": manifest.get("shells", []),
+        "items": manifest.get("submodels", []),
+        "total": len(manifest.get("submodels", [])),
+    }
+
+
+@router.get("/aasx/{dpp_id}/files")
+def list_aasx_files(request: Request, dpp_id: str, db: Session = Depends(get_db)):
+    require_roles(request.state.user, ALL_ROLES)
+    manifest = _indexed_instance(db, dpp_id).aasx_manifest
+    files = [
+        {key: entry.get(key) for key in ("path", "size", "content_type", "role")}
+        for entry in manifest.get("files", [])
+    ]
+    return {"items": files, "total": len(files)}
+
+
+@router.get("/aasx/{dpp_id}/files/{path:path}")
+def read_aasx_file(
+    request: Request, dpp_id: str, path: str, db: Session = Depends(get_db)
+):
+    """Serve one packaged file, or a byte range of it, from the stored package.
+
+    Only the bytes of that file are read from storage, located through the
+    manifest offsets recorded at upload.
+    """
+    require_roles(request.state.user, ALL_ROLES)
+    instance = _indexed_instance(db, dpp_id)
+    try:
+        entry = find_file(instance.aasx_manifest, path)
+    except ManifestError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    size = entry["size"]
+    headers = {"Accept-Ranges": "bytes"}
+    requested = _byte_range(request.headers.get("range"), size)
+    if size == 0:
+        return Response(
+            status_code=200, headers=headers, media_type=entry["content_type"]
+        )
+    start, end = requested or (0, size - 1)
+    if requested:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    body = read_file_range(
+        partial(read_stored_range, instance.aasx_object_key), entry, start, end
+    )
+    return StreamingResponse(
+        body,
+        status_code=206 if requested else 200,
+        headers=headers,
+        media_type=entry["content_type"],
+    )
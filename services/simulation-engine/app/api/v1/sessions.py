@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
 from ...auth import require_roles
@@ -13,7 +13,13 @@ from ...core.session_state import (
     get_lifecycle_state,
     set_lifecycle_state,
 )
-from ...schemas.session_schema import SessionCreate, SessionResponse, SessionUpdate
+from ...core.session_timeline import list_timeline, public_state
+from ...schemas.session_schema import (
+    SessionCreate,
+    SessionResponse,
+    SessionTimelinePage,
+    SessionUpdate,
+)
 from ...services.session_service import create_new_session, fetch_session, update_existing_session
 from services.shared.audit import actor_subject, safe_record_audit
 from services.shared.user_registry import resolve_user_id
@@ -29,7 +35,7 @@ def _to_session_response(session) -> SessionResponse:
         id=str(session.id),
         user_id=str(session.user_id),
         role=session.active_role,
-        state=session.session_state or {},
+        state=public_state(session.session_state),
         lifecycle_state=lifecycle_state,
         is_active=bool(session.is_active),
     )
@@ -95,6 +101,23 @@ def get_session(request: Request, session_id: str, db: Session = Depends(get_db)
     return _to_session_response(session)
 
 
+@router.get("/sessions/{session_id}/timeline", response_model=SessionTimelinePage)
+def get_session_timeline(
+    request: Request,
+    session_id: str,
+    cursor: int | None = Query(default=None, ge=0),
+    limit: int = Query(default=50, ge=1, le=200),
+    kind: str | None = Query(default=None),
+    db: Session = Depends(get_db),
+):
+    require_roles(request.state.user, ALL_ROLES)
+    session = fetch_session(db, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    items, next_cursor = list_timeline(db, session.id, after_seq=cursor, limit=limit, kind=kind)
+    return SessionTimelinePage(items=items, next_cursor=next_cursor)
+
+
 @router.patch("/sessions/{session_id}", response_model=SessionResponse)
 def update_session(request: Request, session_id: str, payload: SessionUpdate, db: Session = Depends(get_db)):
     require_roles(request.state.user, ALL_ROLES)
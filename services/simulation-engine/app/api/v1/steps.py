@@ -1,20 +1,27 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
 import logging
+import time
+from typing import Any, Mapping
 from sqlalchemy.orm import Session
-from uuid import uuid4
+from uuid import UUID, uuid4
 from datetime import datetime, timezone
-from ...core.step_executor import execute_step
-from ...schemas.step_schema import StepExecuteRequest
+from ...core.step_executor import execute_step, execute_step_batch, validate_step_dag
+from ...schemas.step_schema import StepBatchRequest, StepExecuteRequest
 from ...core.story_loader import load_story
 from ...core.session_state import ensure_session_active
+from ...core.receipt_cache import (
+    SESSION_LOCK_WAIT_SECONDS,
+    STEP_REPLAY_SECONDS,
+    get_receipt_cache,
+)
+from ...core.session_timeline import append_timeline_entry, load_receipt, save_receipt
 from ...core.db import get_db
+from ...core.unit_of_work import StepUnitOfWork
 from ...models.session import SimulationSession
 from ...models.story_progress import StoryProgress
 from ...auth import require_roles
-from ...config import EVENT_STREAM_MAXLEN, REDIS_URL
-from services.shared.audit import actor_subject, safe_record_audit
+from services.shared.audit import actor_subject
 from services.shared import events
-from services.shared.outbox import emit_event
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -26,25 +33,196 @@ def _resolve_idempotency_key(
     return request.headers.get("idempotency-key") or payload.idempotency_key
 
 
-def _receipt_key(session_id: str, code: str, idx: int, idempotency_key: str) -> str:
-    return f"{session_id}:{code}:{idx}:{idempotency_key}"
+def _receipt_key(code: str, idx: int, idempotency_key: str) -> str:
+    return f"{code}:{idx}:{idempotency_key}"
 
 
-def _safe_publish(db: Session, payload: dict):
-    ok, _ = emit_event(
+def _step_audit(
+    *,
+    session_id: str,
+    code: str,
+    idx: int,
+    user_id: str,
+    subject: str | None,
+    request_id: str | None,
+    details: dict,
+) -> dict:
+    return {
+        "action": "simulation.step_executed",
+        "object_type": "simulation_step",
+        "object_id": f"{session_id}:{code}:{idx}",
+        "actor_user_id": user_id,
+        "actor_subject_value": subject,
+        "session_id": session_id,
+        "request_id": str(request_id) if request_id else None,
+        "details": {"story_code": code, "step_idx": idx, **details},
+    }
+
+
+def _find_or_create_progress(
+    db: Session, session: SimulationSession
+) -> tuple[StoryProgress, bool]:
+    progress_query = db.query(StoryProgress).filter(
+        StoryProgress.user_id == session.user_id
+    )
+    if session.current_story_id:
+        progress_query = progress_query.filter(
+            StoryProgress.story_id == session.current_story_id
+        )
+    progress = progress_query.order_by(StoryProgress.started_at.desc()).first()
+    if progress:
+        return progress, False
+    progress = StoryProgress(
+        id=uuid4(),
+        user_id=session.user_id,
+        story_id=session.current_story_id,
+        role_type=session.active_role,
+        status="in_progress",
+        completion_percentage=0,
+        steps_completed=[],
+        started_at=datetime.now(timezone.utc),
+    )
+    db.add(progress)
+    return progress, True
+
+
+def _session_uuid(session_id: str) -> UUID:
+    try:
+        return UUID(session_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail="Session not found") from exc
+
+
+def _lock_session(db: Session, session_id: UUID | str) -> SimulationSession | None:
+    """Lock the session row for the current transaction and reload it."""
+    started = time.perf_counter()
+    session = (
+        db.query(SimulationSession)
+        .filter(SimulationSession.id == session_id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
+    SESSION_LOCK_WAIT_SECONDS.observe(time.perf_counter() - started)
+    return session
+
+
+def _apply_step_result(
+    db: Session,
+    session: SimulationSession,
+    progress: StoryProgress,
+    story: Mapping[str, Any],
+    idx: int,
+    step: dict,
+    result: dict,
+) -> bool:
+    """Record a finished step on progress and session state; False if already done."""
+    now = datetime.now(timezone.utc)
+    data = result.get("data")
+    if (
+        step.get("action") == "aas.update"
+        and result.get("status") == "updated"
+        and isinstance(data, dict)
+        and data.get("update")
+    ):
+        append_timeline_entry(
+            db,
+            session,
+            kind="aas_update",
+            action="aas.update",
+            step_idx=idx,
+            payload={
+                "update": data["update"],
+                "payload": data,
+                "timestamp": now.isoformat(),
+            },
+        )
+    steps_completed = list(progress.steps_completed or [])
+    if idx in steps_completed:
+        return False
+    steps_completed.append(idx)
+    progress.steps_completed = steps_completed
+    total_steps = max(1, len(story["steps"]))
+    progress.completion_percentage = int(len(steps_completed) / total_steps * 100)
+    progress.validation_results = {"last_step": idx, "result": result}
+    if progress.completion_percentage >= 100:
+        progress.status = "completed"
+        progress.completed_at = now
+    session.last_activity = now
+    next_state = {
+        **(session.session_state or {}),
+        "last_step_result": result,
+    }
+    if step.get("action") == "compliance.check":
+        next_state["last_validation"] = result
+    if step.get("action", "").startswith("edc."):
+        next_state["edc_state"] = result
+    session.session_state = next_state
+    append_timeline_entry(
         db,
-        stream="simulation.events",
-        payload=payload,
-        redis_url=REDIS_URL,
-        maxlen=EVENT_STREAM_MAXLEN,
-        commit=True,
-        log=logger,
+        session,
+        kind="step",
+        step_idx=idx,
+        action=step.get("action"),
+        payload={
+            "step": idx,
+            "action": step.get("action"),
+            "timestamp": now.isoformat(),
+            "result": result,
+        },
     )
-    if not ok:
-        logger.warning(
-            "Failed to enqueue/publish event",
-            extra={"event_type": payload.get("event_type")},
+    return True
+
+
+# Events emitted when a step of a given action finishes with the given status.
+_ACTION_EVENTS: dict[tuple[str, str], str] = {
+    ("compliance.check", "compliant"): events.COMPLIANCE_CHECK_PASSED,
+    ("aas.create", "created"): events.AAS_CREATED,
+    ("aas.update", "updated"): events.AAS_UPDATED,
+    ("aas.submodel.add", "created"): events.AAS_SUBMODEL_ADDED,
+    ("aas.submodel.patch", "updated"): events.AAS_SUBMODEL_PATCHED,
+    ("aasx.upload", "stored"): events.AASX_UPLOADED,
+    ("api.call", "called"): events.API_CALL_SUCCESS,
+}
+
+
+def _step_events(
+    *,
+    user_id: str,
+    request_id: str | None,
+    session_id: str,
+    code: str,
+    idx: int,
+    action: str | None,
+    result: dict,
+    metadata: dict | None,
+    story_completed: bool,
+) -> list[dict]:
+    common = {
+        "user_id": user_id,
+        "source_service": "simulation-engine",
+        "request_id": request_id,
+        "session_id": session_id,
+        "story_code": code,
+        "step_idx": idx,
+    }
+    event_meta = {"action": action}
+    if metadata:
+        event_meta.update(metadata)
+    status = result.get("status")
+    built = [
+        events.build_event(
+            events.STORY_STEP_COMPLETED, status=status, metadata=event_meta, **common
         )
+    ]
+    if story_completed:
+        built.append(
+            events.build_event(events.STORY_COMPLETED, status="completed", **common)
+        )
+    action_event = _ACTION_EVENTS.get((action or "", str(status)))
+    if action_event:
+        built.append(events.build_event(action_event, status=status, **common))
+    return built
 
 
 @router.post("/sessions/{session_id}/stories/{code}/steps/{idx}/execute")
@@ -67,47 +245,114 @@ def execute(
     if idx < 0 or idx >= len(story.get("steps", [])):
         raise HTTPException(status_code=404, detail="Step not found")
     step = story["steps"][idx]
-    idempotency_key = _resolve_idempotency_key(request, payload)
-    session_query = db.query(SimulationSession).filter(
-        SimulationSession.id == session_id
+    # Checked before the replay fast path so a cached receipt never outlives
+    # the session being deleted or completed.
+    session_uuid = _session_uuid(session_id)
+    session = (
+        db.query(SimulationSession).filter(SimulationSession.id == session_uuid).first()
     )
-    if idempotency_key:
-        session_query = session_query.with_for_update()
-    session = session_query.first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     ensure_session_active(session.session_state, is_active=bool(session.is_active))
-    receipt_id = (
-        _receipt_key(session_id, code, idx, idempotency_key)
-        if idempotency_key
-        else None
-    )
-    session_state = dict(session.session_state or {})
-    receipts = dict(session_state.get("step_receipts") or {})
-    if receipt_id and receipt_id in receipts:
-        safe_record_audit(
+    idempotency_key = _resolve_idempotency_key(request, payload)
+    receipt_id = _receipt_key(code, idx, idempotency_key) if idempotency_key else None
+    receipt_cache = get_receipt_cache()
+    lease_owner = None
+    if receipt_id:
+        started = time.perf_counter()
+        cached = receipt_cache.get(session_id, receipt_id)
+        if cached is None:
+            lease_owner = str(uuid4())
+            if not receipt_cache.acquire(session_id, receipt_id, lease_owner):
+                # A concurrent request with the same key is executing the step;
+                # wait for its result rather than queueing on the row lock.
+                lease_owner = None
+                cached = receipt_cache.wait_for(session_id, receipt_id)
+                if cached is None:
+                    raise HTTPException(
+                        status_code=409,
+                        detail="Step execution with this idempotency key is in progress",
+                    )
+        if cached is not None:
+            STEP_REPLAY_SECONDS.labels(source="redis").observe(
+                time.perf_counter() - started
+            )
+            logger.info(
+                "Served idempotent step replay from receipt cache",
+                extra={
+                    "session_id": session_id,
+                    "story_code": code,
+                    "step_idx": idx,
+                    "request_id": getattr(request.state, "request_id", None),
+                },
+            )
+            return {"result": cached, "idempotent_replay": True}
+
+    try:
+        return _execute_first(
+            request,
             db,
-            action="simulation.step_executed",
-            object_type="simulation_step",
-            object_id=f"{session_id}:{code}:{idx}",
-            actor_user_id=str(session.user_id),
-            actor_subject_value=actor_subject(getattr(request.state, "user", None)),
+            session,
             session_id=session_id,
-            request_id=str(getattr(request.state, "request_id", "")) or None,
-            details={
-                "story_code": code,
-                "step_idx": idx,
-                "idempotency_replay": True,
-                "status": receipts[receipt_id].get("status"),
-            },
+            code=code,
+            idx=idx,
+            story=story,
+            step=step,
+            payload=payload,
+            receipt_id=receipt_id,
         )
-        return {"result": receipts[receipt_id], "idempotent_replay": True}
+    finally:
+        if lease_owner and receipt_id:
+            receipt_cache.release(session_id, receipt_id, lease_owner)
 
+
+def _execute_first(
+    request: Request,
+    db: Session,
+    session: SimulationSession,
+    *,
+    session_id: str,
+    code: str,
+    idx: int,
+    story: Mapping[str, Any],
+    step: dict,
+    payload: StepExecuteRequest,
+    receipt_id: str | None,
+) -> dict:
+    started = time.perf_counter()
     request_id = getattr(request.state, "request_id", None)
+    user_id = str(session.user_id)
+    subject = actor_subject(getattr(request.state, "user", None))
+    uow = StepUnitOfWork(db)
+    receipt_cache = get_receipt_cache()
+
+    receipt = load_receipt(db, session.id, receipt_id) if receipt_id else None
+    if receipt_id and receipt is not None:
+        uow.audit(
+            **_step_audit(
+                session_id=session_id,
+                code=code,
+                idx=idx,
+                user_id=user_id,
+                subject=subject,
+                request_id=request_id,
+                details={
+                    "idempotency_replay": True,
+                    "status": receipt.get("status"),
+                },
+            )
+        )
+        uow.commit()
+        receipt_cache.store(session_id, receipt_id, receipt)
+        STEP_REPLAY_SECONDS.labels(source="postgres").observe(
+            time.perf_counter() - started
+        )
+        return {"result": receipt, "idempotent_replay": True}
+
     context = {
         "session_id": session_id,
         "story_code": code,
-        "user_id": str(session.user_id),
+        "user_id": user_id,
         "event_id": uuid4(),
         "request_id": request_id,
     }
@@ -120,218 +365,161 @@ def execute(
         metadata=payload.metadata,
     )
 
-    progress_query = db.query(StoryProgress).filter(
-        StoryProgress.user_id == session.user_id
-    )
-    if session.current_story_id:
-        progress_query = progress_query.filter(
-            StoryProgress.story_id == session.current_story_id
-        )
-    progress = progress_query.order_by(StoryProgress.started_at.desc()).first()
-    if not progress:
-        progress = StoryProgress(
-            id=uuid4(),
-            user_id=session.user_id,
-            story_id=session.current_story_id,
-            role_type=session.active_role,
-            status="in_progress",
-            completion_percentage=0,
-            steps_completed=[],
-            started_at=datetime.now(timezone.utc),
-        )
-        db.add(progress)
-        db.commit()
-    steps_completed = (
-        progress.steps_completed
-        if progress and progress.steps_completed is not None
-        else []
-    )
-    if idx not in steps_completed:
-        steps_completed.append(idx)
-        progress.steps_completed = steps_completed
-        total_steps = max(1, len(story["steps"]))
-        progress.completion_percentage = int(len(steps_completed) / total_steps * 100)
-        progress.validation_results = {"last_step": idx, "result": result}
-        if progress.completion_percentage >= 100:
-            progress.status = "completed"
-            progress.completed_at = datetime.now(timezone.utc)
-        session.last_activity = datetime.now(timezone.utc)
-        current_state = session.session_state or {}
-        timeline = current_state.get("timeline", [])
-        timeline.append(
-            {
-                "step": idx,
+    # The row lock is taken only for the bookkeeping, after the step's
+    # upstream calls; it serialises receipts and timeline seq allocation.
+    session = _lock_session(db, session.id)
+    if not session:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Session not found")
+    if receipt_id:
+        # Without Redis, a concurrent request with the same key may have
+        # finished first; its receipt wins and this result is discarded.
+        concurrent = load_receipt(db, session.id, receipt_id)
+        if concurrent is not None:
+            db.rollback()
+            receipt_cache.store(session_id, receipt_id, concurrent)
+            return {"result": concurrent, "idempotent_replay": True}
+
+    progress, _ = _find_or_create_progress(db, session)
+    _apply_step_result(db, session, progress, story, idx, step, result)
+    if receipt_id:
+        save_receipt(db, session.id, receipt_id, result)
+
+    for event in _step_events(
+        user_id=user_id,
+        request_id=request_id,
+        session_id=session_id,
+        code=code,
+        idx=idx,
+        action=step.get("action"),
+        result=result,
+        metadata=payload.metadata,
+        story_completed=progress.status == "completed",
+    ):
+        uow.publish(event)
+    uow.audit(
+        **_step_audit(
+            session_id=session_id,
+            code=code,
+            idx=idx,
+            user_id=user_id,
+            subject=subject,
+            request_id=request_id,
+            details={
                 "action": step.get("action"),
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "result": result,
-            }
+                "status": result.get("status"),
+                "idempotency_replay": False,
+            },
         )
-        next_state = {
-            **current_state,
-            "last_step_result": result,
-            "timeline": timeline,
+    )
+    uow.commit()
+    if receipt_id:
+        receipt_cache.store(session_id, receipt_id, result)
+    return {"result": result}
+
+
+@router.post("/sessions/{session_id}/stories/{code}/steps/batch")
+def execute_batch(
+    request: Request,
+    session_id: str,
+    code: str,
+    payload: StepBatchRequest,
+    db: Session = Depends(get_db),
+):
+    require_roles(
+        request.state.user,
+        ["manufacturer", "developer", "admin", "regulator", "consumer", "recycler"],
+    )
+    try:
+        story = load_story(code)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Story not found")
+    story_steps = story.get("steps", [])
+    for item in payload.steps:
+        if item.idx < 0 or item.idx >= len(story_steps):
+            raise HTTPException(status_code=404, detail=f"Step {item.idx} not found")
+
+    batch = [
+        {
+            "key": str(item.idx),
+            "action": story_steps[item.idx]["action"],
+            "params": story_steps[item.idx].get("params", {}),
+            "payload": item.payload,
+            "metadata": item.metadata,
+            "depends_on": [str(dep) for dep in item.depends_on],
         }
-        if step.get("action") == "compliance.check":
-            next_state["last_validation"] = result
-        if step.get("action", "").startswith("edc."):
-            next_state["edc_state"] = result
-        session.session_state = next_state
-        db.commit()
+        for item in payload.steps
+    ]
+    try:
+        order = validate_step_dag(batch)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-    if receipt_id:
-        next_state = dict(session.session_state or {})
-        next_receipts = dict(next_state.get("step_receipts") or {})
-        next_receipts[receipt_id] = result
-        next_state["step_receipts"] = next_receipts
-        session.session_state = next_state
-        db.commit()
-
-    event_meta = {"action": step.get("action")}
-    if payload.metadata:
-        event_meta.update(payload.metadata)
-    _safe_publish(
-        db,
-        events.build_event(
-            events.STORY_STEP_COMPLETED,
-            user_id=str(session.user_id),
-            source_service="simulation-engine",
+    session_uuid = _session_uuid(session_id)
+    session = (
+        db.query(SimulationSession).filter(SimulationSession.id == session_uuid).first()
+    )
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    ensure_session_active(session.session_state, is_active=bool(session.is_active))
+
+    request_id = getattr(request.state, "request_id", None)
+    user_id = str(session.user_id)
+    context = {
+        "session_id": session_id,
+        "story_code": code,
+        "user_id": user_id,
+        "event_id": uuid4(),
+        "request_id": request_id,
+    }
+    results = execute_step_batch(batch, context, db=db)
+
+    # The handlers' writes are staged in ``db``; progress, session state,
+    # outbox events and audit rows join them and the whole batch commits in
+    # one transaction. The session row is locked only for that bookkeeping.
+    session = _lock_session(db, session_uuid)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    metadata_by_key = {step["key"]: step["metadata"] for step in batch}
+    subject = actor_subject(getattr(request.state, "user", None))
+    uow = StepUnitOfWork(db)
+    progress, _ = _find_or_create_progress(db, session)
+    items = []
+    for key in order:
+        idx = int(key)
+        step = story_steps[idx]
+        result = results[key]
+        items.append({"idx": idx, "result": result})
+        if result.get("status") == "skipped":
+            continue
+        was_completed = progress.status == "completed"
+        _apply_step_result(db, session, progress, story, idx, step, result)
+        for event in _step_events(
+            user_id=user_id,
             request_id=request_id,
             session_id=session_id,
-            story_code=code,
-            step_idx=idx,
-            status=result.get("status"),
-            metadata=event_meta,
-        ),
-    )
-    if progress and progress.status == "completed":
-        _safe_publish(
-            db,
-            events.build_event(
-                events.STORY_COMPLETED,
-                user_id=str(session.user_id),
-                source_service="simulation-engine",
-                request_id=request_id,
+            code=code,
+            idx=idx,
+            action=step.get("action"),
+            result=result,
+            metadata=metadata_by_key[key],
+            story_completed=progress.status == "completed" and not was_completed,
+        ):
+            uow.publish(event)
+        uow.audit(
+            **_step_audit(
                 session_id=session_id,
-                story_code=code,
-                step_idx=idx,
-                status="completed",
-            ),
-        )
-    if step.get("action") == "compliance.check":
-        status = result.get("status")
-        if status == "compliant":
-            _safe_publish(
-                db,
-                events.build_event(
-                    events.COMPLIANCE_CHECK_PASSED,
-                    user_id=str(session.user_id),
-                    source_service="simulation-engine",
-                    request_id=request_id,
-                    session_id=session_id,
-                    story_code=code,
-                    step_idx=idx,
-                    status=status,
-                ),
-            )
-    if step.get("action") == "aas.create" and result.get("status") == "created":
-        _safe_publish(
-            db,
-            events.build_event(
-                events.AAS_CREATED,
-                user_id=str(session.user_id),
-                source_service="simulation-engine",
-                request_id=request_id,
-                session_id=session_id,
-                story_code=code,
-                step_idx=idx,
-                status="created",
-            ),
-        )
-    if step.get("action") == "aas.update" and result.get("status") == "updated":
-        _safe_publish(
-            db,
-            events.build_event(
-                events.AAS_UPDATED,
-                user_id=str(session.user_id),
-                source_service="simulation-engine",
-                request_id=request_id,
-                session_id=session_id,
-                story_code=code,
-                step_idx=idx,
-                status="updated",
-            ),
-        )
-    if step.get("action") == "aas.submodel.add" and result.get("status") == "created":
-        _safe_publish(
-            db,
-            events.build_event(
-                events.AAS_SUBMODEL_ADDED,
-                user_id=str(session.user_id),
-                source_service="simulation-engine",
+                code=code,
+                idx=idx,
+                user_id=user_id,
+                subject=subject,
                 request_id=request_id,
-                session_id=session_id,
-                story_code=code,
-                step_idx=idx,
-                status="created",
-            ),
-        )
-    if step.get("action") == "aas.submodel.patch" and result.get("status") == "updated":
-        _safe_publish(
-            db,
-            events.build_event(
-                events.AAS_SUBMODEL_PATCHED,
-                user_id=str(session.user_id),
-                source_service="simulation-engine",
-                request_id=request_id,
-                session_id=session_id,
-                story_code=code,
-                step_idx=idx,
-                status="updated",
-            ),
-        )
-    if step.get("action") == "aasx.upload" and result.get("status") == "stored":
-        _safe_publish(
-            db,
-            events.build_event(
-                events.AASX_UPLOADED,
-                user_id=str(session.user_id),
-                source_service="simulation-engine",
-                request_id=request_id,
-                session_id=session_id,
-                story_code=code,
-                step_idx=idx,
-                status="stored",
-            ),
-        )
-    if step.get("action") == "api.call" and result.get("status") == "called":
-        _safe_publish(
-            db,
-            events.build_event(
-                events.API_CALL_SUCCESS,
-                user_id=str(session.user_id),
-                source_service="simulation-engine",
-                request_id=request_id,
-                session_id=session_id,
-                story_code=code,
-                step_idx=idx,
-                status="called",
-            ),
+                details={
+                    "action": step.get("action"),
+                    "status": result.get("status"),
+                    "batch": True,
+                },
+            )
         )
-    safe_record_audit(
-        db,
-        action="simulation.step_executed",
-        object_type="simulation_step",
-        object_id=f"{session_id}:{code}:{idx}",
-        actor_user_id=str(session.user_id),
-        actor_subject_value=actor_subject(getattr(request.state, "user", None)),
-        session_id=session_id,
-        request_id=str(request_id) if request_id else None,
-        details={
-            "story_code": code,
-            "step_idx": idx,
-            "action": step.get("action"),
-            "status": result.get("status"),
-            "idempotency_replay": False,
-        },
-    )
-    return {"result": result}
+    uow.commit()
+    return {"results": items, "story_completed": progress.status == "completed"}
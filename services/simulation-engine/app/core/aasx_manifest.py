@@ -0,0 +1,410 @@
+from __future__ import annotations
+
+import io
+import json
+import mimetypes
+import mmap
+import posixpath
+import struct
+import zipfile
+import zlib
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, Iterator
+from xml.etree import ElementTree
+
+from ..config import AASX_MAX_COMPRESSION_RATIO, AASX_MAX_PART_BYTES
+
+MANIFEST_VERSION = 1
+
+ORIGIN_REL = "http://admin-shell.io/aasx/relationships/aasx-origin"
+SPEC_REL = "http://admin-shell.io/aasx/relationships/aas-spec"
+SUPPL_REL = "http://admin-shell.io/aasx/relationships/aas-suppl"
+
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_COMPRESSION = {zipfile.ZIP_STORED: "stored", zipfile.ZIP_DEFLATED: "deflated"}
+
+
+class ManifestError(ValueError):
+    """The stored package cannot be indexed or read as requested."""
+
+
+class _MappedFile(io.RawIOBase):
+    """Read-only file view over an ``mmap`` (which lacks ``seekable`` before
+    Python 3.13, as required by ``zipfile``)."""
+
+    def __init__(self, mapped: mmap.mmap):
+        self._mapped = mapped
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self._mapped.read(size)
+
+    def readinto(self, buffer) -> int:
+        data = self._mapped.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._mapped.tell()
+        elif whence == io.SEEK_END:
+            offset += len(self._mapped)
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"invalid whence ({whence})")
+        self._mapped.seek(offset)
+        return self._mapped.tell()
+
+    def tell(self) -> int:
+        return self._mapped.tell()
+
+
+# What the zip reader reads from: the caller's stream or its mmap view.
+_Package = BinaryIO | _MappedFile
+
+
+@contextmanager
+def _mapped(source: BinaryIO) -> Iterator[_Package]:
+    """Memory-map ``source`` when it is backed by a file, so the zip reader
+    pages in only the central directory and the parts it opens."""
+    # Offsets must be relative to the start of the package, so only map
+    # sources that begin at byte 0.
+    if isinstance(source, io.BytesIO) or source.tell() != 0:
+        yield source
+        return
+    try:
+        mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        yield source
+        return
+    try:
+        yield _MappedFile(mapped)
+    finally:
+        mapped.close()
+
+
+def _read_part(archive: zipfile.ZipFile, name: str) -> bytes:
+    """Inflate one part, refusing sizes and ratios no real package needs."""
+    info = archive.getinfo(name)
+    if info.file_size > AASX_MAX_PART_BYTES:
+        raise ManifestError(
+            f"Part {name} is too large ({info.file_size} > {AASX_MAX_PART_BYTES} bytes)"
+        )
+    ratio = info.file_size / max(1, info.compress_size)
+    if info.file_size > 1024 * 1024 and ratio > AASX_MAX_COMPRESSION_RATIO:
+        raise ManifestError(f"Part {name} is compressed {ratio:.0f}:1")
+    return archive.read(info)
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _relationships(archive: zipfile.ZipFile, part: str) -> list[tuple[str, str]]:
+    """Return ``(type, target part)`` pairs from the OPC rels of ``part``."""
+    folder, name = posixpath.split(part.lstrip("/"))
+    rels_name = posixpath.join(folder, "_rels", f"{name}.rels")
+    try:
+        raw = _read_part(archive, rels_name)
+    except KeyError:
+        return []
+    pairs = []
+    for node in ElementTree.fromstring(raw):
+        target = node.get("Target") or ""
+        if node.get("TargetMode") == "External" or not target:
+            continue
+        if target.startswith("/"):
+            resolved = target.lstrip("/")
+        else:
+            resolved = posixpath.normpath(posixpath.join(folder, target))
+        pairs.append((node.get("Type") or "", resolved))
+    return pairs
+
+
+def _spec_parts(archive: zipfile.ZipFile) -> tuple[list[str], list[str]]:
+    names = set(archive.namelist())
+    spec: list[str] = []
+    supplementary: list[str] = []
+    for rel_type, origin in _relationships(archive, ""):
+        if rel_type != ORIGIN_REL:
+            continue
+        for kind, target in _relationships(archive, origin):
+            if kind == SPEC_REL and target in names:
+                spec.append(target)
+            elif kind == SUPPL_REL and target in names:
+                supplementary.append(target)
+    if not spec:
+        # Packages written without OPC relationships: fall back to any
+        # environment-looking part.
+        spec = sorted(
+            name
+            for name in names
+            if name.lower().endswith((".json", ".xml"))
+            and not name.endswith(".rels")
+            and name != "[Content_Types].xml"
+        )
+    return spec, supplementary
+
+
+def _reference_value(reference: Any) -> str | None:
+    if not isinstance(reference, dict):
+        return None
+    keys = reference.get("keys") or []
+    if keys and isinstance(keys[-1], dict):
+        return keys[-1].get("value")
+    return None
+
+
+def _count_json_elements(elements: Any) -> int:
+    if not isinstance(elements, list):
+        return 0
+    total = 0
+    for element in elements:
+        if not isinstance(element, dict):
+            continue
+        total += 1
+        for nested in ("value", "statements", "annotations"):
+            total += _count_json_elements(element.get(nested))
+    return total
+
+
+def _index_json(raw: bytes, part: str) -> tuple[list[dict], list[dict]]:
+    environment = json.loads(raw)
+    shells = [
+        {
+            "id": shell.get("id"),
+            "idShort": shell.get("idShort"),
+            "globalAssetId": (shell.get("assetInformation") or {}).get("globalAssetId"),
+            "submodels": [
+                value
+                for value in map(_reference_value, shell.get("submodels") or [])
+                if value
+            ],
+        }
+        for shell in environment.get("assetAdministrationShells") or []
+        if isinstance(shell, dict)
+    ]
+    submodels = []
+    for submodel in environment.get("submodels") or []:
+        if not isinstance(submodel, dict):
+            continue
+        elements = submodel.get("submodelElements") or []
+        submodels.append(
+            {
+                "id": submodel.get("id"),
+                "idShort": submodel.get("idShort"),
+                "semanticId": _reference_value(submodel.get("semanticId")),
+                "elements": len(elements) if isinstance(elements, list) else 0,
+                "elements_total": _count_json_elements(elements),
+                "part": part,
+            }
+        )
+    return shells, submodels
+
+
+def _child(node: ElementTree.Element, name: str) -> ElementTree.Element | None:
+    for child in node:
+        if _local(child.tag) == name:
+            return child
+    return None
+
+
+def _child_text(node: ElementTree.Element, *names: str) -> str | None:
+    for name in names:
+        child = _child(node, name)
+        text = (child.text or "").strip() if child is not None else ""
+        if text:
+            return text
+    return None
+
+
+def _xml_reference(node: ElementTree.Element | None) -> str | None:
+    if node is None:
+        return None
+    values = [
+        (item.text or "").strip() for item in node.iter() if _local(item.tag) == "value"
+    ]
+    values = [value for value in values if value]
+    return values[-1] if values else None
+
+
+def _count_xml_elements(container: ElementTree.Element | None) -> int:
+    if container is None:
+        return 0
+    total = 0
+    for element in container:
+        total += 1
+        for nested in ("value", "statements", "annotations"):
+            total += _count_xml_elements(_child(element, nested))
+    return total
+
+
+def _index_xml(raw: bytes, part: str) -> tuple[list[dict], list[dict]]:
+    root = ElementTree.fromstring(raw)
+    shells = []
+    submodels = []
+    for node in root.iter():
+        name = _local(node.tag)
+        if name == "assetAdministrationShell":
+            asset = _child(node, "assetInformation")
+            references = _child(node, "submodels")
+            if references is None:
+                references = _child(node, "submodelRefs")
+            global_asset_id = None
+            if asset is not None:
+                global_asset_id = _child_text(asset, "globalAssetId") or _xml_reference(
+                    _child(asset, "globalAssetId")
+                )
+            shells.append(
+                {
+                    "id": _child_text(node, "id", "identification"),
+                    "idShort": _child_text(node, "idShort"),
+                    "globalAssetId": global_asset_id,
+                    "submodels": [
+                        value
+                        for value in map(
+                            _xml_reference,
+                            [] if references is None else list(references),
+                        )
+                        if value
+                    ],
+                }
+            )
+        elif name == "submodel" and _child_text(node, "id", "identification"):
+            elements = _child(node, "submodelElements")
+            submodels.append(
+                {
+                    "id": _child_text(node, "id", "identification"),
+                    "idShort": _child_text(node, "idShort"),
+                    "semanticId": _xml_reference(_child(node, "semanticId")),
+                    "elements": len(elements) if elements is not None else 0,
+                    "elements_total": _count_xml_elements(elements),
+                    "part": part,
+                }
+            )
+    return shells, submodels
+
+
+def _data_offset(buffer: _Package, info: zipfile.ZipInfo) -> int:
+    buffer.seek(info.header_offset)
+    header = buffer.read(_LOCAL_HEADER.size)
+    fields = _LOCAL_HEADER.unpack(header)
+    if fields[0] != _LOCAL_HEADER_SIGNATURE:
+        raise ManifestError(f"Corrupt local header for {info.filename}")
+    name_length, extra_length = fields[9], fields[10]
+    return info.header_offset + _LOCAL_HEADER.size + name_length + extra_length
+
+
+def build_manifest(source: BinaryIO) -> dict[str, Any]:
+    """Index an AASX package: shells, submodels and where each part lives.
+
+    ``source`` must be seekable; its position is restored afterwards. Parts
+    are described by their byte offset in the package, so later reads can
+    fetch a single file (or a range of it) without opening the zip again.
+    """
+    start = source.tell()
+    try:
+        with _mapped(source) as buffer, zipfile.ZipFile(buffer) as archive:
+            spec, supplementary = _spec_parts(archive)
+            shells: list[dict] = []
+            submodels: list[dict] = []
+            errors: list[str] = []
+            for part in spec:
+                reader = _index_json if part.lower().endswith(".json") else _index_xml
+                try:
+                    part_shells, part_submodels = reader(
+                        _read_part(archive, part), part
+                    )
+                except (ValueError, ElementTree.ParseError) as exc:
+                    errors.append(f"{part}: {exc}")
+                    continue
+                shells.extend(part_shells)
+                submodels.extend(part_submodels)
+            files = []
+            for info in archive.infolist():
+                if info.is_dir() or info.compress_type not in _COMPRESSION:
+                    continue
+                files.append(
+                    {
+                        "path": info.filename,
+                        "size": info.file_size,
+                        "compressed_size": info.compress_size,
+                        "compression": _COMPRESSION[info.compress_type],
+                        "offset": _data_offset(buffer, info),
+                        "crc32": info.CRC,
+                        "content_type": mimetypes.guess_type(info.filename)[0]
+                        or "application/octet-stream",
+                        "role": "spec"
+                        if info.filename in spec
+                        else "supplementary"
+                        if info.filename in supplementary
+                        else "package",
+                    }
+                )
+    except zipfile.BadZipFile as exc:
+        raise ManifestError(f"Not an AASX package: {exc}") from exc
+    finally:
+        source.seek(start)
+    manifest: dict[str, Any] = {
+        "version": MANIFEST_VERSION,
+        "spec_parts": spec,
+        "shells": shells,
+        "submodels": submodels,
+        "files": files,
+    }
+    if errors:
+        manifest["errors"] = errors
+    return manifest
+
+
+def summarize(manifest: dict[str, Any]) -> dict[str, int]:
+    return {
+        "shells": len(manifest.get("shells") or []),
+        "submodels": len(manifest.get("submodels") or []),
+        "files": len(manifest.get("files") or []),
+    }
+
+
+def find_file(manifest: dict[str, Any], path: str) -> dict[str, Any]:
+    for entry in manifest.get("files") or []:
+        if entry.get("path") == path:
+            return entry
+    raise ManifestError(f"File '{path}' not found in package")
+
+
+def read_file_range(
+    read_raw: Callable[[int, int], Iterator[bytes]],
+    entry: dict[str, Any],
+    start: int,
+    end: int,
+) -> Iterator[bytes]:
+    """Yield bytes ``start``..``end`` (inclusive) of one packaged file.
+
+    ``read_raw(offset, length)`` reads the stored package. Stored parts are
+    read at their exact offset; deflated parts are inflated from their first
+    compressed byte and stop as soon as ``end`` is reached.
+    """
+    if entry["compression"] == "stored":
+        yield from read_raw(entry["offset"] + start, end - start + 1)
+        return
+
+    inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+    position = 0
+    for chunk in read_raw(entry["offset"], entry["compressed_size"]):
+        data = inflater.decompress(chunk)
+        if not data:
+            continue
+        chunk_end = position + len(data)
+        if chunk_end > start:
+            yield data[max(0, start - position) : end - position + 1]
+        position = chunk_end
+        if position > end:
+            return
+    tail = inflater.flush()
+    if tail and position <= end:
+        yield tail[max(0, start - position) : end - position + 1]
@@ -2,10 +2,16 @@ from __future__ import annotations
 
 import base64
 import binascii
+import hashlib
 import io
 import os
 import re
-from uuid import uuid4
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Iterator, cast
+from uuid import UUID
+
 from sqlalchemy.orm import Session
 
 from ..config import (
@@ -16,13 +22,29 @@ from ..config import (
     MINIO_SECURE,
     MINIO_PUBLIC_URL,
     AASX_STORAGE_DIR,
+    AASX_CHUNK_SIZE,
+    AASX_MINIO_PART_SIZE,
 )
 from ..models.dpp_instance import DppInstance
+from .aasx_manifest import ManifestError, build_manifest, summarize
 
 try:
     from minio import Minio
+    from minio.error import S3Error
 except Exception:  # pragma: no cover - optional dependency
     Minio = None  # type: ignore
+    S3Error = None  # type: ignore
+
+# After a failed MinIO call, uploads go straight to local storage for a while
+# instead of waiting out the client's connection retries on every request.
+MINIO_RETRY_AFTER_SECONDS = 30.0
+
+_MISSING_OBJECT_CODES = {"NoSuchKey", "NoSuchObject", "ResourceNotFound"}
+
+_minio_lock = threading.Lock()
+_minio_client: "Minio | None" = None
+_minio_ready_buckets: set[str] = set()
+_minio_unavailable_until = 0.0
 
 
 def _ensure_bucket(client: "Minio", bucket: str) -> None:
@@ -30,6 +52,38 @@ def _ensure_bucket(client: "Minio", bucket: str) -> None:
         client.make_bucket(bucket)
 
 
+def _get_minio() -> "Minio | None":
+    """Return the process-wide MinIO client, creating the bucket once."""
+    global _minio_client, _minio_unavailable_until
+    if Minio is None:
+        return None
+    with _minio_lock:
+        if time.monotonic() < _minio_unavailable_until:
+            return None
+        if _minio_client is None:
+            _minio_client = Minio(
+                MINIO_ENDPOINT,
+                access_key=MINIO_ACCESS_KEY,
+                secret_key=MINIO_SECRET_KEY,
+                secure=MINIO_SECURE,
+            )
+        if MINIO_BUCKET not in _minio_ready_buckets:
+            try:
+                _ensure_bucket(_minio_client, MINIO_BUCKET)
+            except Exception:
+                _minio_unavailable_until = time.monotonic() + MINIO_RETRY_AFTER_SECONDS
+                raise
+            _minio_ready_buckets.add(MINIO_BUCKET)
+        return _minio_client
+
+
+def _mark_minio_unavailable() -> None:
+    global _minio_unavailable_until
+    with _minio_lock:
+        _minio_unavailable_until = time.monotonic() + MINIO_RETRY_AFTER_SECONDS
+        _minio_ready_buckets.clear()
+
+
 _SAFE_FILENAME = re.compile(r"[^A-Za-z0-9._-]")
 
 
@@ -42,34 +96,110 @@ def _sanitize_filename(filename: str) -> str:
     return sanitized[:180]
 
 
-def _store_local(filename: str, raw: bytes) -> dict:
+def _chunks(source: BinaryIO) -> Iterator[bytes]:
+    while True:
+        chunk = source.read(AASX_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _rewindable(source: BinaryIO | bytes) -> BinaryIO:
+    """Return a stream that can be read more than once without holding it all."""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    if source.seekable():
+        return source
+    spooled = tempfile.SpooledTemporaryFile(max_size=AASX_CHUNK_SIZE)
+    for chunk in _chunks(source):
+        spooled.write(chunk)
+    spooled.seek(0)
+    # SpooledTemporaryFile implements the binary file protocol but is not
+    # declared as a BinaryIO subclass.
+    return cast(BinaryIO, spooled)
+
+
+def _hash_stream(source: BinaryIO) -> tuple[str, int]:
+    start = source.tell()
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in _chunks(source):
+        digest.update(chunk)
+        size += len(chunk)
+    source.seek(start)
+    return digest.hexdigest(), size
+
+
+def _store_local(filename: str, source: BinaryIO | bytes) -> dict:
+    """Copy ``source`` to disk chunk by chunk, hashing on the way.
+
+    Files are named by content hash, so a package that is already stored is
+    not written a second time.
+    """
+    source = _rewindable(source)
     os.makedirs(AASX_STORAGE_DIR, exist_ok=True)
-    key = f"{uuid4()}.aasx"
-    path = os.path.join(AASX_STORAGE_DIR, key)
-    with open(path, "wb") as handle:
-        handle.write(raw)
-    return {"storage": "local", "object_key": key, "path": path, "url": None}
+    digest = hashlib.sha256()
+    size = 0
+    fd, partial = tempfile.mkstemp(dir=AASX_STORAGE_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            for chunk in _chunks(source):
+                digest.update(chunk)
+                size += len(chunk)
+                handle.write(chunk)
+        sha256 = digest.hexdigest()
+        key = f"{sha256}.aasx"
+        path = os.path.join(AASX_STORAGE_DIR, key)
+        deduplicated = os.path.exists(path)
+        if deduplicated:
+            os.unlink(partial)
+        else:
+            os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.unlink(partial)
+        raise
+    return {
+        "storage": "local",
+        "object_key": key,
+        "path": path,
+        "url": None,
+        "sha256": sha256,
+        "bytes": size,
+        "deduplicated": deduplicated,
+    }
 
 
-def _store_minio(filename: str, raw: bytes) -> dict | None:
-    if Minio is None:
+def _minio_object_exists(client: "Minio", object_key: str) -> bool:
+    try:
+        client.stat_object(MINIO_BUCKET, object_key)
+    except S3Error as exc:
+        if exc.code in _MISSING_OBJECT_CODES:
+            return False
+        raise
+    return True
+
+
+def _store_minio(filename: str, source: BinaryIO | bytes) -> dict | None:
+    client = _get_minio()
+    if client is None:
         return None
-    client = Minio(
-        MINIO_ENDPOINT,
-        access_key=MINIO_ACCESS_KEY,
-        secret_key=MINIO_SECRET_KEY,
-        secure=MINIO_SECURE,
-    )
-    _ensure_bucket(client, MINIO_BUCKET)
-    safe_name = _sanitize_filename(filename)
-    object_key = f"aasx/{uuid4()}/{safe_name}"
-    client.put_object(
-        MINIO_BUCKET,
-        object_key,
-        io.BytesIO(raw),
-        length=len(raw),
-        content_type="application/octet-stream",
-    )
+    source = _rewindable(source)
+    sha256, size = _hash_stream(source)
+    object_key = f"aasx/sha256/{sha256}.aasx"
+    deduplicated = _minio_object_exists(client, object_key)
+    if not deduplicated:
+        # A known length lets the client stream fixed-size multipart parts
+        # rather than buffering the whole package.
+        client.put_object(
+            MINIO_BUCKET,
+            object_key,
+            source,
+            length=size,
+            part_size=AASX_MINIO_PART_SIZE,
+            content_type="application/octet-stream",
+            metadata={"filename": _sanitize_filename(filename)},
+        )
     public_url = None
     if MINIO_PUBLIC_URL:
         public_url = f"{MINIO_PUBLIC_URL.rstrip('/')}/{MINIO_BUCKET}/{object_key}"
@@ -78,42 +208,134 @@ def _store_minio(filename: str, raw: bytes) -> dict | None:
         "object_key": object_key,
         "bucket": MINIO_BUCKET,
         "url": public_url,
+        "sha256": sha256,
+        "bytes": size,
+        "deduplicated": deduplicated,
     }
 
 
-def store_aasx_payload(
+def _attach_to_session(
     db: Session,
     session_id: str | None,
     filename: str,
-    content_base64: str,
+    stored: dict,
+    manifest: dict,
     metadata: dict,
-) -> dict:
-    safe_filename = _sanitize_filename(filename)
+) -> None:
+    if not session_id:
+        return
     try:
-        raw = base64.b64decode(content_base64)
-    except binascii.Error:
-        raw = content_base64.encode("utf-8")
+        session_uuid = UUID(str(session_id))
+    except ValueError:
+        return
+    instance = (
+        db.query(DppInstance)
+        .filter(DppInstance.session_id == session_uuid)
+        .order_by(DppInstance.created_at.desc())
+        .first()
+    )
+    if not instance:
+        return
+    # Flushed in a savepoint; the caller commits with its own writes.
     try:
-        stored = _store_minio(safe_filename, raw) or _store_local(safe_filename, raw)
-    except Exception:
-        stored = _store_local(safe_filename, raw)
-    if session_id:
-        instance = (
-            db.query(DppInstance)
-            .filter(DppInstance.session_id == session_id)
-            .order_by(DppInstance.created_at.desc())
-            .first()
-        )
-        if instance:
+        with db.begin_nested():
             instance.aasx_object_key = stored.get("object_key")
             instance.aasx_url = stored.get("url")
-            instance.aasx_filename = safe_filename
+            instance.aasx_filename = filename
+            instance.aasx_sha256 = stored.get("sha256")
+            instance.aasx_manifest = manifest
             instance.compliance_status = {
                 **(instance.compliance_status or {}),
-                "aasx_metadata": metadata or {},
+                "aasx_metadata": {
+                    **(metadata or {}),
+                    "sha256": stored.get("sha256"),
+                    "bytes": stored.get("bytes"),
+                },
             }
-            try:
-                db.commit()
-            except Exception:
-                db.rollback()
+    except Exception:
+        pass
+
+
+def store_aasx_stream(
+    db: Session,
+    session_id: str | None,
+    filename: str,
+    source: BinaryIO,
+    metadata: dict,
+) -> dict:
+    """Store an AASX package read from ``source`` in bounded memory.
+
+    The package is stored under its SHA-256, in MinIO when available and on
+    local disk otherwise, and linked to the session's latest DPP instance.
+    """
+    safe_filename = _sanitize_filename(filename)
+    source = _rewindable(source)
+    start = source.tell()
+    try:
+        stored = _store_minio(safe_filename, source)
+    except Exception:
+        _mark_minio_unavailable()
+        stored = None
+    if stored is None:
+        source.seek(start)
+        stored = _store_local(safe_filename, source)
+    stored["filename"] = safe_filename
+    manifest = _index_package(stored, source, start)
+    stored["manifest"] = (
+        {"error": manifest["error"]} if "error" in manifest else summarize(manifest)
+    )
+    _attach_to_session(db, session_id, safe_filename, stored, manifest, metadata)
     return stored
+
+
+def _index_package(stored: dict, source: BinaryIO, start: int) -> dict:
+    """Build the package manifest once, at upload, from the bytes just stored."""
+    try:
+        if stored.get("path"):
+            with open(stored["path"], "rb") as handle:
+                return build_manifest(handle)
+        source.seek(start)
+        return build_manifest(source)
+    except (ManifestError, OSError) as exc:
+        return {"error": str(exc)}
+
+
+def read_stored_range(object_key: str, offset: int, length: int) -> Iterator[bytes]:
+    """Yield ``length`` bytes of a stored package starting at ``offset``."""
+    if object_key.startswith("aasx/"):
+        client = _get_minio()
+        if client is None:
+            raise ManifestError("Object storage unavailable")
+        response = client.get_object(
+            MINIO_BUCKET, object_key, offset=offset, length=length
+        )
+        try:
+            yield from response.stream(AASX_CHUNK_SIZE)
+        finally:
+            response.close()
+            response.release_conn()
+        return
+    path = os.path.join(AASX_STORAGE_DIR, os.path.basename(object_key))
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        remaining = length
+        while remaining > 0:
+            chunk = handle.read(min(AASX_CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+
+def store_aasx_payload(
+    db: Session,
+    session_id: str | None,
+    filename: str,
+    content_base64: str,
+    metadata: dict,
+) -> dict:
+    try:
+        raw = base64.b64decode(content_base64)
+    except binascii.Error:
+        raw = content_base64.encode("utf-8")
+    return store_aasx_stream(db, session_id, filename, io.BytesIO(raw), metadata)
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+from threading import Lock
+from typing import Any
+
+from services.shared.metrics import build_counter, build_histogram
+import redis
+
+from services.shared.redis_client import redis_connection_kwargs
+
+from ..config import (
+    REDIS_URL,
+    STEP_RECEIPT_LEASE_SECONDS,
+    STEP_RECEIPT_REDIS_RETRY_AFTER_SECONDS,
+    STEP_RECEIPT_REDIS_TIMEOUT_MS,
+    STEP_RECEIPT_TTL_SECONDS,
+    STEP_RECEIPT_WAIT_MS,
+)
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_CACHE_LOOKUPS = build_counter(
+    "dpp_simulation_receipt_cache_total",
+    "Idempotency receipt cache lookups by result",
+    ["result"],
+)
+STEP_REPLAY_SECONDS = build_histogram(
+    "dpp_simulation_step_replay_seconds",
+    "Latency of idempotent step replays by the store that served them",
+    ["source"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+SESSION_LOCK_WAIT_SECONDS = build_histogram(
+    "dpp_simulation_session_lock_wait_seconds",
+    "Time spent waiting for the simulation session row lock",
+    [],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0),
+)
+
+
+class ReceiptCache:
+    """Redis front for step idempotency receipts.
+
+    A finished step's result is cached under the receipt key so replays are
+    answered without touching Postgres. A first execution claims a short
+    ``SET NX`` lease on the key so concurrent duplicates wait for its result
+    instead of queueing on the session row lock. Every Redis failure degrades
+    to the Postgres path: lookups miss and leases are granted. After a failure
+    Redis is not called again for ``retry_after_seconds``, so an outage costs
+    one short timeout rather than one per receipt operation.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        prefix: str = "dpp:simulation:receipt",
+        ttl_seconds: int = STEP_RECEIPT_TTL_SECONDS,
+        lease_seconds: int = STEP_RECEIPT_LEASE_SECONDS,
+        retry_after_seconds: float = STEP_RECEIPT_REDIS_RETRY_AFTER_SECONDS,
+    ):
+        self._client = client
+        self._prefix = prefix
+        self._ttl_seconds = ttl_seconds
+        self._lease_seconds = lease_seconds
+        self._retry_after_seconds = retry_after_seconds
+        self._unavailable_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._unavailable_until
+
+    def _mark_unavailable(self) -> None:
+        self._unavailable_until = time.monotonic() + self._retry_after_seconds
+
+    def _result_key(self, session_id: str, receipt_key: str) -> str:
+        return f"{self._prefix}:{session_id}:{receipt_key}"
+
+    def _lease_key(self, session_id: str, receipt_key: str) -> str:
+        return f"{self._result_key(session_id, receipt_key)}:lease"
+
+    def get(self, session_id: str, receipt_key: str) -> dict[str, Any] | None:
+        if not self.available:
+            RECEIPT_CACHE_LOOKUPS.labels(result="skipped").inc()
+            return None
+        try:
+            raw = self._client.get(self._result_key(session_id, receipt_key))
+        except Exception as exc:
+            self._mark_unavailable()
+            RECEIPT_CACHE_LOOKUPS.labels(result="error").inc()
+            logger.warning("Receipt cache lookup failed", extra={"error": str(exc)})
+            return None
+        if not raw:
+            RECEIPT_CACHE_LOOKUPS.labels(result="miss").inc()
+            return None
+        RECEIPT_CACHE_LOOKUPS.labels(result="hit").inc()
+        return json.loads(raw)
+
+    def acquire(self, session_id: str, receipt_key: str, owner: str) -> bool:
+        if not self.available:
+            return True
+        try:
+            return bool(
+                self._client.set(
+                    self._lease_key(session_id, receipt_key),
+                    owner,
+                    nx=True,
+                    ex=self._lease_seconds,
+                )
+            )
+        except Exception as exc:
+            self._mark_unavailable()
+            logger.warning("Receipt lease unavailable", extra={"error": str(exc)})
+            return True
+
+    def wait_for(
+        self,
+        session_id: str,
+        receipt_key: str,
+        *,
+        timeout_ms: int = STEP_RECEIPT_WAIT_MS,
+        interval_ms: int = 25,
+    ) -> dict[str, Any] | None:
+        """Poll for the result of an execution that holds the lease."""
+        deadline = time.monotonic() + timeout_ms / 1000
+        while self.available and time.monotonic() < deadline:
+            time.sleep(interval_ms / 1000)
+            result = self.get(session_id, receipt_key)
+            if result is not None:
+                return result
+        return None
+
+    def store(self, session_id: str, receipt_key: str, result: dict[str, Any]) -> None:
+        if not self.available:
+            return
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.set(
+                self._result_key(session_id, receipt_key),
+                json.dumps(result),
+                ex=self._ttl_seconds,
+            )
+            pipe.delete(self._lease_key(session_id, receipt_key))
+            pipe.execute()
+        except Exception as exc:
+            self._mark_unavailable()
+            logger.warning("Failed to cache step receipt", extra={"error": str(exc)})
+
+    def release(self, session_id: str, receipt_key: str, owner: str) -> None:
+        if not self.available:
+            return
+        key = self._lease_key(session_id, receipt_key)
+        try:
+            current = self._client.get(key)
+            if isinstance(current, bytes):
+                current = current.decode("utf-8")
+            if current == owner:
+                self._client.delete(key)
+        except Exception as exc:
+            self._mark_unavailable()
+            logger.warning("Failed to release receipt lease", extra={"error": str(exc)})
+
+
+_cache: ReceiptCache | None = None
+_cache_lock = Lock()
+
+
+def _receipt_redis() -> redis.Redis:
+    timeout = STEP_RECEIPT_REDIS_TIMEOUT_MS / 1000
+    return redis.from_url(
+        REDIS_URL,
+        **{
+            **redis_connection_kwargs(),
+            "socket_timeout": timeout,
+            "socket_connect_timeout": timeout,
+            "retry_on_timeout": False,
+        },
+    )
+
+
+def get_receipt_cache() -> ReceiptCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ReceiptCache(_receipt_redis())
+    return _cache
+
+
+def set_receipt_cache(cache: ReceiptCache | None) -> None:
+    global _cache
+    with _cache_lock:
+        _cache = cache
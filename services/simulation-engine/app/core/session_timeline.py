@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import STEP_RECEIPT_TTL_SECONDS
+from ..models.session import SimulationSession
+from ..models.session_timeline import SessionStepReceipt, SessionTimelineEntry
+
+TIMELINE_SUMMARY_RECENT = 5
+MAX_TIMELINE_PAGE = 200
+
+# Keys that used to hold unbounded lists inside ``session_state``; they now
+# live in their own tables and are never returned with the session.
+LEGACY_STATE_KEYS = ("timeline", "step_receipts", "aas_updates")
+# Keys maintained by the server that client state updates must not overwrite.
+SERVER_MANAGED_STATE_KEYS = ("timeline_summary",)
+
+
+def public_state(state: dict[str, Any] | None) -> dict[str, Any]:
+    return {
+        key: value
+        for key, value in (state or {}).items()
+        if key not in LEGACY_STATE_KEYS
+    }
+
+
+def merge_client_state(
+    current: dict[str, Any] | None, incoming: dict[str, Any] | None
+) -> dict[str, Any]:
+    """Apply a client-supplied state while keeping server-managed keys."""
+    current = current or {}
+    merged = {
+        key: value
+        for key, value in (incoming or {}).items()
+        if key not in SERVER_MANAGED_STATE_KEYS
+    }
+    for key in SERVER_MANAGED_STATE_KEYS:
+        if key in current:
+            merged[key] = current[key]
+    return merged
+
+
+def append_timeline_entry(
+    db: Session,
+    session: SimulationSession,
+    *,
+    kind: str,
+    payload: dict[str, Any],
+    step_idx: int | None = None,
+    action: str | None = None,
+) -> SessionTimelineEntry:
+    """Stage a timeline row and update the bounded summary in session state.
+
+    ``seq`` is allocated here, just before the insert, from the highest
+    stored ``seq`` and the summary count (which also covers rows staged
+    earlier in this transaction). Callers must hold the session row lock,
+    taken after any upstream I/O, until the transaction commits.
+    """
+    state = dict(session.session_state or {})
+    summary = dict(state.get("timeline_summary") or {})
+    stored_max = (
+        db.query(func.max(SessionTimelineEntry.seq))
+        .filter(SessionTimelineEntry.session_id == session.id)
+        .scalar()
+    )
+    seq = max(int(stored_max or 0), int(summary.get("count") or 0)) + 1
+    entry = SessionTimelineEntry(
+        session_id=session.id,
+        seq=seq,
+        kind=kind,
+        step_idx=step_idx,
+        action=action,
+        payload=payload,
+    )
+    db.add(entry)
+
+    result = payload.get("result")
+    recent = list(summary.get("recent") or [])
+    recent.append(
+        {
+            "seq": seq,
+            "kind": kind,
+            "step": step_idx,
+            "action": action,
+            "status": result.get("status") if isinstance(result, dict) else None,
+            "timestamp": payload.get("timestamp"),
+        }
+    )
+    summary["count"] = seq
+    summary["recent"] = recent[-TIMELINE_SUMMARY_RECENT:]
+    if kind == "aas_update":
+        summary["aas_updates"] = int(summary.get("aas_updates") or 0) + 1
+    state["timeline_summary"] = summary
+    session.session_state = state
+    return entry
+
+
+def _entry_to_dict(entry: SessionTimelineEntry) -> dict[str, Any]:
+    return {
+        "seq": entry.seq,
+        "kind": entry.kind,
+        "step_idx": entry.step_idx,
+        "action": entry.action,
+        "payload": entry.payload or {},
+        "created_at": entry.created_at.isoformat() if entry.created_at else None,
+    }
+
+
+def list_timeline(
+    db: Session,
+    session_id: UUID,
+    *,
+    after_seq: int | None = None,
+    limit: int = 50,
+    kind: str | None = None,
+) -> tuple[list[dict[str, Any]], int | None]:
+    """Return one page of timeline entries in ``seq`` order and the next cursor."""
+    bounded = max(1, min(limit, MAX_TIMELINE_PAGE))
+    query = db.query(SessionTimelineEntry).filter(
+        SessionTimelineEntry.session_id == session_id
+    )
+    if after_seq is not None:
+        query = query.filter(SessionTimelineEntry.seq > after_seq)
+    if kind:
+        query = query.filter(SessionTimelineEntry.kind == kind)
+    rows = query.order_by(SessionTimelineEntry.seq.asc()).limit(bounded + 1).all()
+    next_cursor = rows[bounded - 1].seq if len(rows) > bounded else None
+    return [_entry_to_dict(row) for row in rows[:bounded]], next_cursor
+
+
+def load_receipt(
+    db: Session,
+    session_id: UUID,
+    receipt_key: str,
+    *,
+    now: datetime | None = None,
+) -> dict[str, Any] | None:
+    now = now or datetime.now(timezone.utc)
+    row = (
+        db.query(SessionStepReceipt)
+        .filter(
+            SessionStepReceipt.session_id == session_id,
+            SessionStepReceipt.receipt_key == receipt_key,
+            SessionStepReceipt.expires_at > now,
+        )
+        .first()
+    )
+    return row.result if row else None
+
+
+def save_receipt(
+    db: Session,
+    session_id: UUID,
+    receipt_key: str,
+    result: dict[str, Any],
+    *,
+    ttl_seconds: int = STEP_RECEIPT_TTL_SECONDS,
+    now: datetime | None = None,
+) -> SessionStepReceipt:
+    now = now or datetime.now(timezone.utc)
+    # Expired receipts of the session are dropped as new ones are written, so
+    # the table stays bounded per session without a separate sweeper.
+    db.query(SessionStepReceipt).filter(
+        SessionStepReceipt.session_id == session_id,
+        SessionStepReceipt.expires_at <= now,
+    ).delete(synchronize_session=False)
+    row = SessionStepReceipt(
+        session_id=session_id,
+        receipt_key=receipt_key,
+        result=result,
+        expires_at=now + timedelta(seconds=ttl_seconds),
+    )
+    db.add(row)
+    return row
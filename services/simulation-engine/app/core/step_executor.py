@@ -1,40 +1,22 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import Any, Callable
-from uuid import uuid4
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import threading
+from typing import Any
 
-import requests
 from sqlalchemy.orm import Session
 
-from ..config import AAS_ADAPTER_URL, COMPLIANCE_URL, EDC_URL
-from ..models.dpp_instance import DppInstance
-from ..models.session import SimulationSession
+from ..config import (
+    AAS_ADAPTER_URL,
+    COMPLIANCE_URL,
+    EDC_URL,
+    STEP_BATCH_MAX_WORKERS,
+    STEP_UPSTREAM_CONCURRENCY,
+)
 from .aasx_storage import store_aasx_payload
 from .service_token import get_service_token
-from services.shared.http_client import request as pooled_request
-
-StepHandler = Callable[
-    [
-        Session,
-        dict[str, Any],
-        dict[str, Any],
-        dict[str, Any],
-        dict[str, Any] | None,
-        dict[str, str],
-    ],
-    dict[str, Any],
-]
-
-
-def _default_payload(payload: dict[str, Any], params: dict[str, Any]) -> dict[str, Any]:
-    if payload:
-        return payload
-    if not params:
-        return {}
-    if params.get("payload") is not None:
-        return params.get("payload") or {}
-    return params
+from services.shared.step_plugins import BuiltinStepPlugins, default_payload
+from services.shared.step_runtime import StepHandler, StepRuntime, unknown_action
 
 
 def _request_headers() -> dict[str, str]:
@@ -42,343 +24,6 @@ def _request_headers() -> dict[str, str]:
     return {"Authorization": f"Bearer {token}"} if token else {}
 
 
-def _call_aas_adapter(
-    method: str,
-    path: str,
-    *,
-    json_body: dict[str, Any] | None,
-    headers: dict[str, str],
-) -> dict[str, Any]:
-    response = pooled_request(
-        method=method,
-        url=f"{AAS_ADAPTER_URL}{path}",
-        json=json_body,
-        headers=headers,
-        timeout=8,
-        session_name="simulation-engine-step-executor",
-    )
-    response.raise_for_status()
-    if not response.content:
-        return {}
-    payload = response.json()
-    return payload if isinstance(payload, dict) else {"items": payload}
-
-
-def _execute_user_input(
-    _db: Session,
-    params: dict[str, Any],
-    payload: dict[str, Any],
-    _context: dict[str, Any],
-    _metadata: dict[str, Any] | None,
-    _headers: dict[str, str],
-) -> dict[str, Any]:
-    if payload:
-        return {"status": "completed", "data": payload}
-    return {"status": "awaiting_input", "prompt": params.get("prompt")}
-
-
-def _execute_compliance_check(
-    db: Session,
-    params: dict[str, Any],
-    payload: dict[str, Any],
-    context: dict[str, Any],
-    _metadata: dict[str, Any] | None,
-    headers: dict[str, str],
-) -> dict[str, Any]:
-    regulations = payload.get("regulations") or params.get("regulations") or []
-    data = payload.get("data") if isinstance(payload, dict) else payload
-    if not data:
-        data = params.get("data")
-    body = {
-        "data": data,
-        "regulations": regulations,
-        "user_id": context.get("user_id"),
-        "session_id": context.get("session_id"),
-        "story_code": context.get("story_code"),
-    }
-    try:
-        response = pooled_request(
-            method="POST",
-            url=f"{COMPLIANCE_URL}/api/v1/compliance/check",
-            json=body,
-            headers=headers,
-            timeout=8,
-            session_name="simulation-engine-step-executor",
-        )
-        response.raise_for_status()
-        result = response.json()
-        # Keep digital twin compliance node in sync when a DPP exists.
-        try:
-            from services.shared.repositories import digital_twin_repo
-
-            session_id = context.get("session_id")
-            if session_id:
-                dpp = (
-                    db.query(DppInstance)
-                    .filter(DppInstance.session_id == session_id)
-                    .first()
-                )
-                if dpp:
-                    graph = digital_twin_repo.get_graph(db, dpp.id)
-                    if graph:
-                        for node in graph["nodes"]:
-                            if node.node_key == "compliance":
-                                node.payload = {
-                                    "status": result.get("status", "unknown"),
-                                    "result": result,
-                                }
-                                db.commit()
-                                break
-        except Exception:
-            pass
-        return {"status": result.get("status", "unknown"), "data": result}
-    except requests.RequestException as exc:
-        return {"status": "error", "error": str(exc)}
-
-
-def _execute_edc_negotiation(
-    _db: Session,
-    params: dict[str, Any],
-    payload: dict[str, Any],
-    context: dict[str, Any],
-    _metadata: dict[str, Any] | None,
-    headers: dict[str, str],
-) -> dict[str, Any]:
-    outgoing = _default_payload(payload, params)
-    if (
-        isinstance(outgoing, dict)
-        and context.get("session_id")
-        and not outgoing.get("session_id")
-    ):
-        outgoing["session_id"] = context.get("session_id")
-    try:
-        response = pooled_request(
-            method="POST",
-            url=f"{EDC_URL}/api/v1/edc/negotiations",
-            json=outgoing,
-            headers=headers,
-            timeout=8,
-            session_name="simulation-engine-step-executor",
-        )
-        response.raise_for_status()
-        return {"status": "ok", "data": response.json()}
-    except requests.RequestException as exc:
-        return {"status": "error", "error": str(exc)}
-
-
-def _execute_edc_transfer(
-    _db: Session,
-    params: dict[str, Any],
-    payload: dict[str, Any],
-    context: dict[str, Any],
-    _metadata: dict[str, Any] | None,
-    headers: dict[str, str],
-) -> dict[str, Any]:
-    outgoing = _default_payload(payload, params)
-    if (
-        isinstance(outgoing, dict)
-        and context.get("session_id")
-        and not outgoing.get("session_id")
-    ):
-        outgoing["session_id"] = context.get("session_id")
-    try:
-        response = pooled_request(
-            method="POST",
-            url=f"{EDC_URL}/api/v1/edc/transfers",
-            json=outgoing,
-            headers=headers,
-            timeout=8,
-            session_name="simulation-engine-step-executor",
-        )
-        response.raise_for_status()
-        return {"status": "ok", "data": response.json()}
-    except requests.RequestException as exc:
-        return {"status": "error", "error": str(exc)}
-
-
-def _execute_aas_create(
-    db: Session,
-    params: dict[str, Any],
-    payload: dict[str, Any],
-    context: dict[str, Any],
-    _metadata: dict[str, Any] | None,
-    headers: dict[str, str],
-) -> dict[str, Any]:
-    outgoing = _default_payload(payload, params)
-    if not isinstance(outgoing, dict):
-        return {"status": "error", "error": "Payload must be object"}
-
-    aas_identifier = outgoing.get("aas_identifier") or outgoing.get("id")
-    product_name = outgoing.get("product_name") or outgoing.get("idShort")
-    asset_info = (
-        outgoing.get("assetInformation", {})
-        if isinstance(outgoing.get("assetInformation"), dict)
-        else {}
-    )
-    product_identifier = outgoing.get("product_identifier") or asset_info.get(
-        "globalAssetId"
-    )
-    if not aas_identifier:
-        return {"status": "error", "error": "Missing aas_identifier"}
-
-    adapter_payload = {
-        "aas_identifier": str(aas_identifier),
-        "product_name": product_name,
-        "product_identifier": product_identifier,
-    }
-    try:
-        adapter_result = _call_aas_adapter(
-            "POST",
-            "/api/v2/aas/shells",
-            json_body=adapter_payload,
-            headers=headers,
-        )
-    except requests.RequestException as exc:
-        return {"status": "error", "error": str(exc)}
-    shell = adapter_result.get("shell") or adapter_result.get("aas") or outgoing
-    status = adapter_result.get("status") or "created"
-
-    dpp = DppInstance(
-        id=uuid4(),
-        session_id=context.get("session_id"),
-        aas_identifier=str(aas_identifier),
-        product_identifier=product_identifier,
-        product_name=product_name,
-        product_category=outgoing.get("product_category"),
-        compliance_status={},
-    )
-    try:
-        db.add(dpp)
-        db.commit()
-    except Exception:
-        db.rollback()
-
-    try:
-        from services.shared.repositories import digital_twin_repo
-
-        snapshot = digital_twin_repo.create_snapshot(
-            db, dpp_instance_id=dpp.id, label="Initial DPP"
-        )
-        digital_twin_repo.add_node(
-            db,
-            snapshot.id,
-            "product",
-            "asset",
-            product_name or "Product",
-            {"aas_id": str(dpp.aas_identifier)},
-        )
-        digital_twin_repo.add_node(
-            db, snapshot.id, "compliance", "status", "Compliance", {"status": "pending"}
-        )
-        digital_twin_repo.add_node(
-            db, snapshot.id, "transfer", "dataspace", "Transfer", {}
-        )
-        digital_twin_repo.add_edge(
-            db, snapshot.id, "product-compliance", "product", "compliance", "validates"
-        )
-        digital_twin_repo.add_edge(
-            db, snapshot.id, "product-transfer", "product", "transfer", "transfers"
-        )
-        db.commit()
-    except Exception:
-        db.rollback()
-        pass
-    return {"status": status, "data": shell}
-
-
-def _execute_aas_submodel_add(
-    _db: Session,
-    params: dict[str, Any],
-    payload: dict[str, Any],
-    _context: dict[str, Any],
-    _metadata: dict[str, Any] | None,
-    headers: dict[str, str],
-) -> dict[str, Any]:
-    outgoing = _default_payload(payload, params)
-    if not isinstance(outgoing, dict):
-        return {"status": "error", "error": "Payload must be object"}
-    submodel = outgoing.get("submodel") or outgoing
-    try:
-        adapter_result = _call_aas_adapter(
-            "POST",
-            "/api/v2/aas/submodels",
-            json_body={"submodel": submodel},
-            headers=headers,
-        )
-    except requests.RequestException as exc:
-        return {"status": "error", "error": str(exc)}
-    return {
-        "status": adapter_result.get("status") or "created",
-        "data": adapter_result.get("submodel", submodel),
-    }
-
-
-def _execute_aas_submodel_patch(
-    _db: Session,
-    params: dict[str, Any],
-    payload: dict[str, Any],
-    _context: dict[str, Any],
-    _metadata: dict[str, Any] | None,
-    headers: dict[str, str],
-) -> dict[str, Any]:
-    outgoing = _default_payload(payload, params)
-    if not isinstance(outgoing, dict):
-        return {"status": "error", "error": "Payload must be object"}
-    submodel_id = outgoing.get("submodel_id")
-    elements = outgoing.get("elements")
-    if not submodel_id or elements is None:
-        return {"status": "error", "error": "Missing submodel_id or elements"}
-    try:
-        adapter_result = _call_aas_adapter(
-            "PATCH",
-            f"/api/v2/aas/submodels/{submodel_id}/elements",
-            json_body={"elements": elements},
-            headers=headers,
-        )
-    except requests.RequestException as exc:
-        return {"status": "error", "error": str(exc)}
-    return {
-        "status": adapter_result.get("status") or "updated",
-        "data": adapter_result.get("elements", elements),
-    }
-
-
-def _execute_aas_update(
-    db: Session,
-    params: dict[str, Any],
-    payload: dict[str, Any],
-    context: dict[str, Any],
-    _metadata: dict[str, Any] | None,
-    _headers: dict[str, str],
-) -> dict[str, Any]:
-    outgoing = _default_payload(payload, params)
-    update_name = None
-    if isinstance(outgoing, dict):
-        update_name = outgoing.get("update")
-    if update_name and context.get("session_id"):
-        session = (
-            db.query(SimulationSession)
-            .filter(SimulationSession.id == context.get("session_id"))
-            .first()
-        )
-        if session:
-            current_state = session.session_state or {}
-            updates = current_state.get("aas_updates", [])
-            updates.append(
-                {
-                    "update": update_name,
-                    "payload": outgoing,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                }
-            )
-            session.session_state = {**current_state, "aas_updates": updates}
-            try:
-                db.commit()
-            except Exception:
-                db.rollback()
-    return {"status": "updated", "data": outgoing}
-
-
 def _execute_aasx_upload(
     db: Session,
     params: dict[str, Any],
@@ -387,7 +32,7 @@ def _execute_aasx_upload(
     metadata: dict[str, Any] | None,
     _headers: dict[str, str],
 ) -> dict[str, Any]:
-    outgoing = _default_payload(payload, params)
+    outgoing = default_payload(payload, params)
     if not isinstance(outgoing, dict):
         return {"status": "error", "error": "Payload must be object"}
     filename = outgoing.get("filename") or "dpp.aasx"
@@ -404,106 +49,226 @@ def _execute_aasx_upload(
     return {"status": "stored", "data": stored}
 
 
-def _execute_api_call(
-    _db: Session,
-    params: dict[str, Any],
-    payload: dict[str, Any],
-    _context: dict[str, Any],
-    _metadata: dict[str, Any] | None,
-    _headers: dict[str, str],
-) -> dict[str, Any]:
-    outgoing = _default_payload(payload, params)
-    return {"status": "called", "data": outgoing}
+STEP_RUNTIME = BuiltinStepPlugins(
+    compliance_url=COMPLIANCE_URL,
+    edc_url=EDC_URL,
+    aas_adapter_url=AAS_ADAPTER_URL,
+    session_name="simulation-engine-step-executor",
+).register(StepRuntime("simulation-engine"))
+# Uploads write to storage and the session's DB; they always run inline.
+STEP_RUNTIME.register("aasx.upload", _execute_aasx_upload, timeout=None)
+STEP_RUNTIME.register("aas_upload_aasx", _execute_aasx_upload, timeout=None)
 
 
-def _execute_json_patch(
-    _db: Session,
-    params: dict[str, Any],
-    payload: dict[str, Any],
-    _context: dict[str, Any],
-    _metadata: dict[str, Any] | None,
-    _headers: dict[str, str],
-) -> dict[str, Any]:
-    outgoing = _default_payload(payload, params)
-    if not isinstance(outgoing, dict):
-        return {"status": "error", "error": "Payload must be object"}
-    document = outgoing.get("document")
-    operations = outgoing.get("operations")
-    if not isinstance(document, dict) or not isinstance(operations, list):
-        return {"status": "patched", "data": outgoing}
-
-    patched = dict(document)
-    for operation in operations:
-        if not isinstance(operation, dict):
-            continue
-        op = operation.get("op")
-        path = str(operation.get("path", "")).strip("/")
-        if not path:
-            continue
-        if op in {"add", "replace"}:
-            patched[path] = operation.get("value")
-        elif op == "remove":
-            patched.pop(path, None)
-    return {"status": "patched", "data": patched}
-
-
-STEP_PLUGINS: dict[str, StepHandler] = {
-    "user.input": _execute_user_input,
-    "compliance.check": _execute_compliance_check,
-    "compliance_check": _execute_compliance_check,
-    "edc.negotiate": _execute_edc_negotiation,
-    "edc_negotiation": _execute_edc_negotiation,
-    "edc.transfer": _execute_edc_transfer,
-    "aas.create": _execute_aas_create,
-    "aas_create_shell": _execute_aas_create,
-    "aas.submodel.add": _execute_aas_submodel_add,
-    "aas.submodel.patch": _execute_aas_submodel_patch,
-    "aas.update": _execute_aas_update,
-    "aasx.upload": _execute_aasx_upload,
-    "aas_upload_aasx": _execute_aasx_upload,
-    "api.call": _execute_api_call,
-    "http_call": _execute_api_call,
-    "json_patch": _execute_json_patch,
-}
+BATCH_FAILURE_STATUSES = {"error", "timeout", "unknown_action", "skipped"}
 
 
-def register_step_plugin(step_type: str, handler: StepHandler) -> None:
-    STEP_PLUGINS[step_type] = handler
+def register_step_plugin(
+    step_type: str,
+    handler: StepHandler,
+    *,
+    timeout: float | None = None,
+    idempotent: bool = False,
+) -> None:
+    STEP_RUNTIME.register(step_type, handler, timeout=timeout, idempotent=idempotent)
 
 
 def list_registered_step_plugins() -> list[str]:
-    return sorted(STEP_PLUGINS.keys())
+    return STEP_RUNTIME.actions()
 
 
 def execute_step(
-    db: Session,
+    db: Session | None,
     action: str,
     params: dict[str, Any],
     payload: dict[str, Any],
     context: dict[str, Any],
     metadata: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    handler = STEP_PLUGINS.get(action)
-    if handler is None:
-        return {
-            "status": "unknown_action",
-            "message": f"No step plugin is registered for '{action}'",
-            "action": action,
-        }
+    if STEP_RUNTIME.get(action) is None:
+        return unknown_action(action)
     headers = _request_headers()
     request_id = context.get("request_id")
     if request_id:
         headers["X-Request-ID"] = str(request_id)
-    try:
-        result = handler(db, params, payload, context, metadata, headers)
-    except Exception as exc:
-        return {
-            "status": "error",
-            "message": f"Step execution failed for '{action}'",
-            "error": str(exc),
-        }
-
-    status = result.get("status", "completed")
-    result.setdefault("status", status)
-    result.setdefault("message", f"Step '{action}' finished with status '{status}'")
-    return result
+    return STEP_RUNTIME.execute(
+        db, action, params, payload, context, metadata=metadata, headers=headers
+    )
+
+
+# Upstream each action talks to; batch execution bounds concurrency per upstream
+# so a wide DAG cannot flood a single dependency.
+ACTION_UPSTREAMS: dict[str, str] = {
+    "compliance.check": "compliance",
+    "compliance_check": "compliance",
+    "edc.negotiate": "edc",
+    "edc_negotiation": "edc",
+    "edc.transfer": "edc",
+    "aas.create": "aas-adapter",
+    "aas_create_shell": "aas-adapter",
+    "aas.submodel.add": "aas-adapter",
+    "aas.submodel.patch": "aas-adapter",
+    "aasx.upload": "storage",
+    "aas_upload_aasx": "storage",
+}
+
+_upstream_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_batch_executor: ThreadPoolExecutor | None = None
+_batch_lock = threading.Lock()
+
+
+def _upstream_semaphore(action: str) -> threading.BoundedSemaphore:
+    upstream = ACTION_UPSTREAMS.get(action, "local")
+    with _batch_lock:
+        semaphore = _upstream_semaphores.get(upstream)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(STEP_UPSTREAM_CONCURRENCY)
+            _upstream_semaphores[upstream] = semaphore
+        return semaphore
+
+
+def _get_batch_executor() -> ThreadPoolExecutor:
+    global _batch_executor
+    with _batch_lock:
+        if _batch_executor is None:
+            _batch_executor = ThreadPoolExecutor(
+                max_workers=STEP_BATCH_MAX_WORKERS,
+                thread_name_prefix="step-batch",
+            )
+        return _batch_executor
+
+
+def validate_step_dag(steps: list[dict[str, Any]]) -> list[str]:
+    """Return step keys in a dependency-respecting order or raise ``ValueError``."""
+    keys = [str(step["key"]) for step in steps]
+    if len(set(keys)) != len(keys):
+        raise ValueError("Batch step keys must be unique")
+    known = set(keys)
+    pending = {
+        str(step["key"]): {str(dep) for dep in step.get("depends_on") or []}
+        for step in steps
+    }
+    for key, deps in pending.items():
+        unknown = deps - known
+        if unknown:
+            raise ValueError(
+                f"Step '{key}' depends on unknown steps: {sorted(unknown)}"
+            )
+        if key in deps:
+            raise ValueError(f"Step '{key}' depends on itself")
+
+    order: list[str] = []
+    resolved: set[str] = set()
+    while pending:
+        ready = [key for key in keys if key in pending and pending[key] <= resolved]
+        if not ready:
+            raise ValueError("Batch steps contain a dependency cycle")
+        for key in ready:
+            order.append(key)
+            resolved.add(key)
+            pending.pop(key)
+    return order
+
+
+def _run_batch_step(
+    db: Session | None, step: dict[str, Any], context: dict[str, Any]
+) -> dict[str, Any]:
+    with _upstream_semaphore(step["action"]):
+        return execute_step(
+            db,
+            step["action"],
+            step.get("params") or {},
+            step.get("payload") or {},
+            context,
+            metadata=step.get("metadata"),
+        )
+
+
+def _batch_step_failed(step: dict[str, Any], exc: Exception) -> dict[str, Any]:
+    return {
+        "status": "error",
+        "message": f"Step execution failed for '{step['action']}'",
+        "error": str(exc),
+    }
+
+
+def _uses_session(action: str) -> bool:
+    # Only inline plugins get the caller's session (see StepRuntime).
+    plugin = STEP_RUNTIME.get(action)
+    return plugin is not None and plugin.timeout is None
+
+
+def execute_step_batch(
+    steps: list[dict[str, Any]],
+    context: dict[str, Any],
+    *,
+    db: Session,
+) -> dict[str, dict[str, Any]]:
+    """Execute a DAG of steps concurrently and return results keyed by step key.
+
+    Each step is a dict with ``key``, ``action``, ``params``, ``payload``,
+    optional ``metadata`` and ``depends_on`` (keys of earlier steps). A step is
+    submitted once all of its dependencies finished without an error status;
+    dependents of a failed step are reported as ``skipped``. Every step
+    acquires the semaphore of the upstream its action calls.
+
+    Steps whose plugin writes to the DB run one at a time on the calling
+    thread, each in a savepoint of ``db``, while the other steps run on a
+    bounded shared executor without a session. Nothing is committed here: the
+    caller commits the handlers' writes together with its own bookkeeping.
+    """
+    validate_step_dag(steps)
+    by_key = {str(step["key"]): step for step in steps}
+    deps = {
+        key: {str(dep) for dep in step.get("depends_on") or []}
+        for key, step in by_key.items()
+    }
+    results: dict[str, dict[str, Any]] = {}
+    running: dict[Future, str] = {}
+    staged: list[str] = []
+    executor = _get_batch_executor()
+
+    def _schedule_ready() -> None:
+        for key, step in by_key.items():
+            if key in results or key in staged or key in running.values():
+                continue
+            if not deps[key] <= results.keys():
+                continue
+            failed = [
+                dep
+                for dep in deps[key]
+                if results[dep].get("status") in BATCH_FAILURE_STATUSES
+            ]
+            if failed:
+                results[key] = {
+                    "status": "skipped",
+                    "message": f"Skipped because dependencies failed: {sorted(failed)}",
+                    "action": step["action"],
+                }
+            elif _uses_session(step["action"]):
+                staged.append(key)
+            else:
+                future = executor.submit(_run_batch_step, None, step, context)
+                running[future] = key
+
+    _schedule_ready()
+    while len(results) < len(by_key):
+        if staged:
+            key = staged.pop(0)
+            try:
+                with db.begin_nested():
+                    results[key] = _run_batch_step(db, by_key[key], context)
+            except Exception as exc:
+                results[key] = _batch_step_failed(by_key[key], exc)
+        elif running:
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                key = running.pop(future)
+                try:
+                    results[key] = future.result()
+                except Exception as exc:
+                    results[key] = _batch_step_failed(by_key[key], exc)
+        # Otherwise only skipped steps were resolved in the last pass.
+        _schedule_ready()
+
+    return {key: results[key] for key in by_key}
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-import copy
+import hashlib
+import mmap
 import os
+import threading
+import time
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping
 
+import orjson
 import yaml
 from pydantic import ValidationError
 
@@ -13,8 +19,95 @@ from ..schemas.story_schema import StoryDefinition
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 DEFAULT_DATA_DIR = os.path.join(ROOT_DIR, "data", "stories")
 DATA_DIR: str = os.getenv("STORY_DATA_DIR") or DEFAULT_DATA_DIR
+DEFAULT_BUNDLE_PATH = os.path.join(ROOT_DIR, "data", "stories.bundle.json")
+BUNDLE_FORMAT = 1
 
-_CACHE: dict[str, dict[str, Any]] = {}
+
+def _as_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        parsed = float(raw)
+    except ValueError:
+        return default
+    return parsed if parsed >= 0 else default
+
+
+# Story files are re-stat'ed at most this often; lookups in between are served
+# from the in-memory index without touching the filesystem.
+REFRESH_INTERVAL_SECONDS = _as_float("STORY_REFRESH_INTERVAL_SECONDS", 2.0)
+
+
+def _story_source() -> str:
+    """``bundle`` requires a compiled bundle, ``yaml`` always parses the YAML
+    sources, and ``auto`` (dev default) uses a bundle only while its content
+    hash still matches the YAML sources, so local edits are never masked."""
+    source = (os.getenv("STORY_SOURCE") or "auto").strip().lower()
+    return source if source in {"auto", "bundle", "yaml"} else "auto"
+
+
+def _bundle_path() -> str:
+    return os.getenv("STORY_BUNDLE_PATH") or DEFAULT_BUNDLE_PATH
+
+
+class FrozenDict(dict):
+    """Read-only ``dict`` shared by every reader of the story cache.
+
+    It stays a ``dict`` subclass so JSON encoders, FastAPI and pydantic treat
+    it like any other mapping; mutation raises ``TypeError``. Use
+    :func:`mutable_copy` to get a private, writable copy.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *_args: Any, **_kwargs: Any):
+        raise TypeError("Story definitions are read-only; use mutable_copy()")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+    def __deepcopy__(self, _memo: dict) -> "FrozenDict":
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def mutable_copy(value: Any) -> Any:
+    """Return a plain, writable deep copy of a (possibly frozen) story value."""
+    if isinstance(value, dict):
+        return {key: mutable_copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [mutable_copy(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class _StoryIndex:
+    signature: tuple[tuple[str, int, int], ...]
+    stories: tuple[Mapping[str, Any], ...]
+    by_code: Mapping[str, Mapping[str, Any]]
+    by_epic: Mapping[str, tuple[Mapping[str, Any], ...]]
+    checked_at: float
+    content_hash: str | None = None
+
+
+# Keyed by the explicit ``data_dir`` or ``None`` for the configured default,
+# so the hot path never resolves paths or touches the filesystem.
+_CACHE: dict[str | None, _StoryIndex] = {}
+_CACHE_LOCK = threading.Lock()
 
 
 def _resolve_data_dir(data_dir: str | None = None) -> str:
@@ -66,16 +159,9 @@ def _validate_story(raw_story: Any, *, source: str, index: int) -> dict[str, Any
     return validated.model_dump(exclude_none=True)
 
 
-def _load_all(data_dir: str | None = None) -> list[dict[str, Any]]:
-    resolved_dir = _resolve_data_dir(data_dir)
-    if not os.path.exists(resolved_dir):
-        raise KeyError(f"Story data directory not found: {resolved_dir}")
-
-    signature = _story_files_signature(resolved_dir)
-    cached = _CACHE.get(resolved_dir)
-    if cached and cached.get("signature") == signature:
-        return copy.deepcopy(cached.get("stories", []))
-
+def _parse_stories(
+    resolved_dir: str, signature: tuple[tuple[str, int, int], ...]
+) -> list[dict[str, Any]]:
     all_stories: list[dict[str, Any]] = []
     for filename, _, _ in signature:
         file_path = os.path.join(resolved_dir, filename)
@@ -86,23 +172,189 @@ def _load_all(data_dir: str | None = None) -> list[dict[str, Any]]:
         for index, raw_story in enumerate(parsed):
             validated = _validate_story(raw_story, source=file_path, index=index)
             all_stories.append(_decorate(validated))
+    return all_stories
+
 
-    _CACHE[resolved_dir] = {
-        "signature": signature,
-        "stories": copy.deepcopy(all_stories),
+def _sources_hash(
+    resolved_dir: str, signature: tuple[tuple[str, int, int], ...]
+) -> str:
+    digest = hashlib.sha256()
+    for filename, _, _ in signature:
+        digest.update(filename.encode("utf-8") + b"\0")
+        with open(os.path.join(resolved_dir, filename), "rb") as handle:
+            digest.update(handle.read())
+    return digest.hexdigest()
+
+
+def compile_story_bundle(
+    output_path: str | None = None, *, data_dir: str | None = None
+) -> dict[str, Any]:
+    """Validate the YAML sources and write them as a single JSON bundle.
+
+    The bundle carries a SHA-256 over the source files so an unchanged pack
+    is recognised without re-freezing it. It is written atomically.
+    """
+    resolved_dir = _resolve_data_dir(data_dir)
+    if not os.path.exists(resolved_dir):
+        raise KeyError(f"Story data directory not found: {resolved_dir}")
+    output_path = output_path or _bundle_path()
+    signature = _story_files_signature(resolved_dir)
+    stories = _parse_stories(resolved_dir, signature)
+    content_hash = _sources_hash(resolved_dir, signature)
+    bundle = {
+        "format": BUNDLE_FORMAT,
+        "content_hash": content_hash,
+        "sources": [filename for filename, _, _ in signature],
+        "stories": stories,
     }
-    return all_stories
+    payload = orjson.dumps(bundle)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(payload)
+    os.replace(tmp_path, output_path)
+    return {
+        "path": output_path,
+        "content_hash": content_hash,
+        "stories": len(stories),
+        "bytes": len(payload),
+    }
+
+
+def _read_bundle(path: str) -> tuple[str, list[dict[str, Any]]]:
+    with open(path, "rb") as handle:
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                bundle = orjson.loads(view)
+    if not isinstance(bundle, dict) or bundle.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"{path}: unsupported story bundle format")
+    return str(bundle.get("content_hash") or ""), list(bundle.get("stories") or [])
+
+
+def _file_signature(path: str) -> tuple[tuple[str, int, int], ...]:
+    stat = os.stat(path)
+    return ((os.path.basename(path), int(stat.st_mtime_ns), int(stat.st_size)),)
+
+
+def _build_index(
+    signature: tuple[tuple[str, int, int], ...],
+    stories: list[dict[str, Any]],
+    checked_at: float,
+    content_hash: str | None = None,
+) -> _StoryIndex:
+    frozen = tuple(_freeze(story) for story in stories)
+    by_code: dict[str, Mapping[str, Any]] = {}
+    by_epic: dict[str, list[Mapping[str, Any]]] = {}
+    for story in frozen:
+        # First definition wins, matching the previous linear scan.
+        by_code.setdefault(story.get("code"), story)
+        if story.get("epic_code"):
+            by_epic.setdefault(story["epic_code"], []).append(story)
+    return _StoryIndex(
+        signature=signature,
+        stories=frozen,
+        by_code=MappingProxyType(by_code),
+        by_epic=MappingProxyType(
+            {epic: tuple(items) for epic, items in by_epic.items()}
+        ),
+        checked_at=checked_at,
+        content_hash=content_hash,
+    )
+
+
+def _index_from_bundle(
+    signature: tuple[tuple[str, int, int], ...],
+    content_hash: str,
+    stories: list[dict[str, Any]],
+    cached: _StoryIndex | None,
+    now: float,
+) -> _StoryIndex:
+    if cached is not None and content_hash and cached.content_hash == content_hash:
+        return replace(cached, signature=signature, checked_at=now)
+    return _build_index(signature, stories, now, content_hash)
+
+
+def _refresh_index(
+    data_dir: str | None, cached: _StoryIndex | None, now: float
+) -> _StoryIndex:
+    source = _story_source() if data_dir is None else "yaml"
+    bundle_path = _bundle_path()
+    resolved_dir = _resolve_data_dir(data_dir)
+    has_bundle = os.path.exists(bundle_path)
+    if source == "bundle" or (
+        source == "auto" and has_bundle and not os.path.exists(resolved_dir)
+    ):
+        if not has_bundle:
+            raise KeyError(f"Story bundle not found: {bundle_path}")
+        signature = _file_signature(bundle_path)
+        if cached is not None and cached.signature == signature:
+            return replace(cached, checked_at=now)
+        content_hash, stories = _read_bundle(bundle_path)
+        return _index_from_bundle(signature, content_hash, stories, cached, now)
+
+    if not os.path.exists(resolved_dir):
+        raise KeyError(f"Story data directory not found: {resolved_dir}")
+    signature = _story_files_signature(resolved_dir)
+    if source == "auto" and has_bundle:
+        # The YAML files are part of the signature, so editing one re-checks
+        # the bundle against the new sources hash.
+        signature = _file_signature(bundle_path) + signature
+    if cached is not None and cached.signature == signature:
+        return replace(cached, checked_at=now)
+    if source == "auto" and has_bundle:
+        sources_hash = _sources_hash(resolved_dir, signature[1:])
+        content_hash, stories = _read_bundle(bundle_path)
+        if content_hash == sources_hash:
+            return _index_from_bundle(signature, content_hash, stories, cached, now)
+        return _build_index(
+            signature, _parse_stories(resolved_dir, signature[1:]), now, sources_hash
+        )
+    return _build_index(signature, _parse_stories(resolved_dir, signature), now)
+
+
+def _get_index(data_dir: str | None = None, *, force: bool = False) -> _StoryIndex:
+    cached = _CACHE.get(data_dir)
+    if (
+        not force
+        and cached is not None
+        and time.monotonic() - cached.checked_at < REFRESH_INTERVAL_SECONDS
+    ):
+        return cached
+
+    with _CACHE_LOCK:
+        cached = _CACHE.get(data_dir)
+        now = time.monotonic()
+        if (
+            not force
+            and cached is not None
+            and now - cached.checked_at < REFRESH_INTERVAL_SECONDS
+        ):
+            return cached
+        index = _refresh_index(data_dir, cached, now)
+        _CACHE[data_dir] = index
+        return index
+
+
+def clear_story_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+def load_story(code: str, *, data_dir: str | None = None) -> Mapping[str, Any]:
+    story = _get_index(data_dir).by_code.get(code)
+    if story is None:
+        raise KeyError(f"Story {code} not found")
+    return story
 
 
-def load_story(code: str, *, data_dir: str | None = None) -> dict[str, Any]:
-    for story in _load_all(data_dir=data_dir):
-        if story.get("code") == code:
-            return story
-    raise KeyError(f"Story {code} not found")
+def list_stories(*, data_dir: str | None = None) -> list[Mapping[str, Any]]:
+    return list(_get_index(data_dir).stories)
 
 
-def list_stories(*, data_dir: str | None = None) -> list[dict[str, Any]]:
-    return _load_all(data_dir=data_dir)
+def list_epic_stories(
+    epic_code: str, *, data_dir: str | None = None
+) -> list[Mapping[str, Any]]:
+    return list(_get_index(data_dir).by_epic.get(epic_code, ()))
 
 
 def lint_stories(*, data_dir: str | None = None) -> list[str]:
@@ -111,7 +363,7 @@ def lint_stories(*, data_dir: str | None = None) -> list[str]:
     if not Path(resolved_dir).exists():
         return [f"Story data directory not found: {resolved_dir}"]
     try:
-        _load_all(data_dir=resolved_dir)
+        _get_index(resolved_dir, force=True)
     except (KeyError, ValueError) as exc:
         errors.append(str(exc))
     return errors
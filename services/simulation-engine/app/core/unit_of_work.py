@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from services.shared.audit import record_audit
+from services.shared.outbox import enqueue_events
+
+from ..config import EVENT_STREAM_MAXLEN, REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+
+class StepUnitOfWork:
+    """Collects the side effects of a step request and commits them once.
+
+    Progress and session-state changes are made directly on ORM objects in
+    ``db``; outbox events and audit rows are queued here and written when
+    :meth:`commit` runs. Events and audit rows are flushed under savepoints so
+    that, like ``emit_event`` and ``safe_record_audit``, a failure there is
+    logged instead of discarding the step's state changes.
+    """
+
+    def __init__(self, db: Session, *, stream: str = "simulation.events"):
+        self.db = db
+        self.stream = stream
+        self._events: list[dict[str, Any]] = []
+        self._audits: list[dict[str, Any]] = []
+
+    def publish(self, payload: dict[str, Any]) -> None:
+        self._events.append(payload)
+
+    def audit(self, **entry: Any) -> None:
+        self._audits.append(entry)
+
+    def _flush_audits(self) -> None:
+        if not self._audits:
+            return
+        try:
+            with self.db.begin_nested():
+                for entry in self._audits:
+                    record_audit(self.db, **entry, commit=False)
+        except SQLAlchemyError:
+            logger.warning(
+                "Failed to write audit entries",
+                extra={"count": len(self._audits)},
+            )
+
+    def commit(self) -> None:
+        try:
+            staged = enqueue_events(
+                self.db,
+                stream=self.stream,
+                payloads=self._events,
+                redis_url=REDIS_URL,
+                maxlen=EVENT_STREAM_MAXLEN,
+                log=logger,
+            )
+            if staged < len(self._events):
+                logger.warning(
+                    "Failed to enqueue/publish events",
+                    extra={
+                        "event_types": [
+                            event.get("event_type") for event in self._events
+                        ]
+                    },
+                )
+            self._flush_audits()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self._events.clear()
+            self._audits.clear()
@@ -3,6 +3,8 @@ from services.shared.models import (  # noqa: F401
     Base,
     User,
     SimulationSession,
+    SessionTimelineEntry,
+    SessionStepReceipt,
     UserStory,
     StoryProgress,
     DppInstance,
@@ -31,6 +33,8 @@ __all__ = [
     "Base",
     "User",
     "SimulationSession",
+    "SessionTimelineEntry",
+    "SessionStepReceipt",
     "UserStory",
     "StoryProgress",
     "DppInstance",
@@ -0,0 +1,4 @@
+from services.shared.models.session_timeline import (  # noqa: F401
+    SessionStepReceipt,
+    SessionTimelineEntry,
+)
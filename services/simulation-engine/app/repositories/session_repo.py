@@ -1,11 +1,12 @@
 from sqlalchemy.orm import Session
 from uuid import uuid4
 from datetime import datetime, timezone
+from ..core.session_timeline import merge_client_state
 from ..models.session import SimulationSession
 
 
 def create_session(db: Session, user_id: str, role: str, state: dict) -> SimulationSession:
-    session = SimulationSession(id=uuid4(), user_id=user_id, active_role=role, session_state=state or {})
+    session = SimulationSession(id=uuid4(), user_id=user_id, active_role=role, session_state=merge_client_state({}, state))
     db.add(session)
     db.commit()
     db.refresh(session)
@@ -26,7 +27,7 @@ def update_session(
     if role is not None:
         session.active_role = role
     if state is not None:
-        session.session_state = state
+        session.session_state = merge_client_state(session.session_state, state)
     if is_active is not None:
         session.is_active = is_active
     session.last_activity = datetime.now(timezone.utc)
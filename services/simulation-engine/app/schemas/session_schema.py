@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 class SessionCreate(BaseModel):
@@ -23,3 +23,8 @@ class SessionResponse(BaseModel):
     state: Dict
     lifecycle_state: Optional[str] = None
     is_active: bool = True
+
+
+class SessionTimelinePage(BaseModel):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[int] = None
@@ -1,8 +1,19 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 
 class StepExecuteRequest(BaseModel):
     payload: Dict[str, Any] = Field(default_factory=dict)
     metadata: Dict[str, Any] = Field(default_factory=dict)
     idempotency_key: str | None = None
+
+
+class StepBatchItem(BaseModel):
+    idx: int
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    depends_on: List[int] = Field(default_factory=list)
+
+
+class StepBatchRequest(BaseModel):
+    steps: List[StepBatchItem] = Field(min_length=1, max_length=50)
@@ -109,9 +109,11 @@ def ensure_steps(conn, template_id: str) -> None:
     ).fetchall()
     existing_keys = {row[0] for row in existing}
 
+    added = False
     for step in MANUFACTURER_STEPS:
         if step["step_key"] in existing_keys:
             continue
+        added = True
         conn.execute(
             text(
                 """
@@ -130,6 +132,12 @@ def ensure_steps(conn, template_id: str) -> None:
                 "default_payload": step["default_payload"],
             },
         )
+    if added:
+        # Running services cache templates by version.
+        conn.execute(
+            text("UPDATE journey_templates SET version = version + 1 WHERE id = :id"),
+            {"id": template_id},
+        )
 
 
 def backfill() -> None:
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Peak RSS per AASX upload: JSON base64 vs streaming multipart.
+
+Each mode runs in a fresh subprocess so its peak RSS reflects one upload:
+
+* ``json``      - what ``POST /aasx/upload`` does: read the whole JSON body,
+  validate it into ``AasxUploadRequest`` and decode ``content_base64``;
+* ``multipart`` - what ``POST /aasx/files`` does: feed the request body in
+  64 KiB chunks through Starlette's multipart parser and store the spooled
+  part with ``store_aasx_stream``.
+
+Both store to a temporary local directory (MinIO disabled), so the numbers
+are the server-side cost of receiving and persisting the package.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+for path in (ROOT, SERVICE_DIR):
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+
+BOUNDARY = "benchaasxboundary"
+READ_CHUNK = 64 * 1024
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM is reset by exec; ru_maxrss (KiB on Linux) may carry the parent's
+    # peak over into the child, so it is only a fallback.
+    try:
+        with open("/proc/self/status") as handle:
+            for line in handle:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _write_inputs(workdir: Path, size_mb: int) -> tuple[Path, Path]:
+    package = os.urandom(size_mb * 1024 * 1024)
+    json_path = workdir / "upload.json"
+    json_path.write_text(
+        json.dumps(
+            {
+                "filename": "bench.aasx",
+                "content_base64": base64.b64encode(package).decode("ascii"),
+            }
+        )
+    )
+    multipart_path = workdir / "upload.multipart"
+    with multipart_path.open("wb") as handle:
+        handle.write(
+            (
+                f"--{BOUNDARY}\r\n"
+                'Content-Disposition: form-data; name="file"; filename="bench.aasx"\r\n'
+                "Content-Type: application/octet-stream\r\n\r\n"
+            ).encode()
+        )
+        handle.write(package)
+        handle.write(f"\r\n--{BOUNDARY}--\r\n".encode())
+    return json_path, multipart_path
+
+
+def _run_json(path: Path) -> None:
+    from app.core.aasx_storage import store_aasx_payload
+    from app.schemas.aas_schema import AasxUploadRequest
+
+    body = path.read_bytes()
+    payload = AasxUploadRequest.model_validate_json(body)
+    store_aasx_payload(None, None, payload.filename, payload.content_base64, {})
+
+
+def _run_multipart(path: Path) -> None:
+    from starlette.datastructures import Headers
+    from starlette.formparsers import MultiPartParser
+
+    from app.core.aasx_storage import store_aasx_stream
+
+    async def _body():
+        with path.open("rb") as handle:
+            while chunk := handle.read(READ_CHUNK):
+                yield chunk
+
+    async def _parse():
+        headers = Headers({"content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+        return await MultiPartParser(headers, _body()).parse()
+
+    form = asyncio.run(_parse())
+    upload = form["file"]
+    try:
+        store_aasx_stream(None, None, upload.filename, upload.file, {})
+    finally:
+        upload.file.close()
+
+
+def _child(mode: str, path: Path, storage_dir: str) -> None:
+    from app.core import aasx_storage
+
+    aasx_storage.Minio = None
+    aasx_storage.AASX_STORAGE_DIR = storage_dir
+    before = _peak_rss_mb()
+    started = time.perf_counter()
+    {"json": _run_json, "multipart": _run_multipart}[mode](path)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"before": before, "after": _peak_rss_mb(), "seconds": elapsed}))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark AASX upload memory.")
+    parser.add_argument("--size-mb", type=int, default=50, help="Package size.")
+    parser.add_argument(
+        "--child", choices=["json", "multipart"], help=argparse.SUPPRESS
+    )
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    parser.add_argument("--storage-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, Path(args.input), args.storage_dir)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        json_path, multipart_path = _write_inputs(workdir, args.size_mb)
+        print(f"package={args.size_mb} MiB")
+        for mode, path in (("json", json_path), ("multipart", multipart_path)):
+            storage_dir = workdir / f"store-{mode}"
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--child",
+                    mode,
+                    "--input",
+                    str(path),
+                    "--storage-dir",
+                    str(storage_dir),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+                env={**os.environ, "PYTHONPATH": f"{ROOT}{os.pathsep}{SERVICE_DIR}"},
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{mode:<10} peak rss +{result['after'] - result['before']:7.1f} MiB "
+                f"(peak {result['after']:7.1f} MiB)  {result['seconds'] * 1000:8.1f} ms"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Measure end-to-end step execution latency and DB round trips per step.
+
+Runs the step execute endpoint in-process against ``DATABASE_URL`` (Postgres;
+the route filters UUID columns by string ids, which SQLite does not support)
+with a no-op step plugin, so the numbers reflect the request pipeline and its
+transaction handling rather than upstream services. ``--replays`` re-sends
+every step with its Idempotency-Key to measure the receipt-cache fast path;
+session row-lock wait is read from the lock-wait histogram.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+for path in (ROOT, SERVICE_DIR):
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _lock_wait_totals() -> tuple[float, float]:
+    try:
+        from prometheus_client import REGISTRY
+    except ImportError:
+        return 0.0, 0.0
+    name = "dpp_simulation_session_lock_wait_seconds"
+    total = REGISTRY.get_sample_value(f"{name}_sum") or 0.0
+    count = REGISTRY.get_sample_value(f"{name}_count") or 0.0
+    return total, count
+
+
+def _report(
+    label: str, latencies: list[float], statements: list[int], commits: list[int]
+) -> None:
+    print(f"{label}: {len(latencies)} requests")
+    print(
+        "  latency ms: "
+        f"p50={statistics.median(latencies):.2f} "
+        f"p95={_percentile(latencies, 95):.2f} "
+        f"max={max(latencies):.2f}"
+    )
+    print(
+        "  db per request: "
+        f"statements={statistics.mean(statements):.1f} "
+        f"commits={statistics.mean(commits):.1f}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark simulation step execution.")
+    parser.add_argument("--steps", type=int, default=200, help="Steps to execute.")
+    parser.add_argument("--database-url", default=None, help="Override DATABASE_URL.")
+    parser.add_argument(
+        "--idempotency",
+        action="store_true",
+        help="Send an Idempotency-Key so receipts and row locks are exercised.",
+    )
+    parser.add_argument(
+        "--replays",
+        action="store_true",
+        help="Replay every step with the same Idempotency-Key after the first pass.",
+    )
+    args = parser.parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from app import main as app_main
+    from app.api.v1 import steps as steps_api
+    from app.core.db import SessionLocal, engine
+    from app.core.step_executor import register_step_plugin
+    from app.models.session import SimulationSession
+    from app.models.story_progress import StoryProgress
+    from app.models.user import User
+
+    story = {
+        "code": "BENCH-STEPS",
+        "steps": [{"action": "bench.noop"} for _ in range(args.steps)],
+    }
+    register_step_plugin(
+        "bench.noop",
+        lambda db, params, payload, context, metadata, headers: {"status": "ok"},
+    )
+    steps_api.load_story = lambda code: story
+
+    def _verify(request):
+        request.state.user = {"sub": "bench", "realm_access": {"roles": ["developer"]}}
+
+    app_main.verify_request = _verify
+
+    user_id = uuid4()
+    session_id = uuid4()
+    with SessionLocal() as db:
+        db.add(User(id=user_id, keycloak_id=f"bench-{user_id}"))
+        db.add(
+            SimulationSession(
+                id=session_id,
+                user_id=user_id,
+                active_role="developer",
+                session_state={},
+                is_active=True,
+            )
+        )
+        db.commit()
+
+    counters = {"statements": 0, "commits": 0}
+
+    def _on_statement(*_args):
+        counters["statements"] += 1
+
+    def _on_commit(*_args):
+        counters["commits"] += 1
+
+    event.listen(engine, "before_cursor_execute", _on_statement)
+    event.listen(engine, "commit", _on_commit)
+
+    client = TestClient(app_main.app)
+    url = f"/api/v1/sessions/{session_id}/stories/{story['code']}/steps/{{idx}}/execute"
+    use_keys = args.idempotency or args.replays
+
+    def _run_pass() -> tuple[list[float], list[int], list[int]] | None:
+        latencies: list[float] = []
+        statements: list[int] = []
+        commits: list[int] = []
+        for idx in range(args.steps):
+            headers = {"Idempotency-Key": f"bench-{idx}"} if use_keys else {}
+            counters["statements"] = counters["commits"] = 0
+            started = time.perf_counter()
+            response = client.post(
+                url.format(idx=idx), json={"payload": {}}, headers=headers
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                print(f"Step {idx} failed: {response.status_code} {response.text}")
+                return None
+            statements.append(counters["statements"])
+            commits.append(counters["commits"])
+        return latencies, statements, commits
+
+    try:
+        lock_before = _lock_wait_totals()
+        first = _run_pass()
+        lock_after = _lock_wait_totals()
+        replays = _run_pass() if first and args.replays else None
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_statement)
+        event.remove(engine, "commit", _on_commit)
+        with SessionLocal() as db:
+            db.query(StoryProgress).filter(StoryProgress.user_id == user_id).delete()
+            db.query(SimulationSession).filter(
+                SimulationSession.id == session_id
+            ).delete()
+            db.query(User).filter(User.id == user_id).delete()
+            db.commit()
+
+    if first is None or (args.replays and replays is None):
+        return 1
+    _report("first executions", *first)
+    lock_total = lock_after[0] - lock_before[0]
+    lock_count = lock_after[1] - lock_before[1]
+    if lock_count:
+        print(f"  session lock wait ms: mean={lock_total / lock_count * 1000:.3f}")
+    if replays:
+        _report("replays", *replays)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
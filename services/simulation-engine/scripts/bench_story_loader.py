@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for story lookups served by the in-memory story index.
+
+``--scale 10 100`` additionally replicates the bundled stories 10x and 100x
+and compares YAML parsing with the compiled bundle for process cold start
+(fresh interpreter, import + first index build) and first-request latency
+(first ``load_story`` on an empty cache).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+for path in (ROOT, SERVICE_DIR):
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+
+from app.core import story_loader  # noqa: E402
+
+
+def _bench(label: str, func, number: int) -> None:
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{label:<28} {best / number * 1e6:10.2f} us/op")
+
+
+def _synthesize(source_dir: str, target_dir: Path, scale: int) -> int:
+    count = 0
+    for source in sorted(Path(source_dir).glob("*.yaml")):
+        if source.name == "schema.yaml":
+            continue
+        stories = yaml.safe_load(source.read_text(encoding="utf-8")) or []
+        for copy in range(scale):
+            renamed = []
+            for story in stories:
+                prefix, epic, order = (story["code"].split("-") + ["", ""])[:3]
+                renamed.append({**story, "code": f"{prefix}-{epic}{copy:03d}-{order}"})
+            target = target_dir / f"{source.stem}-{copy:03d}.yaml"
+            target.write_text(
+                yaml.safe_dump(renamed, sort_keys=False), encoding="utf-8"
+            )
+            count += len(renamed)
+    return count
+
+
+def _cold_start_seconds(env: dict[str, str]) -> float:
+    code = (
+        "import time; started = time.perf_counter(); "
+        "from app.core import story_loader; story_loader.list_stories(); "
+        "print(time.perf_counter() - started)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SERVICE_DIR,
+        env={**os.environ, "PYTHONPATH": f"{ROOT}{os.pathsep}{SERVICE_DIR}", **env},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def _first_request_seconds(env: dict[str, str], code: str) -> float:
+    previous = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    try:
+        story_loader.clear_story_cache()
+        started = time.perf_counter()
+        story_loader.load_story(code)
+        return time.perf_counter() - started
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        story_loader.clear_story_cache()
+
+
+def _bench_scale(source_dir: str, scale: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        stories_dir = Path(tmp) / "stories"
+        stories_dir.mkdir()
+        count = _synthesize(source_dir, stories_dir, scale)
+        bundle_path = str(Path(tmp) / "stories.bundle.json")
+        info = story_loader.compile_story_bundle(bundle_path, data_dir=str(stories_dir))
+        last_code = story_loader.list_stories(data_dir=str(stories_dir))[-1]["code"]
+        modes = {
+            "yaml": {"STORY_SOURCE": "yaml", "STORY_DATA_DIR": str(stories_dir)},
+            "bundle": {"STORY_SOURCE": "bundle", "STORY_BUNDLE_PATH": bundle_path},
+        }
+        print(f"scale x{scale}: {count} stories, bundle {info['bytes'] / 1024:.0f} KiB")
+        for mode, env in modes.items():
+            cold = _cold_start_seconds(env)
+            first = _first_request_seconds(env, last_code)
+            print(
+                f"  {mode:<7} cold start {cold * 1000:9.1f} ms   "
+                f"first request {first * 1000:9.1f} ms"
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark story loader lookups.")
+    parser.add_argument(
+        "--data-dir", default=None, help="Optional story data directory override."
+    )
+    parser.add_argument(
+        "--number", type=int, default=20000, help="Calls per timing run."
+    )
+    parser.add_argument(
+        "--scale",
+        type=int,
+        nargs="*",
+        default=[],
+        help="Replication factors for the YAML vs bundle comparison, e.g. 10 100.",
+    )
+    args = parser.parse_args()
+
+    stories = story_loader.list_stories(data_dir=args.data_dir)
+    if not stories:
+        print("No stories found")
+        return 1
+    codes = [story["code"] for story in stories]
+    last_code = codes[-1]
+    epic = next(
+        (story["epic_code"] for story in stories if story.get("epic_code")), None
+    )
+    print(f"stories: {len(stories)}")
+
+    _bench(
+        "load_story (last code)",
+        lambda: story_loader.load_story(last_code, data_dir=args.data_dir),
+        args.number,
+    )
+    _bench(
+        "list_stories",
+        lambda: story_loader.list_stories(data_dir=args.data_dir),
+        args.number,
+    )
+    if epic:
+        _bench(
+            f"list_epic_stories ({epic})",
+            lambda: story_loader.list_epic_stories(epic, data_dir=args.data_dir),
+            args.number,
+        )
+    _bench(
+        "forced stat check (lint)",
+        lambda: story_loader.lint_stories(data_dir=args.data_dir),
+        max(1, args.number // 1000),
+    )
+    source_dir = story_loader._resolve_data_dir(args.data_dir)
+    for scale in args.scale:
+        _bench_scale(source_dir, scale)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -12,12 +12,19 @@ for path in (ROOT, SERVICE_DIR):
     if path_str not in sys.path:
         sys.path.insert(0, path_str)
 
-from app.core.story_loader import lint_stories  # noqa: E402
+from app.core.story_loader import compile_story_bundle, lint_stories  # noqa: E402
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Validate simulation story definitions.")
     parser.add_argument("--data-dir", default=None, help="Optional story data directory override.")
+    parser.add_argument(
+        "--bundle",
+        nargs="?",
+        const="",
+        default=None,
+        help="Also compile the validated stories into a bundle (default: STORY_BUNDLE_PATH).",
+    )
     args = parser.parse_args()
 
     errors = lint_stories(data_dir=args.data_dir)
@@ -28,6 +35,9 @@ def main() -> int:
         return 1
 
     print("Story lint passed")
+    if args.bundle is not None:
+        info = compile_story_bundle(args.bundle or None, data_dir=args.data_dir)
+        print(f"Story bundle written to {info['path']} ({info['stories']} stories, {info['bytes']} bytes, sha256 {info['content_hash']})")
     return 0
 
 
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import services.shared.models  # noqa: F401
+from app import main
+from app.core import aasx_manifest, aasx_storage
+from app.core.aasx_manifest import build_manifest
+from app.core.db import get_db
+from services.shared.models.base import Base
+from services.shared.models.dpp_instance import DppInstance
+from services.shared.models.session import SimulationSession
+from services.shared.models.user import User
+
+ENVIRONMENT = {
+    "assetAdministrationShells": [
+        {
+            "id": "urn:aas:battery",
+            "idShort": "Battery",
+            "assetInformation": {"globalAssetId": "urn:asset:battery"},
+            "submodels": [
+                {"keys": [{"type": "Submodel", "value": "urn:sm:nameplate"}]}
+            ],
+        }
+    ],
+    "submodels": [
+        {
+            "id": "urn:sm:nameplate",
+            "idShort": "Nameplate",
+            "semanticId": {
+                "keys": [{"type": "GlobalReference", "value": "urn:idta:nameplate"}]
+            },
+            "submodelElements": [
+                {"idShort": "Manufacturer", "modelType": "Property", "value": "ACME"},
+                {
+                    "idShort": "Address",
+                    "modelType": "SubmodelElementCollection",
+                    "value": [
+                        {"idShort": "Street", "modelType": "Property", "value": "Main"},
+                        {"idShort": "City", "modelType": "Property", "value": "Berlin"},
+                    ],
+                },
+            ],
+        }
+    ],
+}
+MANUAL = bytes(range(256)) * 64
+IMAGE = b"\x89PNG" + b"\x01" * 5000
+
+
+def _package(data: bytes | None = None) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(
+            "_rels/.rels",
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Type="http://admin-shell.io/aasx/relationships/aasx-origin" '
+            'Target="/aasx/aasx-origin" Id="r1"/></Relationships>',
+        )
+        archive.writestr("aasx/aasx-origin", "Intentionally empty.")
+        archive.writestr(
+            "aasx/_rels/aasx-origin.rels",
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Type="http://admin-shell.io/aasx/relationships/aas-spec" '
+            'Target="/aasx/data.json" Id="r2"/>'
+            '<Relationship Type="http://admin-shell.io/aasx/relationships/aas-suppl" '
+            'Target="/aasx/files/manual.pdf" Id="r3"/></Relationships>',
+        )
+        archive.writestr(
+            "aasx/data.json",
+            json.dumps(ENVIRONMENT) if data is None else data,
+            compress_type=zipfile.ZIP_DEFLATED,
+        )
+        archive.writestr(
+            "aasx/files/manual.pdf", MANUAL, compress_type=zipfile.ZIP_DEFLATED
+        )
+        archive.writestr(
+            "aasx/files/photo.png", IMAGE, compress_type=zipfile.ZIP_STORED
+        )
+    return buffer.getvalue()
+
+
+def test_manifest_indexes_shells_submodels_and_part_offsets() -> None:
+    package = _package()
+
+    manifest = build_manifest(io.BytesIO(package))
+
+    assert manifest["spec_parts"] == ["aasx/data.json"]
+    assert manifest["shells"] == [
+        {
+            "id": "urn:aas:battery",
+            "idShort": "Battery",
+            "globalAssetId": "urn:asset:battery",
+            "submodels": ["urn:sm:nameplate"],
+        }
+    ]
+    [submodel] = manifest["submodels"]
+    assert (
+        submodel["semanticId"],
+        submodel["elements"],
+        submodel["elements_total"],
+    ) == (
+        "urn:idta:nameplate",
+        2,
+        4,
+    )
+    files = {entry["path"]: entry for entry in manifest["files"]}
+    photo = files["aasx/files/photo.png"]
+    assert package[photo["offset"] : photo["offset"] + photo["size"]] == IMAGE
+    assert files["aasx/files/manual.pdf"]["role"] == "supplementary"
+    assert files["aasx/files/manual.pdf"]["compression"] == "deflated"
+
+
+@pytest.fixture()
+def indexed_upload(tmp_path, monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+    user = User(id=uuid4(), keycloak_id=f"aasx-{uuid4()}")
+    session = SimulationSession(
+        id=uuid4(), user_id=user.id, active_role="manufacturer", session_state={}
+    )
+    instance = DppInstance(
+        id=uuid4(),
+        session_id=session.id,
+        aas_identifier="urn:aas:battery",
+        compliance_status={},
+    )
+    db.add_all([user, session, instance])
+    db.commit()
+
+    monkeypatch.setattr(aasx_storage, "Minio", None)
+    monkeypatch.setattr(aasx_storage, "AASX_STORAGE_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        main,
+        "verify_request",
+        lambda request: setattr(
+            request.state,
+            "user",
+            {"sub": user.keycloak_id, "realm_access": {"roles": ["manufacturer"]}},
+        ),
+    )
+    main.app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(main.app)
+    upload = client.post(
+        "/api/v1/aasx/files",
+        files={"file": ("battery.aasx", _package(), "application/octet-stream")},
+        data={"session_id": str(session.id)},
+    )
+    try:
+        yield client, upload, instance.id
+    finally:
+        main.app.dependency_overrides.pop(get_db, None)
+        db.close()
+
+
+def test_manifest_refuses_to_inflate_oversized_or_bomb_like_parts(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    bomb = build_manifest(io.BytesIO(_package(b" " * (4 * 1024 * 1024))))
+    # Larger than the rels parts, smaller than the spec part.
+    monkeypatch.setattr(aasx_manifest, "AASX_MAX_PART_BYTES", 512)
+    oversized = build_manifest(io.BytesIO(_package()))
+
+    assert bomb["shells"] == []
+    (bomb_error,) = bomb["errors"]
+    assert bomb_error.startswith("aasx/data.json: Part aasx/data.json is compressed")
+    (oversized_error,) = oversized["errors"]
+    assert "aasx/data.json is too large" in oversized_error
+
+
+def test_upload_stores_manifest_and_serves_submodels(indexed_upload) -> None:
+    client, upload, dpp_id = indexed_upload
+
+    listing = client.get(f"/api/v1/aasx/{dpp_id}/submodels")
+
+    assert upload.json()["storage"]["manifest"] == {
+        "shells": 1,
+        "submodels": 1,
+        "files": 6,
+    }
+    assert listing.status_code == 200
+    assert listing.json()["total"] == 1
+    assert listing.json()["items"][0]["idShort"] == "Nameplate"
+
+
+def test_packaged_files_are_served_whole_or_by_range(indexed_upload) -> None:
+    client, _upload, dpp_id = indexed_upload
+
+    whole = client.get(f"/api/v1/aasx/{dpp_id}/files/aasx/files/photo.png")
+    stored_range = client.get(
+        f"/api/v1/aasx/{dpp_id}/files/aasx/files/photo.png",
+        headers={"Range": "bytes=2-9"},
+    )
+    deflated_range = client.get(
+        f"/api/v1/aasx/{dpp_id}/files/aasx/files/manual.pdf",
+        headers={"Range": "bytes=-300"},
+    )
+    unsatisfiable = client.get(
+        f"/api/v1/aasx/{dpp_id}/files/aasx/files/photo.png",
+        headers={"Range": "bytes=99999-"},
+    )
+
+    assert whole.status_code == 200
+    assert whole.content == IMAGE
+    assert whole.headers["content-type"] == "image/png"
+    assert stored_range.status_code == 206
+    assert stored_range.content == IMAGE[2:10]
+    assert stored_range.headers["content-range"] == f"bytes 2-9/{len(IMAGE)}"
+    assert deflated_range.status_code == 206
+    assert deflated_range.content == MANUAL[-300:]
+    assert unsatisfiable.status_code == 416
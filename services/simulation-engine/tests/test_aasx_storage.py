@@ -1,8 +1,24 @@
 from __future__ import annotations
 
+import hashlib
+import io
 from pathlib import Path
+from uuid import uuid4
 
+from fastapi.testclient import TestClient
+from minio.error import S3Error
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import services.shared.models  # noqa: F401
+from app import main
 from app.core import aasx_storage
+from app.core.db import get_db
+from services.shared.models.base import Base
+from services.shared.models.dpp_instance import DppInstance
+from services.shared.models.session import SimulationSession
+from services.shared.models.user import User
 
 
 def test_sanitize_filename_strips_path_segments() -> None:
@@ -22,3 +38,126 @@ def test_store_local_keeps_output_within_storage_dir(tmp_path, monkeypatch) -> N
     assert stored_path.is_file()
     assert str(stored_path).startswith(str(tmp_path.resolve()) + "/")
     assert ".." not in stored["object_key"]
+
+
+def test_store_local_deduplicates_by_content_hash(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(aasx_storage, "AASX_CHUNK_SIZE", 4)
+    monkeypatch.setattr(aasx_storage, "AASX_STORAGE_DIR", str(tmp_path))
+
+    first = aasx_storage._store_local("a.aasx", io.BytesIO(b"same package"))
+    second = aasx_storage._store_local("b.aasx", io.BytesIO(b"same package"))
+
+    assert first["sha256"] == hashlib.sha256(b"same package").hexdigest()
+    assert first["object_key"] == second["object_key"] == f"{first['sha256']}.aasx"
+    assert (first["deduplicated"], second["deduplicated"]) == (False, True)
+    assert first["bytes"] == 12
+    assert [path.name for path in tmp_path.iterdir()] == [first["object_key"]]
+
+
+class _FakeMinio:
+    instances = 0
+
+    def __init__(self, *args, **kwargs) -> None:
+        type(self).instances += 1
+        self.objects: dict[str, bytes] = {}
+        self.bucket_checks = 0
+        self.part_sizes: list[int] = []
+
+    def bucket_exists(self, bucket: str) -> bool:
+        self.bucket_checks += 1
+        return True
+
+    def stat_object(self, bucket: str, key: str):
+        if key not in self.objects:
+            raise S3Error(None, "NoSuchKey", "missing", key, "req", "host")
+        return object()
+
+    def put_object(self, bucket, key, data, length, part_size=0, **kwargs):
+        self.part_sizes.append(part_size)
+        self.objects[key] = data.read(length)
+
+
+def test_store_aasx_stream_reuses_minio_client_and_skips_known_packages(
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(aasx_storage, "Minio", _FakeMinio)
+    monkeypatch.setattr(aasx_storage, "_minio_client", None)
+    monkeypatch.setattr(aasx_storage, "_minio_ready_buckets", set())
+    monkeypatch.setattr(aasx_storage, "_minio_unavailable_until", 0.0)
+    _FakeMinio.instances = 0
+
+    results = [
+        aasx_storage.store_aasx_stream(None, None, name, io.BytesIO(body), {})
+        for name, body in (("a.aasx", b"one"), ("b.aasx", b"one"), ("c.aasx", b"two"))
+    ]
+
+    client = aasx_storage._minio_client
+    assert _FakeMinio.instances == 1
+    assert client.bucket_checks == 1
+    assert [result["deduplicated"] for result in results] == [False, True, False]
+    assert results[0]["object_key"] == results[1]["object_key"]
+    assert sorted(client.objects.values()) == [b"one", b"two"]
+    assert client.part_sizes == [aasx_storage.AASX_MINIO_PART_SIZE] * 2
+
+
+def test_multipart_upload_stores_package_and_links_session(
+    tmp_path, monkeypatch
+) -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+    user = User(id=uuid4(), keycloak_id=f"aasx-{uuid4()}")
+    session = SimulationSession(
+        id=uuid4(), user_id=user.id, active_role="manufacturer", session_state={}
+    )
+    instance = DppInstance(
+        id=uuid4(),
+        session_id=session.id,
+        aas_identifier="urn:aas:1",
+        compliance_status={},
+    )
+    db.add_all([user, session, instance])
+    db.commit()
+
+    monkeypatch.setattr(aasx_storage, "Minio", None)
+    monkeypatch.setattr(aasx_storage, "AASX_STORAGE_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        main,
+        "verify_request",
+        lambda request: setattr(
+            request.state,
+            "user",
+            {"sub": user.keycloak_id, "realm_access": {"roles": ["manufacturer"]}},
+        ),
+    )
+    main.app.dependency_overrides[get_db] = lambda: db
+    body = b"PK\x03\x04" + b"x" * 4096
+    try:
+        response = TestClient(main.app).post(
+            "/api/v1/aasx/files",
+            files={
+                "file": (
+                    "../battery.aasx",
+                    body,
+                    "application/asset-administration-shell-package",
+                )
+            },
+            data={"session_id": str(session.id)},
+        )
+    finally:
+        main.app.dependency_overrides.pop(get_db, None)
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["filename"] == "battery.aasx"
+    assert payload["bytes"] == len(body)
+    assert payload["sha256"] == hashlib.sha256(body).hexdigest()
+    assert (tmp_path / f"{payload['sha256']}.aasx").read_bytes() == body
+    db.refresh(instance)
+    assert instance.aasx_object_key == f"{payload['sha256']}.aasx"
+    assert instance.compliance_status["aasx_metadata"]["sha256"] == payload["sha256"]
+    db.close()
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import services.shared.models  # noqa: F401
+from app import main
+from app.api.v1 import steps
+from app.core.db import get_db
+from app.core.receipt_cache import ReceiptCache
+from services.shared.models.base import Base
+from services.shared.models.session import SimulationSession
+from services.shared.models.user import User
+
+
+class _FakePipeline:
+    def __init__(self, client: "_FakeRedis"):
+        self._client = client
+        self._ops: list = []
+
+    def set(self, *args, **kwargs):
+        self._ops.append(("set", args, kwargs))
+
+    def delete(self, *args):
+        self._ops.append(("delete", args, {}))
+
+    def execute(self):
+        return [
+            getattr(self._client, name)(*args, **kwargs)
+            for name, args, kwargs in self._ops
+        ]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+
+    def get(self, key):
+        value = self.values.get(key)
+        return value.encode() if value is not None else None
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def pipeline(self, transaction: bool = True):
+        return _FakePipeline(self)
+
+
+class _BrokenRedis:
+    def __getattr__(self, name):
+        def _fail(*args, **kwargs):
+            raise ConnectionError("redis down")
+
+        return _fail
+
+
+def test_lease_is_exclusive_until_result_is_stored():
+    cache = ReceiptCache(_FakeRedis())
+    assert cache.get("s1", "US-1:0:k") is None
+    assert cache.acquire("s1", "US-1:0:k", "owner-a") is True
+    assert cache.acquire("s1", "US-1:0:k", "owner-b") is False
+
+    cache.store("s1", "US-1:0:k", {"status": "ok"})
+    assert cache.get("s1", "US-1:0:k") == {"status": "ok"}
+    assert cache.acquire("s1", "US-1:0:k", "owner-b") is True
+
+
+def test_release_only_drops_own_lease():
+    client = _FakeRedis()
+    cache = ReceiptCache(client)
+    cache.acquire("s1", "key", "owner-a")
+    cache.release("s1", "key", "owner-b")
+    assert cache.acquire("s1", "key", "owner-c") is False
+    cache.release("s1", "key", "owner-a")
+    assert cache.acquire("s1", "key", "owner-c") is True
+
+
+def test_redis_failures_fall_back_to_postgres_path():
+    cache = ReceiptCache(_BrokenRedis())
+    assert cache.get("s1", "key") is None
+    assert cache.acquire("s1", "key", "owner") is True
+    cache.store("s1", "key", {"status": "ok"})
+    cache.release("s1", "key", "owner")
+
+
+def test_failure_skips_redis_until_retry_window_passes():
+    class _CountingBrokenRedis(_BrokenRedis):
+        calls = 0
+
+        def __getattr__(self, name):
+            _CountingBrokenRedis.calls += 1
+            return super().__getattr__(name)
+
+    cache = ReceiptCache(_CountingBrokenRedis(), retry_after_seconds=60)
+    assert cache.get("s1", "key") is None
+    assert cache.available is False
+    assert cache.acquire("s1", "key", "owner") is True
+    cache.store("s1", "key", {"status": "ok"})
+    cache.release("s1", "key", "owner")
+    assert cache.wait_for("s1", "key", timeout_ms=1000) is None
+    assert _CountingBrokenRedis.calls == 1
+
+
+@pytest.fixture()
+def replay_client(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    db = factory()
+    user = User(id=uuid4(), keycloak_id=f"replay-{uuid4()}")
+    session = SimulationSession(
+        id=uuid4(),
+        user_id=user.id,
+        active_role="manufacturer",
+        session_state={},
+        is_active=True,
+    )
+    db.add_all([user, session])
+    db.commit()
+    session_id = str(session.id)
+    db.close()
+
+    cache = ReceiptCache(_FakeRedis())
+    cache.store(session_id, "US-RC:0:replay-key", {"status": "ok", "cached": True})
+
+    def _verify(request):
+        request.state.user = {
+            "sub": "test-user",
+            "realm_access": {"roles": ["developer"]},
+        }
+
+    def _db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(main, "verify_request", _verify)
+    monkeypatch.setattr(steps, "get_receipt_cache", lambda: cache)
+    monkeypatch.setattr(
+        steps, "load_story", lambda code: {"code": code, "steps": [{"action": "noop"}]}
+    )
+    main.app.dependency_overrides[get_db] = _db
+    try:
+        yield TestClient(main.app), factory, session_id
+    finally:
+        main.app.dependency_overrides.pop(get_db, None)
+
+
+def _replay(client: TestClient, session_id: str):
+    return client.post(
+        f"/api/v1/sessions/{session_id}/stories/US-RC/steps/0/execute",
+        json={"payload": {}},
+        headers={"Idempotency-Key": "replay-key"},
+    )
+
+
+def test_cached_replay_is_served_for_an_active_session(replay_client):
+    client, _, session_id = replay_client
+    response = _replay(client, session_id)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "result": {"status": "ok", "cached": True},
+        "idempotent_replay": True,
+    }
+
+
+def test_cached_replay_is_refused_once_the_session_ends(replay_client):
+    client, factory, session_id = replay_client
+    db = factory()
+    session = db.get(SimulationSession, UUID(session_id))
+    session.is_active = False
+    db.commit()
+    assert _replay(client, session_id).status_code == 409
+
+    db.delete(session)
+    db.commit()
+    db.close()
+    assert _replay(client, session_id).status_code == 404
+
+
+def test_malformed_session_ids_are_not_found_on_single_and_batch_paths(
+    replay_client,
+):
+    client, _, _ = replay_client
+    single = _replay(client, "not-a-uuid")
+    batch = client.post(
+        "/api/v1/sessions/not-a-uuid/stories/US-RC/steps/batch",
+        json={"steps": [{"idx": 0, "payload": {}}]},
+    )
+
+    assert single.status_code == 404
+    assert batch.status_code == 404
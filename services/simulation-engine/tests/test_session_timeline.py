@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import services.shared.models  # noqa: F401
+from app.api.v1 import steps
+from app.core.session_timeline import (
+    TIMELINE_SUMMARY_RECENT,
+    append_timeline_entry,
+    list_timeline,
+    load_receipt,
+    merge_client_state,
+    public_state,
+    save_receipt,
+)
+from services.shared.models.base import Base
+from services.shared.models.session import SimulationSession
+from services.shared.models.session_timeline import SessionTimelineEntry
+from services.shared.models.story_progress import StoryProgress
+from services.shared.models.user import User
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+    user = User(id=uuid4(), keycloak_id=f"timeline-{uuid4()}")
+    session = SimulationSession(
+        id=uuid4(),
+        user_id=user.id,
+        active_role="manufacturer",
+        session_state={},
+        is_active=True,
+    )
+    db.add_all([user, session])
+    db.commit()
+    try:
+        yield db, session
+    finally:
+        db.close()
+
+
+def test_timeline_is_paginated_and_summary_stays_bounded(db_session):
+    db, session = db_session
+    for idx in range(12):
+        append_timeline_entry(
+            db,
+            session,
+            kind="step",
+            step_idx=idx,
+            action="noop",
+            payload={"step": idx, "result": {"status": "ok"}},
+        )
+    db.commit()
+
+    summary = session.session_state["timeline_summary"]
+    assert summary["count"] == 12
+    assert [item["seq"] for item in summary["recent"]] == list(
+        range(13 - TIMELINE_SUMMARY_RECENT, 13)
+    )
+
+    first, cursor = list_timeline(db, session.id, limit=5)
+    assert [item["seq"] for item in first] == [1, 2, 3, 4, 5]
+    assert cursor == 5
+    rest, _ = list_timeline(db, session.id, after_seq=10, limit=5)
+    assert [item["step_idx"] for item in rest] == [10, 11]
+    assert list_timeline(db, session.id, after_seq=12)[1] is None
+
+
+def test_seq_is_allocated_past_rows_committed_by_other_writers(db_session):
+    db, session = db_session
+    # Another request committed an entry after this session was loaded.
+    db.add(
+        SessionTimelineEntry(
+            session_id=session.id, seq=1, kind="step", payload={"step": 0}
+        )
+    )
+    db.commit()
+
+    first = append_timeline_entry(db, session, kind="step", payload={"step": 1})
+    second = append_timeline_entry(db, session, kind="step", payload={"step": 2})
+    db.commit()
+
+    assert (first.seq, second.seq) == (2, 3)
+    assert session.session_state["timeline_summary"]["count"] == 3
+
+
+def test_receipts_expire_after_ttl(db_session):
+    db, session = db_session
+    now = datetime.now(timezone.utc)
+    save_receipt(
+        db, session.id, "US-1:0:key", {"status": "ok"}, ttl_seconds=60, now=now
+    )
+    db.commit()
+
+    assert load_receipt(db, session.id, "US-1:0:key", now=now) == {"status": "ok"}
+    later = now + timedelta(seconds=120)
+    assert load_receipt(db, session.id, "US-1:0:key", now=later) is None
+
+    # The expired row is replaced when the same key is written again.
+    save_receipt(db, session.id, "US-1:0:key", {"status": "again"}, now=later)
+    db.commit()
+    assert load_receipt(db, session.id, "US-1:0:key", now=later) == {"status": "again"}
+
+
+def test_aas_updates_are_appended_to_the_timeline(db_session):
+    db, session = db_session
+    progress = StoryProgress(
+        id=uuid4(),
+        user_id=session.user_id,
+        role_type="manufacturer",
+        steps_completed=[],
+    )
+    db.add(progress)
+    story = {"steps": [{"action": "aas.update"}, {"action": "noop"}]}
+    result = {"status": "updated", "data": {"update": "battery-capacity"}}
+
+    steps._apply_step_result(db, session, progress, story, 0, story["steps"][0], result)
+    db.commit()
+
+    items, _ = list_timeline(db, session.id)
+    assert [(item["kind"], item["seq"]) for item in items] == [
+        ("aas_update", 1),
+        ("step", 2),
+    ]
+    assert items[0]["payload"]["update"] == "battery-capacity"
+    assert session.session_state["timeline_summary"]["aas_updates"] == 1
+
+
+def test_client_state_cannot_replace_server_managed_keys():
+    current = {"timeline_summary": {"count": 3}, "note": "old"}
+    merged = merge_client_state(current, {"note": "new", "timeline_summary": {}})
+    assert merged == {"note": "new", "timeline_summary": {"count": 3}}
+    assert public_state({"timeline": [1], "step_receipts": {}, "note": "x"}) == {
+        "note": "x"
+    }
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from typing import Any
 
+import pytest
+
 from app.config import AAS_ADAPTER_URL
 from app.core.step_executor import (
     execute_step,
+    execute_step_batch,
     list_registered_step_plugins,
     register_step_plugin,
+    validate_step_dag,
 )
 
 
@@ -17,6 +22,17 @@ def test_default_plugins_include_core_step_types():
     assert "aas_upload_aasx" in plugins
 
 
+def test_session_plugins_run_inline_and_side_effects_are_not_cached():
+    from app.core.step_executor import STEP_RUNTIME
+
+    for action in ("compliance.check", "aas.create", "aasx.upload"):
+        plugin = STEP_RUNTIME.get(action)
+        assert plugin is not None
+        assert plugin.timeout is None
+        assert plugin.idempotent is False
+    assert STEP_RUNTIME.get("json_patch").idempotent is True
+
+
 def test_register_plugin_and_execute():
     def _custom_handler(db, params, payload, context, metadata, headers):
         return {"status": "ok", "data": {"echo": payload}}
@@ -101,7 +117,7 @@ def test_aas_create_plugin_delegates_to_aas_adapter(monkeypatch):
     monkeypatch.setattr(
         "app.core.step_executor.get_service_token", lambda: "service-token"
     )
-    monkeypatch.setattr("app.core.step_executor.pooled_request", _fake_request)
+    monkeypatch.setattr("services.shared.step_plugins.pooled_request", _fake_request)
 
     result = execute_step(
         db=_Db(),
@@ -126,3 +142,161 @@ def test_aas_create_plugin_delegates_to_aas_adapter(monkeypatch):
     assert calls[0]["url"] == f"{AAS_ADAPTER_URL}/api/v2/aas/shells"
     assert calls[0]["headers"]["Authorization"] == "Bearer service-token"
     assert calls[0]["headers"]["X-Request-ID"] == "req-step-1"
+
+
+def test_aas_submodel_patch_plugin_replaces_the_list_unless_told_not_to(monkeypatch):
+    class _Response:
+        status_code = 200
+        content = b"{}"
+
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return {"status": "updated"}
+
+    bodies: list[dict[str, Any]] = []
+
+    def _fake_request(method: str, url: str, json: Any = None, **_kwargs: Any):
+        bodies.append(json)
+        return _Response()
+
+    monkeypatch.setattr(
+        "app.core.step_executor.get_service_token", lambda: "service-token"
+    )
+    monkeypatch.setattr("services.shared.step_plugins.pooled_request", _fake_request)
+
+    elements = [{"idShort": "capacity", "value": "80"}]
+    for payload in (
+        {"submodel_id": "sm-1", "elements": elements},
+        {"submodel_id": "sm-1", "elements": elements, "prune": False},
+    ):
+        result = execute_step(
+            db=None,
+            action="aas.submodel.patch",
+            params={},
+            payload=payload,
+            context={"session_id": "s-1", "request_id": "req-patch"},
+        )
+        assert result["status"] == "updated"
+
+    assert [body["prune"] for body in bodies] == [True, False]
+
+
+def test_validate_step_dag_orders_dependencies_and_rejects_cycles():
+    steps = [
+        {"key": "b", "action": "x", "depends_on": ["a"]},
+        {"key": "a", "action": "x"},
+        {"key": "c", "action": "x", "depends_on": ["a", "b"]},
+    ]
+    assert validate_step_dag(steps) == ["a", "b", "c"]
+
+    with pytest.raises(ValueError):
+        validate_step_dag(
+            [
+                {"key": "a", "action": "x", "depends_on": ["b"]},
+                {"key": "b", "action": "x", "depends_on": ["a"]},
+            ]
+        )
+    with pytest.raises(ValueError):
+        validate_step_dag([{"key": "a", "action": "x", "depends_on": ["missing"]}])
+
+
+def test_execute_step_batch_runs_dag_and_skips_dependents_of_failures():
+    seen: list[str] = []
+
+    def _record(db, params, payload, context, metadata, headers):
+        seen.append(payload["name"])
+        if payload.get("fail"):
+            return {"status": "error", "message": "boom"}
+        return {"status": "ok", "data": {"name": payload["name"]}}
+
+    class _Session:
+        savepoints = 0
+
+        @contextmanager
+        def begin_nested(self):
+            _Session.savepoints += 1
+            yield
+
+    def _remote(db, params, payload, context, metadata, headers):
+        return {"status": "ok", "data": {"has_session": db is not None}}
+
+    register_step_plugin("custom.batch", _record)
+    register_step_plugin("custom.remote", _remote, timeout=1)
+    results = execute_step_batch(
+        [
+            {"key": "root", "action": "custom.batch", "payload": {"name": "root"}},
+            {
+                "key": "left",
+                "action": "custom.batch",
+                "payload": {"name": "left", "fail": True},
+                "depends_on": ["root"],
+            },
+            {
+                "key": "right",
+                "action": "custom.batch",
+                "payload": {"name": "right"},
+                "depends_on": ["root"],
+            },
+            {"key": "remote", "action": "custom.remote", "depends_on": ["root"]},
+            {
+                "key": "after-left",
+                "action": "custom.batch",
+                "payload": {"name": "after-left"},
+                "depends_on": ["left"],
+            },
+        ],
+        {},
+        db=_Session(),
+    )
+
+    assert list(results) == ["root", "left", "right", "remote", "after-left"]
+    assert results["root"]["status"] == "ok"
+    assert results["left"]["status"] == "error"
+    assert results["right"]["status"] == "ok"
+    assert results["after-left"]["status"] == "skipped"
+    assert results["remote"]["data"] == {"has_session": False}
+    # Session steps are staged in savepoints of the caller's session, which
+    # commits them; pooled steps never see it.
+    assert _Session.savepoints == 3
+    assert seen[0] == "root"
+    assert "after-left" not in seen
+
+
+def test_json_patch_plugin_applies_nested_pointers_without_touching_input():
+    document = {"battery": {"cells": [{"id": 1}], "weight": 5}, "meta": {"v": 1}}
+    result = execute_step(
+        db=None,
+        action="json_patch",
+        params={},
+        payload={
+            "document": document,
+            "operations": [
+                {"op": "add", "path": "/battery/cells/-", "value": {"id": 2}},
+                {"op": "move", "from": "/battery/weight", "path": "/weight"},
+                {"op": "test", "path": "/meta/v", "value": 1},
+            ],
+        },
+        context={},
+    )
+    failed = execute_step(
+        db=None,
+        action="json_patch",
+        params={},
+        payload={
+            "document": document,
+            "operations": [{"op": "remove", "path": "/battery/missing"}],
+        },
+        context={},
+    )
+
+    assert result["status"] == "patched"
+    assert result["data"] == {
+        "battery": {"cells": [{"id": 1}, {"id": 2}]},
+        "meta": {"v": 1},
+        "weight": 5,
+    }
+    assert result["touched"] == ["/battery/cells/1", "/battery/weight", "/weight"]
+    assert document["battery"] == {"cells": [{"id": 1}], "weight": 5}
+    assert failed["status"] == "error"
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import services.shared.models  # noqa: F401
+from app.api.v1 import steps
+from app.core.unit_of_work import StepUnitOfWork
+from services.shared.models.audit_log import AuditLog
+from services.shared.models.base import Base
+from services.shared.models.event_outbox import EventOutbox
+from services.shared.models.session import SimulationSession
+from services.shared.models.session_timeline import SessionTimelineEntry
+from services.shared.models.story_progress import StoryProgress
+from services.shared.models.user import User
+
+
+def test_step_side_effects_are_committed_once():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    TestingSession = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    user_id = uuid4()
+    session_id = uuid4()
+    with TestingSession() as db:
+        db.add(User(id=user_id, keycloak_id="uow-user"))
+        db.add(
+            SimulationSession(
+                id=session_id,
+                user_id=user_id,
+                active_role="manufacturer",
+                session_state={},
+                is_active=True,
+            )
+        )
+        db.commit()
+
+    commits: list[object] = []
+    event.listen(engine, "commit", commits.append)
+
+    story = {"code": "US-UOW", "steps": [{"action": "custom.uow"}]}
+    result = {"status": "ok"}
+    with TestingSession() as db:
+        session = db.get(SimulationSession, session_id)
+        uow = StepUnitOfWork(db)
+        progress, created = steps._find_or_create_progress(db, session)
+        assert created
+        assert steps._apply_step_result(
+            db, session, progress, story, 0, story["steps"][0], result
+        )
+        for payload in steps._step_events(
+            user_id=str(user_id),
+            request_id="req-1",
+            session_id=str(session_id),
+            code="US-UOW",
+            idx=0,
+            action="custom.uow",
+            result=result,
+            metadata=None,
+            story_completed=progress.status == "completed",
+        ):
+            uow.publish(payload)
+        uow.audit(
+            **steps._step_audit(
+                session_id=str(session_id),
+                code="US-UOW",
+                idx=0,
+                user_id=str(user_id),
+                subject="test-user",
+                request_id="req-1",
+                details={"status": "ok"},
+            )
+        )
+        uow.commit()
+
+    assert len(commits) == 1
+    with TestingSession() as db:
+        assert db.query(StoryProgress).one().status == "completed"
+        session = db.get(SimulationSession, session_id)
+        assert session.session_state["timeline_summary"]["count"] == 1
+        assert db.query(SessionTimelineEntry).count() == 1
+        event_types = {row.payload["event_type"] for row in db.query(EventOutbox)}
+        assert event_types == {"story_step_completed", "story_completed"}
+        audit = db.query(AuditLog).one()
+        assert audit.object_id == f"{session_id}:US-UOW:0"
+
+
+def test_unit_of_work_keeps_state_when_audit_rows_fail():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    AuditLog.__table__.drop(engine)
+    TestingSession = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    with TestingSession() as db:
+        uow = StepUnitOfWork(db)
+        db.add(User(id=uuid4(), keycloak_id="uow-audit"))
+        uow.publish({"event_type": "story_step_completed"})
+        uow.audit(action="x", object_type="y", object_id="z")
+        uow.commit()
+
+    with TestingSession() as db:
+        assert db.query(User).filter(User.keycloak_id == "uow-audit").count() == 1
+        assert db.query(EventOutbox).count() == 1
@@ -5,7 +5,17 @@ import time
 
 import yaml
 
-from app.core.story_loader import lint_stories, list_stories
+import pytest
+
+from app.core.story_loader import (
+    clear_story_cache,
+    compile_story_bundle,
+    lint_stories,
+    list_epic_stories,
+    list_stories,
+    load_story,
+    mutable_copy,
+)
 
 
 def test_list_stories_includes_story_version_and_metadata(tmp_path):
@@ -78,6 +88,7 @@ def test_story_loader_cache_uses_file_signature_and_invalidates(tmp_path, monkey
         return original_safe_load(*args, **kwargs)
 
     monkeypatch.setattr("app.core.story_loader.yaml.safe_load", _counting_safe_load)
+    monkeypatch.setattr("app.core.story_loader.REFRESH_INTERVAL_SECONDS", 0)
 
     first = list_stories(data_dir=str(tmp_path))
     second = list_stories(data_dir=str(tmp_path))
@@ -101,3 +112,128 @@ def test_story_loader_cache_uses_file_signature_and_invalidates(tmp_path, monkey
     )
     list_stories(data_dir=str(tmp_path))
     assert call_count == 2
+
+
+def test_story_index_serves_frozen_stories_by_code_and_epic(tmp_path):
+    story_file = tmp_path / "stories.yaml"
+    story_file.write_text(
+        textwrap.dedent(
+            """
+            - code: US-31-01
+              title: "First"
+              steps:
+                - action: user.input
+                  params:
+                    prompt: "one"
+            - code: US-31-02
+              title: "Second"
+              steps:
+                - action: user.input
+            - code: US-32-01
+              title: "Other epic"
+              steps:
+                - action: user.input
+            """
+        ).strip()
+        + "\n",
+        encoding="utf-8",
+    )
+
+    story = load_story("US-31-02", data_dir=str(tmp_path))
+    assert story is load_story("US-31-02", data_dir=str(tmp_path))
+    assert [
+        item["code"] for item in list_epic_stories("EPIC-31", data_dir=str(tmp_path))
+    ] == [
+        "US-31-01",
+        "US-31-02",
+    ]
+    # The epic index shares the frozen stories of the code index.
+    assert list_epic_stories("EPIC-31", data_dir=str(tmp_path))[1] is story
+    assert list_epic_stories("EPIC-404", data_dir=str(tmp_path)) == []
+
+    first = load_story("US-31-01", data_dir=str(tmp_path))
+    with pytest.raises(TypeError):
+        first["title"] = "changed"
+    with pytest.raises(TypeError):
+        first["steps"][0]["params"]["prompt"] = "changed"
+
+    copy = mutable_copy(first)
+    copy["steps"][0]["params"]["prompt"] = "changed"
+    assert (
+        load_story("US-31-01", data_dir=str(tmp_path))["steps"][0]["params"]["prompt"]
+        == "one"
+    )
+
+
+def test_compiled_bundle_is_loaded_instead_of_yaml(tmp_path, monkeypatch):
+    stories_dir = tmp_path / "stories"
+    stories_dir.mkdir()
+    (stories_dir / "stories.yaml").write_text(
+        textwrap.dedent(
+            """
+            - code: US-41-01
+              title: "Bundled story"
+              steps:
+                - action: user.input
+            """
+        ).strip()
+        + "\n",
+        encoding="utf-8",
+    )
+    bundle_path = tmp_path / "stories.bundle.json"
+    info = compile_story_bundle(str(bundle_path), data_dir=str(stories_dir))
+    assert info["stories"] == 1
+    assert len(info["content_hash"]) == 64
+
+    monkeypatch.setenv("STORY_SOURCE", "bundle")
+    monkeypatch.setenv("STORY_BUNDLE_PATH", str(bundle_path))
+    monkeypatch.setattr(
+        "app.core.story_loader.yaml.safe_load",
+        lambda *_args, **_kwargs: pytest.fail("bundle mode must not parse YAML"),
+    )
+    clear_story_cache()
+    try:
+        story = load_story("US-41-01")
+        assert story["title"] == "Bundled story"
+        assert story["epic_code"] == "EPIC-41"
+
+        monkeypatch.setenv("STORY_BUNDLE_PATH", str(tmp_path / "missing.json"))
+        clear_story_cache()
+        with pytest.raises(KeyError):
+            load_story("US-41-01")
+    finally:
+        clear_story_cache()
+
+
+def test_auto_source_ignores_a_bundle_compiled_from_older_yaml(tmp_path, monkeypatch):
+    stories_dir = tmp_path / "stories"
+    stories_dir.mkdir()
+    source = stories_dir / "stories.yaml"
+
+    def _write(title: str) -> None:
+        source.write_text(
+            f"- code: US-42-01\n  title: {title}\n  steps:\n    - action: user.input\n",
+            encoding="utf-8",
+        )
+
+    _write("Compiled")
+    bundle_path = tmp_path / "stories.bundle.json"
+    compile_story_bundle(str(bundle_path), data_dir=str(stories_dir))
+
+    monkeypatch.setenv("STORY_SOURCE", "auto")
+    monkeypatch.setenv("STORY_BUNDLE_PATH", str(bundle_path))
+    monkeypatch.setattr("app.core.story_loader.DATA_DIR", str(stories_dir))
+    monkeypatch.setattr("app.core.story_loader.REFRESH_INTERVAL_SECONDS", 0.0)
+    clear_story_cache()
+    try:
+        with monkeypatch.context() as patched:
+            patched.setattr(
+                "app.core.story_loader.yaml.safe_load",
+                lambda *_args, **_kwargs: pytest.fail("fresh bundle must be used"),
+            )
+            assert load_story("US-42-01")["title"] == "Compiled"
+
+        _write("Edited in dev")
+        assert load_story("US-42-01")["title"] == "Edited in dev"
+    finally:
+        clear_story_cache()